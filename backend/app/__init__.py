@@ -19,6 +19,10 @@ from middleware.auth import init_jwt, generate_token, jwt_required_custom, get_c
 # Import database configuration
 # from routes.pdf_preview import pdf_preview_bp  # Temporarily disabled due to syntax error
 from config.database import init_db
+from services.event_loop import init_event_loop
+from services.taxonomy import init_taxonomy
+from services.arxiv_harvest import init_arxiv_harvester
+from app.json_provider import ScholarJSONProvider
 
 
 def create_app(config_name='development'):
@@ -33,6 +37,7 @@ def create_app(config_name='development'):
         Flask: Configured Flask application instance
     """
     app = Flask(__name__)
+    app.json = ScholarJSONProvider(app)
 
     # Configuration
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -60,6 +65,15 @@ def create_app(config_name='development'):
         app.logger.error(f"Failed to initialize database: {e}")
         # In development, continue anyway; in production, you might want to raise
 
+    # Start the app-level event loop that routes submit coroutines to
+    init_event_loop(app)
+
+    # Load the bundled concept/category snapshot; newer ones are picked up in the background
+    init_taxonomy(app)
+
+    # Keep recent arXiv papers in the local store (only when ARXIV_HARVEST_CATEGORIES is set)
+    init_arxiv_harvester(app)
+
     # Register blueprints
     from routes.auth import auth_bp
     from routes.paper_reader import paper_reader_bp
@@ -71,6 +85,7 @@ def create_app(config_name='development'):
     from routes.favorites import favorites_bp
     from routes.upload import upload_bp
     from routes.unified_papers import unified_papers_bp  # unified_papers_bp has url_prefix='/api/papers'
+    from routes.citation_graph import citation_graph_bp
 
     app.register_blueprint(auth_bp)  # auth_bp already has url_prefix='/api/auth'
     app.register_blueprint(paper_reader_bp, url_prefix='/api/papers')
@@ -82,11 +97,18 @@ def create_app(config_name='development'):
     app.register_blueprint(settings_bp)  # settings_bp already has url_prefix='/api/settings'
     app.register_blueprint(favorites_bp)  # favorites_bp already has url_prefix='/api/favorites'
     app.register_blueprint(upload_bp)  # upload_bp already has url_prefix='/api/upload'
+    app.register_blueprint(citation_graph_bp)  # citation_graph_bp already has url_prefix='/api/citation-graph'
 
     # Health check endpoint
     @app.route('/api/health')
     def health_check():
-        return {'success': True, 'status': 'healthy', 'message': 'ScholarAI API is running'}
+        from services.source_health import get_source_health
+        return {
+            'success': True,
+            'status': 'healthy',
+            'message': 'ScholarAI API is running',
+            'sources': get_source_health().snapshot()  # Per-upstream breaker state and latency
+        }
 
     # Error handlers
     @app.errorhandler(404)
@@ -0,0 +1,20 @@
+"""
+JSON provider
+=============
+Serializes Paper records (and other Mapping types) in jsonify responses.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+from models.paper import json_default
+
+
+class ScholarJSONProvider(DefaultJSONProvider):
+    """Default Flask JSON provider that also understands Paper records."""
+
+    @staticmethod
+    def default(o):
+        try:
+            return json_default(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
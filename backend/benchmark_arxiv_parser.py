@@ -0,0 +1,97 @@
+"""
+arXiv Atom parser benchmark
+对比 feedparser + ArxivClient._parse_paper 与流式解析器 arxiv_atom 的解析耗时和内存峰值
+
+用法:
+    python benchmark_arxiv_parser.py [feed.xml ...] [--entries 100] [--repeat 20]
+
+默认使用 tests/fixtures/arxiv_feed.xml，并将其中的条目复制到 --entries 条（arXiv max_results 上限为100）
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import feedparser
+
+from services.arxiv_atom import parse_feed
+from services.arxiv_client import ArxivClient
+
+DEFAULT_FEED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'arxiv_feed.xml')
+
+
+def expand_feed(content: bytes, entries: int) -> bytes:
+    """将响应中的条目循环复制到指定数量"""
+    text = content.decode('utf-8')
+    items = re.findall(r'<entry>.*?</entry>', text, flags=re.S)
+    if not items or entries <= 0:
+        return content
+    head = text[:text.index('<entry>')]
+    body = ''.join(items[i % len(items)] for i in range(entries))
+    return (head + body + '\n</feed>\n').encode('utf-8')
+
+
+def parse_with_feedparser(content: bytes, client: ArxivClient):
+    feed = feedparser.parse(content)
+    return [client._parse_paper(entry) for entry in feed.entries]
+
+
+def parse_with_atom(content: bytes, client: ArxivClient):
+    return parse_feed(content)[0]
+
+
+def measure(func, content: bytes, client: ArxivClient, repeat: int):
+    """返回 (每次耗时列表, 内存峰值字节数, 解析结果)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content, client)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func(content, client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark arXiv Atom parsers')
+    parser.add_argument('feeds', nargs='*', default=[DEFAULT_FEED], help='recorded arXiv API responses')
+    parser.add_argument('--entries', type=int, default=100, help='expand each feed to this many entries (0 = as recorded)')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per parser')
+    args = parser.parse_args()
+
+    client = ArxivClient()
+    print(f"{'feed':<24}{'entries':>8}{'parser':>12}{'median ms':>12}{'peak KiB':>10}")
+    print('-' * 66)
+
+    for path in args.feeds:
+        with open(path, 'rb') as f:
+            content = expand_feed(f.read(), args.entries)
+
+        results = {}
+        for name, func in (('feedparser', parse_with_feedparser), ('atom', parse_with_atom)):
+            timings, peak, papers = measure(func, content, client, args.repeat)
+            results[name] = (statistics.median(timings), papers)
+            print(f"{os.path.basename(path):<24}{len(papers):>8}{name:>12}"
+                  f"{statistics.median(timings) * 1000:>12.2f}{peak / 1024:>10.0f}")
+
+        speedup = results['feedparser'][0] / results['atom'][0]
+        # comment/journal_ref 只有流式解析器能读到（feedparser 使用 arxiv_ 前缀的键名）
+        mismatches = sum(
+            1 for a, b in zip(results['feedparser'][1], results['atom'][1])
+            if {k: v for k, v in a.items() if k not in ('comment', 'journal_ref')}
+            != {k: v for k, v in b.items() if k not in ('comment', 'journal_ref')}
+        )
+        print(f"{'':<24}speedup x{speedup:.1f}, mismatched papers: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Bulk metadata dump ingestion
+将OpenAlex快照（works/**/*.gz）或arXiv元数据转储（arxiv-metadata-oai-snapshot.json）批量导入 papers 集合
+
+解析和写入分布在多个进程中，每批一次无序批量写入；中断后使用相同的 --checkpoint 重新运行即可从上次的位置继续
+
+用法:
+    python ingest_dump.py openalex /data/openalex/works --workers 8
+    python ingest_dump.py arxiv arxiv-metadata-oai-snapshot.json --mode missing
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.database import init_db
+from services.bulk_ingest import FORMATS, MODES, BulkIngester
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest OpenAlex / arXiv metadata dumps into the paper store')
+    parser.add_argument('format', choices=sorted(FORMATS), help='dump format')
+    parser.add_argument('paths', nargs='+', help='dump files or directories (.gz / .json / .jsonl)')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count, 0 = in-process)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='records per bulk write')
+    parser.add_argument('--mode', choices=MODES, default='replace', help='replace stored papers or only insert missing ones')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file (default: .ingest-<format>.json)')
+    parser.add_argument('--restart', action='store_true', help='ignore the existing checkpoint')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    init_db()
+
+    checkpoint = args.checkpoint or f'.ingest-{args.format}.json'
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    ingester = BulkIngester(
+        args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        mode=args.mode,
+        checkpoint=checkpoint
+    )
+    stats = ingester.ingest(args.paths)
+    print(' '.join(f'{key}={value}' for key, value in stats.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ from .user import User, UserRole, UserStats
 from .project import Project, ProjectPaper, ProjectProgress
 from .settings import UserSettings, Theme, Language, ApiConfig
 from .favorites import Favorite, Folder
+from .paper import Paper
 
 __all__ = ['User', 'UserRole', 'UserStats', 'Project', 'ProjectPaper', 'ProjectProgress',
-           'UserSettings', 'Theme', 'Language', 'ApiConfig', 'Favorite', 'Folder']
+           'UserSettings', 'Theme', 'Language', 'ApiConfig', 'Favorite', 'Folder', 'Paper']
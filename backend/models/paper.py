@@ -0,0 +1,209 @@
+"""
+ScholarAI - 论文记录
+
+各数据源客户端 _parse_paper 产生的标准化论文数据。
+
+与每篇论文一个普通字典相比：
+- 已知字段存放在 __slots__ 中，没有实例字典，未设置的字段不占用额外存储
+- 未知字段（如合并、排序时附加的字段）存放在按需创建的 _extra 字典中
+- 实现 MutableMapping 接口，现有按字典读写论文的代码（get/[]/in/dict()/items()）无需修改
+- to_dict / to_json 直接按槽位序列化
+"""
+
+import copy
+import json
+import re
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+# 标准化时使用的预编译正则
+YEAR_PATTERN = re.compile(r'(\d{4})')
+MARKUP_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 已知字段（顺序即序列化顺序）
+FIELDS = (
+    # 所有数据源共有
+    'paper_id', 'title', 'authors', 'summary', 'published', 'published_year', 'updated',
+    'categories', 'primary_category', 'pdf_url', 'arxiv_url', 'comment', 'journal_ref',
+    # 数据源特有（可选）
+    'source', 'citations', 'year', 'citation_count', 'influential_citation_count', 'venue',
+    'publication_type', 'publication_types', 'publication_date', 'is_open_access', 'doi', 'pmid',
+    'external_ids', 'concepts', 'topics', 's2_fields_of_study',
+    # 合并、排序结果
+    'sources', 'source_ids', 'local_score', 'score', 'citation_rank'
+)
+
+_FIELD_SET = frozenset(FIELDS)
+_UNSET = object()
+
+
+class Paper(MutableMapping):
+    """
+    标准化论文记录
+
+    用法:
+        paper = Paper(paper_id='2301.00001', title='...', authors=[...])
+        paper['source'] = 'arxiv'
+        paper.get('doi')
+        paper.to_dict()
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, fields: Optional[Mapping] = None, **kwargs):
+        """
+        Args:
+            fields: 初始字段
+            **kwargs: 初始字段（覆盖 fields 中的同名字段）
+        """
+        self._extra = None
+        if fields:
+            self._assign(fields.items())
+        if kwargs:
+            self._assign(kwargs.items())
+
+    def _assign(self, items) -> None:
+        """批量设置字段（构造时的快速路径）"""
+        extra = self._extra
+        for name, value in items:
+            if name in _FIELD_SET:
+                setattr(self, name, value)
+            else:
+                if extra is None:
+                    extra = self._extra = {}
+                extra[name] = value
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping, **overrides) -> 'Paper':
+        """从字典或另一条论文记录创建（浅拷贝），可同时覆盖部分字段"""
+        paper = cls(mapping)
+        if overrides:
+            paper._assign(overrides.items())
+        return paper
+
+    # --- Mapping 接口 ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key, _UNSET)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELD_SET:
+            if getattr(self, key, _UNSET) is _UNSET:
+                raise KeyError(key)
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in FIELDS:
+            if getattr(self, name, _UNSET) is not _UNSET:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        count = sum(1 for name in FIELDS if getattr(self, name, _UNSET) is not _UNSET)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELD_SET:
+            return getattr(self, key, _UNSET) is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key, _UNSET)
+            return default if value is _UNSET else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    # --- 拷贝与序列化 ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（浅拷贝）"""
+        data = {}
+        for name in FIELDS:
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                data[name] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def to_json(self) -> str:
+        """序列化为JSON字符串"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=json_default)
+
+    def copy(self) -> 'Paper':
+        """浅拷贝"""
+        return self.__copy__()
+
+    def __copy__(self) -> 'Paper':
+        paper = Paper.__new__(Paper)
+        for name in FIELDS:
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                setattr(paper, name, value)
+        paper._extra = dict(self._extra) if self._extra else None
+        return paper
+
+    def __deepcopy__(self, memo: Dict) -> 'Paper':
+        paper = Paper.__new__(Paper)
+        memo[id(self)] = paper
+        for name in FIELDS:
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                # 字符串、数字等不可变值无需拷贝
+                if isinstance(value, (list, dict)):
+                    value = copy.deepcopy(value, memo)
+                setattr(paper, name, value)
+        paper._extra = copy.deepcopy(self._extra, memo) if self._extra else None
+        return paper
+
+    def __reduce__(self):
+        return (Paper, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f'Paper({self.to_dict()!r})'
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps 的 default 参数：序列化论文记录（其他Mapping转为字典）"""
+    if isinstance(value, Paper):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def extract_year(text: Optional[str]) -> Optional[int]:
+    """从日期字符串中提取年份"""
+    if not text:
+        return None
+    match = YEAR_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def strip_markup(text: Optional[str]) -> str:
+    """移除摘要中的JATS/HTML标签"""
+    if not text or '<' not in text:
+        return text
+    return MARKUP_TAG_PATTERN.sub('', text)
@@ -8,7 +8,7 @@ import logging
 from flask import Blueprint, request, jsonify, Response, stream_with_context
 from typing import Dict, List, Optional
 
-from services.zhipu_client import get_zhipu_client
+from services.zhipu_client import get_zhipu_client, get_llm_cache
 from middleware.auth import jwt_required_custom, get_current_user_id
 
 # Configure logging
@@ -33,7 +33,8 @@ def chat():
             "api_config": {
                 "model": "glm-4-flash",
                 "temperature": 0.7,
-                "max_tokens": 2000
+                "max_tokens": 2000,
+                "cache": true           // 可选，false时不使用补全缓存
             }
         }
 
@@ -95,7 +96,8 @@ def chat():
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            stream=False
+            stream=False,
+            cache=api_config.get('cache')
         )
 
         if not result.get('success'):
@@ -201,7 +203,8 @@ def chat_stream():
                     messages=messages,
                     model=model,
                     temperature=temperature,
-                    max_tokens=max_tokens
+                    max_tokens=max_tokens,
+                    cache=api_config.get('cache')
                 )
 
                 # 处理流式响应
@@ -234,3 +237,25 @@ def chat_stream():
             'success': False,
             'error': f'处理请求时发生错误: {str(e)}'
         }), 500
+
+
+@ai_bp.route('/cache/stats', methods=['GET'])
+def get_llm_cache_stats():
+    """
+    获取LLM补全缓存统计信息
+
+    Response:
+        {
+            "success": true,
+            "data": {
+                "hits": 120,
+                "misses": 30,
+                "hit_rate": 0.8,
+                ...
+            }
+        }
+    """
+    return jsonify({
+        'success': True,
+        'data': get_llm_cache().stats()
+    })
@@ -0,0 +1,328 @@
+"""
+引用图API路由
+引用/参考文献列表、k跳邻域、共同引用和最短引用路径，均基于本地引用图查询；
+相关论文和排序分数来自引用图排序（PageRank / 共被引 / 文献耦合）
+"""
+
+from flask import Blueprint, request, jsonify
+from services.citation_graph import DIRECTIONS, get_citation_graph
+from services.citation_rank import get_citation_ranker
+from services.event_loop import run_async
+
+citation_graph_bp = Blueprint('citation_graph', __name__, url_prefix='/api/citation-graph')
+
+# 查询参数上限，避免单个请求触发过多上游抓取
+MAX_HOPS = 3
+MAX_NODES = 5000
+MAX_EXPAND = 100
+MAX_PATH_DEPTH = 6
+
+
+def _resolve(graph, paper_id):
+    """解析论文ID，失败时返回None"""
+    return run_async(graph.resolve(paper_id))
+
+
+def _not_found(paper_id):
+    return jsonify({
+        'success': False,
+        'error': f'未找到论文: {paper_id}'
+    }), 404
+
+
+def _list_neighbors(paper_id, direction):
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+
+    graph = get_citation_graph()
+    resolved = _resolve(graph, paper_id)
+    if resolved is None:
+        return _not_found(paper_id)
+
+    data = run_async(graph.neighbors(resolved, direction, offset=offset, limit=limit))
+    return jsonify({
+        'success': True,
+        'data': data
+    })
+
+
+@citation_graph_bp.route('/papers/<path:paper_id>/citations', methods=['GET'])
+def get_citations(paper_id):
+    """
+    获取引用该论文的论文（按被引数降序）
+
+    Path Parameters:
+        paper_id (str): S2论文ID，或 arXiv:xxx、DOI:xxx 等形式
+
+    Query Parameters:
+        offset (int, optional): 起始位置，默认0
+        limit (int, optional): 返回数量，默认100，最大1000
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "paper_id": "...",
+                "papers": [{"paper_id": "...", "title": "...", "year": 2020, "citation_count": 12}],
+                "total": 1500,
+                "truncated": false
+            }
+        }
+    """
+    try:
+        return _list_neighbors(paper_id, 'citations')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'获取引用失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/papers/<path:paper_id>/references', methods=['GET'])
+def get_references(paper_id):
+    """
+    获取该论文的参考文献（按被引数降序）
+
+    参数和返回格式同 /papers/<paper_id>/citations
+    """
+    try:
+        return _list_neighbors(paper_id, 'references')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'获取参考文献失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/papers/<path:paper_id>/neighborhood', methods=['GET'])
+def get_neighborhood(paper_id):
+    """
+    获取论文的k跳引用邻域
+
+    Query Parameters:
+        hops (int, optional): 跳数，默认1，最大3
+        direction (str, optional): citations、references 或 both，默认both
+        max_nodes (int, optional): 返回的最大节点数，默认500
+        max_expand (int, optional): 每跳最多展开的节点数（按被引数选取），默认25
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "paper_id": "...",
+                "nodes": [{"paper_id": "...", "hop": 1, "title": "...", ...}],
+                "edges": [{"citing": "...", "cited": "..."}],
+                "errors": {}
+            }
+        }
+    """
+    try:
+        hops = min(max(request.args.get('hops', 1, type=int), 1), MAX_HOPS)
+        direction = request.args.get('direction', 'both')
+        max_nodes = min(max(request.args.get('max_nodes', 500, type=int), 1), MAX_NODES)
+        max_expand = min(max(request.args.get('max_expand', 25, type=int), 1), MAX_EXPAND)
+        if direction not in DIRECTIONS + ('both',):
+            return jsonify({
+                'success': False,
+                'error': 'direction 必须是 citations、references 或 both'
+            }), 400
+
+        graph = get_citation_graph()
+        resolved = _resolve(graph, paper_id)
+        if resolved is None:
+            return _not_found(paper_id)
+
+        data = run_async(graph.neighborhood(
+            resolved,
+            hops=hops,
+            direction=direction,
+            max_nodes=max_nodes,
+            max_expand=max_expand
+        ))
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'获取引用邻域失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/papers/<path:paper_id>/related', methods=['GET'])
+def get_related(paper_id):
+    """
+    按共被引和文献耦合获取相关论文（基于已保存的引用图，不请求上游）
+
+    Query Parameters:
+        limit (int, optional): 返回数量，默认10，最大100
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "paper_id": "...",
+                "scores": {"pagerank": 1.2e-05, "percentile": 0.93, "cocitation": 40, "coupling": 12},
+                "papers": [{"paper_id": "...", "title": "...", "cocitation": 5, "coupling": 2, "score": 7, ...}]
+            }
+        }
+    """
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+
+        graph = get_citation_graph()
+        resolved = _resolve(graph, paper_id)
+        if resolved is None:
+            return _not_found(paper_id)
+
+        ranker = get_citation_ranker()
+        related = ranker.related(resolved, k=limit)
+        info = graph.describe([pid for pid, _ in related])
+        return jsonify({
+            'success': True,
+            'data': {
+                'paper_id': resolved,
+                'scores': ranker.scores(resolved),
+                'papers': [dict(info[pid], paper_id=pid, **scores) for pid, scores in related]
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'获取相关论文失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/common', methods=['GET'])
+def get_common():
+    """
+    共同引用 / 共同参考文献
+
+    Query Parameters:
+        ids (str): 逗号分隔的论文ID（2-20个）
+        direction (str, optional):
+            - citations: 同时引用所有给定论文的论文（默认）
+            - references: 被所有给定论文引用的论文
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {"paper_ids": [...], "direction": "citations", "papers": [...], "total": 8}
+        }
+    """
+    try:
+        ids = [pid.strip() for pid in request.args.get('ids', '').split(',') if pid.strip()]
+        direction = request.args.get('direction', 'citations')
+        if not 2 <= len(ids) <= 20:
+            return jsonify({
+                'success': False,
+                'error': 'ids 需要2-20个逗号分隔的论文ID'
+            }), 400
+        if direction not in DIRECTIONS:
+            return jsonify({
+                'success': False,
+                'error': 'direction 必须是 citations 或 references'
+            }), 400
+
+        graph = get_citation_graph()
+        resolved = []
+        for pid in ids:
+            rid = _resolve(graph, pid)
+            if rid is None:
+                return _not_found(pid)
+            resolved.append(rid)
+
+        data = run_async(graph.common(resolved, direction))
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'获取共同引用失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/path', methods=['GET'])
+def get_path():
+    """
+    两篇论文之间的最短引用路径（忽略引用方向）
+
+    Query Parameters:
+        from (str): 起点论文ID
+        to (str): 终点论文ID
+        max_depth (int, optional): 最大路径长度，默认4，最大6
+        max_expand (int, optional): 最多展开的节点数，默认50
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "path": [{"paper_id": "...", "title": "...", ...}] 或 null,
+                "edges": [{"citing": "...", "cited": "..."}],
+                "expanded": 12
+            }
+        }
+    """
+    try:
+        source = request.args.get('from', '').strip()
+        target = request.args.get('to', '').strip()
+        if not source or not target:
+            return jsonify({
+                'success': False,
+                'error': '缺少from或to参数'
+            }), 400
+        max_depth = min(max(request.args.get('max_depth', 4, type=int), 1), MAX_PATH_DEPTH)
+        max_expand = min(max(request.args.get('max_expand', 50, type=int), 1), MAX_EXPAND)
+
+        graph = get_citation_graph()
+        resolved_source = _resolve(graph, source)
+        if resolved_source is None:
+            return _not_found(source)
+        resolved_target = _resolve(graph, target)
+        if resolved_target is None:
+            return _not_found(target)
+
+        data = run_async(graph.shortest_path(
+            resolved_source,
+            resolved_target,
+            max_depth=max_depth,
+            max_expand=max_expand
+        ))
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'查找引用路径失败: {str(e)}'
+        }), 500
+
+
+@citation_graph_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """
+    获取引用图统计信息
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "nodes": 12000, "edges": 30000, "memory_hits": 80, "store_hits": 5, ...,
+                "ranking": {"papers": 250000, "edges": 1200000, "iterations": 38, ...}
+            }
+        }
+    """
+    data = get_citation_graph().stats()
+    data['ranking'] = get_citation_ranker().stats()
+    return jsonify({
+        'success': True,
+        'data': data
+    })
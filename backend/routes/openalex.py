@@ -5,7 +5,7 @@ OpenAlex API Routes
 
 from flask import Blueprint, request, jsonify
 from services.openalex_client import get_openalex_client
-import asyncio
+from services.event_loop import run_async
 
 # 创建蓝图
 openalex_bp = Blueprint('openalex', __name__, url_prefix='/api/openalex')
@@ -91,7 +91,7 @@ def search_papers():
 
         # 调用API
         client = get_openalex_client()
-        result = asyncio.run(client.search_papers(
+        result = run_async(client.search_papers(
             query=query,
             filter_fields=filter_fields if filter_fields else None,
             page=page,
@@ -127,7 +127,7 @@ def get_paper_details(paper_id):
     """
     try:
         client = get_openalex_client()
-        result = asyncio.run(client.get_paper_details(paper_id))
+        result = run_async(client.get_paper_details(paper_id))
 
         if result.get('success'):
             return jsonify(result)
@@ -161,7 +161,7 @@ def get_paper_pdf(paper_id):
     """
     try:
         client = get_openalex_client()
-        result = asyncio.run(client.get_paper_pdf_url(paper_id))
+        result = run_async(client.get_paper_pdf_url(paper_id))
 
         if result.get('success'):
             return jsonify(result)
@@ -197,7 +197,7 @@ def get_random_papers():
         count = min(count, 50)  # 限制最大值
 
         client = get_openalex_client()
-        result = asyncio.run(client.get_random_papers(count=count))
+        result = run_async(client.get_random_papers(count=count))
 
         if result.get('success'):
             return jsonify(result)
@@ -232,7 +232,7 @@ def get_concepts():
         limit = request.args.get('limit', 100, type=int)
 
         client = get_openalex_client()
-        result = asyncio.run(client.get_concepts(limit=limit))
+        result = run_async(client.get_concepts(limit=limit))
 
         if result.get('success'):
             return jsonify(result)
@@ -272,7 +272,7 @@ def compare_all_apis():
 
         # 1. OpenAlex（无限制）
         openalex_client = get_openalex_client()
-        openalex_result = asyncio.run(openalex_client.search_papers(
+        openalex_result = run_async(openalex_client.search_papers(
             query=query,
             page=1,
             page_size=limit
@@ -286,7 +286,7 @@ def compare_all_apis():
         # 2. arXiv（无限制）
         from services.arxiv_client import get_arxiv_client
         arxiv_client = get_arxiv_client()
-        arxiv_result = asyncio.run(arxiv_client.search_papers(
+        arxiv_result = run_async(arxiv_client.search_papers(
             query=query,
             page=1,
             page_size=limit
@@ -301,7 +301,7 @@ def compare_all_apis():
         try:
             from services.semantic_scholar_client import get_semantic_scholar_client
             s2_client = get_semantic_scholar_client()
-            s2_result = asyncio.run(s2_client.search_papers(
+            s2_result = run_async(s2_client.search_papers(
                 query=query,
                 page=1,
                 page_size=limit
@@ -3,10 +3,13 @@ Papers API Routes
 使用OpenAlex API实现论文搜索和详情查询（完全免费无限制）
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 import logging
 from services.unified_search_fix import get_fixed_paper_search  # Use fixed version with correct OpenAlex filters
 from services.openalex_client import get_openalex_client  # Import OpenAlex client
+from services.event_loop import run_async
+from services.projection import PROFILES, project_result, resolve_fields
+from services.taxonomy import KINDS, get_taxonomy
 
 # 创建蓝图
 papers_bp = Blueprint('papers', __name__, url_prefix='/api/papers')
@@ -26,6 +29,7 @@ def search_papers():
         venue: 发表场所 (可选)
         page: 页码 (可选, 默认1)
         page_size: 每页数量 (可选, 默认20, 最大200)
+        fields: 返回字段，视图名 (list, detail, full) 或逗号分隔的字段名 (可选, 默认full)
 
     Returns:
         JSON响应包含论文列表和分页信息
@@ -39,6 +43,13 @@ def search_papers():
         venue = request.args.get('venue', '').strip() or None
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('page_size', 20, type=int)
+        try:
+            profile, fields = resolve_fields(request.args.get('fields'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': f'无效的fields参数，可选视图: {", ".join(PROFILES)}，或逗号分隔的字段名'
+            }), 400
 
         # 验证必填参数
         if not query:
@@ -70,16 +81,16 @@ def search_papers():
             filter_fields['venue'] = venue
 
         # 调用OpenAlex搜索
-        import asyncio
-        result = asyncio.run(client.search_papers(
+        result = run_async(client.search_papers(
             query=query,
             filter_fields=filter_fields,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            profile=profile
         ))
 
         if result['success']:
-            return jsonify(result)
+            return jsonify(project_result(result, profile, fields))
         else:
             return jsonify({
                 'success': False,
@@ -102,6 +113,9 @@ def get_paper_details(paper_id):
     Path Parameters:
         paper_id: 论文ID (支持OpenAlex ID或arXiv ID)
 
+    Query Parameters:
+        fields: 返回字段，视图名 (list, detail, full) 或逗号分隔的字段名 (可选, 默认full)
+
     Returns:
         JSON响应包含论文详情
     """
@@ -111,26 +125,31 @@ def get_paper_details(paper_id):
                 'success': False,
                 'error': '论文ID不能为空'
             }), 400
+        try:
+            profile, fields = resolve_fields(request.args.get('fields'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': f'无效的fields参数，可选视图: {", ".join(PROFILES)}，或逗号分隔的字段名'
+            }), 400
 
         # 获取OpenAlex客户端
         client = get_openalex_client()
 
         # 获取论文详情
-        import asyncio
-
         # 检测是否为arXiv ID格式 (YYMM.NNNNN)
         import re
         arxiv_pattern = r'^\d{4}\.\d{5}(v\d+)?$'
 
         if bool(re.match(arxiv_pattern, paper_id)):
             # 使用arXiv ID查找
-            result = asyncio.run(client.get_paper_by_arxiv_id(paper_id))
+            result = run_async(client.get_paper_by_arxiv_id(paper_id, profile=profile))
         else:
             # 使用OpenAlex ID查找
-            result = asyncio.run(client.get_paper_details(paper_id))
+            result = run_async(client.get_paper_details(paper_id, profile=profile))
 
         if result['success']:
-            return jsonify(result)
+            return jsonify(project_result(result, profile, fields))
         else:
             return jsonify({
                 'success': False,
@@ -167,8 +186,7 @@ def get_paper_pdf(paper_id):
         client = get_openalex_client()
 
         # 获取PDF URL
-        import asyncio
-        result = asyncio.run(client.get_paper_pdf_url(paper_id))
+        result = run_async(client.get_paper_pdf_url(paper_id))
 
         if result['success']:
             return jsonify(result)
@@ -191,21 +209,37 @@ def get_fields():
     """
     获取研究领域列表（OpenAlex Concepts）
 
+    来自启动时加载、后台定期刷新的分类快照（services/taxonomy.py），不请求OpenAlex；
+    响应带有 ETag（快照版本），客户端可用 If-None-Match 获取 304
+
+    Query Parameters:
+        type (str, optional): concepts（默认）、topics 或 arxiv（arXiv分类）
+        limit (int, optional): 返回数量，默认50
+
     Returns:
-        JSON响应包含领域列表
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "concepts": [{"id": "C41008148", "name": "Computer science", "level": 0, ...}],
+                "total": 65000,
+                "version": "3f2a...",
+                "fetched_at": "2026-10-01T00:00:00"
+            }
+        }
     """
     try:
-        client = get_openalex_client()
-        import asyncio
-        result = asyncio.run(client.get_concepts(limit=50))
-
-        if result['success']:
-            return jsonify(result)
-        else:
+        kind = request.args.get('type', 'concepts')
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+        if kind not in KINDS:
             return jsonify({
                 'success': False,
-                'error': result.get('error', '获取领域列表失败')
-            }), 500
+                'error': f'无效的type参数，可选值: {", ".join(KINDS)}'
+            }), 400
+
+        snapshot = get_taxonomy().snapshot
+        response = Response(snapshot.payload(kind, limit), mimetype='application/json')
+        response.set_etag(snapshot.version)
+        return response.make_conditional(request)
 
     except Exception as e:
         logger.error(f"获取领域列表失败: {str(e)}")
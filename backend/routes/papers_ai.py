@@ -10,30 +10,49 @@ Provides intelligent features on top of arXiv search results:
 from flask import Blueprint, request, jsonify, Response, stream_with_context
 from services.arxiv_client import ArxivClient
 from services.zhipu_client import ZhipuClient
+from services.unified_search import get_unified_search
+from services.vector_index import get_vector_index
+from services.citation_rank import get_citation_ranker
+from models.paper import Paper
+from services.event_loop import run_async
+from services.llm_batch import DEFAULT_LIMIT as LLM_MAX_CONCURRENCY, BoundedLLMExecutor
 import json
+import re
 
 papers_ai_bp = Blueprint('papers_ai', __name__, url_prefix='/api/papers-ai')
 
+# Upper bound on papers per /summarize request
+MAX_SUMMARIZE_PAPERS = 20
+
+
+def fetch_papers_with_errors(paper_ids: list) -> tuple:
+    """
+    Fetch paper details in one batch.
+
+    Returns ({requested_id: paper} in input order, {requested_id: error}).
+    """
+    result = run_async(get_unified_search().get_papers_batch(paper_ids))
+    return result['data']['papers'], result['data'].get('errors', {})
+
+
+def fetch_papers(paper_ids: list) -> list:
+    """Fetch paper details for the given IDs in one batch, preserving input order."""
+    return list(fetch_papers_with_errors(paper_ids)[0].values())
+
 
 def get_papers_context(paper_ids: list) -> str:
     """Build context string from paper IDs for AI prompts."""
-    client = ArxivClient()
     papers_data = []
 
-    for paper_id in paper_ids:
-        try:
-            paper = client.get_paper_details(paper_id)
-            if paper:
-                papers_data.append(f"""
-Paper ID: {paper.get('id', 'N/A')}
+    for paper in fetch_papers(paper_ids):
+        papers_data.append(f"""
+Paper ID: {paper.get('paper_id', 'N/A')}
 Title: {paper.get('title', 'N/A')}
 Authors: {', '.join(paper.get('authors', []))}
-Abstract: {paper.get('abstract', 'N/A')}
+Abstract: {paper.get('summary', 'N/A')}
 Published: {paper.get('published', 'N/A')}
 Categories: {', '.join(paper.get('categories', []))}
 """)
-        except Exception as e:
-            continue
 
     return '\n\n'.join(papers_data)
 
@@ -348,10 +367,18 @@ def recommend_papers():
     """
     Recommend related papers based on a given paper.
 
+    Candidates come from the local TF-IDF/SVD vector index over stored papers
+    (see services/vector_index.py), so no LLM call is needed. With "explain": true
+    the LLM is asked once to write the "reason" text for the retrieved papers.
+    With "rank": "citation" a wider candidate set is re-ranked by the papers'
+    PageRank in the local citation graph (see services/citation_rank.py).
+
     Request body:
     {
         "paper_id": "2301.00001",
         "count": 5,                 // Optional, default 5
+        "explain": false,           // Optional: LLM-written reasons
+        "rank": "citation",         // Optional: re-rank by citation graph score
         "api_config": { ... }        // Optional
     }
 
@@ -363,9 +390,13 @@ def recommend_papers():
                 {
                     "paper_id": "2301.00002",
                     "title": "...",
+                    "source": "arxiv",
+                    "score": 0.42,
+                    "citation_rank": 0.91,   // Only with "rank": "citation"; null if not in the graph
                     "reason": "This paper builds upon..."
                 }
-            ]
+            ],
+            "index": { ... }         // Vector index stats
         }
     }
     """
@@ -381,118 +412,66 @@ def recommend_papers():
         paper_id = data['paper_id']
         count = data.get('count', 5)
         api_config = data.get('api_config', {})
+        rank = data.get('rank')
 
         if count < 1 or count > 10:
             return jsonify({
                 'success': False,
                 'error': 'count must be between 1 and 10'
             }), 400
-
-        # Get source paper details
-        arxiv_client = ArxivClient()
-        try:
-            source_paper = arxiv_client.get_paper_details(paper_id)
-        except Exception as e:
+        if rank not in (None, 'citation'):
             return jsonify({
                 'success': False,
-                'error': f'Failed to fetch paper: {str(e)}'
-            }), 404
+                'error': 'rank must be "citation" when given'
+            }), 400
 
-        if not source_paper:
+        # Get source paper details
+        papers = fetch_papers([paper_id])
+        if not papers:
             return jsonify({
                 'success': False,
                 'error': 'Paper not found'
             }), 404
+        source_paper = papers[0]
+
+        index = get_vector_index()
+        # Re-ranking needs a wider candidate pool than the final count
+        candidates = [
+            Paper.from_mapping(paper, score=round(score, 4))
+            for paper, score in index.similar(source_paper, k=count * 3 if rank else count)
+        ]
+        if rank == 'citation':
+            candidates = get_citation_ranker().rerank(candidates)
+
+        recommendations = []
+        for paper in candidates[:count]:
+            reason = f"Similar title and abstract content (cosine similarity {paper['score']:.2f})"
+            if paper.get('citation_rank') is not None:
+                reason += f", citation graph PageRank percentile {paper['citation_rank']:.2f}"
+            recommendation = {
+                'paper_id': paper.get('paper_id'),
+                'title': paper.get('title'),
+                'source': paper.get('source'),
+                'authors': paper.get('authors', [])[:5],
+                'published_year': paper.get('published_year'),
+                'score': paper['score'],
+                'reason': reason
+            }
+            if rank:
+                recommendation['citation_rank'] = paper.get('citation_rank')
+            recommendations.append(recommendation)
 
-        # Build prompt for recommendations
-        prompt = f"""You are a research assistant specializing in academic paper recommendations.
-
-Based on the following paper, suggest {count} related papers that researchers interested in this topic should read.
-
-Source Paper:
-Title: {source_paper.get('title', 'N/A')}
-Authors: {', '.join(source_paper.get('authors', []))}
-Abstract: {source_paper.get('abstract', 'N/A')}
-Categories: {', '.join(source_paper.get('categories', []))}
-
-For each recommendation, provide:
-1. Paper ID (use arXiv ID format like 2301.00001)
-2. Title (your best estimate if exact paper doesn't exist)
-3. A brief reason why it's relevant
-
-Return ONLY a JSON array of objects with this exact structure:
-[
-  {{
-    "paper_id": "2301.00001",
-    "title": "Paper Title",
-    "reason": "Reason for recommendation..."
-  }}
-]
-
-Focus on:
-- Papers cited by this work
-- Papers that cite this work
-- Papers in the same field with similar approaches
-- Seminal works in this area
-- Recent advances on this topic"""
-
-        # Initialize AI client
-        ai_client = ZhipuClient(api_key=api_config.get('api_key'))
-
-        response = ai_client.chat_completion(
-            messages=[{"role": "user", "content": prompt}],
-            stream=False
-        )
-
-        if not response.get('success'):
-            return jsonify({
-                'success': False,
-                'error': response.get('error', 'AI request failed')
-            }), 500
-
-        content = response['data']['choices'][0]['message']['content']
-
-        # Parse recommendations
-        try:
-            # Try to extract JSON array
-            import re
-            json_match = re.search(r'\[[\s\S]*?\]', content)
-            if json_match:
-                recommendations = json.loads(json_match.group())
-            else:
-                recommendations = json.loads(content)
-
-            # Validate structure
-            if not isinstance(recommendations, list):
-                raise ValueError('Response is not a list')
-
+        if data.get('explain') and recommendations:
+            reasons = explain_recommendations(source_paper, recommendations, api_config)
             for rec in recommendations:
-                if not all(k in rec for k in ['paper_id', 'title', 'reason']):
-                    raise ValueError('Missing required fields in recommendation')
-
-        except Exception as e:
-            # Fallback: create basic structure from AI text
-            recommendations = []
-            lines = content.split('\n')
-            current_rec = {}
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                if 'paper_id' in line.lower() or line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-                    if current_rec:
-                        recommendations.append(current_rec)
-                    current_rec = {'paper_id': 'N/A', 'title': 'See response text', 'reason': line}
-                elif current_rec:
-                    current_rec['reason'] = current_rec.get('reason', '') + ' ' + line
-
-            if current_rec:
-                recommendations.append(current_rec)
+                if reasons.get(rec['paper_id']):
+                    rec['reason'] = reasons[rec['paper_id']]
 
         return jsonify({
             'success': True,
             'data': {
-                'recommendations': recommendations[:count]
+                'recommendations': recommendations,
+                'index': index.stats()
             }
         })
 
@@ -503,6 +482,41 @@ Focus on:
         }), 500
 
 
+def explain_recommendations(source_paper: dict, recommendations: list, api_config: dict) -> dict:
+    """Ask the LLM once for a short reason per recommended paper (best effort)."""
+    candidates = '\n'.join(
+        f"- {rec['paper_id']}: {rec['title']}" for rec in recommendations
+    )
+    prompt = f"""You are a research assistant specializing in academic paper recommendations.
+
+Source Paper:
+Title: {source_paper.get('title', 'N/A')}
+Abstract: {source_paper.get('summary', 'N/A')}
+
+Related papers:
+{candidates}
+
+For each related paper, write one sentence explaining why a reader of the source paper
+should read it. Return ONLY a JSON object mapping paper ID to reason:
+{{"2301.00002": "Reason..."}}"""
+
+    ai_client = ZhipuClient(api_key=api_config.get('api_key'))
+    response = ai_client.chat_completion(
+        messages=[{"role": "user", "content": prompt}],
+        stream=False
+    )
+    if not response.get('success'):
+        return {}
+
+    content = response['data']['choices'][0]['message']['content']
+    try:
+        json_match = re.search(r'\{[\s\S]*\}', content)
+        reasons = json.loads(json_match.group() if json_match else content)
+    except (ValueError, AttributeError):
+        return {}
+    return reasons if isinstance(reasons, dict) else {}
+
+
 @papers_ai_bp.route('/summarize', methods=['POST'])
 def summarize_papers():
     """
@@ -513,6 +527,7 @@ def summarize_papers():
         "paper_ids": ["2301.00001", "2301.00002"],
         "length": "medium",          // Optional: short, medium, long
         "stream": false,              // Optional
+        "max_concurrency": 4,         // Optional: parallel LLM calls (at most LLM_MAX_CONCURRENCY)
         "api_config": { ... }         // Optional
     }
 
@@ -526,10 +541,24 @@ def summarize_papers():
                     "title": "...",
                     "summary": "...",
                     "key_points": ["...", "..."]
+                },
+                {
+                    "paper_id": "2301.00002",
+                    "title": "...",
+                    "error": "..."        // Per-paper failure
                 }
-            ]
+            ],
+            "failed": 1
         }
     }
+
+    Streaming response (text/event-stream), papers generated concurrently
+    and interleaved as chunks arrive:
+        data: {"paper_id": "2301.00002", "content": "..."}
+        data: {"paper_id": "2301.00001", "content": "..."}
+        data: {"paper_id": "2301.00002", "done": true}
+        data: {"paper_id": "2301.00001", "error": "..."}
+        data: [DONE]
     """
     try:
         data = request.get_json()
@@ -551,12 +580,22 @@ def summarize_papers():
                 'error': 'Please provide at least 1 paper ID'
             }), 400
 
-        if len(paper_ids) > 10:
+        if len(paper_ids) > MAX_SUMMARIZE_PAPERS:
             return jsonify({
                 'success': False,
-                'error': 'Maximum 10 papers can be summarized at once'
+                'error': f'Maximum {MAX_SUMMARIZE_PAPERS} papers can be summarized at once'
             }), 400
 
+        # Parallel LLM calls: client value capped at LLM_MAX_CONCURRENCY
+        max_concurrency = data.get('max_concurrency')
+        if max_concurrency is not None and (
+                isinstance(max_concurrency, bool) or not isinstance(max_concurrency, int) or max_concurrency < 1):
+            return jsonify({
+                'success': False,
+                'error': 'max_concurrency must be a positive integer'
+            }), 400
+        max_concurrency = min(max_concurrency or LLM_MAX_CONCURRENCY, LLM_MAX_CONCURRENCY)
+
         # Define length constraints
         length_guides = {
             'short': '100-150 words',
@@ -567,16 +606,17 @@ def summarize_papers():
         if length not in length_guides:
             length = 'medium'
 
-        # Get papers details
-        arxiv_client = ArxivClient()
-        papers_data = []
-        for paper_id in paper_ids:
-            try:
-                paper = arxiv_client.get_paper_details(paper_id)
-                if paper:
-                    papers_data.append(paper)
-            except Exception as e:
-                continue
+        # Get papers details (one batched upstream call per source); papers that
+        # could not be fetched are reported per paper instead of being dropped
+        try:
+            fetched, fetch_errors = fetch_papers_with_errors(paper_ids)
+        except Exception:
+            fetched, fetch_errors = {}, {}
+        papers_data = list(fetched.values())
+        fetch_failures = {
+            pid: {'paper_id': pid, 'error': fetch_errors.get(pid, 'Paper not found')}
+            for pid in paper_ids if pid not in fetched
+        }
 
         if not papers_data:
             return jsonify({
@@ -588,15 +628,14 @@ def summarize_papers():
         ai_client = ZhipuClient(api_key=api_config.get('api_key'))
 
         if stream:
-            # Streaming: provide one summary at a time
-            def generate():
-                for paper in papers_data:
-                    try:
-                        prompt = f"""Summarize this paper in {length_guides[length]}:
+            # Streaming: per-paper streams run concurrently and their chunks
+            # are multiplexed into one SSE stream tagged with paper_id
+            def stream_one(paper):
+                prompt = f"""Summarize this paper in {length_guides[length]}:
 
 Title: {paper.get('title', 'N/A')}
 Authors: {', '.join(paper.get('authors', []))}
-Abstract: {paper.get('abstract', 'N/A')}
+Abstract: {paper.get('summary', 'N/A')}
 
 Provide:
 1. A concise summary
@@ -610,19 +649,30 @@ Format as:
 - [point 2]
 ..."""
 
-                        for chunk in ai_client.chat_completion_stream(
-                            messages=[{"role": "user", "content": prompt}],
-                            temperature=0.7,
-                            top_p=0.9,
-                            max_tokens=1500
-                        ):
-                            if chunk:
-                                yield f"data: {json.dumps({{'paper_id': paper.get('id'), 'content': chunk}})}\n\n"
+                return ai_client.chat_completion_stream(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    top_p=0.9,
+                    max_tokens=1500
+                )
 
-                        yield f"data: {json.dumps({{'paper_id': paper.get('id'), 'done': True}})}\n\n"
+            executor = BoundedLLMExecutor(limit=max_concurrency)
 
-                    except Exception as e:
-                        yield f"data: {json.dumps({{'paper_id': paper.get('id'), 'error': str(e)}})}\n\n"
+            def generate():
+                for failure in fetch_failures.values():
+                    yield f"data: {json.dumps(failure)}\n\n"
+
+                for index, kind, payload in executor.stream(stream_one, papers_data):
+                    event = {'paper_id': papers_data[index].get('paper_id')}
+                    if kind == 'chunk':
+                        if not payload:
+                            continue
+                        event['content'] = payload
+                    elif kind == 'done':
+                        event['done'] = True
+                    else:
+                        event['error'] = payload
+                    yield f"data: {json.dumps(event)}\n\n"
 
                 yield "data: [DONE]\n\n"
 
@@ -636,15 +686,13 @@ Format as:
             )
 
         else:
-            # Non-streaming: generate all summaries
-            summaries = []
-
-            for paper in papers_data:
+            # Non-streaming: per-paper completions run concurrently (bounded)
+            async def summarize_one(paper):
                 prompt = f"""Summarize this paper in {length_guides[length]}:
 
 Title: {paper.get('title', 'N/A')}
 Authors: {', '.join(paper.get('authors', []))}
-Abstract: {paper.get('abstract', 'N/A')}
+Abstract: {paper.get('summary', 'N/A')}
 
 Provide:
 1. A concise summary
@@ -656,39 +704,58 @@ Return as JSON:
   "key_points": ["point 1", "point 2", "point 3"]
 }}"""
 
-                response = ai_client.chat_completion(
+                return await ai_client.async_client.chat_completion(
                     messages=[{"role": "user", "content": prompt}],
                     stream=False
                 )
 
-                if response.get('success'):
-                    content = response['data']['choices'][0]['message']['content']
-                    try:
-                        # Try to parse JSON response
-                        import re
-                        json_match = re.search(r'\{[\s\S]*?\}', content)
-                        if json_match:
-                            summary_data = json.loads(json_match.group())
-                        else:
-                            summary_data = json.loads(content)
-
-                        summary = summary_data.get('summary', content)
-                        key_points = summary_data.get('key_points', [])
-                    except:
-                        summary = content
-                        key_points = []
+            executor = BoundedLLMExecutor(limit=max_concurrency)
+            responses = executor.run(summarize_one, papers_data)
 
+            summaries = []
+            for paper, response in zip(papers_data, responses):
+                if not response.get('success'):
                     summaries.append({
-                        'paper_id': paper.get('id'),
+                        'paper_id': paper.get('paper_id'),
                         'title': paper.get('title'),
-                        'summary': summary,
-                        'key_points': key_points
+                        'error': response.get('error', 'Summary generation failed')
                     })
+                    continue
+
+                content = response['data']['choices'][0]['message']['content']
+                try:
+                    # Try to parse JSON response
+                    json_match = re.search(r'\{[\s\S]*?\}', content)
+                    if json_match:
+                        summary_data = json.loads(json_match.group())
+                    else:
+                        summary_data = json.loads(content)
+
+                    summary = summary_data.get('summary', content)
+                    key_points = summary_data.get('key_points', [])
+                except:
+                    summary = content
+                    key_points = []
+
+                summaries.append({
+                    'paper_id': paper.get('paper_id'),
+                    'title': paper.get('title'),
+                    'summary': summary,
+                    'key_points': key_points
+                })
+
+            # Keep the requested order, including papers whose details could not be fetched
+            generated = iter(summaries)
+            summaries = [
+                fetch_failures[pid] if pid in fetch_failures else next(generated)
+                for pid in dict.fromkeys(paper_ids)
+            ]
 
             return jsonify({
                 'success': True,
                 'data': {
-                    'summaries': summaries
+                    'summaries': summaries,
+                    'failed': sum(1 for item in summaries if 'error' in item)
                 }
             })
 
@@ -5,7 +5,7 @@ Semantic Scholar API Routes
 
 from flask import Blueprint, request, jsonify
 from services.semantic_scholar_client import get_semantic_scholar_client
-import asyncio
+from services.event_loop import run_async
 
 # 创建蓝图
 semantic_scholar_bp = Blueprint('semantic_scholar', __name__, url_prefix='/api/semantic-scholar')
@@ -71,7 +71,7 @@ def search_papers():
 
         # 调用API
         client = get_semantic_scholar_client()
-        result = asyncio.run(client.search_papers(
+        result = run_async(client.search_papers(
             query=query,
             fields_of_study=fields_of_study,
             year_min=year_min,
@@ -112,7 +112,7 @@ def get_paper_details(paper_id):
     """
     try:
         client = get_semantic_scholar_client()
-        result = asyncio.run(client.get_paper_details(paper_id))
+        result = run_async(client.get_paper_details(paper_id))
 
         if result.get('success'):
             return jsonify(result)
@@ -146,7 +146,7 @@ def get_paper_pdf(paper_id):
     """
     try:
         client = get_semantic_scholar_client()
-        result = asyncio.run(client.get_paper_pdf_url(paper_id))
+        result = run_async(client.get_paper_pdf_url(paper_id))
 
         if result.get('success'):
             return jsonify(result)
@@ -184,7 +184,7 @@ def get_recommendations(paper_id):
         limit = min(limit, 100)  # 限制最大值
 
         client = get_semantic_scholar_client()
-        result = asyncio.run(client.get_recommendations(paper_id, limit=limit))
+        result = run_async(client.get_recommendations(paper_id, limit=limit))
 
         if result.get('success'):
             return jsonify(result)
@@ -223,7 +223,7 @@ def get_citations(paper_id):
         limit = min(limit, 1000)  # 限制最大值
 
         client = get_semantic_scholar_client()
-        result = asyncio.run(client.get_citations(paper_id, limit=limit))
+        result = run_async(client.get_citations(paper_id, limit=limit))
 
         if result.get('success'):
             return jsonify(result)
@@ -261,7 +261,7 @@ def compare_with_arxiv():
 
         # 获取Semantic Scholar结果
         s2_client = get_semantic_scholar_client()
-        s2_result = asyncio.run(s2_client.search_papers(
+        s2_result = run_async(s2_client.search_papers(
             query=query,
             page=1,
             page_size=limit
@@ -270,7 +270,7 @@ def compare_with_arxiv():
         # 获取arXiv结果
         from services.arxiv_client import get_arxiv_client
         arxiv_client = get_arxiv_client()
-        arxiv_result = asyncio.run(arxiv_client.search_papers(
+        arxiv_result = run_async(arxiv_client.search_papers(
             query=query,
             page=1,
             page_size=limit
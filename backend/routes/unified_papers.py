@@ -5,7 +5,10 @@
 
 from flask import Blueprint, request, jsonify
 from services.unified_search import get_unified_search
-import asyncio
+from services.event_loop import run_async
+from services.projection import PROFILES, project_result, resolve_fields
+from services.rate_limiter import get_rate_limiter
+from services.single_flight import get_single_flight
 
 # 创建蓝图 - 使用不同的url_prefix避免与papers_bp冲突
 unified_papers_bp = Blueprint('unified_papers', __name__, url_prefix='/api/unified-papers')
@@ -27,6 +30,19 @@ def search_papers_unified():
         page (int, optional): 页码，默认1
         page_size (int, optional): 每页数量，默认10
         source (str, optional): 首选数据源 (arxiv, openalex, semantic_scholar)
+        mode (str, optional): 搜索模式 (fallback, race, merge)，默认fallback
+            - race: 并发查询所有数据源，返回最先成功的结果
+            - merge: 并发查询所有数据源，合并截止时间前返回的结果
+        deadline (float, optional): 联邦模式下每个数据源的截止时间（秒）
+        cache (str, optional): 设为 no-cache 时跳过缓存读取，直接请求上游并刷新缓存
+            （也可以使用请求头 Cache-Control: no-cache）
+        local (str, optional): 本地索引模式 (first, blend)
+            - first: 本地索引能填满当前页时直接返回本地结果
+            - blend: 将本地索引结果合并到上游结果中
+        fields (str, optional): 返回字段，视图名 (list, detail, full) 或逗号分隔的字段名，默认full
+            - list: 只返回列表页字段，同时只向上游请求这些字段
+        rank (str, optional): 重排序方式，citation 表示按本地引用图分数（PageRank）重排序当前页，
+            每篇论文带有 citation_rank（PageRank百分位，不在引用图中时为null）
 
     Returns:
         JSON响应，格式: {
@@ -57,10 +73,41 @@ def search_papers_unified():
         page = request.args.get('page', 1, type=int)
         page_size = request.args.get('page_size', 10, type=int)
         preferred_source = request.args.get('source')
+        mode = request.args.get('mode', 'fallback')
+        deadline = request.args.get('deadline', type=float)
+        local = request.args.get('local')
+        rank = request.args.get('rank')
+        use_cache = not (
+            request.args.get('cache', '').lower() in ('no-cache', 'false', '0')
+            or request.cache_control.no_cache
+        )
+        try:
+            profile, fields = resolve_fields(request.args.get('fields'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': f'无效的fields参数，可选视图: {", ".join(PROFILES)}，或逗号分隔的字段名'
+            }), 400
 
         # 调用统一搜索服务
         search = get_unified_search()
-        result = asyncio.run(search.search_papers(
+        if mode not in search.SEARCH_MODES:
+            return jsonify({
+                'success': False,
+                'error': f'无效的mode参数，可选值: {", ".join(search.SEARCH_MODES)}'
+            }), 400
+        if local and local not in search.LOCAL_MODES:
+            return jsonify({
+                'success': False,
+                'error': f'无效的local参数，可选值: {", ".join(search.LOCAL_MODES)}'
+            }), 400
+        if rank and rank not in search.RANK_MODES:
+            return jsonify({
+                'success': False,
+                'error': f'无效的rank参数，可选值: {", ".join(search.RANK_MODES)}'
+            }), 400
+
+        result = run_async(search.search_papers(
             query=query,
             field=field,
             year_min=year_min,
@@ -68,11 +115,17 @@ def search_papers_unified():
             venue=venue,
             page=page,
             page_size=page_size,
-            preferred_source=preferred_source
+            preferred_source=preferred_source,
+            mode=mode,
+            deadline=deadline,
+            use_cache=use_cache,
+            local=local,
+            profile=profile,
+            rank=rank
         ))
 
         if result.get('success'):
-            return jsonify(result)
+            return jsonify(project_result(result, profile, fields))
         else:
             # 所有数据源都失败了
             return jsonify(result), 500
@@ -94,6 +147,9 @@ def get_paper_details_unified(paper_id):
 
     Query Parameters:
         source (str, optional): 数据源 (arxiv, openalex, semantic_scholar)，默认自动检测
+        refresh (bool, optional): 为true时跳过本地存储，直接从上游获取最新数据
+        hedge (bool, optional): 是否对冲请求（首选数据源慢时同时请求备选数据源），默认 DETAIL_HEDGING
+        fields (str, optional): 返回字段，视图名 (list, detail, full) 或逗号分隔的字段名，默认full
 
     Returns:
         JSON响应，格式: {
@@ -106,12 +162,29 @@ def get_paper_details_unified(paper_id):
     """
     try:
         source = request.args.get('source')
+        refresh = request.args.get('refresh', '').lower() in ('true', '1', 'yes')
+        hedge = request.args.get('hedge')
+        if hedge is not None:
+            hedge = hedge.lower() in ('true', '1', 'yes')
+        try:
+            profile, fields = resolve_fields(request.args.get('fields'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': f'无效的fields参数，可选视图: {", ".join(PROFILES)}，或逗号分隔的字段名'
+            }), 400
 
         search = get_unified_search()
-        result = asyncio.run(search.get_paper_details(paper_id, source=source))
+        result = run_async(search.get_paper_details(
+            paper_id,
+            source=source,
+            use_store=not refresh,
+            hedge=hedge
+        ))
 
         if result.get('success'):
-            return jsonify(result)
+            # 详情仍按完整数据获取（写入论文存储），只裁剪响应
+            return jsonify(project_result(result, profile, fields))
         else:
             return jsonify(result), 404
 
@@ -145,7 +218,7 @@ def compare_sources():
         limit = request.args.get('limit', 5, type=int)
 
         search = get_unified_search()
-        result = asyncio.run(search.compare_sources(query=query, limit=limit))
+        result = run_async(search.compare_sources(query=query, limit=limit))
 
         if result.get('success'):
             return jsonify(result)
@@ -157,3 +230,73 @@ def compare_sources():
             'success': False,
             'error': f'比较失败: {str(e)}'
         }), 500
+
+
+@unified_papers_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """
+    获取搜索结果缓存统计信息
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "hits": 120,
+                "misses": 30,
+                "hit_rate": 0.8,
+                ...
+            }
+        }
+    """
+    search = get_unified_search()
+    return jsonify({
+        'success': True,
+        'data': search.cache.stats()
+    })
+
+
+@unified_papers_bp.route('/local-index/stats', methods=['GET'])
+def get_local_index_stats():
+    """
+    获取本地论文索引统计信息
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "papers": 5000,
+                "terms": 42000,
+                ...
+            }
+        }
+    """
+    search = get_unified_search()
+    return jsonify({
+        'success': True,
+        'data': search.local_index.stats()
+    })
+
+
+@unified_papers_bp.route('/upstream/stats', methods=['GET'])
+def get_upstream_stats():
+    """
+    获取上游请求统计信息（速率限制、请求合并与对冲请求）
+
+    Returns:
+        JSON响应，格式: {
+            "success": true,
+            "data": {
+                "rate_limits": {"acquired": 300, "delayed": 12, "hosts": {...}, ...},
+                "single_flight": {"calls": 200, "coalesced": 80, "coalesce_rate": 0.2857, ...},
+                "hedging": {"requests": 500, "hedged": 40, "hedge_wins": 25, "delays": {...}, ...}
+            }
+        }
+    """
+    return jsonify({
+        'success': True,
+        'data': {
+            'rate_limits': get_rate_limiter().stats(),
+            'single_flight': get_single_flight().stats(),
+            'hedging': get_unified_search().hedge_policy.stats()
+        }
+    })
@@ -5,11 +5,13 @@ This module provides external service integrations including:
 - ArXiv paper reader (for PDF processing)
 - OpenAlex paper search (primary, no rate limit, 250M+ papers)
 - Zhipu AI client (for AI features)
+- Shared async HTTP transport (connection pooling for upstream APIs)
 """
 
 from .arxiv_reader import ArxivReader, analyze_paper
 from .openalex_client import OpenAlexClient, get_openalex_client
-from .zhipu_client import ZhipuClient, get_zhipu_client
+from .zhipu_client import ZhipuClient, AsyncZhipuClient, get_zhipu_client
+from .http_transport import AsyncHTTPTransport, get_http_transport
 
 __all__ = [
     'ArxivReader',
@@ -17,5 +19,8 @@ __all__ = [
     'OpenAlexClient',
     'get_openalex_client',
     'ZhipuClient',
-    'get_zhipu_client'
+    'AsyncZhipuClient',
+    'get_zhipu_client',
+    'AsyncHTTPTransport',
+    'get_http_transport'
 ]
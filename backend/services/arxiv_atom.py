@@ -0,0 +1,183 @@
+"""
+arXiv Atom响应流式解析
+只针对arXiv API的Atom格式，用 ElementTree.iterparse 增量解析，逐条产出论文数据，
+避免 feedparser 构建通用对象树、嗅探编码和日期带来的开销
+
+- iter_entries: 逐条产出原始条目（id/title/summary/作者/分类/链接/arXiv扩展字段）
+- entry_to_paper: 将条目转换为与 ArxivClient 相同的标准化论文数据
+- parse_feed: 解析整个响应，返回论文列表和结果总数
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from models.paper import Paper, extract_year
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ARXIV = '{http://arxiv.org/schemas/atom}'
+OPENSEARCH = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+ENTRY = ATOM + 'entry'
+TOTAL_RESULTS = OPENSEARCH + 'totalResults'
+
+# 简单文本字段: XML标签 -> 条目键名
+_TEXT_FIELDS = {
+    ATOM + 'id': 'id',
+    ATOM + 'title': 'title',
+    ATOM + 'summary': 'summary',
+    ATOM + 'published': 'published',
+    ATOM + 'updated': 'updated',
+    ARXIV + 'comment': 'comment',
+    ARXIV + 'journal_ref': 'journal_ref',
+    ARXIV + 'doi': 'doi'
+}
+
+_AUTHOR = ATOM + 'author'
+_AUTHOR_NAME = ATOM + 'name'
+_CATEGORY = ATOM + 'category'
+_PRIMARY_CATEGORY = ARXIV + 'primary_category'
+_LINK = ATOM + 'link'
+
+ARXIV_ID_PATTERN = re.compile(r'/(\d+\.\d+)')
+ID_YEAR_PATTERN = re.compile(r'(\d{4})\.\d+')
+
+Source = Union[bytes, bytearray, str, BinaryIO]
+
+
+def _parse_entry(elem: ET.Element) -> Dict:
+    """解析单个 <entry> 元素"""
+    entry = {
+        'id': '',
+        'title': '',
+        'summary': '',
+        'published': None,
+        'updated': None,
+        'comment': '',
+        'journal_ref': None,
+        'doi': '',
+        'authors': [],
+        'categories': [],
+        'primary_category': '',
+        'links': []
+    }
+    for child in elem:
+        tag = child.tag
+        key = _TEXT_FIELDS.get(tag)
+        if key is not None:
+            entry[key] = (child.text or '').strip()
+        elif tag == _AUTHOR:
+            name = child.findtext(_AUTHOR_NAME)
+            if name and name.strip():
+                entry['authors'].append(name.strip())
+        elif tag == _CATEGORY:
+            term = child.get('term')
+            if term:
+                entry['categories'].append(term)
+        elif tag == _LINK:
+            entry['links'].append(dict(child.attrib))
+        elif tag == _PRIMARY_CATEGORY:
+            entry['primary_category'] = child.get('term', '')
+    return entry
+
+
+def iter_entries(source: Source, feed_info: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    增量解析arXiv Atom响应，逐条产出条目
+
+    Args:
+        source: 响应内容（bytes/str）或二进制文件对象
+        feed_info: 可选字典，解析过程中写入 total_results
+
+    Yields:
+        条目字典（id, title, summary, published, updated, comment, journal_ref, doi,
+        authors, categories, primary_category, links）
+    """
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    for _, elem in ET.iterparse(source, events=('end',)):
+        tag = elem.tag
+        if tag == ENTRY:
+            yield _parse_entry(elem)
+            # 释放已解析条目的子元素，内存占用与条目数无关
+            elem.clear()
+        elif tag == TOTAL_RESULTS and feed_info is not None:
+            try:
+                feed_info['total_results'] = int((elem.text or '0').strip())
+            except ValueError:
+                feed_info['total_results'] = 0
+
+
+def entry_to_paper(entry: Dict) -> Paper:
+    """
+    将条目转换为标准化论文数据（字段与 ArxivClient._parse_paper 一致）
+
+    Args:
+        entry: iter_entries 产出的条目
+
+    Returns:
+        论文记录
+    """
+    arxiv_id = ''
+    match = ARXIV_ID_PATTERN.search(entry['id'])
+    if match:
+        arxiv_id = match.group(1)
+
+    categories = entry['categories']
+
+    published = entry['published']
+    published_year = extract_year(published)
+    if not published_year and arxiv_id:
+        id_match = ID_YEAR_PATTERN.match(arxiv_id)
+        if id_match:
+            published_year = int(id_match.group(1))
+
+    pdf_url = ''
+    for link in entry['links']:
+        if link.get('type') == 'application/pdf':
+            pdf_url = link.get('href', '')
+            break
+
+    return Paper(
+        paper_id=arxiv_id,
+        title=entry['title'],
+        authors=entry['authors'],
+        summary=entry['summary'],
+        published=published,
+        published_year=published_year,
+        updated=entry['updated'] or None,
+        categories=categories,
+        primary_category=categories[0] if categories else '',
+        pdf_url=pdf_url,
+        arxiv_url=entry['id'],
+        comment=entry['comment'],
+        journal_ref=entry['journal_ref'] or None
+    )
+
+
+def iter_papers(source: Source, feed_info: Optional[Dict] = None) -> Iterator[Paper]:
+    """增量解析响应，逐条产出标准化论文数据（参数同 iter_entries）"""
+    for entry in iter_entries(source, feed_info):
+        yield entry_to_paper(entry)
+
+
+def parse_feed(source: Source) -> Tuple[List[Paper], int]:
+    """
+    解析完整的arXiv Atom响应
+
+    Args:
+        source: 响应内容或二进制文件对象
+
+    Returns:
+        (论文列表, 结果总数)
+
+    Raises:
+        xml.etree.ElementTree.ParseError: 响应不是合法的XML
+    """
+    feed_info = {'total_results': 0}
+    papers = list(iter_papers(source, feed_info))
+    return papers, feed_info['total_results']
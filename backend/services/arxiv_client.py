@@ -3,23 +3,31 @@ arXiv API Client
 实现arXiv论文搜索功能，支持关键词、领域、年份过滤和分页
 """
 
-import feedparser
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime
 import re
 
+from models.paper import Paper
+from services.arxiv_atom import iter_papers, parse_feed
+from services.http_transport import get_http_transport
+from services.projection import project
+from services.single_flight import coalesce
+
 
 class ArxivClient:
     """arXiv API客户端"""
 
     BASE_URL = "http://export.arxiv.org/api/query"
 
+    # 批量查询时每次请求的最大ID数
+    BATCH_SIZE = 100
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = get_http_transport()
+        self.headers = {
             'User-Agent': 'ScholarAI/1.0 (https://scholarai.example.com)'
-        })
+        }
 
     def _build_query(
         self,
@@ -93,15 +101,18 @@ class ArxivClient:
         except AttributeError:
             return str(date_value)
 
-    def _parse_paper(self, entry) -> Dict:
+    def _parse_paper(self, entry) -> Paper:
         """
-        解析单篇论文信息
+        解析单篇论文信息（feedparser条目）
+
+        请求响应已改用 arxiv_atom 流式解析，此方法保留为对照实现，
+        用于校验两者输出一致和基准测试
 
         Args:
             entry: feedparser entry对象
 
         Returns:
-            论文数据字典
+            论文记录
         """
         # 提取作者信息
         authors = []
@@ -157,22 +168,23 @@ class ArxivClient:
                     pdf_url = link.href
                     break
 
-        return {
-            'paper_id': arxiv_id,
-            'title': entry.title if hasattr(entry, 'title') else "",
-            'authors': authors,
-            'summary': entry.summary if hasattr(entry, 'summary') else "",
-            'published': self._format_date(entry.published) if hasattr(entry, 'published') else None,
-            'published_year': published_year,
-            'updated': updated,
-            'categories': categories,
-            'primary_category': primary_category,
-            'pdf_url': pdf_url,
-            'arxiv_url': entry.id if hasattr(entry, 'id') else "",
-            'comment': entry.comment if hasattr(entry, 'comment') else "",
-            'journal_ref': entry.journal_ref if hasattr(entry, 'journal_ref') else None
-        }
-
+        return Paper(
+            paper_id=arxiv_id,
+            title=entry.title if hasattr(entry, 'title') else "",
+            authors=authors,
+            summary=entry.summary if hasattr(entry, 'summary') else "",
+            published=self._format_date(entry.published) if hasattr(entry, 'published') else None,
+            published_year=published_year,
+            updated=updated,
+            categories=categories,
+            primary_category=primary_category,
+            pdf_url=pdf_url,
+            arxiv_url=entry.id if hasattr(entry, 'id') else "",
+            comment=entry.comment if hasattr(entry, 'comment') else "",
+            journal_ref=entry.journal_ref if hasattr(entry, 'journal_ref') else None
+        )
+
+    @coalesce
     async def search_papers(
         self,
         query: str,
@@ -181,7 +193,8 @@ class ArxivClient:
         year_max: Optional[int] = None,
         venue: Optional[str] = None,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        profile: str = 'full'
     ) -> Dict:
         """
         搜索arXiv论文
@@ -194,6 +207,7 @@ class ArxivClient:
             venue: 发表场所 (如 NeurIPS, ICML, CVPR)
             page: 页码 (从1开始)
             page_size: 每页数量 (最大100)
+            profile: 字段视图（list/detail/full），arXiv不支持字段选择，解析后裁剪
 
         Returns:
             搜索结果字典
@@ -215,17 +229,12 @@ class ArxivClient:
 
         try:
             # 发送请求
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
+            response = await self.http.get(self.BASE_URL, params=params, headers=self.headers, timeout=10)
             response.raise_for_status()
 
-            # 解析Atom feed
-            feed = feedparser.parse(response.content)
-
-            # 提取论文总数
-            total_results = int(feed.feed.opensearch_totalresults) if hasattr(feed.feed, 'opensearch_totalresults') else 0
-
-            # 解析论文列表
-            papers = [self._parse_paper(entry) for entry in feed.entries]
+            # 流式解析Atom feed（论文列表和总数）
+            papers, total_results = parse_feed(response.content)
+            papers = [project(paper, profile) for paper in papers]
 
             return {
                 'success': True,
@@ -249,6 +258,7 @@ class ArxivClient:
                 'error': f'解析arXiv响应失败: {str(e)}'
             }
 
+    @coalesce
     async def get_paper_details(self, paper_id: str) -> Dict:
         """
         获取论文详情
@@ -268,13 +278,12 @@ class ArxivClient:
         }
 
         try:
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
+            response = await self.http.get(self.BASE_URL, params=params, headers=self.headers, timeout=10)
             response.raise_for_status()
 
-            feed = feedparser.parse(response.content)
+            paper = next(iter_papers(response.content), None)
 
-            if feed.entries:
-                paper = self._parse_paper(feed.entries[0])
+            if paper:
                 return {
                     'success': True,
                     'data': paper
@@ -291,6 +300,116 @@ class ArxivClient:
                 'error': f'获取论文详情失败: {str(e)}'
             }
 
+    @coalesce
+    async def get_papers_batch(self, paper_ids: List[str]) -> Dict:
+        """
+        批量获取论文详情（使用id_list参数，每次请求最多 BATCH_SIZE 篇）
+
+        Args:
+            paper_ids: arXiv论文ID列表
+
+        Returns:
+            {
+                'success': True,
+                'data': {
+                    'papers': {论文ID: 论文数据},
+                    'errors': {论文ID: 错误信息}
+                }
+            }
+        """
+        papers = {}
+        errors = {}
+
+        for i in range(0, len(paper_ids), self.BATCH_SIZE):
+            chunk = paper_ids[i:i + self.BATCH_SIZE]
+            # 返回的paper_id不带版本号，按不带版本号的ID对应回请求ID
+            requested = {re.sub(r'v\d+$', '', pid): pid for pid in chunk}
+
+            params = {
+                'id_list': ','.join(chunk),
+                'max_results': len(chunk)
+            }
+
+            try:
+                response = await self.http.get(self.BASE_URL, params=params, headers=self.headers, timeout=10)
+                response.raise_for_status()
+
+                for paper in iter_papers(response.content):
+                    original_id = requested.get(paper['paper_id'])
+                    if original_id:
+                        papers[original_id] = paper
+
+                for pid in chunk:
+                    if pid not in papers:
+                        errors[pid] = '论文未找到'
+
+            except Exception as e:
+                for pid in chunk:
+                    errors[pid] = f'获取论文详情失败: {str(e)}'
+
+        return {
+            'success': True,
+            'data': {
+                'papers': papers,
+                'errors': errors
+            }
+        }
+
+    async def list_updates(
+        self,
+        category: str,
+        since: datetime,
+        until: datetime,
+        start: int = 0,
+        max_results: int = 100
+    ) -> Dict:
+        """
+        按最后更新时间窗口列出某分类的论文（新提交和新版本，按更新时间升序）
+
+        Args:
+            category: arXiv分类 (如 cs.AI)
+            since: 窗口起点（UTC，包含）
+            until: 窗口终点（UTC，包含）
+            start: 结果偏移
+            max_results: 每页数量
+
+        Returns:
+            {'success': True, 'data': {'papers': [...], 'total': 总数}}
+        """
+        window = f"[{since.strftime('%Y%m%d%H%M')} TO {until.strftime('%Y%m%d%H%M')}]"
+        params = {
+            'search_query': f'cat:{category} AND lastUpdatedDate:{window}',
+            'start': start,
+            'max_results': max_results,
+            'sortBy': 'lastUpdatedDate',
+            'sortOrder': 'ascending'
+        }
+
+        try:
+            # 后台采集：按arXiv的速率限制排队，不设最长等待时间
+            response = await self.http.get(self.BASE_URL, params=params, headers=self.headers, timeout=30, max_wait=None)
+            response.raise_for_status()
+
+            papers, total_results = parse_feed(response.content)
+            return {
+                'success': True,
+                'data': {
+                    'papers': papers,
+                    'total': total_results
+                }
+            }
+
+        except requests.exceptions.RequestException as e:
+            return {
+                'success': False,
+                'error': f'arXiv API请求失败: {str(e)}'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'解析arXiv响应失败: {str(e)}'
+            }
+
     async def get_paper_pdf_url(self, paper_id: str) -> Dict:
         """
         获取论文PDF下载链接
@@ -0,0 +1,328 @@
+"""
+arXiv增量采集
+按分类定期拉取新提交和有新版本的论文，写入本地论文存储（papers集合）和本地BM25索引，
+使大多数近期论文的搜索可以由本地索引直接作答
+
+- 每个分类在 harvest_watermarks 集合中记录水位线（已完整采集到的时间点）
+- 从水位线向前回退 overlap 开始，按 window 切分时间窗口，窗口内按最后更新时间升序分页拉取
+- 窗口全部写入后才推进水位线，中断后从未完成的窗口重新开始；重复写入同一论文是幂等的
+- arXiv条目在公布时才进入API索引，晚于其更新时间，overlap 用于补齐公布延迟
+- 每个Web进程都会启动后台线程，但同一时间只有持有租约（harvest_watermarks 中的 lease:arxiv）的进程采集；
+  采集期间每个窗口前续期租约，续期失败（已被其他进程接管）时立即停止
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SOURCE = 'arxiv'
+
+
+class LeaseLost(RuntimeError):
+    """后台采集租约已被其他进程接管"""
+
+
+def _parse_categories(value: str) -> List[str]:
+    """解析逗号分隔的分类列表"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class ArxivHarvester:
+    """arXiv增量采集器"""
+
+    COLLECTION_NAME = 'harvest_watermarks'
+
+    # 配置：采集的分类、采集间隔、首次采集的回溯时间、回退重叠和窗口大小
+    DEFAULT_CATEGORIES = _parse_categories(os.getenv('ARXIV_HARVEST_CATEGORIES', ''))
+    DEFAULT_INTERVAL = timedelta(hours=float(os.getenv('ARXIV_HARVEST_INTERVAL_HOURS', '6')))
+    DEFAULT_LOOKBACK = timedelta(days=float(os.getenv('ARXIV_HARVEST_LOOKBACK_DAYS', '7')))
+    DEFAULT_OVERLAP = timedelta(hours=float(os.getenv('ARXIV_HARVEST_OVERLAP_HOURS', '72')))
+    DEFAULT_WINDOW = timedelta(days=1)
+
+    # 后台采集租约：持有者每次采集前续期，租约在 interval + LEASE_GRACE 后过期，
+    # 持有者退出后由其他进程接管
+    LEASE_ID = f'lease:{SOURCE}'
+    LEASE_GRACE = timedelta(hours=1)
+
+    def __init__(
+        self,
+        client=None,
+        store=None,
+        index=None,
+        collection=None,
+        categories: Optional[Iterable[str]] = None,
+        interval: Optional[timedelta] = None,
+        lookback: Optional[timedelta] = None,
+        overlap: Optional[timedelta] = None,
+        window: Optional[timedelta] = None,
+        page_size: int = 200,
+        owner: Optional[str] = None
+    ):
+        """
+        Args:
+            client: arXiv客户端（默认使用全局单例）
+            store: 论文存储（默认使用全局论文存储）
+            index: 本地BM25索引（默认使用全局索引）
+            collection: 水位线集合（可选，默认延迟获取harvest_watermarks集合）
+            categories: 采集的分类
+            interval: 后台采集间隔，为0时不启动后台线程
+            lookback: 没有水位线时回溯的时间
+            overlap: 每次采集从水位线向前回退的时间
+            window: 单次查询的时间窗口
+            page_size: 每页数量
+            owner: 租约持有者标识（默认为 主机名:进程ID）
+        """
+        self._client = client
+        self._store = store
+        self._index = index
+        self._collection = collection
+        self.categories = list(self.DEFAULT_CATEGORIES if categories is None else categories)
+        self.interval = self.DEFAULT_INTERVAL if interval is None else interval
+        self.lookback = lookback or self.DEFAULT_LOOKBACK
+        self.overlap = self.DEFAULT_OVERLAP if overlap is None else overlap
+        self.window = window or self.DEFAULT_WINDOW
+        self.page_size = page_size
+        self._owner = owner
+        self._harvest_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from services.arxiv_client import get_arxiv_client
+            self._client = get_arxiv_client()
+        return self._client
+
+    @property
+    def store(self):
+        if self._store is None:
+            from services.paper_store import get_paper_store
+            self._store = get_paper_store()
+        return self._store
+
+    @property
+    def index(self):
+        if self._index is None:
+            from services.local_index import get_local_index
+            self._index = get_local_index()
+        return self._index
+
+    @property
+    def collection(self):
+        """获取水位线集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            self._collection = get_collection(self.COLLECTION_NAME)
+        return self._collection
+
+    @staticmethod
+    def _key(category: str) -> str:
+        return f'{SOURCE}:{category}'
+
+    @property
+    def owner(self) -> str:
+        # 每次取当前进程ID：单例可能在fork出工作进程之前创建
+        return self._owner or f'{socket.gethostname()}:{os.getpid()}'
+
+    def acquire_lease(self, now: Optional[datetime] = None) -> bool:
+        """
+        获取或续期后台采集租约
+
+        Args:
+            now: 当前时间（默认当前UTC时间）
+
+        Returns:
+            是否持有租约（租约被其他进程持有且未过期时返回False）
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        now = now or datetime.utcnow()
+        try:
+            self.collection.find_one_and_update(
+                {'_id': self.LEASE_ID, '$or': [{'owner': self.owner}, {'expires_at': {'$lte': now}}]},
+                {'$set': {'owner': self.owner, 'expires_at': now + self.interval + self.LEASE_GRACE}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # 租约存在且不满足条件，upsert插入相同_id失败
+            return False
+
+    def watermark(self, category: str) -> Optional[datetime]:
+        """分类的水位线（已完整采集到的时间点），没有采集过时返回None"""
+        doc = self.collection.find_one({'_id': self._key(category)})
+        return doc.get('watermark') if doc else None
+
+    def _save_watermark(self, category: str, watermark: datetime, harvested: int) -> None:
+        self.collection.update_one(
+            {'_id': self._key(category)},
+            {
+                '$set': {'watermark': watermark, 'harvested_at': datetime.utcnow()},
+                '$inc': {'harvested': harvested}
+            },
+            upsert=True
+        )
+
+    async def harvest_window(self, category: str, since: datetime, until: datetime) -> int:
+        """
+        采集一个时间窗口内的全部论文
+
+        Args:
+            category: arXiv分类
+            since: 窗口起点
+            until: 窗口终点
+
+        Returns:
+            写入的论文数
+
+        Raises:
+            RuntimeError: 上游请求失败（水位线不推进）
+        """
+        written = 0
+        start = 0
+        while True:
+            result = await self.client.list_updates(category, since, until, start=start, max_results=self.page_size)
+            if not result.get('success'):
+                raise RuntimeError(result.get('error', 'arXiv请求失败'))
+
+            papers = result['data']['papers']
+            items = [(paper, SOURCE) for paper in papers if paper.get('paper_id')]
+            if items:
+                await asyncio.to_thread(self.store.upsert_many, items)
+                await asyncio.to_thread(self.index.add_many, items)
+                written += len(items)
+
+            start += len(papers)
+            if len(papers) < self.page_size or start >= result['data']['total']:
+                return written
+
+    async def harvest(self, category: str, now: Optional[datetime] = None, lease: bool = False) -> Dict:
+        """
+        从水位线采集一个分类到当前时间
+
+        Args:
+            category: arXiv分类
+            now: 采集终点（默认当前UTC时间）
+            lease: 是否在每个窗口前续期后台采集租约
+
+        Returns:
+            {'category', 'harvested', 'windows', 'watermark'}
+
+        Raises:
+            LeaseLost: 租约续期失败（已完成的窗口保留水位线）
+        """
+        now = now or datetime.utcnow()
+        watermark = await asyncio.to_thread(self.watermark, category)
+        since = watermark - self.overlap if watermark else now - self.lookback
+
+        harvested = 0
+        windows = 0
+        while since < now:
+            if lease and not await asyncio.to_thread(self.acquire_lease):
+                raise LeaseLost(f'arXiv采集租约已被其他进程接管，{category} 停止于 {watermark}')
+            until = min(since + self.window, now)
+            written = await self.harvest_window(category, since, until)
+            # 窗口完整写入后才推进水位线
+            await asyncio.to_thread(self._save_watermark, category, until, written)
+            harvested += written
+            windows += 1
+            watermark = until
+            since = until
+
+        logger.info(f"arXiv {category} 采集 {harvested} 篇，水位线 {watermark}")
+        return {'category': category, 'harvested': harvested, 'windows': windows, 'watermark': watermark}
+
+    def run(self, categories: Optional[Iterable[str]] = None, lease: bool = False) -> Dict[str, Dict]:
+        """
+        同步采集多个分类（单个分类失败不影响其他分类，租约丢失时停止全部采集）
+
+        Args:
+            categories: 采集的分类（默认使用配置的分类）
+            lease: 是否持有后台采集租约（采集期间续期）
+
+        Returns:
+            {分类: 采集结果或 {'error': 错误信息}}
+        """
+        from services.event_loop import run_async
+
+        results = {}
+        with self._harvest_lock:
+            for category in categories or self.categories:
+                try:
+                    results[category] = run_async(self.harvest(category, lease=lease), timeout=3600)
+                except LeaseLost as e:
+                    logger.warning(str(e))
+                    results[category] = {'error': str(e)}
+                    break
+                except Exception as e:
+                    logger.warning(f"arXiv {category} 采集失败: {e}")
+                    results[category] = {'error': str(e)}
+        return results
+
+    def start(self) -> None:
+        """
+        启动后台采集线程（启动时采集一次，之后按 interval 定期采集）
+
+        多个进程同时启动时只有持有租约的进程采集，其余进程定期尝试接管
+        """
+        if not self.categories or not self.interval or (self._thread and self._thread.is_alive()):
+            return
+
+        def loop():
+            while True:
+                try:
+                    if self.acquire_lease():
+                        self.run(lease=True)
+                    else:
+                        logger.debug("arXiv增量采集租约由其他进程持有，跳过本次采集")
+                except Exception as e:
+                    logger.warning(f"arXiv增量采集失败: {e}")
+                if self._stop.wait(self.interval.total_seconds()):
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='arxiv-harvest', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台采集线程"""
+        self._stop.set()
+
+
+# 导出单例
+_arxiv_harvester = None
+_arxiv_harvester_lock = threading.Lock()
+
+
+def get_arxiv_harvester() -> ArxivHarvester:
+    """获取arXiv增量采集器单例"""
+    global _arxiv_harvester
+    with _arxiv_harvester_lock:
+        if _arxiv_harvester is None:
+            _arxiv_harvester = ArxivHarvester()
+        return _arxiv_harvester
+
+
+def init_arxiv_harvester(app=None) -> ArxivHarvester:
+    """
+    启动arXiv增量采集（在create_app中调用一次，未配置 ARXIV_HARVEST_CATEGORIES 时不采集；
+    多个工作进程中只有持有租约的进程采集）
+
+    Args:
+        app: Flask应用实例（可选）
+
+    Returns:
+        ArxivHarvester实例
+    """
+    harvester = get_arxiv_harvester()
+    harvester.start()
+    if app is not None:
+        app.extensions['arxiv_harvester'] = harvester
+    return harvester
@@ -5,13 +5,14 @@ This service handles fetching and parsing arXiv papers for deep reading analysis
 It integrates with arXiv API and optionally uses Zhipu AI for enhanced analysis.
 """
 
-import feedparser
 import re
 import requests
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
 
+from services.arxiv_atom import iter_entries
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -59,29 +60,33 @@ class ArxivReader:
             response = requests.get(url, timeout=10)
             response.raise_for_status()
 
-            # Parse XML response
-            feed = feedparser.parse(response.content)
+            # Parse XML response (streaming Atom parser, first entry only)
+            entry = next(iter_entries(response.content), None)
 
-            if not feed.entries:
+            if entry is None:
                 raise ValueError(f"Paper not found: {paper_id}")
 
-            entry = feed.entries[0]
+            # Prefer the PDF link, fall back to the abstract page
+            links = entry["links"]
+            pdf_link = next((l for l in links if l.get("type") == "application/pdf"), None)
+            alternate = next((l for l in links if l.get("rel") == "alternate"), None)
+            link = (pdf_link or alternate or {}).get("href", "")
 
             # Extract metadata
             metadata = {
                 "paper_id": paper_id,
-                "title": entry.get("title", "").strip(),
-                "authors": [author.get("name", "") for author in entry.get("authors", [])],
-                "summary": entry.get("summary", "").strip(),
-                "published": entry.get("published", ""),
-                "updated": entry.get("updated", ""),
-                "primary_category": entry.get("primary_category", ""),
-                "categories": [tag.get("term") for tag in entry.get("tags", [])],
-                "pdf_url": entry.get("link", "").replace("http://", "https://"),
+                "title": entry["title"],
+                "authors": entry["authors"],
+                "summary": entry["summary"],
+                "published": entry["published"] or "",
+                "updated": entry["updated"] or "",
+                "primary_category": entry["primary_category"],
+                "categories": entry["categories"],
+                "pdf_url": link.replace("http://", "https://"),
                 "abs_url": f"{self.ARXIV_ABS_URL}{paper_id}",
-                "comment": entry.get("comment", ""),
-                "journal_ref": entry.get("arxiv_journal_ref", ""),
-                "doi": entry.get("arxiv_doi", "")
+                "comment": entry["comment"],
+                "journal_ref": entry["journal_ref"] or "",
+                "doi": entry["doi"]
             }
 
             logger.info(f"Successfully fetched metadata for {paper_id}")
@@ -112,21 +117,20 @@ class ArxivReader:
             response = requests.get(url, timeout=10)
             response.raise_for_status()
 
-            feed = feedparser.parse(response.content)
+            entry = next(iter_entries(response.content), None)
 
-            if not feed.entries:
+            if entry is None:
                 return []
 
-            entry = feed.entries[0]
             versions = []
 
             # Parse versions from entry
-            for link in entry.get("links", []):
+            for link in entry["links"]:
                 if "title" in link and "versions" in link.get("title", "").lower():
                     version_info = {
                         "version": link.get("title", ""),
                         "url": link.get("href", ""),
-                        "date": entry.get("updated", "")
+                        "date": entry["updated"] or ""
                     }
                     versions.append(version_info)
 
@@ -135,7 +139,7 @@ class ArxivReader:
                 versions = [{
                     "version": "v1",
                     "url": f"{self.ARXIV_ABS_URL}{paper_id}",
-                    "date": entry.get("published", "")
+                    "date": entry["published"] or ""
                 }]
 
             logger.info(f"Found {len(versions)} versions for {paper_id}")
@@ -0,0 +1,395 @@
+"""
+离线批量导入
+从OpenAlex快照（works JSONL.gz）和arXiv元数据转储（arxiv-metadata-oai-snapshot.json）导入论文到 papers 集合
+
+- 主进程流式解压、按行切分为批次，内存占用只与在途批次数有关
+- 解析、标准化（复用各客户端的解析逻辑）和写入在进程池中完成，每个工作进程使用独立的MongoDB连接，
+  每批一次无序批量写入
+- 按文件记录检查点（已提交的行数和字节偏移），中断后可从检查点继续；
+  检查点只越过已完成写入的连续批次，重复导入同一批次是幂等的
+"""
+
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from models.paper import Paper
+from services.arxiv_atom import entry_to_paper
+
+logger = logging.getLogger(__name__)
+
+# 导入格式 -> 写入时使用的数据源名称
+FORMATS = {'openalex': 'openalex', 'arxiv': 'arxiv'}
+
+# 写入方式: 覆盖已有论文 / 只写入尚未存储的论文
+MODES = ('replace', 'missing')
+
+# 目录输入时导入的文件后缀
+DUMP_SUFFIXES = ('.gz', '.json', '.jsonl')
+
+
+def _rfc2822_to_iso(value: Optional[str]) -> Optional[str]:
+    """arXiv转储中的版本时间（Mon, 2 Apr 2007 19:18:42 GMT）转换为Atom接口使用的ISO格式"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).strftime('%Y-%m-%dT%H:%M:%SZ')
+    except (TypeError, ValueError):
+        return None
+
+
+def arxiv_record_to_entry(record: Dict) -> Dict:
+    """
+    将arXiv元数据转储记录转换为 arxiv_atom.iter_entries 产出的条目格式
+
+    Args:
+        record: 转储中的一行（id, title, abstract, authors_parsed, categories, versions, ...）
+
+    Returns:
+        条目字典（可直接传给 entry_to_paper）
+    """
+    arxiv_id = record.get('id', '')
+    versions = record.get('versions') or []
+    latest = versions[-1].get('version', 'v1') if versions else 'v1'
+
+    authors = []
+    for parts in record.get('authors_parsed') or []:
+        last, first = (parts + ['', ''])[:2]
+        name = ' '.join(p for p in (first, last) if p).strip()
+        if len(parts) > 2 and parts[2]:
+            name = f'{name} {parts[2]}'
+        if name:
+            authors.append(name)
+    if not authors and record.get('authors'):
+        authors = [a.strip() for a in record['authors'].replace(' and ', ', ').split(',') if a.strip()]
+
+    published = _rfc2822_to_iso(versions[0].get('created')) if versions else None
+    updated = _rfc2822_to_iso(versions[-1].get('created')) if versions else None
+
+    return {
+        'id': f'http://arxiv.org/abs/{arxiv_id}{latest}',
+        # 转储中的标题保留了原始换行
+        'title': ' '.join((record.get('title') or '').split()),
+        'summary': (record.get('abstract') or '').strip(),
+        'published': published,
+        'updated': updated or record.get('update_date'),
+        'comment': record.get('comments') or '',
+        'journal_ref': record.get('journal-ref'),
+        'doi': record.get('doi') or '',
+        'authors': authors,
+        'categories': (record.get('categories') or '').split(),
+        'primary_category': '',
+        'links': [
+            {'href': f'http://arxiv.org/abs/{arxiv_id}{latest}', 'rel': 'alternate', 'type': 'text/html'},
+            {'href': f'http://arxiv.org/pdf/{arxiv_id}{latest}', 'rel': 'related', 'type': 'application/pdf', 'title': 'pdf'}
+        ]
+    }
+
+
+def parse_arxiv_record(record: Dict) -> Paper:
+    """arXiv转储记录 -> 标准化论文数据（与arXiv接口返回的字段一致）"""
+    paper = entry_to_paper(arxiv_record_to_entry(record))
+    # 旧式ID（如 hep-th/9901001）不能从链接中解析
+    if not paper['paper_id']:
+        paper['paper_id'] = record.get('id', '')
+    if record.get('doi'):
+        paper['doi'] = record['doi']
+    return paper
+
+
+_openalex_client = None
+
+
+def parse_openalex_record(record: Dict) -> Paper:
+    """OpenAlex快照记录 -> 标准化论文数据（与OpenAlex接口返回的字段一致）"""
+    global _openalex_client
+    if _openalex_client is None:
+        from services.openalex_client import OpenAlexClient
+        _openalex_client = OpenAlexClient()
+    return _openalex_client._parse_paper(record)
+
+
+PARSERS = {'openalex': parse_openalex_record, 'arxiv': parse_arxiv_record}
+
+
+def ingest_lines(lines: List[bytes], fmt: str, store, mode: str = 'replace') -> Dict[str, int]:
+    """
+    解析一批JSON行并批量写入论文存储
+
+    Args:
+        lines: 原始JSON行
+        fmt: 导入格式（openalex/arxiv）
+        store: PaperStore实例
+        mode: 写入方式（replace/missing）
+
+    Returns:
+        计数 {'records', 'written', 'skipped', 'invalid', 'errors'}
+    """
+    parse = PARSERS[fmt]
+    source = FORMATS[fmt]
+    counts = {'records': 0, 'written': 0, 'skipped': 0, 'invalid': 0, 'errors': 0}
+
+    papers = []
+    for line in lines:
+        if not line.strip():
+            continue
+        counts['records'] += 1
+        try:
+            paper = parse(json.loads(line))
+        except Exception:
+            counts['invalid'] += 1
+            continue
+        if not paper.get('paper_id'):
+            counts['skipped'] += 1
+            continue
+        papers.append((paper, source))
+
+    if not papers:
+        return counts
+    write = store.upsert_many if mode == 'replace' else store.insert_missing
+    try:
+        counts['written'] = write(papers)
+    except BulkWriteError as e:
+        # 无序批量写入：失败的条目不影响其他条目
+        failed = len(e.details.get('writeErrors', []))
+        counts['errors'] = failed
+        counts['written'] = len(papers) - failed
+    return counts
+
+
+# --- 工作进程 ---
+
+_worker_store = None
+
+
+def default_store():
+    """工作进程中的论文存储（每个进程独立连接MongoDB）"""
+    from config.database import init_db
+    from services.paper_store import PaperStore
+    init_db()
+    return PaperStore()
+
+
+def _init_worker(store_factory: Callable) -> None:
+    global _worker_store
+    logging.getLogger('pymongo').setLevel(logging.WARNING)
+    _worker_store = store_factory()
+
+
+def _process_chunk(lines: List[bytes], fmt: str, mode: str) -> Dict[str, int]:
+    return ingest_lines(lines, fmt, _worker_store, mode)
+
+
+# --- 输入文件与检查点 ---
+
+def expand_paths(paths: Iterable[str]) -> List[str]:
+    """展开输入路径（目录递归查找转储文件，按路径排序）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.endswith(DUMP_SUFFIXES))
+        else:
+            files.append(path)
+    return sorted(os.path.abspath(f) for f in files)
+
+
+def iter_lines(path: str, start_line: int = 0, start_offset: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """
+    流式读取文件的行（.gz 文件边解压边读取）
+
+    Args:
+        path: 文件路径
+        start_line: 跳过的行数（压缩文件从头解压并跳过）
+        start_offset: 起始字节偏移（仅未压缩文件，直接定位）
+
+    Yields:
+        (行内容, 该行结束处的字节偏移（压缩文件为解压后的偏移）)
+    """
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            offset = 0
+            for number, line in enumerate(f):
+                offset += len(line)
+                if number >= start_line:
+                    yield line, offset
+    else:
+        with open(path, 'rb') as f:
+            f.seek(start_offset)
+            offset = start_offset
+            for line in f:
+                offset += len(line)
+                yield line, offset
+
+
+class Checkpoint:
+    """导入检查点（JSON文件，原子替换写入）"""
+
+    def __init__(self, path: Optional[str]):
+        """
+        Args:
+            path: 检查点文件路径，为None时不保存
+        """
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+
+    def get(self, file_path: str) -> Dict:
+        """文件的进度 {'lines', 'offset', 'done'}"""
+        return self.files.get(file_path) or {'lines': 0, 'offset': 0, 'done': False}
+
+    def update(self, file_path: str, lines: int, offset: int, done: bool = False) -> None:
+        self.files[file_path] = {'lines': lines, 'offset': offset, 'done': done}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class BulkIngester:
+    """离线批量导入"""
+
+    def __init__(
+        self,
+        fmt: str,
+        store=None,
+        workers: Optional[int] = None,
+        batch_size: int = 1000,
+        mode: str = 'replace',
+        checkpoint: Optional[str] = None,
+        checkpoint_interval: float = 10.0,
+        store_factory: Callable = default_store
+    ):
+        """
+        Args:
+            fmt: 导入格式（openalex/arxiv）
+            store: 论文存储（workers=0时在主进程中使用）
+            workers: 工作进程数，默认CPU核数；为0时在主进程中解析和写入
+            batch_size: 每批的行数（即每次批量写入的文档数）
+            mode: 写入方式（replace/missing）
+            checkpoint: 检查点文件路径
+            checkpoint_interval: 检查点保存间隔（秒）
+            store_factory: 工作进程中创建论文存储的函数（需可被pickle）
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f'无效的导入格式: {fmt}')
+        if mode not in MODES:
+            raise ValueError(f'无效的写入方式: {mode}')
+        self.fmt = fmt
+        self.store = store
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.mode = mode
+        self.checkpoint = Checkpoint(checkpoint)
+        self.checkpoint_interval = checkpoint_interval
+        self.store_factory = store_factory
+        self.stats = {'files': 0, 'records': 0, 'written': 0, 'skipped': 0, 'invalid': 0, 'errors': 0}
+
+    def _chunks(self, path: str, progress: Dict) -> Iterator[Tuple[List[bytes], int, int]]:
+        """按批切分文件，产出 (行列表, 批次结束行号, 批次结束偏移)"""
+        line_number = progress['lines']
+        chunk = []
+        offset = progress['offset']
+        for line, offset in iter_lines(path, progress['lines'], progress['offset']):
+            chunk.append(line)
+            line_number += 1
+            if len(chunk) >= self.batch_size:
+                yield chunk, line_number, offset
+                chunk = []
+        if chunk:
+            yield chunk, line_number, offset
+
+    def _add(self, counts: Dict[str, int]) -> None:
+        for key, value in counts.items():
+            self.stats[key] += value
+
+    def ingest_file(self, path: str, executor: Optional[ProcessPoolExecutor] = None) -> None:
+        """
+        导入单个文件（从检查点继续）
+
+        Args:
+            path: 文件路径
+            executor: 进程池（为None时在主进程中处理）
+        """
+        progress = self.checkpoint.get(path)
+        if progress['done']:
+            logger.info(f"跳过已完成的文件: {path}")
+            return
+
+        # 在途批次数上限，限制主进程内存占用
+        max_pending = max(2, self.workers * 2)
+        pending = deque()
+        last_save = time.monotonic()
+
+        def complete(item):
+            nonlocal last_save
+            result, lines, offset = item
+            self._add(result.result() if executor else result)
+            self.checkpoint.update(path, lines, offset)
+            if time.monotonic() - last_save >= self.checkpoint_interval:
+                self.checkpoint.save()
+                last_save = time.monotonic()
+
+        for chunk, lines, offset in self._chunks(path, progress):
+            if executor:
+                pending.append((executor.submit(_process_chunk, chunk, self.fmt, self.mode), lines, offset))
+                # 按提交顺序等待，检查点只越过连续完成的批次
+                while len(pending) >= max_pending:
+                    complete(pending.popleft())
+            else:
+                complete((ingest_lines(chunk, self.fmt, self.store, self.mode), lines, offset))
+        while pending:
+            complete(pending.popleft())
+
+        final = self.checkpoint.get(path)
+        self.checkpoint.update(path, final['lines'], final['offset'], done=True)
+        self.checkpoint.save()
+        self.stats['files'] += 1
+
+    def ingest(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        导入多个文件或目录
+
+        Args:
+            paths: 文件或目录路径
+
+        Returns:
+            导入统计 {'files', 'records', 'written', 'skipped', 'invalid', 'errors', 'seconds'}
+        """
+        files = expand_paths(paths)
+        start = time.monotonic()
+        if self.workers <= 0:
+            if self.store is None:
+                self.store = self.store_factory()
+            for path in files:
+                self.ingest_file(path)
+        else:
+            # spawn：工作进程不继承父进程的MongoDB连接
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.store_factory,)
+            ) as executor:
+                for path in files:
+                    self.ingest_file(path, executor)
+
+        stats = dict(self.stats)
+        stats['seconds'] = round(time.monotonic() - start, 1)
+        return stats
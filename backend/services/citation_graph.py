@@ -0,0 +1,631 @@
+"""
+引用图存储
+将Semantic Scholar的引用（citations）和参考文献（references）关系保存为本地引用图，
+重复访问和多跳查询直接在本地完成，不再每次重新下载上千条边
+
+- MongoDB citation_edges 集合保存边 {citing, cited}，citation_nodes 集合保存节点信息和各方向的抓取时间
+- 内存邻接表缓存最近使用的节点（按节点和方向LRU淘汰），反方向的邻居只随完整的邻接表保留，淘汰时一并移除
+- 首次访问某节点某方向时按需填充：内存 -> MongoDB（未过期） -> S2分页抓取
+- 查询：邻居列表、k跳邻域、共同引用/共同参考文献、最短引用路径
+
+MongoDB不可用时只使用内存邻接表
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.paper_store import normalize_arxiv_id, normalize_doi
+from services.semantic_scholar_client import get_semantic_scholar_client
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# S2论文ID（40位十六进制），其他形式（arXiv:、DOI:等）需要先解析
+S2_ID_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+DIRECTIONS = ('citations', 'references')
+
+
+def _opposite(direction: str) -> str:
+    return 'references' if direction == 'citations' else 'citations'
+
+
+class CitationGraph:
+    """本地引用图（线程安全）"""
+
+    EDGE_COLLECTION = 'citation_edges'
+    NODE_COLLECTION = 'citation_nodes'
+
+    # 数据新鲜度：超过该时间的节点会重新从上游抓取
+    DEFAULT_MAX_AGE = timedelta(hours=float(os.getenv('CITATION_GRAPH_MAX_AGE_HOURS', '168')))
+
+    # 每个节点每个方向最多抓取的边数（S2分页接口 offset+limit 上限为10000）
+    MAX_EDGES = int(os.getenv('CITATION_GRAPH_MAX_EDGES', '10000'))
+
+    # 内存中保留完整邻接表的（节点, 方向）数
+    CACHE_SIZE = int(os.getenv('CITATION_GRAPH_CACHE_SIZE', '20000'))
+
+    def __init__(
+        self,
+        client=None,
+        edges=None,
+        nodes=None,
+        max_age: Optional[timedelta] = None,
+        max_edges: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        persist: bool = True
+    ):
+        """
+        Args:
+            client: Semantic Scholar客户端（默认使用单例）
+            edges: citation_edges 集合（可选，默认延迟获取）
+            nodes: citation_nodes 集合（可选，默认延迟获取）
+            max_age: 数据新鲜度阈值
+            max_edges: 每个节点每个方向最多抓取的边数
+            cache_size: 内存中保留的（节点, 方向）邻接表数
+            persist: 是否读写MongoDB
+        """
+        self.client = client or get_semantic_scholar_client()
+        self._edges = edges
+        self._nodes = nodes
+        self.max_age = max_age or self.DEFAULT_MAX_AGE
+        self.max_edges = max_edges or self.MAX_EDGES
+        self.cache_size = cache_size or self.CACHE_SIZE
+        self.persist = persist
+
+        # cited -> {citing}，citing -> {cited}
+        self._adjacency: Dict[str, Dict[str, Set[str]]] = {d: {} for d in DIRECTIONS}
+        # 邻接表完整的（节点, 方向） -> {fetched_at, total, truncated}，按最近使用排序
+        self._complete: 'OrderedDict[Tuple[str, str], Dict]' = OrderedDict()
+        # 节点信息 {title, year, citation_count}
+        self._meta: 'OrderedDict[str, Dict]' = OrderedDict()
+        # 非S2形式ID -> S2 ID
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._flight = SingleFlight()
+        self._stats = {'memory_hits': 0, 'store_hits': 0, 'upstream_fetches': 0, 'upstream_pages': 0}
+
+    @property
+    def edges(self):
+        """获取边集合（延迟初始化）"""
+        if self._edges is None:
+            from config.database import get_collection
+            collection = get_collection(self.EDGE_COLLECTION)
+            collection.create_index('citing')
+            collection.create_index('cited')
+            self._edges = collection
+        return self._edges
+
+    @property
+    def nodes(self):
+        """获取节点集合（延迟初始化）"""
+        if self._nodes is None:
+            from config.database import get_collection
+            self._nodes = get_collection(self.NODE_COLLECTION)
+        return self._nodes
+
+    # --- 内存邻接表 ---
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _add_neighbors(self, paper_id: str, direction: str, neighbors: Iterable[Dict]) -> None:
+        """将节点某方向的邻居加入邻接表（同时写入反方向）"""
+        other = _opposite(direction)
+        with self._lock:
+            own = self._adjacency[direction].setdefault(paper_id, set())
+            for neighbor in neighbors:
+                nid = neighbor['paper_id']
+                own.add(nid)
+                self._adjacency[other].setdefault(nid, set()).add(paper_id)
+                self._set_meta(nid, neighbor)
+
+    def _set_meta(self, paper_id: str, info: Dict) -> None:
+        meta = {
+            'title': info.get('title') or '',
+            'year': info.get('year'),
+            'citation_count': info.get('citation_count') or 0
+        }
+        self._meta[paper_id] = meta
+        self._meta.move_to_end(paper_id)
+        while len(self._meta) > self.cache_size * 10:
+            self._meta.popitem(last=False)
+
+    def _drop_neighbors(self, paper_id: str, direction: str) -> None:
+        """
+        移除节点某方向的邻接表及其写入的反方向邻居
+
+        邻居自身该反方向的邻接表完整时保留（该边本身就在其中），否则移除，
+        避免淘汰后残留的反方向条目使邻接表无限增长
+        """
+        other = _opposite(direction)
+        with self._lock:
+            for nid in self._adjacency[direction].pop(paper_id, ()):
+                reverse = self._adjacency[other].get(nid)
+                if reverse is None or (nid, other) in self._complete:
+                    continue
+                reverse.discard(paper_id)
+                if not reverse:
+                    del self._adjacency[other][nid]
+
+    def _mark_complete(self, paper_id: str, direction: str, state: Dict) -> None:
+        with self._lock:
+            key = (paper_id, direction)
+            self._complete[key] = state
+            self._complete.move_to_end(key)
+            while len(self._complete) > self.cache_size:
+                (evicted, evicted_direction), _ = self._complete.popitem(last=False)
+                self._drop_neighbors(evicted, evicted_direction)
+
+    def _is_fresh(self, fetched_at: Optional[datetime]) -> bool:
+        return fetched_at is not None and datetime.utcnow() - fetched_at < self.max_age
+
+    def _cached(self, paper_id: str, direction: str) -> Optional[Dict]:
+        """内存中完整且未过期的邻接表状态"""
+        with self._lock:
+            state = self._complete.get((paper_id, direction))
+            if state is None or not self._is_fresh(state['fetched_at']):
+                return None
+            self._complete.move_to_end((paper_id, direction))
+            return state
+
+    def adjacent(self, paper_id: str, direction: str) -> Set[str]:
+        """内存中节点某方向的邻居（调用前应先 ensure）"""
+        with self._lock:
+            return set(self._adjacency[direction].get(paper_id, ()))
+
+    def meta(self, paper_id: str) -> Dict:
+        """节点信息"""
+        with self._lock:
+            return dict(self._meta.get(paper_id) or {'title': '', 'year': None, 'citation_count': 0})
+
+    def describe(self, paper_ids: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取节点信息（内存中没有的从MongoDB读取）
+
+        Returns:
+            {paper_id: {title, year, citation_count}}
+        """
+        with self._lock:
+            found = {pid: dict(self._meta[pid]) for pid in paper_ids if pid in self._meta}
+        missing = [pid for pid in paper_ids if pid not in found]
+        if missing and self.persist:
+            try:
+                for doc in self.nodes.find({'_id': {'$in': missing}}, {'title': 1, 'year': 1, 'citation_count': 1}):
+                    found[doc['_id']] = {
+                        'title': doc.get('title') or '',
+                        'year': doc.get('year'),
+                        'citation_count': doc.get('citation_count') or 0
+                    }
+            except Exception as e:
+                logger.warning(f"读取引用图节点失败: {e}")
+        return {pid: found.get(pid) or self.meta(pid) for pid in paper_ids}
+
+    # --- 按需填充 ---
+
+    async def resolve(self, paper_id: str) -> Optional[str]:
+        """
+        将论文ID解析为S2 ID（arXiv:xxx、DOI:xxx 等形式需要请求一次上游）
+
+        Returns:
+            S2论文ID，无法解析时返回None
+        """
+        if S2_ID_PATTERN.match(paper_id):
+            return paper_id
+        with self._lock:
+            if paper_id in self._aliases:
+                return self._aliases[paper_id]
+        result = await self.client.get_paper_details(paper_id, profile='list')
+        if not result.get('success') or not result['data'].get('paper_id'):
+            return None
+        resolved = result['data']['paper_id']
+        with self._lock:
+            self._aliases[paper_id] = resolved
+            self._set_meta(resolved, {
+                'title': result['data'].get('title'),
+                'year': result['data'].get('published_year'),
+                'citation_count': result['data'].get('citation_count')
+            })
+        return resolved
+
+    async def ensure(self, paper_id: str, direction: str) -> Dict:
+        """
+        确保节点某方向的邻接表完整地在内存中
+
+        Args:
+            paper_id: S2论文ID
+            direction: 'citations' 或 'references'
+
+        Returns:
+            邻接表状态 {fetched_at, total, truncated}
+
+        Raises:
+            ValueError: direction 无效
+            RuntimeError: 上游抓取失败
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f'无效的direction: {direction}')
+        state = self._cached(paper_id, direction)
+        if state is not None:
+            self._count('memory_hits')
+            return state
+        # 并发请求同一节点时只加载一次
+        return await self._flight.do((paper_id, direction), lambda: self._fill(paper_id, direction))
+
+    async def _fill(self, paper_id: str, direction: str) -> Dict:
+        """从MongoDB（未过期时）或上游加载邻接表"""
+        if self.persist:
+            try:
+                state = await asyncio.to_thread(self._load_from_store, paper_id, direction)
+            except Exception as e:
+                logger.warning(f"读取引用图存储失败: {e}")
+                state = None
+            if state is not None:
+                self._count('store_hits')
+                return state
+
+        neighbors, truncated = await self._fetch_upstream(paper_id, direction)
+        state = {'fetched_at': datetime.utcnow(), 'total': len(neighbors), 'truncated': truncated}
+        with self._lock:
+            # 重新抓取时以上游结果为准
+            self._drop_neighbors(paper_id, direction)
+            self._add_neighbors(paper_id, direction, neighbors)
+            self._mark_complete(paper_id, direction, state)
+
+        if self.persist:
+            try:
+                await asyncio.to_thread(self._save_to_store, paper_id, direction, neighbors, state)
+            except Exception as e:
+                logger.warning(f"写入引用图存储失败: {e}")
+        return state
+
+    async def _fetch_upstream(self, paper_id: str, direction: str) -> Tuple[List[Dict], bool]:
+        """分页抓取全部邻居（最多 max_edges 条）"""
+        self._count('upstream_fetches')
+        neighbors = []
+        offset = 0
+        while offset is not None and len(neighbors) < self.max_edges:
+            limit = min(self.client.CITATION_PAGE_SIZE, self.max_edges - len(neighbors))
+            result = await self.client.get_citation_page(paper_id, direction, offset=offset, limit=limit)
+            self._count('upstream_pages')
+            if not result.get('success'):
+                raise RuntimeError(result.get('error', f'获取{direction}失败'))
+            neighbors.extend(result['data']['papers'])
+            offset = result['data'].get('next')
+        return neighbors[:self.max_edges], offset is not None
+
+    def _load_from_store(self, paper_id: str, direction: str) -> Optional[Dict]:
+        """从MongoDB加载未过期的邻接表"""
+        node = self.nodes.find_one({'_id': paper_id})
+        fetched_at = (node or {}).get(f'{direction}_fetched_at')
+        if not self._is_fresh(fetched_at):
+            return None
+
+        if direction == 'citations':
+            ids = [doc['citing'] for doc in self.edges.find({'cited': paper_id}, {'citing': 1})]
+        else:
+            ids = [doc['cited'] for doc in self.edges.find({'citing': paper_id}, {'cited': 1})]
+        infos = {doc['_id']: doc for doc in self.nodes.find({'_id': {'$in': ids}}, {'title': 1, 'year': 1, 'citation_count': 1})}
+        neighbors = [dict(infos.get(nid) or {}, paper_id=nid) for nid in ids]
+
+        state = {
+            'fetched_at': fetched_at,
+            'total': len(ids),
+            'truncated': bool(node.get(f'{direction}_truncated'))
+        }
+        with self._lock:
+            self._drop_neighbors(paper_id, direction)
+            self._add_neighbors(paper_id, direction, neighbors)
+            if node.get('title'):
+                self._set_meta(paper_id, node)
+            self._mark_complete(paper_id, direction, state)
+        return state
+
+    def _save_to_store(self, paper_id: str, direction: str, neighbors: List[Dict], state: Dict) -> None:
+        """将邻接表写入MongoDB（边和邻居节点信息批量写入）"""
+        from pymongo import UpdateOne
+
+        edge_ops = []
+        node_ops = []
+        for neighbor in neighbors:
+            nid = neighbor['paper_id']
+            citing, cited = (nid, paper_id) if direction == 'citations' else (paper_id, nid)
+            edge_ops.append(UpdateOne(
+                {'_id': f'{citing}>{cited}'},
+                {'$set': {
+                    'citing': citing,
+                    'cited': cited,
+                    'is_influential': neighbor.get('is_influential', False),
+                    'intents': neighbor.get('intents') or []
+                }},
+                upsert=True
+            ))
+            info = {
+                'title': neighbor.get('title') or '',
+                'year': neighbor.get('year'),
+                'citation_count': neighbor.get('citation_count') or 0
+            }
+            # 外部ID用于将其他数据源的论文对应到引用图节点
+            doi = normalize_doi(neighbor.get('doi'))
+            arxiv_id = normalize_arxiv_id(neighbor.get('arxiv_id'))
+            if doi:
+                info['doi'] = doi
+            if arxiv_id:
+                info['arxiv_id'] = arxiv_id
+            node_ops.append(UpdateOne({'_id': nid}, {'$set': info}, upsert=True))
+        node_ops.append(UpdateOne(
+            {'_id': paper_id},
+            {'$set': {
+                f'{direction}_fetched_at': state['fetched_at'],
+                f'{direction}_total': state['total'],
+                f'{direction}_truncated': state['truncated']
+            }},
+            upsert=True
+        ))
+
+        if edge_ops:
+            self.edges.bulk_write(edge_ops, ordered=False)
+        self.nodes.bulk_write(node_ops, ordered=False)
+
+    def iter_edges(self, batch_size: int = 10000) -> Iterable[Tuple[str, str]]:
+        """
+        遍历MongoDB中保存的全部边
+
+        Args:
+            batch_size: 每批读取的文档数
+
+        Yields:
+            (citing, cited)
+        """
+        cursor = self.edges.find({}, {'_id': 0, 'citing': 1, 'cited': 1}).batch_size(batch_size)
+        for doc in cursor:
+            yield doc['citing'], doc['cited']
+
+    def iter_aliases(self, batch_size: int = 10000) -> Iterable[Tuple[str, Dict[str, str]]]:
+        """
+        遍历带有外部ID的节点
+
+        Yields:
+            (S2论文ID, {'doi': ..., 'arxiv': ...})
+        """
+        cursor = self.nodes.find(
+            {'$or': [{'doi': {'$exists': True}}, {'arxiv_id': {'$exists': True}}]},
+            {'doi': 1, 'arxiv_id': 1}
+        ).batch_size(batch_size)
+        for doc in cursor:
+            ids = {'doi': doc.get('doi'), 'arxiv': doc.get('arxiv_id')}
+            yield doc['_id'], {key: value for key, value in ids.items() if value}
+
+    async def _ensure_many(self, paper_ids: Iterable[str], directions: Iterable[str]) -> Dict[str, str]:
+        """
+        并发确保多个节点的邻接表
+
+        Returns:
+            抓取失败的节点 {paper_id: 错误信息}
+        """
+        pairs = [(pid, d) for pid in paper_ids for d in directions]
+        results = await asyncio.gather(*[self.ensure(pid, d) for pid, d in pairs], return_exceptions=True)
+        return {
+            pid: str(result)
+            for (pid, _), result in zip(pairs, results)
+            if isinstance(result, Exception)
+        }
+
+    # --- 查询 ---
+
+    def _directions(self, direction: str) -> Tuple[str, ...]:
+        if direction == 'both':
+            return DIRECTIONS
+        if direction not in DIRECTIONS:
+            raise ValueError(f'无效的direction: {direction}')
+        return (direction,)
+
+    def _node(self, paper_id: str, **extra) -> Dict:
+        node = {'paper_id': paper_id}
+        node.update(self.meta(paper_id))
+        node.update(extra)
+        return node
+
+    async def neighbors(self, paper_id: str, direction: str, offset: int = 0, limit: int = 100) -> Dict:
+        """
+        获取引用或参考文献列表（按被引数降序分页）
+
+        Returns:
+            {'paper_id', 'papers': [...], 'total', 'truncated'}
+        """
+        state = await self.ensure(paper_id, direction)
+        ranked = sorted(
+            (self._node(nid) for nid in self.adjacent(paper_id, direction)),
+            key=lambda node: (-node['citation_count'], node['paper_id'])
+        )
+        return {
+            'paper_id': paper_id,
+            'papers': ranked[offset:offset + limit],
+            'total': len(ranked),
+            'truncated': state['truncated']
+        }
+
+    async def neighborhood(
+        self,
+        paper_id: str,
+        hops: int = 1,
+        direction: str = 'both',
+        max_nodes: int = 500,
+        max_expand: int = 25
+    ) -> Dict:
+        """
+        k跳邻域（广度优先）
+
+        每一跳只展开被引数最高的 max_expand 个节点，避免第二跳起上游请求数爆炸
+
+        Args:
+            paper_id: 中心论文S2 ID
+            hops: 跳数
+            direction: 'citations'、'references' 或 'both'
+            max_nodes: 返回的最大节点数
+            max_expand: 每跳最多展开的节点数
+
+        Returns:
+            {'nodes': [{paper_id, hop, title, year, citation_count}], 'edges': [{citing, cited}], 'errors': {...}}
+        """
+        directions = self._directions(direction)
+        hop_of = {paper_id: 0}
+        edges = set()
+        errors = {}
+        frontier = [paper_id]
+
+        for hop in range(1, hops + 1):
+            if not frontier or len(hop_of) >= max_nodes:
+                break
+            expand = sorted(frontier, key=lambda nid: -self.meta(nid)['citation_count'])[:max_expand]
+            errors.update(await self._ensure_many(expand, directions))
+
+            next_frontier = []
+            for nid in expand:
+                for d in directions:
+                    for neighbor in self.adjacent(nid, d):
+                        edges.add((neighbor, nid) if d == 'citations' else (nid, neighbor))
+                        if neighbor not in hop_of and len(hop_of) < max_nodes:
+                            hop_of[neighbor] = hop
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        return {
+            'paper_id': paper_id,
+            'nodes': [self._node(nid, hop=hop) for nid, hop in hop_of.items()],
+            'edges': [
+                {'citing': citing, 'cited': cited}
+                for citing, cited in sorted(edges)
+                if citing in hop_of and cited in hop_of
+            ],
+            'errors': errors
+        }
+
+    async def common(self, paper_ids: List[str], direction: str = 'citations') -> Dict:
+        """
+        共同引用（同时引用所有给定论文的论文）或共同参考文献（被所有给定论文引用的论文）
+
+        Args:
+            paper_ids: 论文S2 ID列表（至少2个）
+            direction: 'citations' 或 'references'
+
+        Returns:
+            {'papers': [...], 'total'}
+        """
+        errors = await self._ensure_many(paper_ids, self._directions(direction))
+        if errors:
+            raise RuntimeError(f'获取{direction}失败: {errors}')
+        sets = [self.adjacent(pid, direction) for pid in paper_ids]
+        shared = set.intersection(*sets) if sets else set()
+        papers = sorted((self._node(nid) for nid in shared), key=lambda node: (-node['citation_count'], node['paper_id']))
+        return {'paper_ids': paper_ids, 'direction': direction, 'papers': papers, 'total': len(papers)}
+
+    async def shortest_path(
+        self,
+        source: str,
+        target: str,
+        max_depth: int = 4,
+        max_expand: int = 50
+    ) -> Dict:
+        """
+        两篇论文之间的最短引用路径（忽略引用方向，双向广度优先）
+
+        Args:
+            source: 起点论文S2 ID
+            target: 终点论文S2 ID
+            max_depth: 最大路径长度
+            max_expand: 最多展开的节点数（每个节点需要抓取引用和参考文献）
+
+        Returns:
+            {'path': [{paper_id, title, ...}] 或 None, 'edges': [{citing, cited}], 'expanded': 展开的节点数}
+        """
+        if source == target:
+            return {'path': [self._node(source)], 'edges': [], 'expanded': 0}
+
+        parents = [{source: None}, {target: None}]
+        frontiers = [[source], [target]]
+        expanded = 0
+        meeting = None
+
+        for _ in range(max_depth):
+            # 展开较小的一侧
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            frontier = frontiers[side][:max(0, max_expand - expanded)]
+            if not frontier:
+                break
+            await self._ensure_many(frontier, DIRECTIONS)
+            expanded += len(frontier)
+
+            next_frontier = []
+            for nid in frontier:
+                for d in DIRECTIONS:
+                    for neighbor in self.adjacent(nid, d):
+                        if neighbor in parents[side]:
+                            continue
+                        parents[side][neighbor] = nid
+                        next_frontier.append(neighbor)
+                        if neighbor in parents[1 - side]:
+                            meeting = neighbor
+                            break
+                    if meeting:
+                        break
+                if meeting:
+                    break
+            if meeting:
+                break
+            frontiers[side] = next_frontier
+
+        if meeting is None:
+            return {'path': None, 'edges': [], 'expanded': expanded}
+
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+
+        edges = []
+        for a, b in zip(path, path[1:]):
+            if b in self.adjacent(a, 'references'):
+                edges.append({'citing': a, 'cited': b})
+            else:
+                edges.append({'citing': b, 'cited': a})
+        return {'path': [self._node(nid) for nid in path], 'edges': edges, 'expanded': expanded}
+
+    def stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            内存中的节点/边数及命中统计
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_adjacency'] = len(self._complete)
+            stats['edges'] = sum(len(v) for v in self._adjacency['references'].values())
+            stats['nodes'] = len(self._meta)
+        return stats
+
+
+# 导出单例
+_citation_graph = None
+
+
+def get_citation_graph() -> CitationGraph:
+    """获取引用图单例"""
+    global _citation_graph
+    if _citation_graph is None:
+        _citation_graph = CitationGraph()
+    return _citation_graph
@@ -0,0 +1,526 @@
+"""
+引用图排序信号
+基于本地引用图（citation_edges）构建稀疏邻接矩阵，用 NumPy/SciPy 计算每篇论文的：
+
+- PageRank：引用网络中的重要性（幂迭代，每次迭代与边数成线性）
+- 共被引强度（co-citation）：与其他论文被同一篇论文共同引用的次数之和 = A^T (出度 - 1)
+- 文献耦合强度（bibliographic coupling）：与其他论文共享参考文献的次数之和 = A (入度 - 1)
+
+分数由 rank_citations.py 按论文保存到 citation_scores 集合，并用于搜索结果和推荐结果的重排序；
+related 按共被引和文献耦合查找与给定论文关系最紧密的论文
+
+- 重新计算时以上一次的PageRank作为初始值（增量计算），只写入变化明显的分数
+- Web进程加载时优先使用 citation_scores 中保存的PageRank和百分位，
+  保存的分数覆盖引用图中全部论文时不再迭代计算
+"""
+
+import logging
+import os
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from models.paper import Paper
+from services.paper_store import extract_identifiers
+
+logger = logging.getLogger(__name__)
+
+
+def pagerank(
+    adjacency: csr_matrix,
+    damping: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    start: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, int]:
+    """
+    幂迭代计算PageRank（无出边的节点将其分数均匀分配给所有节点）
+
+    Args:
+        adjacency: 邻接矩阵，行为引用方、列为被引方
+        damping: 阻尼系数
+        tol: 收敛阈值（按节点平均的L1误差）
+        max_iter: 最大迭代次数
+        start: 初始分数（如上一次的结果），默认均匀分布
+
+    Returns:
+        (分数数组（和为1）, 迭代次数)
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0), 0
+
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inverse = np.zeros(n)
+    inverse[~dangling] = 1.0 / out_degree[~dangling]
+    # 转置后每行是被引方，乘以分数向量即为一次传播
+    transition = csr_matrix((diags(inverse) @ adjacency).T)
+
+    if start is None or start.sum() <= 0:
+        scores = np.full(n, 1.0 / n)
+    else:
+        scores = start / start.sum()
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        updated = damping * (transition @ scores)
+        updated += (damping * scores[dangling].sum() + 1.0 - damping) / n
+        error = np.abs(updated - scores).sum()
+        scores = updated
+        if error < n * tol:
+            break
+    return scores, iterations
+
+
+def cocitation_strength(adjacency: csr_matrix) -> np.ndarray:
+    """每篇论文的共被引强度（对所有其他论文的共被引次数之和）"""
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    return np.asarray(adjacency.T @ np.maximum(out_degree - 1, 0)).ravel()
+
+
+def coupling_strength(adjacency: csr_matrix) -> np.ndarray:
+    """每篇论文的文献耦合强度（与所有其他论文共享参考文献的次数之和）"""
+    in_degree = np.asarray(adjacency.sum(axis=0)).ravel()
+    return np.asarray(adjacency @ np.maximum(in_degree - 1, 0)).ravel()
+
+
+class CitationRanker:
+    """引用图排序分数（线程安全）"""
+
+    COLLECTION_NAME = 'citation_scores'
+
+    def __init__(self, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100):
+        """
+        Args:
+            damping: PageRank阻尼系数
+            tol: PageRank收敛阈值
+            max_iter: PageRank最大迭代次数
+        """
+        self.damping = damping
+        self.tol = tol
+        self.max_iter = max_iter
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.aliases: Dict[Tuple[str, str], int] = {}
+        self.adjacency = csr_matrix((0, 0))
+        self.cited_by = csr_matrix((0, 0))
+        self.pagerank = np.zeros(0)
+        self.percentile = np.zeros(0)
+        self.cocitation = np.zeros(0)
+        self.coupling = np.zeros(0)
+        self.edges = 0
+        self.iterations = 0
+        self.built_at = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(
+        self,
+        edges: Iterable[Tuple[str, str]],
+        aliases: Iterable[Tuple[str, Dict[str, str]]] = (),
+        previous: Optional[Dict[str, float]] = None,
+        stored: Optional[Dict[str, Dict]] = None
+    ) -> int:
+        """
+        从边列表全量计算分数
+
+        Args:
+            edges: [(citing, cited), ...]，重复边只计一次
+            aliases: [(S2论文ID, {'doi': ..., 'arxiv': ...}), ...]，用于匹配其他数据源的论文
+            previous: 上一次的PageRank {论文ID: 分数}，作为初始值加快收敛；
+                默认使用 stored 中的PageRank，都没有时使用当前内存中的分数
+            stored: citation_scores 中保存的分数（见 load_scores），覆盖全部论文时
+                直接使用其PageRank和百分位，不再迭代计算
+
+        Returns:
+            边数
+        """
+        index: Dict[str, int] = {}
+        rows = array('i')
+        cols = array('i')
+        for citing, cited in edges:
+            if citing == cited:
+                continue
+            row = index.get(citing)
+            if row is None:
+                row = index[citing] = len(index)
+            col = index.get(cited)
+            if col is None:
+                col = index[cited] = len(index)
+            rows.append(row)
+            cols.append(col)
+
+        n = len(index)
+        adjacency = csr_matrix(
+            (np.ones(len(rows)), (np.frombuffer(rows, dtype=np.int32), np.frombuffer(cols, dtype=np.int32))),
+            shape=(n, n)
+        )
+        adjacency.data[:] = 1.0
+
+        if stored and all(pid in stored for pid in index):
+            # 保存的分数是最新的：直接使用，不再迭代
+            scores = np.zeros(n)
+            percentile = np.zeros(n)
+            for pid, row in index.items():
+                scores[row] = stored[pid]['pagerank']
+                percentile[row] = stored[pid]['percentile']
+            iterations = 0
+        else:
+            if previous is None and stored:
+                previous = {pid: doc['pagerank'] for pid, doc in stored.items()}
+            if previous is None:
+                with self._lock:
+                    previous = {pid: float(self.pagerank[i]) for pid, i in self.index.items()} if self.index else None
+            start = None
+            if previous:
+                start = np.full(n, 1.0 / max(n, 1))
+                for pid, row in index.items():
+                    if pid in previous:
+                        start[row] = previous[pid]
+
+            scores, iterations = pagerank(adjacency, self.damping, self.tol, self.max_iter, start)
+
+            percentile = np.zeros(n)
+            if n > 1:
+                percentile[np.argsort(scores, kind='stable')] = np.arange(n) / (n - 1)
+
+        alias_rows = {}
+        for pid, ids in aliases:
+            row = index.get(pid)
+            if row is not None:
+                for kind, value in ids.items():
+                    alias_rows[(kind, value)] = row
+
+        ids = [''] * n
+        for pid, row in index.items():
+            ids[row] = pid
+
+        with self._lock:
+            self.ids = ids
+            self.index = index
+            self.aliases = alias_rows
+            self.adjacency = adjacency
+            self.cited_by = csr_matrix(adjacency.T)
+            self.pagerank = scores
+            self.percentile = percentile
+            self.cocitation = cocitation_strength(adjacency)
+            self.coupling = coupling_strength(adjacency)
+            self.edges = adjacency.nnz
+            self.iterations = iterations
+            self.built_at = time.monotonic()
+            self.loaded = True
+
+        logger.info(f"引用图排序分数计算完成，{n} 篇论文，{adjacency.nnz} 条边，PageRank迭代 {iterations} 次")
+        return adjacency.nnz
+
+    def load_from_graph(
+        self,
+        graph,
+        previous: Optional[Dict[str, float]] = None,
+        stored: Optional[Dict[str, Dict]] = None
+    ) -> int:
+        """
+        从引用图的MongoDB存储全量计算分数
+
+        Args:
+            graph: CitationGraph实例
+            previous: 上一次的PageRank（可选）
+            stored: citation_scores 中保存的分数（可选）
+
+        Returns:
+            边数
+        """
+        return self.build(graph.iter_edges(), graph.iter_aliases(), previous, stored)
+
+    # --- 查询 ---
+
+    def _row(self, paper: Dict, source: Optional[str] = None) -> Optional[int]:
+        """按S2 ID或DOI/arXiv ID查找论文所在行（调用方持有锁）"""
+        ids = extract_identifiers(paper, source or paper.get('source', ''))
+        if ids.get('s2') in self.index:
+            return self.index[ids['s2']]
+        if paper.get('paper_id') in self.index:
+            return self.index[paper['paper_id']]
+        for kind in ('doi', 'arxiv'):
+            if kind in ids and (kind, ids[kind]) in self.aliases:
+                return self.aliases[(kind, ids[kind])]
+        return None
+
+    def _scores(self, row: int) -> Dict:
+        return {
+            'pagerank': float(self.pagerank[row]),
+            'percentile': round(float(self.percentile[row]), 4),
+            'cocitation': int(self.cocitation[row]),
+            'coupling': int(self.coupling[row])
+        }
+
+    def scores(self, paper_id: str) -> Optional[Dict]:
+        """
+        获取论文的排序分数
+
+        Args:
+            paper_id: S2论文ID
+
+        Returns:
+            {'pagerank', 'percentile', 'cocitation', 'coupling'}，不在引用图中时返回None
+        """
+        with self._lock:
+            row = self.index.get(paper_id)
+            return None if row is None else self._scores(row)
+
+    def lookup(self, paper: Dict, source: Optional[str] = None) -> Optional[Dict]:
+        """按论文数据（任意数据源）获取排序分数，参数同 scores"""
+        with self._lock:
+            row = self._row(paper, source)
+            return None if row is None else self._scores(row)
+
+    def rerank(self, papers: List[Dict], weight: float = 0.3) -> List[Dict]:
+        """
+        按引用图分数重排序论文列表
+
+        排序分数 = (1 - weight) * 原排名分数 + weight * PageRank百分位；
+        不在引用图中的论文按中位数（0.5）计算。每篇论文的 citation_rank 字段为其PageRank百分位
+
+        Args:
+            papers: 已排序的论文列表
+            weight: 引用图分数的权重（0-1）
+
+        Returns:
+            重排序后的论文列表
+        """
+        if not papers:
+            return papers
+        n = len(papers)
+        keyed = []
+        with self._lock:
+            for position, paper in enumerate(papers):
+                row = self._row(paper)
+                percentile = None if row is None else round(float(self.percentile[row]), 4)
+                # 不修改原对象（可能是缓存中的结果）
+                paper = Paper.from_mapping(paper, citation_rank=percentile)
+                relevance = 1.0 - position / n
+                signal = 0.5 if percentile is None else percentile
+                keyed.append(((1.0 - weight) * relevance + weight * signal, -position, paper))
+        keyed.sort(key=lambda item: item[:2], reverse=True)
+        return [paper for _, _, paper in keyed]
+
+    def related(self, paper_id: str, k: int = 10) -> List[Tuple[str, Dict]]:
+        """
+        按共被引和文献耦合查找相关论文
+
+        共被引次数 = 同时引用两篇论文的论文数，耦合次数 = 两篇论文共同的参考文献数；
+        只访问与给定论文相距两跳的边
+
+        Args:
+            paper_id: S2论文ID
+            k: 返回数量
+
+        Returns:
+            [(论文ID, {'cocitation', 'coupling', 'score', 'pagerank'}), ...]，按score降序
+        """
+        with self._lock:
+            row = self.index.get(paper_id)
+            if row is None:
+                return []
+            cocited = self.cited_by[row] @ self.adjacency
+            coupled = self.adjacency[row] @ self.cited_by
+            combined = csr_matrix(cocited + coupled)
+
+            columns = combined.indices
+            keep = columns != row
+            columns, values = columns[keep], combined.data[keep]
+            if not len(columns):
+                return []
+
+            # 共同关系数降序，相同时PageRank高的在前
+            top = np.lexsort((-self.pagerank[columns], -values))[:k]
+            columns, values = columns[top], values[top]
+            cocitation = np.asarray(cocited[:, columns].todense()).ravel()
+            coupling = np.asarray(coupled[:, columns].todense()).ravel()
+            return [
+                (self.ids[col], {
+                    'cocitation': int(cocitation[i]),
+                    'coupling': int(coupling[i]),
+                    'score': float(values[i]),
+                    'pagerank': float(self.pagerank[col])
+                })
+                for i, col in enumerate(columns)
+            ]
+
+    # --- 持久化 ---
+
+    def load_scores(self, collection) -> Dict[str, Dict]:
+        """
+        读取上一次保存的分数（作为增量计算的初始值，或直接用于排序）
+
+        Args:
+            collection: citation_scores 集合
+
+        Returns:
+            {论文ID: {'pagerank', 'percentile', 'cocitation', 'coupling'}}
+        """
+        fields = ('pagerank', 'percentile', 'cocitation', 'coupling')
+        return {
+            doc['_id']: {field: doc[field] for field in fields}
+            for doc in collection.find({}, dict.fromkeys(fields, 1))
+            if all(field in doc for field in fields)
+        }
+
+    @staticmethod
+    def _unchanged(scores: Dict, old: Optional[Dict], min_change: float) -> bool:
+        """保存的分数是否仍然有效：PageRank相对变化、百分位绝对变化不超过 min_change，共被引和耦合强度不变"""
+        return old is not None and (
+            abs(scores['pagerank'] - old['pagerank']) <= min_change * old['pagerank']
+            and abs(scores['percentile'] - old['percentile']) <= min_change
+            and scores['cocitation'] == old['cocitation']
+            and scores['coupling'] == old['coupling']
+        )
+
+    def save_scores(
+        self,
+        collection,
+        previous: Optional[Dict[str, Dict]] = None,
+        min_change: float = 0.01,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        保存分数到 citation_scores 集合
+
+        Args:
+            collection: citation_scores 集合
+            previous: 已保存的分数（见 load_scores），所有字段都没有明显变化的论文不再写入
+            min_change: PageRank相对变化和百分位绝对变化的阈值
+            batch_size: 每批写入的文档数
+
+        Returns:
+            写入的论文数
+        """
+        from pymongo import UpdateOne
+
+        now = datetime.utcnow()
+        written = 0
+        operations = []
+        with self._lock:
+            for row, pid in enumerate(self.ids):
+                scores = self._scores(row)
+                if self._unchanged(scores, (previous or {}).get(pid), min_change):
+                    continue
+                operations.append(UpdateOne(
+                    {'_id': pid},
+                    {'$set': dict(scores, computed_at=now)},
+                    upsert=True
+                ))
+                if len(operations) >= batch_size:
+                    collection.bulk_write(operations, ordered=False)
+                    written += len(operations)
+                    operations = []
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+        return written
+
+    def stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            论文数、边数、PageRank迭代次数等
+        """
+        with self._lock:
+            return {
+                'papers': len(self.ids),
+                'edges': self.edges,
+                'aliases': len(self.aliases),
+                'iterations': self.iterations,
+                'age_seconds': round(time.monotonic() - self.built_at, 1) if self.loaded else None,
+                'loaded': self.loaded
+            }
+
+
+# 导出单例
+_citation_ranker = None
+_citation_ranker_lock = threading.Lock()
+_rebuilding = threading.Event()
+
+# 分数最长使用时间（秒），超过后在后台按最新的引用图重新计算
+CITATION_RANK_MAX_AGE = float(os.getenv('CITATION_RANK_MAX_AGE', '3600'))
+
+
+def _stored_scores(ranker: CitationRanker) -> Optional[Dict[str, Dict]]:
+    """读取 rank_citations.py 保存的分数（不可用时返回None）"""
+    try:
+        from config.database import get_collection
+        return ranker.load_scores(get_collection(CitationRanker.COLLECTION_NAME)) or None
+    except Exception as e:
+        logger.warning(f"读取已保存的排序分数失败: {e}")
+        return None
+
+
+def _load(ranker: CitationRanker, graph) -> None:
+    if graph is None:
+        from services.citation_graph import get_citation_graph
+        graph = get_citation_graph()
+    try:
+        ranker.load_from_graph(graph, stored=_stored_scores(ranker))
+    except Exception as e:
+        logger.warning(f"从引用图计算排序分数失败: {e}")
+        ranker.built_at = time.monotonic()
+        ranker.loaded = True
+
+
+def schedule_rebuild(graph=None) -> bool:
+    """
+    在后台线程重新计算排序分数（计算期间继续使用旧分数）
+
+    Returns:
+        是否启动了新的计算（已有计算进行中时返回False）
+    """
+    if _rebuilding.is_set():
+        return False
+    _rebuilding.set()
+    ranker = get_citation_ranker(graph)
+
+    def rebuild():
+        try:
+            _load(ranker, graph)
+        finally:
+            _rebuilding.clear()
+
+    threading.Thread(target=rebuild, name='citation-rank-rebuild', daemon=True).start()
+    return True
+
+
+def get_citation_ranker(graph=None) -> CitationRanker:
+    """
+    获取引用图排序分数单例
+
+    首次调用时从引用图存储同步加载（存储不可用时为空），优先使用 citation_scores 中保存的分数；
+    之后分数过期（CITATION_RANK_MAX_AGE）时在后台重新加载
+
+    Args:
+        graph: CitationGraph实例（默认使用全局引用图）
+    """
+    global _citation_ranker
+    with _citation_ranker_lock:
+        if _citation_ranker is None:
+            _citation_ranker = CitationRanker()
+        if not _citation_ranker.loaded:
+            _load(_citation_ranker, graph)
+            return _citation_ranker
+
+    ranker = _citation_ranker
+    if time.monotonic() - ranker.built_at > CITATION_RANK_MAX_AGE:
+        schedule_rebuild(graph)
+    return ranker
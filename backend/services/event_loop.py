@@ -0,0 +1,168 @@
+"""
+应用级事件循环
+在后台线程中运行一个常驻asyncio事件循环，Flask同步路由通过 run_async() 提交协程
+
+相比每个请求调用 asyncio.run():
+- 不必为每个请求创建/销毁事件循环
+- 异步连接状态、后台任务可以跨请求保留
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopRunner:
+    """在后台守护线程中运行的常驻事件循环"""
+
+    def __init__(self, name: str = 'scholarai-event-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """当前运行的事件循环（未启动时为None）"""
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """事件循环是否正在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'EventLoopRunner':
+        """
+        启动事件循环线程（重复调用无副作用）
+
+        Returns:
+            self
+        """
+        with self._lock:
+            if self.is_running:
+                return self
+
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            logger.info("应用事件循环已启动")
+        return self
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        在常驻事件循环中执行协程并等待结果（供同步代码调用）
+
+        Args:
+            coro: 要执行的协程
+            timeout: 等待超时（秒），超时后协程会被取消
+
+        Returns:
+            协程的返回值
+
+        Raises:
+            RuntimeError: 在事件循环线程内部调用（会造成死锁）
+            concurrent.futures.TimeoutError: 等待超时
+        """
+        if not self.is_running:
+            self.start()
+
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在事件循环线程内同步等待协程，请直接await")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def submit(self, coro: Awaitable):
+        """
+        提交协程到事件循环，不等待结果
+
+        Args:
+            coro: 要执行的协程
+
+        Returns:
+            concurrent.futures.Future
+        """
+        if not self.is_running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        停止事件循环并等待线程退出
+
+        Args:
+            timeout: 等待线程退出的超时时间（秒）
+        """
+        with self._lock:
+            if not self.is_running:
+                return
+            loop = self._loop
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout)
+            if not loop.is_running():
+                loop.close()
+            self._loop = None
+            self._thread = None
+            logger.info("应用事件循环已停止")
+
+
+# 导出单例
+_event_loop_runner = None
+
+
+def get_event_loop_runner() -> EventLoopRunner:
+    """获取应用事件循环单例"""
+    global _event_loop_runner
+    if _event_loop_runner is None:
+        _event_loop_runner = EventLoopRunner()
+    return _event_loop_runner
+
+
+def init_event_loop(app=None) -> EventLoopRunner:
+    """
+    启动应用事件循环（在create_app中调用一次）
+
+    Args:
+        app: Flask应用实例（可选）
+
+    Returns:
+        EventLoopRunner实例
+    """
+    runner = get_event_loop_runner().start()
+    if app is not None:
+        app.extensions['event_loop_runner'] = runner
+    return runner
+
+
+def run_async(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    在应用事件循环中执行协程并返回结果（替代路由中的 asyncio.run）
+
+    Args:
+        coro: 要执行的协程
+        timeout: 等待超时（秒）
+
+    Returns:
+        协程的返回值
+    """
+    return get_event_loop_runner().run(coro, timeout=timeout)
+
+
+atexit.register(lambda: _event_loop_runner.stop() if _event_loop_runner else None)
@@ -0,0 +1,137 @@
+"""
+对冲请求（hedged requests）策略
+论文详情查询时，首选数据源在其历史p90延迟内没有返回，则向下一个数据源发送备份请求，
+先成功返回的结果胜出，用少量额外请求换取更低的尾延迟
+
+- 每个数据源保留最近的详情请求延迟样本，用于计算对冲延迟（分位数）
+- 对冲预算：每个请求积累 budget 个令牌，每次对冲消耗一个，
+  使对冲请求数不超过请求总数的 budget 比例（允许少量突发）
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """对冲延迟与预算（线程安全）"""
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        budget: Optional[float] = None,
+        max_burst: float = 5.0,
+        default_delay: Optional[float] = None,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        """
+        Args:
+            quantile: 对冲延迟使用的延迟分位数
+            budget: 对冲请求占请求总数的最大比例（默认 HEDGE_BUDGET 或 0.1）
+            max_burst: 预算令牌上限（允许连续对冲的次数）
+            default_delay: 样本不足时的对冲延迟，秒（默认 HEDGE_DEFAULT_DELAY 或 1.0）
+            min_delay: 对冲延迟下限（秒）
+            min_samples: 使用分位数前需要的最少样本数
+            window: 每个数据源保留的延迟样本数
+        """
+        self.quantile = quantile
+        self.budget = budget if budget is not None else float(os.getenv('HEDGE_BUDGET', '0.1'))
+        self.max_burst = max_burst
+        self.default_delay = default_delay or float(os.getenv('HEDGE_DEFAULT_DELAY', '1.0'))
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._tokens = max_burst
+        self._stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'budget_exhausted': 0}
+        self._lock = threading.Lock()
+
+    def observe(self, source: str, latency: float) -> None:
+        """
+        记录一次详情请求的延迟
+
+        Args:
+            source: 数据源名称
+            latency: 请求耗时（秒）
+        """
+        with self._lock:
+            samples = self._samples.get(source)
+            if samples is None:
+                samples = self._samples[source] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def delay(self, source: str) -> float:
+        """
+        获取数据源的对冲延迟（最近延迟样本的分位数）
+
+        Args:
+            source: 数据源名称
+
+        Returns:
+            等待首选数据源多少秒后发送对冲请求
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(source, ()))
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        index = min(len(samples) - 1, int(self.quantile * len(samples)))
+        return max(self.min_delay, samples[index])
+
+    def start_request(self) -> None:
+        """登记一个可对冲的请求（积累预算）"""
+        with self._lock:
+            self._stats['requests'] += 1
+            self._tokens = min(self.max_burst, self._tokens + self.budget)
+
+    def try_hedge(self) -> bool:
+        """
+        尝试消耗一次对冲预算
+
+        Returns:
+            是否允许发送对冲请求
+        """
+        with self._lock:
+            if self._tokens < 1:
+                self._stats['budget_exhausted'] += 1
+                return False
+            self._tokens -= 1
+            self._stats['hedged'] += 1
+            return True
+
+    def record_win(self) -> None:
+        """记录对冲请求先于首选请求成功返回"""
+        with self._lock:
+            self._stats['hedge_wins'] += 1
+
+    def stats(self) -> Dict:
+        """
+        获取对冲统计信息
+
+        Returns:
+            请求数、对冲数、对冲胜出数、对冲率，以及各数据源当前的对冲延迟
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            sources = list(self._samples)
+        stats['hedge_rate'] = round(stats['hedged'] / stats['requests'], 4) if stats['requests'] else 0.0
+        stats['budget'] = self.budget
+        stats['delays'] = {source: round(self.delay(source), 3) for source in sources}
+        return stats
+
+
+# 导出单例
+_hedge_policy = None
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """获取对冲策略单例"""
+    global _hedge_policy
+    if _hedge_policy is None:
+        _hedge_policy = HedgePolicy()
+    return _hedge_policy
@@ -0,0 +1,244 @@
+"""
+共享异步HTTP传输层
+为arXiv、OpenAlex、Semantic Scholar客户端提供非阻塞的HTTP请求
+
+- 所有客户端共享同一个连接池（keep-alive复用TCP/TLS连接）
+- 阻塞的socket读写在专用线程池中执行，协程等待期间不阻塞事件循环
+- 支持按主机配置最大并发连接数
+- 发送请求前按主机获取速率限制令牌（见 services/rate_limiter.py），收到429时暂停该主机
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_host_limits(value: str) -> Dict[str, int]:
+    """
+    解析按主机的连接数限制配置
+
+    Args:
+        value: 形如 "export.arxiv.org=2,api.semanticscholar.org=4" 的字符串
+
+    Returns:
+        {主机名: 最大连接数}
+    """
+    limits = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item or '=' not in item:
+            continue
+        host, limit = item.split('=', 1)
+        try:
+            limits[host.strip()] = int(limit)
+        except ValueError:
+            logger.warning(f"忽略无效的主机连接数配置: {item}")
+    return limits
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析Retry-After响应头
+
+    Args:
+        value: 秒数或HTTP日期
+
+    Returns:
+        需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AsyncHTTPTransport:
+    """基于连接池的异步HTTP传输"""
+
+    # 每个主机默认最大连接数
+    DEFAULT_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+
+    # 执行HTTP请求的工作线程数（即全局最大并发请求数）
+    DEFAULT_MAX_WORKERS = int(os.getenv('HTTP_MAX_WORKERS', '32'))
+
+    # 读取流式响应的工作线程数（每个进行中的流在读取时占用一个线程）
+    DEFAULT_STREAM_WORKERS = int(os.getenv('HTTP_STREAM_WORKERS', '32'))
+
+    # 按主机覆盖的连接数限制，如 "export.arxiv.org=2,api.semanticscholar.org=4"
+    DEFAULT_HOST_LIMITS = os.getenv('HTTP_HOST_LIMITS', '')
+
+    # 收到429且没有Retry-After时暂停该主机的秒数
+    DEFAULT_429_PAUSE = 5.0
+
+    # 等待速率限制令牌的最长时间（秒），排队更久的请求立即失败；后台任务可按请求传 max_wait=None 不限
+    DEFAULT_MAX_RATE_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '10'))
+
+    def __init__(
+        self,
+        pool_maxsize: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        host_limits: Optional[Dict[str, int]] = None,
+        rate_limiter=None
+    ):
+        """
+        初始化传输层
+
+        Args:
+            pool_maxsize: 每个主机的最大连接数
+            max_workers: 工作线程数
+            host_limits: 按主机覆盖的最大连接数 {主机名: 连接数}
+            rate_limiter: 速率限制器（默认使用全局 RateLimiter）
+        """
+        if rate_limiter is None:
+            from services.rate_limiter import get_rate_limiter
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.pool_maxsize = pool_maxsize or self.DEFAULT_POOL_MAXSIZE
+        self.max_workers = max_workers or self.DEFAULT_MAX_WORKERS
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'ScholarAI/1.0 (https://scholarai.example.com)'
+        })
+
+        # pool_block=True: 连接数达到上限时排队等待，而不是创建额外的短连接
+        default_adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True
+        )
+        self.session.mount('http://', default_adapter)
+        self.session.mount('https://', default_adapter)
+
+        self.host_limits = {}
+        limits = _parse_host_limits(self.DEFAULT_HOST_LIMITS)
+        limits.update(host_limits or {})
+        for host, limit in limits.items():
+            self.set_host_limit(host, limit)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='scholarai-http'
+        )
+        # 流式响应的逐行读取使用独立线程池，长时间挂起的读取不占用请求线程和事件循环的默认线程池
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=self.DEFAULT_STREAM_WORKERS,
+            thread_name_prefix='scholarai-stream'
+        )
+
+    def set_host_limit(self, host: str, limit: int) -> None:
+        """
+        设置单个主机的最大并发连接数
+
+        Args:
+            host: 主机名（如 export.arxiv.org）
+            limit: 最大连接数
+        """
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=limit,
+            pool_block=True
+        )
+        for scheme in ('http://', 'https://'):
+            self.session.mount(f'{scheme}{host}', adapter)
+        self.host_limits[host] = limit
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送HTTP请求（不阻塞事件循环）
+
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: 传给 requests.Session.request 的参数（params, json, headers, timeout等）；
+                max_wait 为等待速率限制令牌的最长秒数（默认 DEFAULT_MAX_RATE_WAIT，None表示不限）
+
+        Returns:
+            requests.Response
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败（包括排队超过 max_wait 的 RateLimitExceeded）
+        """
+        max_wait = kwargs.pop('max_wait', self.DEFAULT_MAX_RATE_WAIT)
+        host = urlsplit(url).hostname
+        await self.rate_limiter.acquire(host, max_wait=max_wait)
+
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor,
+            functools.partial(self.session.request, method, url, **kwargs)
+        )
+
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            seconds = retry_after if retry_after is not None else self.DEFAULT_429_PAUSE
+            if host in self.rate_limiter.shared_buckets:
+                # 暂停共享令牌桶需要写数据库，放到线程中执行，不阻塞事件循环
+                await asyncio.to_thread(self.rate_limiter.pause, host, seconds)
+            else:
+                self.rate_limiter.pause(host, seconds)
+        return response
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        """发送GET请求"""
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        """发送POST请求"""
+        return await self.request('POST', url, **kwargs)
+
+    async def iter_lines(self, response: requests.Response) -> AsyncIterator[bytes]:
+        """
+        逐行读取流式响应（stream=True），阻塞的socket读取在流读取线程池中进行
+
+        Args:
+            response: request(..., stream=True) 返回的响应
+
+        Yields:
+            响应的每一行（bytes，可能为空行）
+        """
+        loop = asyncio.get_running_loop()
+        lines = response.iter_lines()
+        while True:
+            line = await loop.run_in_executor(self._stream_executor, next, lines, None)
+            if line is None:
+                return
+            yield line
+
+    def close(self) -> None:
+        """关闭连接池和工作线程"""
+        self._executor.shutdown(wait=False)
+        self._stream_executor.shutdown(wait=False)
+        self.session.close()
+
+
+# 导出单例
+_http_transport = None
+
+
+def get_http_transport() -> AsyncHTTPTransport:
+    """获取共享HTTP传输层单例"""
+    global _http_transport
+    if _http_transport is None:
+        _http_transport = AsyncHTTPTransport()
+    return _http_transport
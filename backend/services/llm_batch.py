@@ -0,0 +1,170 @@
+"""
+LLM批量调用执行器
+以有界并发执行多次独立的LLM调用（如逐篇论文摘要），每次调用单独计时
+
+- 并发上限：同时进行的调用数不超过 limit
+- 单次超时：从调用实际开始执行时计时，排队时间不计入
+- 结果按输入顺序返回，单个调用失败/超时不影响其他调用
+- 流式调用：多个流并发执行，片段按到达顺序交错输出并标注所属输入
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+
+from services.event_loop import run_async
+
+logger = logging.getLogger(__name__)
+
+# 默认并发上限与单次调用超时（秒）
+DEFAULT_LIMIT = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+DEFAULT_TIMEOUT = float(os.getenv('LLM_CALL_TIMEOUT', '90'))
+
+
+class BoundedLLMExecutor:
+    """有界并发的LLM调用执行器"""
+
+    def __init__(self, limit: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            limit: 最大并发调用数（默认 LLM_MAX_CONCURRENCY）
+            timeout: 单次调用超时（秒，默认 LLM_CALL_TIMEOUT）
+        """
+        self.limit = max(1, limit or DEFAULT_LIMIT)
+        self.timeout = timeout or DEFAULT_TIMEOUT
+
+    async def map(self, func: Callable[[Any], Dict], items: Iterable[Any]) -> List[Dict]:
+        """
+        对每个输入并发执行 func
+
+        func 可以是协程函数（超时后调用被取消），也可以是同步函数（在线程池中运行）
+
+        Args:
+            func: 单次调用函数，返回 {'success': ..., ...} 格式的字典
+            items: 输入列表
+
+        Returns:
+            与输入顺序一致的结果列表；异常或超时的调用返回
+            {'success': False, 'error': ...}
+        """
+        semaphore = asyncio.Semaphore(self.limit)
+
+        async def call(item):
+            async with semaphore:
+                try:
+                    if asyncio.iscoroutinefunction(func):
+                        job = func(item)
+                    else:
+                        job = asyncio.to_thread(func, item)
+                    return await asyncio.wait_for(job, self.timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"LLM调用超时（{self.timeout}秒）")
+                    return {'success': False, 'error': f'LLM调用超时（{self.timeout}秒）'}
+                except Exception as e:
+                    logger.warning(f"LLM调用失败: {e}")
+                    return {'success': False, 'error': str(e)}
+
+        return await asyncio.gather(*[call(item) for item in items])
+
+    def run(self, func: Callable[[Any], Dict], items: Iterable[Any]) -> List[Dict]:
+        """
+        同步版本的 map（在应用事件循环中执行，供Flask路由调用）
+
+        Args:
+            func: 单次调用函数
+            items: 输入列表
+
+        Returns:
+            与输入顺序一致的结果列表
+        """
+        return run_async(self.map(func, list(items)))
+
+    def stream(
+        self,
+        func: Callable[[Any], Iterator[str]],
+        items: Iterable[Any]
+    ) -> Generator[Tuple[int, str, Any], None, None]:
+        """
+        并发执行多个流式调用，按到达顺序交错产出片段
+
+        每个输入最终恰好产出一个 'done' 或 'error' 事件。生成器被提前关闭
+        （如客户端断开）时，尚未开始的调用被取消，进行中的调用在下一个片段处停止。
+
+        Args:
+            func: 单次流式调用函数，返回文本片段迭代器
+            items: 输入列表
+
+        Yields:
+            (输入下标, 事件类型, 内容)，事件类型为 'chunk'（内容为文本片段）、
+            'done'（内容为None）或 'error'（内容为错误信息）
+        """
+        items = list(items)
+        if not items:
+            return
+
+        events: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        # 已超时的输入：消费端判定超时后，对应的流在下一个片段处停止
+        expired = set()
+        timeout_error = f'LLM调用超时（{self.timeout}秒）'
+
+        def worker(index, item):
+            if stop.is_set():
+                return
+            events.put((index, 'start', time.monotonic()))
+            try:
+                for chunk in func(item):
+                    if stop.is_set() or index in expired:
+                        return
+                    events.put((index, 'chunk', chunk))
+                events.put((index, 'done', None))
+            except Exception as e:
+                logger.warning(f"LLM流式调用失败: {e}")
+                events.put((index, 'error', str(e)))
+
+        pool = ThreadPoolExecutor(max_workers=min(self.limit, len(items)), thread_name_prefix='llm-stream')
+        pending = set(range(len(items)))
+        # 进行中的输入 -> 截止时间（从调用实际开始时计时，排队时间不计入）
+        deadlines: Dict[int, float] = {}
+        try:
+            for index, item in enumerate(items):
+                pool.submit(worker, index, item)
+
+            while pending:
+                # 由消费端检查每个输入的截止时间：某个流停滞时，即使其他流仍在输出也会按时超时
+                now = time.monotonic()
+                for index in sorted(i for i, deadline in deadlines.items() if deadline <= now):
+                    del deadlines[index]
+                    expired.add(index)
+                    pending.discard(index)
+                    yield index, 'error', timeout_error
+                if not pending:
+                    return
+
+                wait = min(deadlines.values()) - now if deadlines else self.timeout
+                try:
+                    index, kind, payload = events.get(timeout=max(0.0, wait))
+                except queue.Empty:
+                    if deadlines:
+                        continue
+                    # 没有进行中的调用且长时间没有新调用开始，剩余输入全部按超时处理
+                    for index in sorted(pending):
+                        yield index, 'error', timeout_error
+                    return
+                if index not in pending:
+                    continue
+                if kind == 'start':
+                    deadlines[index] = payload + self.timeout
+                    continue
+                if kind != 'chunk':
+                    pending.discard(index)
+                    deadlines.pop(index, None)
+                yield index, kind, payload
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
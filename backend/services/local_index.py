@@ -0,0 +1,372 @@
+"""
+本地论文全文索引
+基于已获取并存储在papers集合中的论文构建内存倒排索引，使用BM25打分
+
+- 索引字段: 标题、摘要、作者、分类（标题权重更高）
+- 年份/分类过滤在遍历倒排表时按文档的年份和分类判断，代价只与命中的倒排项数有关
+- 支持增量添加/更新：同一论文 (source, paper_id) 再次添加时替换旧记录，
+  释放的文档编号被复用，索引大小只与在用论文数有关
+- 检索时只在锁内复制查询词的倒排项，打分和取前k名（heapq）在锁外进行，
+  并发检索和后台采集的写入不会互相阻塞
+- 索引常驻内存（每篇论文约数KB），启动时最多载入 LOCAL_INDEX_MAX_DOCS 篇最新获取的论文
+"""
+
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.paper import Paper
+
+logger = logging.getLogger(__name__)
+
+# 英文词/数字，以及逐字切分的中文
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]')
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'we', 'our'
+})
+
+# 启动时从论文存储载入的最大论文数（按获取时间从新到旧，0表示不限制）
+LOCAL_INDEX_MAX_DOCS = int(os.getenv('LOCAL_INDEX_MAX_DOCS', '200000'))
+
+# 各字段的词频权重
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'summary': 1.0,
+    'authors': 1.5,
+    'categories': 1.0
+}
+
+
+def _stem(token: str) -> str:
+    """简单的复数归一化（networks -> network），不处理 -ss 结尾的词"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词（小写、去停用词、复数归一化）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        词列表
+    """
+    if not text:
+        return []
+    return [_stem(t) for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(paper: Dict, field: str) -> str:
+    value = paper.get(field)
+    if isinstance(value, list):
+        return ' '.join(v if isinstance(v, str) else str(v.get('name', '')) for v in value if v)
+    return value or ''
+
+
+def _paper_year(paper: Dict) -> Optional[int]:
+    year = paper.get('published_year') or paper.get('year')
+    if year:
+        try:
+            return int(year)
+        except (TypeError, ValueError):
+            return None
+    published = paper.get('published') or ''
+    return int(published[:4]) if published[:4].isdigit() else None
+
+
+def _paper_categories(paper: Dict) -> frozenset:
+    categories = set(paper.get('categories') or []) | {paper.get('primary_category')}
+    return frozenset(c.lower() for c in categories if c)
+
+
+class LocalPaperIndex:
+    """论文BM25倒排索引（线程安全）"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: BM25词频饱和参数
+            b: BM25文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        # 词 -> {文档编号: 加权词频}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # 按文档编号存储的论文、词频、长度、年份和分类（已删除的文档为None）
+        self._papers: List[Optional[Dict]] = []
+        self._doc_terms: List[Optional[Counter]] = []
+        self._doc_lengths: List[float] = []
+        self._doc_years: List[Optional[int]] = []
+        self._doc_categories: List[Optional[frozenset]] = []
+        self._doc_ids: Dict[Tuple[str, str], int] = {}
+        # 已释放、可复用的文档编号
+        self._free: List[int] = []
+        self._total_length = 0.0
+        self._live_count = 0
+        # 年份/分类 -> 在用文档数（用于统计）
+        self._year_counts: Counter = Counter()
+        self._category_counts: Counter = Counter()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    def add(self, paper: Dict, source: Optional[str] = None) -> None:
+        """
+        添加或更新论文
+
+        Args:
+            paper: _parse_paper 的输出
+            source: 数据源名称（默认使用 paper['source']）
+        """
+        source = source or paper.get('source', '')
+        paper_id = paper.get('paper_id')
+        if not paper_id:
+            return
+
+        terms = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(_field_text(paper, field)):
+                terms[token] += weight
+
+        paper = Paper.from_mapping(paper, source=source)
+        length = sum(terms.values())
+        year = _paper_year(paper)
+        categories = _paper_categories(paper)
+
+        with self._lock:
+            key = (source, paper_id)
+            if key in self._doc_ids:
+                self._remove(self._doc_ids[key])
+
+            if self._free:
+                doc = self._free.pop()
+                self._papers[doc] = paper
+                self._doc_terms[doc] = terms
+                self._doc_lengths[doc] = length
+                self._doc_years[doc] = year
+                self._doc_categories[doc] = categories
+            else:
+                doc = len(self._papers)
+                self._papers.append(paper)
+                self._doc_terms.append(terms)
+                self._doc_lengths.append(length)
+                self._doc_years.append(year)
+                self._doc_categories.append(categories)
+            self._total_length += length
+            self._doc_ids[key] = doc
+            self._live_count += 1
+
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc] = tf
+
+            if year:
+                self._year_counts[year] += 1
+            self._category_counts.update(categories)
+
+    def add_many(self, items: Iterable[Tuple[Dict, str]]) -> int:
+        """
+        批量添加论文
+
+        Args:
+            items: [(论文数据, 数据源), ...]
+
+        Returns:
+            添加的论文数
+        """
+        count = 0
+        for paper, source in items:
+            self.add(paper, source)
+            count += 1
+        return count
+
+    def _remove(self, doc: int) -> None:
+        """删除文档并释放其编号（调用方持有锁）"""
+        for term in self._doc_terms[doc]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths[doc]
+        self._live_count -= 1
+
+        year = self._doc_years[doc]
+        if year:
+            self._year_counts[year] -= 1
+            if not self._year_counts[year]:
+                del self._year_counts[year]
+        self._category_counts.subtract(self._doc_categories[doc])
+        for category in self._doc_categories[doc]:
+            if not self._category_counts[category]:
+                del self._category_counts[category]
+
+        self._papers[doc] = None
+        self._doc_terms[doc] = None
+        self._doc_years[doc] = None
+        self._doc_categories[doc] = None
+        self._free.append(doc)
+
+    def _matches(
+        self,
+        doc: int,
+        year_min: Optional[int],
+        year_max: Optional[int],
+        category: Optional[str]
+    ) -> bool:
+        """文档是否满足年份/分类过滤条件（调用方持有锁）"""
+        if year_min or year_max:
+            year = self._doc_years[doc]
+            if not year or (year_min and year < year_min) or (year_max and year > year_max):
+                return False
+        return not category or category in self._doc_categories[doc]
+
+    def search(
+        self,
+        query: str,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        category: Optional[str] = None,
+        venue: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Dict:
+        """
+        BM25检索
+
+        Args:
+            query: 搜索关键词
+            year_min: 最小年份
+            year_max: 最大年份
+            category: 分类过滤（如 cs.AI）
+            venue: 发表场所（子串匹配）
+            page: 页码
+            page_size: 每页数量
+
+        Returns:
+            与数据源搜索结果相同格式的 data 字典（papers带有 local_score）
+        """
+        terms = set(tokenize(query))
+
+        filtered = bool(year_min or year_max or category)
+        category = category.lower() if category else None
+
+        with self._lock:
+            # 锁内只复制查询词的倒排项（已按过滤条件筛选）及命中文档的长度和论文引用；
+            # 倒排表中只有在用文档，论文对象更新时整体替换，锁外读取是安全的
+            n = self._live_count
+            avg_length = self._total_length / n if n else 0.0
+            matched: List[Tuple[float, List[Tuple[int, float]]]] = []
+            docs: Dict[int, Tuple[float, Dict]] = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                hits = [
+                    (doc, tf) for doc, tf in postings.items()
+                    if not filtered or self._matches(doc, year_min, year_max, category)
+                ]
+                for doc, _ in hits:
+                    if doc not in docs:
+                        docs[doc] = (self._doc_lengths[doc], self._papers[doc])
+                matched.append((idf, hits))
+
+        scores: Dict[int, float] = {}
+        for idf, hits in matched:
+            for doc, tf in hits:
+                norm = self.k1 * (1 - self.b + self.b * docs[doc][0] / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if venue:
+            venue = venue.lower()
+            scores = {
+                doc: score for doc, score in scores.items()
+                if venue in (docs[doc][1].get('venue') or docs[doc][1].get('journal_ref') or '').lower()
+            }
+
+        # 只取到当前页为止的前k名，分数相同时按文档编号升序
+        total = len(scores)
+        start = (page - 1) * page_size
+        ranked = heapq.nlargest(start + page_size, scores.items(), key=lambda item: (item[1], -item[0]))
+        papers = [
+            Paper.from_mapping(docs[doc][1], local_score=round(score, 4))
+            for doc, score in ranked[start:]
+        ]
+
+        return {
+            'papers': papers,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': (total + page_size - 1) // page_size,
+            'source': 'local'
+        }
+
+    def load_from_store(self, store, batch_size: int = 1000, max_docs: Optional[int] = None) -> int:
+        """
+        从论文存储构建索引
+
+        索引常驻内存，占用随论文数线性增长；超过 max_docs 时只载入最新获取的论文，
+        之后的搜索结果和采集的论文仍会增量加入
+
+        Args:
+            store: PaperStore实例
+            batch_size: 每批读取的文档数
+            max_docs: 最多载入的论文数（默认 LOCAL_INDEX_MAX_DOCS，0表示不限制）
+
+        Returns:
+            索引的论文数
+        """
+        if max_docs is None:
+            max_docs = LOCAL_INDEX_MAX_DOCS
+        count = self.add_many(
+            (doc['data'], doc['source'])
+            for doc in store.iter_documents(batch_size=batch_size, limit=max_docs or None)
+        )
+        if max_docs and count >= max_docs:
+            logger.warning(f"本地论文索引已达到载入上限 LOCAL_INDEX_MAX_DOCS={max_docs}，更早获取的论文未载入")
+        self.loaded = True
+        logger.info(f"本地论文索引构建完成，共 {count} 篇")
+        return count
+
+    def stats(self) -> Dict:
+        """
+        获取索引统计信息
+
+        Returns:
+            论文数、词项数、年份/分类数
+        """
+        with self._lock:
+            return {
+                'papers': self._live_count,
+                'terms': len(self._postings),
+                'years': len(self._year_counts),
+                'categories': len(self._category_counts),
+                'loaded': self.loaded
+            }
+
+
+# 导出单例
+_local_index = None
+
+
+def get_local_index() -> LocalPaperIndex:
+    """获取本地论文索引单例"""
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalPaperIndex()
+    return _local_index
@@ -7,8 +7,27 @@ API文档: https://docs.openalex.org/
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime
-import re
-import time
+
+from models.paper import Paper, extract_year, strip_markup
+from services.http_transport import get_http_transport
+from services.projection import OPENALEX_SELECT, project
+from services.single_flight import coalesce
+
+
+def rebuild_abstract(inverted_index: Optional[Dict[str, List[int]]]) -> str:
+    """
+    由 abstract_inverted_index（词 -> 出现位置列表）还原摘要文本
+
+    Args:
+        inverted_index: OpenAlex的倒排索引摘要
+
+    Returns:
+        摘要文本，没有摘要时返回空字符串
+    """
+    if not inverted_index:
+        return ''
+    words = sorted((position, word) for word, positions in inverted_index.items() for position in positions)
+    return ' '.join(word for _, word in words)
 
 
 class OpenAlexClient:
@@ -21,42 +40,32 @@ class OpenAlexClient:
     # 可以在环境变量中设置 OPENALEX_EMAIL
     EMAIL = None  # 从环境变量读取
 
+    # 批量查询时每次请求的最大ID数（OpenAlex的OR过滤最多支持100个值）
+    BATCH_SIZE = 50
+
     def __init__(self, email: Optional[str] = None):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = get_http_transport()
+        self.headers = {
             'User-Agent': 'ScholarAI/1.0 (https://scholarai.example.com)',
             'Accept': 'application/json'
-        })
+        }
 
         # 设置邮箱（推荐，以获得更好的服务）
         self.email = email or self.EMAIL
         if self.email:
             # OpenAlex推荐在User-Agent中包含邮箱
-            self.session.headers.update({
-                'User-Agent': f'ScholarAI/1.0 (mailto:{self.email})'
-            })
-
-        # 请求速率限制（礼貌使用）
-        self.last_request_time = 0
-        self.min_request_interval = 0.01  # 每秒最多100次请求
-
-    def _rate_limit(self):
-        """简单的速率限制"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
-        self.last_request_time = time.time()
-
-    def _parse_paper(self, work: Dict) -> Dict:
+            self.headers['User-Agent'] = f'ScholarAI/1.0 (mailto:{self.email})'
+
+    def _parse_paper(self, work: Dict, profile: str = 'full') -> Paper:
         """
         解析OpenAlex论文数据
 
         Args:
             work: OpenAlex返回的论文数据
+            profile: 字段视图（list/detail/full）
 
         Returns:
-            标准化的论文数据字典
+            标准化的论文记录
         """
         # 提取作者信息
         authors = []
@@ -66,15 +75,8 @@ class OpenAlexClient:
             if author.get('display_name'):
                 authors.append(author['display_name'])
 
-        # 提取年份
-        published_year = work.get('publication_year')
-        if not published_year:
-            # 从publication_date中提取年份
-            pub_date = work.get('publication_date')
-            if pub_date:
-                date_match = re.search(r'(\d{4})', pub_date)
-                if date_match:
-                    published_year = int(date_match.group(1))
+        # 提取年份（缺失时从publication_date中提取）
+        published_year = work.get('publication_year') or extract_year(work.get('publication_date'))
 
         # 提取发表时间
         published = work.get('publication_date')
@@ -104,13 +106,11 @@ class OpenAlexClient:
         source = primary_location.get('source') or {} if isinstance(primary_location, dict) else {}
         venue = source.get('display_name', '') if isinstance(source, dict) else ''
 
-        # 提取摘要
-        summary = work.get('abstract', '') or ''
+        # 提取摘要（OpenAlex只提供倒排索引形式的摘要）
+        summary = work.get('abstract', '') or rebuild_abstract(work.get('abstract_inverted_index'))
         if summary and summary.startswith('<'):
             # 移除JATS XML标签
-            summary = re.sub(r'<jats:[^>]+>', '', summary)
-            summary = re.sub(r'</jats:[^>]+>', '', summary)
-            summary = re.sub(r'<[^>]+>', '', summary)
+            summary = strip_markup(summary)
             # 解码HTML实体
             summary = summary.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
 
@@ -124,43 +124,51 @@ class OpenAlexClient:
         cited_by_percentile = work.get('cited_by_percentile_year') or {}
         influential_citation_count = cited_by_percentile.get('min', 0) if isinstance(cited_by_percentile, dict) else 0
 
-        return {
-            'paper_id': work.get('id', '').replace('https://openalex.org/', ''),
-            'title': work.get('title', ''),
-            'authors': authors,
-            'summary': summary,
-            'published': published,
-            'published_year': published_year,
-            'updated': updated,
-            'categories': categories,
-            'primary_category': primary_category,
-            'pdf_url': pdf_url,
-            'arxiv_url': work.get('id', ''),
-            'comment': '',
-            'journal_ref': venue,
+        paper = Paper(
+            paper_id=work.get('id', '').replace('https://openalex.org/', ''),
+            title=work.get('title', ''),
+            authors=authors,
+            summary=summary,
+            published=published,
+            published_year=published_year,
+            updated=updated,
+            categories=categories,
+            primary_category=primary_category,
+            pdf_url=pdf_url,
+            arxiv_url=work.get('id', ''),
+            comment='',
+            journal_ref=venue,
             # 前端兼容字段
-            'citations': citation_count,  # 前端使用citations字段
-            'year': published_year,  # 前端使用year字段
+            citations=citation_count,  # 前端使用citations字段
+            year=published_year,  # 前端使用year字段
             # OpenAlex特有字段
-            'citation_count': citation_count,
-            'influential_citation_count': influential_citation_count,
-            'venue': venue,
-            'publication_type': work.get('type', ''),
-            'publication_date': published,
-            'is_open_access': is_open_access,
-            'doi': work.get('doi', ''),
-            'pmid': work.get('pmid', ''),
-            'concepts': concepts,
-            'topics': [work.get('primary_topic', {})] if work.get('primary_topic') else [],
-        }
-
+            citation_count=citation_count,
+            influential_citation_count=influential_citation_count,
+            venue=venue,
+            publication_type=work.get('type', ''),
+            publication_date=published,
+            is_open_access=is_open_access,
+            doi=work.get('doi', ''),
+            pmid=work.get('pmid', ''),
+            concepts=concepts,
+            topics=[work.get('primary_topic', {})] if work.get('primary_topic') else [],
+        )
+        return project(paper, profile)
+
+    def _select(self, profile: str) -> Optional[str]:
+        """获取字段视图对应的select参数（full视图不限制字段）"""
+        fields = OPENALEX_SELECT.get(profile)
+        return ','.join(fields) if fields else None
+
+    @coalesce
     async def search_papers(
         self,
         query: str,
         filter_fields: Optional[Dict] = None,
         page: int = 1,
         page_size: int = 10,
-        sort: Optional[str] = None
+        sort: Optional[str] = None,
+        profile: str = 'full'
     ) -> Dict:
         """
         搜索OpenAlex论文
@@ -176,12 +184,11 @@ class OpenAlexClient:
             page: 页码（从1开始）
             page_size: 每页数量（默认200，OpenAlex支持per-page=200）
             sort: 排序方式，如 'cited_by_count:desc', 'publication_date:desc'
+            profile: 字段视图（list/detail/full），决定select参数和返回的字段
 
         Returns:
             搜索结果字典
         """
-        self._rate_limit()
-
         # 构建查询参数
         params = {
             'search': query,
@@ -193,6 +200,11 @@ class OpenAlexClient:
         if sort:
             params['sort'] = sort
 
+        # 只请求视图需要的字段
+        select = self._select(profile)
+        if select:
+            params['select'] = select
+
         # 添加过滤条件
         if filter_fields:
             filters = []
@@ -228,8 +240,9 @@ class OpenAlexClient:
             if query_params:
                 url += '?' + '&'.join(query_params)
             
-            response = self.session.get(
+            response = await self.http.get(
                 url,
+                headers=self.headers,
                 timeout=30
             )
             response.raise_for_status()
@@ -237,7 +250,7 @@ class OpenAlexClient:
             data = response.json()
 
             # 提取论文列表
-            papers = [self._parse_paper(work) for work in data.get('results', [])]
+            papers = [self._parse_paper(work, profile) for work in data.get('results', [])]
 
             # 提取元数据
             meta = data.get('meta', {})
@@ -272,25 +285,28 @@ class OpenAlexClient:
                 'error': f'解析OpenAlex响应失败: {str(e)}'
             }
 
-    async def get_paper_details(self, paper_id: str) -> Dict:
+    @coalesce
+    async def get_paper_details(self, paper_id: str, profile: str = 'full') -> Dict:
         """
         获取论文详情
 
         Args:
             paper_id: OpenAlex论文ID（可以是完整URL或ID部分）
+            profile: 字段视图（list/detail/full）
 
         Returns:
             论文详情字典
         """
-        self._rate_limit()
-
         # 如果是完整URL，提取ID部分
         if paper_id.startswith('http'):
             paper_id = paper_id.replace('https://openalex.org/', '')
 
         try:
-            response = self.session.get(
+            select = self._select(profile)
+            response = await self.http.get(
                 f"{self.API_BASE}/works/{paper_id}",
+                headers=self.headers,
+                params={'select': select} if select else None,
                 timeout=30
             )
             response.raise_for_status()
@@ -299,7 +315,7 @@ class OpenAlexClient:
 
             return {
                 'success': True,
-                'data': self._parse_paper(work)
+                'data': self._parse_paper(work, profile)
             }
 
         except requests.exceptions.RequestException as e:
@@ -313,6 +329,66 @@ class OpenAlexClient:
                 'error': f'解析论文详情失败: {str(e)}'
             }
 
+    @coalesce
+    async def get_papers_batch(self, paper_ids: List[str]) -> Dict:
+        """
+        批量获取论文详情（使用 filter=ids.openalex:W1|W2|... ，每次请求最多 BATCH_SIZE 篇）
+
+        Args:
+            paper_ids: OpenAlex论文ID列表（可以是完整URL或ID部分）
+
+        Returns:
+            {
+                'success': True,
+                'data': {
+                    'papers': {论文ID: 论文数据},
+                    'errors': {论文ID: 错误信息}
+                }
+            }
+        """
+        papers = {}
+        errors = {}
+
+        for i in range(0, len(paper_ids), self.BATCH_SIZE):
+            chunk = paper_ids[i:i + self.BATCH_SIZE]
+            requested = {pid.replace('https://openalex.org/', ''): pid for pid in chunk}
+
+            try:
+                response = await self.http.get(
+                    f"{self.API_BASE}/works",
+                    headers=self.headers,
+                    params={
+                        'filter': f"ids.openalex:{'|'.join(requested)}",
+                        'per-page': len(chunk)
+                    },
+                    timeout=30
+                )
+                response.raise_for_status()
+
+                data = response.json()
+
+                for work in data.get('results', []):
+                    paper = self._parse_paper(work)
+                    original_id = requested.get(paper['paper_id'])
+                    if original_id:
+                        papers[original_id] = paper
+
+                for pid in chunk:
+                    if pid not in papers:
+                        errors[pid] = '论文未找到'
+
+            except Exception as e:
+                for pid in chunk:
+                    errors[pid] = f'获取论文详情失败: {str(e)}'
+
+        return {
+            'success': True,
+            'data': {
+                'papers': papers,
+                'errors': errors
+            }
+        }
+
     async def get_paper_pdf_url(self, paper_id: str) -> Dict:
         """
         获取论文PDF下载链接
@@ -339,25 +415,31 @@ class OpenAlexClient:
         else:
             return result
 
-    async def get_paper_by_arxiv_id(self, arxiv_id: str) -> Dict:
+    @coalesce
+    async def get_paper_by_arxiv_id(self, arxiv_id: str, profile: str = 'full') -> Dict:
         """
         通过arXiv ID获取论文详情（用于arXiv API回退）
 
         Args:
             arxiv_id: arXiv论文ID (如 2301.00001)
+            profile: 字段视图（list/detail/full）
 
         Returns:
             论文详情字典
         """
-        self._rate_limit()
+        params = {
+            'filter': f'has_arxiv_id:{arxiv_id}',
+            'per-page': 1
+        }
+        select = self._select(profile)
+        if select:
+            params['select'] = select
 
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.API_BASE}/works",
-                params={
-                    'filter': f'has_arxiv_id:{arxiv_id}',
-                    'per-page': 1
-                },
+                headers=self.headers,
+                params=params,
                 timeout=30
             )
             response.raise_for_status()
@@ -368,7 +450,7 @@ class OpenAlexClient:
                 work = data['results'][0]
                 return {
                     'success': True,
-                    'data': self._parse_paper(work)
+                    'data': self._parse_paper(work, profile)
                 }
             else:
                 return {
@@ -397,11 +479,10 @@ class OpenAlexClient:
         Returns:
             随机论文列表
         """
-        self._rate_limit()
-
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.API_BASE}/works",
+                headers=self.headers,
                 params={
                     'per-page': min(count, 50),
                     'sort': 'cited_by_count:desc'  # 按引用数排序
@@ -443,11 +524,10 @@ class OpenAlexClient:
         Returns:
             概念列表
         """
-        self._rate_limit()
-
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.API_BASE}/concepts",
+                headers=self.headers,
                 params={
                     'per-page': min(limit, 200),
                     'sort': 'works_count:desc'  # 按论文数量排序
@@ -488,6 +568,62 @@ class OpenAlexClient:
                 'error': f'解析概念列表失败: {str(e)}'
             }
 
+    async def get_topics(self, limit: int = 100) -> Dict:
+        """
+        获取主题列表（OpenAlex Topics，按论文数量排序）
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            主题列表（含所属子领域、领域、学科）
+        """
+        try:
+            response = await self.http.get(
+                f"{self.API_BASE}/topics",
+                headers=self.headers,
+                params={
+                    'per-page': min(limit, 200),
+                    'sort': 'works_count:desc',
+                    'select': 'id,display_name,subfield,field,domain,works_count'
+                },
+                timeout=30
+            )
+            response.raise_for_status()
+
+            data = response.json()
+
+            topics = [
+                {
+                    'id': t.get('id', '').replace('https://openalex.org/', ''),
+                    'name': t.get('display_name', ''),
+                    'subfield': (t.get('subfield') or {}).get('display_name', ''),
+                    'field': (t.get('field') or {}).get('display_name', ''),
+                    'domain': (t.get('domain') or {}).get('display_name', ''),
+                    'works_count': t.get('works_count', 0),
+                }
+                for t in data.get('results', [])
+            ]
+
+            return {
+                'success': True,
+                'data': {
+                    'topics': topics,
+                    'total': data.get('meta', {}).get('count', 0)
+                }
+            }
+
+        except requests.exceptions.RequestException as e:
+            return {
+                'success': False,
+                'error': f'获取主题列表失败: {str(e)}'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'解析主题列表失败: {str(e)}'
+            }
+
 
 # 导出单例
 _openalex_client = None
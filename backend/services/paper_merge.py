@@ -0,0 +1,180 @@
+"""
+跨数据源论文去重合并
+将arXiv、OpenAlex、Semantic Scholar返回的同一篇论文聚类为一条记录
+
+聚类依据（任一相同即视为同一篇论文）:
+- DOI
+- arXiv ID（包括Semantic Scholar external_ids中的ArXiv）
+- 规范化标题 + 第一作者姓氏 的指纹
+
+每个标识符维护一个哈希索引，配合并查集合并，整体为线性时间
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from models.paper import Paper
+from services.paper_store import extract_identifiers
+
+# 标题规范化：去除标点和多余空白
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# 计数类字段：合并时取最大值
+MAX_FIELDS = ('citation_count', 'citations', 'influential_citation_count')
+
+# 列表字段：合并时取并集（保持顺序）
+UNION_FIELDS = ('categories',)
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """
+    规范化标题（去除重音、转小写、只保留字母数字）
+
+    Args:
+        title: 原始标题
+
+    Returns:
+        规范化后的标题，如 "attention is all you need"
+    """
+    if not title:
+        return ''
+    title = unicodedata.normalize('NFKD', title)
+    title = ''.join(c for c in title if not unicodedata.combining(c)).lower()
+    return NON_ALNUM_PATTERN.sub(' ', title).strip()
+
+
+def first_author_surname(authors) -> str:
+    """
+    获取第一作者的规范化姓氏
+
+    Args:
+        authors: 作者列表（字符串或包含name字段的字典）
+
+    Returns:
+        规范化的姓氏，没有作者时返回空字符串
+    """
+    if not authors:
+        return ''
+    author = authors[0]
+    if isinstance(author, dict):
+        author = author.get('name') or author.get('display_name') or ''
+    parts = normalize_title(author).split()
+    return parts[-1] if parts else ''
+
+
+def title_fingerprint(paper: Dict) -> Optional[str]:
+    """
+    生成 标题 + 第一作者姓氏 的指纹
+
+    Args:
+        paper: _parse_paper 的输出
+
+    Returns:
+        指纹字符串，标题为空时返回None
+    """
+    title = normalize_title(paper.get('title'))
+    if not title:
+        return None
+    return f"{title}|{first_author_surname(paper.get('authors'))}"
+
+
+def paper_keys(paper: Dict) -> List[str]:
+    """
+    获取论文的所有聚类键
+
+    Returns:
+        ['doi:...', 'arxiv:...', 'fp:...']（只包含存在的键）
+    """
+    ids = extract_identifiers(paper, paper.get('source', ''))
+    keys = [f"{name}:{ids[name]}" for name in ('doi', 'arxiv') if ids.get(name)]
+    fingerprint = title_fingerprint(paper)
+    if fingerprint:
+        keys.append(f"fp:{fingerprint}")
+    return keys
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == '' or value == [] or value == {}
+
+
+def merge_records(records: List[Dict]) -> Dict:
+    """
+    合并同一篇论文的多条记录
+
+    以第一条（优先级最高）记录为基础，空字段由后续记录补全，
+    计数字段取最大值，分类取并集
+
+    Args:
+        records: 同一篇论文的记录（按优先级排序）
+
+    Returns:
+        合并后的记录，附加 sources（来源列表）和 source_ids（各来源的论文ID）
+    """
+    merged = Paper.from_mapping(records[0])
+    sources = []
+    source_ids = {}
+
+    for record in records:
+        source = record.get('source')
+        if source and source not in sources:
+            sources.append(source)
+            source_ids[source] = record.get('paper_id')
+        if record is records[0]:
+            continue
+
+        for name, value in record.items():
+            if name in MAX_FIELDS:
+                merged[name] = max(merged.get(name) or 0, value or 0)
+            elif name in UNION_FIELDS and isinstance(value, list):
+                existing = merged.get(name) or []
+                merged[name] = existing + [v for v in value if v not in existing]
+            elif _is_empty(merged.get(name)) and not _is_empty(value):
+                merged[name] = value
+
+    merged['sources'] = sources
+    merged['source_ids'] = source_ids
+    return merged
+
+
+def merge_papers(papers: List[Dict]) -> List[Dict]:
+    """
+    对多来源的论文列表去重合并
+
+    Args:
+        papers: 论文列表（按排名排序，每条应带有source字段）
+
+    Returns:
+        去重后的论文列表，每篇论文出现在其最高排名记录的位置
+    """
+    parent = list(range(len(papers)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # 保留排名更靠前的记录为根
+            if root_j < root_i:
+                root_i, root_j = root_j, root_i
+            parent[root_j] = root_i
+
+    # 每个聚类键一个哈希索引：键 -> 第一次出现该键的记录下标
+    index: Dict[str, int] = {}
+    for i, paper in enumerate(papers):
+        for key in paper_keys(paper):
+            if key in index:
+                union(i, index[key])
+            else:
+                index[key] = i
+
+    # 根节点是聚类中排名最靠前的记录，因此字典插入顺序即排名顺序
+    clusters: Dict[int, List[Dict]] = {}
+    for i, paper in enumerate(papers):
+        clusters.setdefault(find(i), []).append(paper)
+
+    return [merge_records(records) for records in clusters.values()]
@@ -0,0 +1,336 @@
+"""
+论文元数据本地存储
+将各数据源 _parse_paper 产生的标准化论文数据持久化到MongoDB的papers集合，
+论文详情优先从本地读取，过期数据在后台刷新
+
+集合文档结构:
+{
+    "source": "arxiv",               # 数据源
+    "paper_id": "2301.00001",        # 数据源内的论文ID
+    "ids": {                         # 跨数据源标识符（用于按任意ID查找）
+        "arxiv": "2301.00001",
+        "doi": "10.1000/xyz",
+        "openalex": "W123",
+        "s2": "abc..."
+    },
+    "data": {...},                   # _parse_paper 的输出
+    "fetched_at": datetime           # 最近一次从上游获取的时间
+}
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# arXiv新式ID（YYMM.NNNNN）和旧式ID（archive/YYMMNNN），可带版本号
+ARXIV_ID_PATTERN = re.compile(r'^(\d{4}\.\d{4,5}|[a-z\-]+(\.[A-Z]{2})?/\d{7})(v\d+)?$')
+
+# DOI的URL前缀
+DOI_PREFIX_PATTERN = re.compile(r'^(https?://(dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """
+    规范化DOI（去除URL前缀并转小写）
+
+    Args:
+        doi: 原始DOI，如 https://doi.org/10.1000/XYZ
+
+    Returns:
+        规范化的DOI，如 10.1000/xyz；无效时返回None
+    """
+    if not doi or not isinstance(doi, str):
+        return None
+    doi = DOI_PREFIX_PATTERN.sub('', doi.strip()).lower()
+    return doi if doi.startswith('10.') else None
+
+
+def normalize_arxiv_id(arxiv_id: Optional[str]) -> Optional[str]:
+    """
+    规范化arXiv ID（去除版本号）
+
+    Args:
+        arxiv_id: 原始arXiv ID，如 2301.00001v2
+
+    Returns:
+        不带版本号的ID，如 2301.00001；无效时返回None
+    """
+    if not arxiv_id or not isinstance(arxiv_id, str):
+        return None
+    arxiv_id = arxiv_id.strip()
+    match = ARXIV_ID_PATTERN.match(arxiv_id)
+    if not match:
+        return None
+    return match.group(1)
+
+
+def extract_identifiers(paper: Dict, source: str) -> Dict[str, str]:
+    """
+    从标准化论文数据中提取跨数据源标识符
+
+    Args:
+        paper: _parse_paper 的输出
+        source: 数据源名称
+
+    Returns:
+        {'arxiv': ..., 'doi': ..., 'openalex': ..., 's2': ...}（只包含存在的标识符）
+    """
+    ids = {}
+    paper_id = paper.get('paper_id') or ''
+
+    if source == 'arxiv':
+        ids['arxiv'] = normalize_arxiv_id(paper_id)
+    elif source == 'openalex':
+        ids['openalex'] = paper_id or None
+    elif source == 'semantic_scholar':
+        ids['s2'] = paper_id or None
+
+    ids['doi'] = normalize_doi(paper.get('doi'))
+
+    # Semantic Scholar的外部ID中包含DOI和arXiv ID
+    external_ids = paper.get('external_ids') or {}
+    if isinstance(external_ids, dict):
+        ids['doi'] = ids['doi'] or normalize_doi(external_ids.get('DOI'))
+        ids['arxiv'] = ids.get('arxiv') or normalize_arxiv_id(external_ids.get('ArXiv'))
+
+    return {key: value for key, value in ids.items() if value}
+
+
+class PaperStore:
+    """论文元数据存储（papers集合）"""
+
+    COLLECTION_NAME = 'papers'
+
+    # 数据新鲜度：超过该时间的论文会在后台刷新
+    DEFAULT_MAX_AGE = timedelta(hours=float(os.getenv('PAPER_STORE_MAX_AGE_HOURS', '168')))
+
+    def __init__(self, collection=None, max_age: Optional[timedelta] = None):
+        """
+        Args:
+            collection: MongoDB集合（可选，默认延迟获取papers集合）
+            max_age: 数据新鲜度阈值
+        """
+        self._collection = collection
+        self.max_age = max_age or self.DEFAULT_MAX_AGE
+
+    @property
+    def collection(self):
+        """获取论文集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            collection = get_collection(self.COLLECTION_NAME)
+            # 同一数据源内论文ID唯一
+            collection.create_index([('source', 1), ('paper_id', 1)], unique=True)
+            # 跨数据源标识符索引（用于按任意ID查找）
+            for key in ('arxiv', 'doi', 'openalex', 's2'):
+                collection.create_index(f'ids.{key}', sparse=True)
+            # 新鲜度索引（按获取时间查询）
+            collection.create_index('fetched_at')
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def build_document(paper: Dict, source: str, fetched_at: Optional[datetime] = None) -> Dict:
+        """
+        构建papers集合文档
+
+        Args:
+            paper: _parse_paper 的输出
+            source: 数据源名称
+            fetched_at: 获取时间（默认当前时间）
+
+        Returns:
+            集合文档
+        """
+        data = dict(paper)
+        data['source'] = source
+        return {
+            'source': source,
+            'paper_id': paper.get('paper_id', ''),
+            'ids': extract_identifiers(paper, source),
+            'data': data,
+            'fetched_at': fetched_at or datetime.utcnow()
+        }
+
+    def upsert(self, paper: Dict, source: str) -> None:
+        """
+        写入或更新论文
+
+        Args:
+            paper: _parse_paper 的输出
+            source: 数据源名称
+        """
+        if not paper.get('paper_id'):
+            return
+        doc = self.build_document(paper, source)
+        self.collection.replace_one(
+            {'source': source, 'paper_id': doc['paper_id']},
+            doc,
+            upsert=True
+        )
+
+    def upsert_many(self, items: Iterable[Tuple[Dict, str]]) -> int:
+        """
+        批量写入或更新论文（无序批量写入，单条失败不影响其他条目）
+
+        Args:
+            items: [(论文数据, 数据源), ...]
+
+        Returns:
+            提交的写入操作数
+        """
+        operations = []
+        for paper, source in items:
+            if not paper.get('paper_id'):
+                continue
+            doc = self.build_document(paper, source)
+            operations.append(ReplaceOne(
+                {'source': source, 'paper_id': doc['paper_id']},
+                doc,
+                upsert=True
+            ))
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def insert_missing(self, items: Iterable[Tuple[Dict, str]]) -> int:
+        """
+        批量写入尚未存储的论文（已存在的论文保持不变，避免用搜索列表数据覆盖详情数据）
+
+        Args:
+            items: [(论文数据, 数据源), ...]
+
+        Returns:
+            提交的写入操作数
+        """
+        operations = []
+        for paper, source in items:
+            if not paper.get('paper_id'):
+                continue
+            doc = self.build_document(paper, source)
+            operations.append(UpdateOne(
+                {'source': source, 'paper_id': doc['paper_id']},
+                {'$setOnInsert': doc},
+                upsert=True
+            ))
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def iter_documents(self, batch_size: int = 1000, limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        遍历集合中的论文文档
+
+        Args:
+            batch_size: 每批从数据库读取的文档数
+            limit: 最多返回的文档数（按获取时间从新到旧，走fetched_at索引；None表示全部）
+
+        Yields:
+            集合文档（只包含source、paper_id、data字段）
+        """
+        cursor = self.collection.find({}, {'source': 1, 'paper_id': 1, 'data': 1}, batch_size=batch_size)
+        if limit:
+            cursor = cursor.sort('fetched_at', -1).limit(limit)
+        for doc in cursor:
+            yield doc
+
+    def find(self, paper_id: str, source: Optional[str] = None) -> Optional[Dict]:
+        """
+        按任意标识符查找论文
+
+        Args:
+            paper_id: 论文ID（arXiv ID、DOI、OpenAlex ID或Semantic Scholar ID）
+            source: 限定数据源（可选）
+
+        Returns:
+            集合文档，未找到时返回None
+        """
+        return self.find_many([paper_id], source).get(paper_id)
+
+    def find_many(self, paper_ids: List[str], source: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        按任意标识符批量查找论文（单次查询）
+
+        Args:
+            paper_ids: 论文ID列表
+            source: 限定数据源（可选）
+
+        Returns:
+            {请求的论文ID: 集合文档}（未找到的ID不包含在内）
+        """
+        clauses_by_id = {pid: self._lookup_clauses(pid) for pid in paper_ids}
+        if not clauses_by_id:
+            return {}
+
+        query = {'$or': [c for clauses in clauses_by_id.values() for c in clauses]}
+        if source:
+            query['source'] = source
+        docs = list(self.collection.find(query))
+
+        found = {}
+        for pid, clauses in clauses_by_id.items():
+            matches = [doc for doc in docs if self._matches(doc, clauses)]
+            if not matches:
+                continue
+            # 数据源内ID完全匹配的文档优先
+            exact = [doc for doc in matches if doc.get('paper_id') == pid]
+            found[pid] = (exact or matches)[0]
+        return found
+
+    @staticmethod
+    def _matches(doc: Dict, clauses: List[Dict]) -> bool:
+        """判断文档是否满足任一查找条件"""
+        for clause in clauses:
+            for field, expected in clause.items():
+                value = doc
+                for part in field.split('.'):
+                    value = value.get(part) if isinstance(value, dict) else None
+                if value == expected:
+                    return True
+        return False
+
+    def is_stale(self, doc: Dict) -> bool:
+        """判断文档是否超过新鲜度阈值"""
+        fetched_at = doc.get('fetched_at')
+        if not isinstance(fetched_at, datetime):
+            return True
+        return datetime.utcnow() - fetched_at > self.max_age
+
+    @staticmethod
+    def _lookup_clauses(paper_id: str) -> List[Dict]:
+        """
+        构建按任意标识符查找的查询条件
+
+        只使用 ids.* 字段（每个字段都有索引，$or 的每个分支都能走索引）；
+        各数据源的论文ID都记录在 ids 中（见 extract_identifiers），不需要单独匹配 paper_id
+        """
+        paper_id = paper_id.strip()
+        clauses = [
+            {'ids.openalex': paper_id},
+            {'ids.s2': paper_id}
+        ]
+        arxiv_id = normalize_arxiv_id(paper_id)
+        if arxiv_id:
+            clauses.append({'ids.arxiv': arxiv_id})
+        doi = normalize_doi(paper_id)
+        if doi:
+            clauses.append({'ids.doi': doi})
+        return clauses
+
+
+# 导出单例
+_paper_store = None
+
+
+def get_paper_store() -> PaperStore:
+    """获取论文存储单例"""
+    global _paper_store
+    if _paper_store is None:
+        _paper_store = PaperStore()
+    return _paper_store
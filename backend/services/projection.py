@@ -0,0 +1,139 @@
+"""
+论文字段投影
+按视图（list / detail / full）裁剪论文字段，同时决定向上游请求哪些字段，
+减少上游响应体积、解析时间和API响应体积
+
+- list: 列表页（搜索结果）需要的字段
+- detail: 详情页字段（不含 concepts/topics 等原始嵌套对象）
+- full: 全部字段（默认，与未投影时一致）
+
+OpenAlex 使用 select= 参数，Semantic Scholar 使用 fields= 参数；arXiv 不支持投影，只在解析后裁剪
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.paper import Paper
+
+PROFILES = ('list', 'detail', 'full')
+
+DEFAULT_PROFILE = 'full'
+
+# 列表视图字段
+LIST_FIELDS = (
+    'paper_id', 'title', 'authors', 'summary', 'published', 'published_year', 'year',
+    'primary_category', 'categories', 'venue', 'journal_ref', 'citation_count', 'citations',
+    'pdf_url', 'doi', 'is_open_access'
+)
+
+# 详情视图中去掉的原始嵌套对象（categories/primary_category 已包含其名称）
+DETAIL_EXCLUDED = ('concepts', 'topics', 's2_fields_of_study')
+
+# 来源、合并和排序信息，在所有视图中保留
+META_FIELDS = ('source', 'sources', 'source_ids', 'local_score', 'score', 'citation_rank')
+
+# OpenAlex select= 字段（None表示不限制）
+OPENALEX_SELECT = {
+    'list': [
+        'id', 'doi', 'title', 'publication_year', 'publication_date', 'authorships',
+        'primary_location', 'best_location', 'open_access', 'cited_by_count', 'primary_topic',
+        'concepts'
+    ],
+    'detail': [
+        'id', 'doi', 'title', 'publication_year', 'publication_date', 'updated_date', 'authorships',
+        'primary_location', 'best_location', 'open_access', 'cited_by_count', 'primary_topic',
+        'concepts', 'cited_by_percentile_year', 'type'
+    ],
+    'full': None
+}
+
+# Semantic Scholar fields= 字段（full视图使用客户端各接口原有的字段列表）
+S2_FIELDS = {
+    'list': [
+        'paperId', 'title', 'abstract', 'authors', 'year', 'publicationDate', 'venue',
+        'journal', 'citationCount', 'openAccessPdf', 'isOpenAccess', 'externalIds'
+    ],
+    'detail': [
+        'paperId', 'externalIds', 'url', 'title', 'abstract', 'authors', 'venue', 'year',
+        'journal', 'citationCount', 'influentialCitationCount', 'isOpenAccess', 'openAccessPdf',
+        'publicationTypes', 'publicationDate', 'updateDate'
+    ]
+}
+
+
+def resolve_fields(value: Optional[str]) -> Tuple[str, Optional[Tuple[str, ...]]]:
+    """
+    解析 fields= 请求参数
+
+    Args:
+        value: 视图名（list/detail/full）或逗号分隔的字段名，为空时使用默认视图
+
+    Returns:
+        (向上游请求使用的视图, 自定义字段列表或None)
+
+    Raises:
+        ValueError: 既不是视图名也不包含任何字段名
+    """
+    if not value:
+        return DEFAULT_PROFILE, None
+    value = value.strip()
+    if value in PROFILES:
+        return value, None
+    fields = tuple(f.strip() for f in value.split(',') if f.strip())
+    if not fields:
+        raise ValueError(f'无效的fields参数: {value}')
+    # 自定义字段都在列表视图中时只向上游请求列表视图字段
+    profile = 'list' if set(fields) <= set(LIST_FIELDS) | set(META_FIELDS) else 'full'
+    return profile, fields
+
+
+def project(paper: Dict, profile: str = DEFAULT_PROFILE, fields: Optional[Iterable[str]] = None) -> Dict:
+    """
+    裁剪单篇论文的字段
+
+    Args:
+        paper: 论文数据
+        profile: 视图名
+        fields: 自定义字段列表（优先于视图）
+
+    Returns:
+        裁剪后的论文数据，类型与输入相同（full视图且没有自定义字段时返回原对象）
+    """
+    if fields is not None:
+        keep = set(fields) | set(META_FIELDS)
+        items = {name: value for name, value in paper.items() if name in keep}
+    elif profile == 'list':
+        keep = set(LIST_FIELDS) | set(META_FIELDS)
+        items = {name: value for name, value in paper.items() if name in keep}
+    elif profile == 'detail':
+        items = {name: value for name, value in paper.items() if name not in DETAIL_EXCLUDED}
+    else:
+        return paper
+    return Paper(items) if isinstance(paper, Paper) else items
+
+
+def project_papers(papers: List[Dict], profile: str = DEFAULT_PROFILE, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """裁剪论文列表的字段"""
+    if profile == 'full' and fields is None:
+        return papers
+    return [project(paper, profile, fields) for paper in papers]
+
+
+def project_result(result: Dict, profile: str = DEFAULT_PROFILE, fields: Optional[Iterable[str]] = None) -> Dict:
+    """
+    裁剪搜索或详情结果中的论文字段
+
+    Args:
+        result: {'success': True, 'data': {'papers': [...]}} 或 {'success': True, 'data': {论文}}
+
+    Returns:
+        原结果字典（原地修改）
+    """
+    data = result.get('data')
+    if not result.get('success') or not isinstance(data, Mapping):
+        return result
+    if isinstance(data.get('papers'), list):
+        data['papers'] = project_papers(data['papers'], profile, fields)
+    elif 'paper_id' in data:
+        result['data'] = project(data, profile, fields)
+    return result
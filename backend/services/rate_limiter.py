@@ -0,0 +1,420 @@
+"""
+上游API速率限制
+按主机维护令牌桶，在发送HTTP请求前获取令牌，避免触发上游的429限流
+
+- 令牌桶线程安全，同一进程内所有工作线程/协程共享
+- 预约式获取：令牌不足时预约下一个令牌并返回需要等待的时间，
+  等待者按获取顺序排队，协程使用 asyncio.sleep 等待，不阻塞事件循环
+- 可选的MongoDB共享令牌桶（rate_limits集合），多进程（如gunicorn worker）共享同一配额
+- 收到429时可暂停主机的令牌发放（按Retry-After）
+- 交互请求可设置最长等待时间，排队超过该时间时立即失败，不无限占用请求线程
+- 令牌等待时间累计到当前请求链（见 track_wait），上游延迟统计中扣除本地排队时间
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """令牌等待时间超过调用方允许的最长等待时间"""
+
+
+class WaitTracker:
+    """一段请求链上获取令牌的累计等待时间和被拒绝次数"""
+
+    __slots__ = ('seconds', 'rejected')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.rejected = 0
+
+
+# 当前请求链的等待统计（子任务复制上下文后共享同一个对象）
+_tracker: ContextVar[Optional[WaitTracker]] = ContextVar('rate_limit_wait', default=None)
+
+
+@contextlib.contextmanager
+def track_wait() -> Iterator[WaitTracker]:
+    """
+    统计代码块内（包括其中创建的任务）获取令牌的等待时间和被拒绝次数
+
+    用法:
+        with track_wait() as waited:
+            await client.search_papers(...)
+        upstream_latency = elapsed - waited.seconds
+    """
+    tracker = WaitTracker()
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def parse_rate(value: str) -> Tuple[float, float]:
+    """
+    解析速率配置
+
+    Args:
+        value: 形如 "100/60"（每60秒100次）或 "100/60:5"（突发容量5）的字符串
+
+    Returns:
+        (每秒令牌数, 桶容量)
+
+    Raises:
+        ValueError: 格式无效
+    """
+    value, _, burst = value.partition(':')
+    count, _, period = value.partition('/')
+    rate = float(count) / float(period or 1)
+    if rate <= 0:
+        raise ValueError(f'速率必须为正数: {value}')
+    capacity = float(burst) if burst else max(1.0, float(round(rate)))
+    return rate, capacity
+
+
+def _parse_host_rates(value: str) -> Dict[str, Tuple[float, float]]:
+    """
+    解析按主机的速率配置
+
+    Args:
+        value: 形如 "api.semanticscholar.org=100/60,api.openalex.org=10/1:10" 的字符串
+
+    Returns:
+        {主机名: (每秒令牌数, 桶容量)}
+    """
+    rates = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item or '=' not in item:
+            continue
+        host, rate = item.split('=', 1)
+        try:
+            rates[host.strip()] = parse_rate(rate.strip())
+        except ValueError:
+            logger.warning(f"忽略无效的速率限制配置: {item}")
+    return rates
+
+
+class TokenBucket:
+    """进程内令牌桶（线程安全）"""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发请求数）
+            clock: 时钟函数（测试用）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """按经过的时间补充令牌（调用方持有锁）"""
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        预约一个令牌
+
+        令牌不足时令牌数变为负数（即排在前面的预约），后续预约需要等待更久
+
+        Returns:
+            需要等待的秒数（0表示可以立即发送）
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self) -> None:
+        """归还一个令牌（预约后未发送请求，如等待被取消）"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """暂停令牌发放（收到429时调用），之后的预约至少等待 seconds 秒"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class MongoTokenBucket:
+    """基于MongoDB的共享令牌桶（rate_limits集合，每个主机一个文档）"""
+
+    COLLECTION_NAME = 'rate_limits'
+
+    def __init__(self, key: str, rate: float, capacity: float, collection=None, clock=time.time):
+        """
+        Args:
+            key: 桶标识（主机名）
+            rate: 每秒补充的令牌数
+            capacity: 桶容量
+            collection: MongoDB集合（可选，默认延迟获取rate_limits集合）
+            clock: 时钟函数（多进程共享，使用墙上时间）
+        """
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._collection = collection
+
+    @property
+    def collection(self):
+        """获取令牌桶集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            self._collection = get_collection(self.COLLECTION_NAME)
+        return self._collection
+
+    def _update(self, delta: float, floor: Optional[float] = None) -> float:
+        """
+        原子地补充令牌并加上 delta（聚合管道更新，需要MongoDB 4.2+）
+
+        Returns:
+            更新后的令牌数
+        """
+        now = self.clock()
+        refilled = {'$min': [self.capacity, {'$add': [
+            {'$ifNull': ['$tokens', self.capacity]},
+            {'$multiply': [{'$subtract': [now, {'$ifNull': ['$updated_at', now]}]}, self.rate]}
+        ]}]}
+        tokens = {'$add': [refilled, delta]}
+        if floor is not None:
+            tokens = {'$min': [tokens, floor]}
+        doc = self.collection.find_one_and_update(
+            {'_id': self.key},
+            [{'$set': {'tokens': tokens, 'updated_at': now}}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['tokens']
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        return max(0.0, -self._update(-1) / self.rate)
+
+    def refund(self) -> None:
+        """归还一个令牌"""
+        self._update(1)
+
+    def pause(self, seconds: float) -> None:
+        """暂停令牌发放"""
+        self._update(0, floor=-seconds * self.rate)
+
+
+class RateLimiter:
+    """按主机的速率限制器"""
+
+    def __init__(
+        self,
+        host_rates: Optional[Dict[str, Tuple[float, float]]] = None,
+        shared: bool = False,
+        collection=None
+    ):
+        """
+        Args:
+            host_rates: {主机名: (每秒令牌数, 桶容量)}，未配置的主机不限速
+            shared: 是否使用MongoDB共享令牌桶（多进程共享配额）
+            collection: 共享令牌桶使用的MongoDB集合（可选）
+        """
+        self.shared = shared
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.shared_buckets: Dict[str, MongoTokenBucket] = {}
+        self._stats = {
+            'acquired': 0, 'delayed': 0, 'wait_seconds': 0.0, 'rejected': 0, 'paused': 0, 'shared_errors': 0
+        }
+        self._stats_lock = threading.Lock()
+        for host, (rate, capacity) in (host_rates or {}).items():
+            self.set_rate(host, rate, capacity, collection)
+
+    def set_rate(self, host: str, rate: float, capacity: float, collection=None) -> None:
+        """
+        设置主机的速率限制
+
+        Args:
+            host: 主机名（如 api.semanticscholar.org）
+            rate: 每秒请求数
+            capacity: 突发容量
+            collection: 共享令牌桶使用的MongoDB集合（可选）
+        """
+        self.buckets[host] = TokenBucket(rate, capacity)
+        if self.shared:
+            self.shared_buckets[host] = MongoTokenBucket(host, rate, capacity, collection=collection)
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+
+    def _refund(self, bucket) -> None:
+        """归还预约的令牌（失败只记录日志）"""
+        try:
+            bucket.refund()
+        except Exception as e:
+            self._count('shared_errors')
+            logger.warning(f"归还令牌失败: {e}")
+
+    def _reserve(self, host: str) -> Tuple[float, object]:
+        """预约令牌：优先使用共享令牌桶，共享桶不可用时退回进程内令牌桶"""
+        shared = self.shared_buckets.get(host)
+        if shared is not None:
+            try:
+                return shared.reserve(), shared
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"共享令牌桶不可用，使用进程内令牌桶: {e}")
+        bucket = self.buckets[host]
+        return bucket.reserve(), bucket
+
+    def _release(self, bucket) -> None:
+        """归还未使用的预约：共享令牌桶需要写数据库，放到线程中执行（不等待结果），不阻塞事件循环"""
+        if isinstance(bucket, MongoTokenBucket):
+            asyncio.get_running_loop().run_in_executor(None, self._refund, bucket)
+        else:
+            self._refund(bucket)
+
+    async def acquire(self, host: str, max_wait: Optional[float] = None) -> float:
+        """
+        获取主机的一个令牌（需要时异步等待）
+
+        Args:
+            host: 主机名
+            max_wait: 最长等待秒数，需要等待更久时归还预约并抛出 RateLimitExceeded（None表示不限）
+
+        Returns:
+            实际等待的秒数
+
+        Raises:
+            RateLimitExceeded: 需要等待的时间超过 max_wait
+        """
+        if host not in self.buckets:
+            return 0.0
+
+        if host in self.shared_buckets:
+            wait, bucket = await asyncio.to_thread(self._reserve, host)
+        else:
+            wait, bucket = self._reserve(host)
+
+        tracker = _tracker.get()
+        if max_wait is not None and wait > max_wait:
+            self._count('rejected')
+            if tracker is not None:
+                tracker.rejected += 1
+            self._release(bucket)
+            raise RateLimitExceeded(f'{host} 请求过于频繁，需要排队 {wait:.1f}s（最多等待 {max_wait}s）')
+
+        self._count('acquired')
+        if wait > 0:
+            self._count('delayed')
+            self._count('wait_seconds', wait)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # 被取消的等待者归还预约的令牌，不占用后面请求的配额
+                self._release(bucket)
+                raise
+            if tracker is not None:
+                tracker.seconds += wait
+        return wait
+
+    def pause(self, host: str, seconds: float) -> None:
+        """
+        暂停主机的令牌发放（收到429时调用）
+
+        Args:
+            host: 主机名
+            seconds: 暂停秒数（通常来自Retry-After）
+        """
+        if host not in self.buckets:
+            return
+        self._count('paused')
+        logger.warning(f"{host} 返回429，暂停请求 {seconds}s")
+        self.buckets[host].pause(seconds)
+        shared = self.shared_buckets.get(host)
+        if shared is not None:
+            try:
+                shared.pause(seconds)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"暂停共享令牌桶失败: {e}")
+
+    def stats(self) -> Dict:
+        """
+        获取速率限制统计信息
+
+        Returns:
+            获取/延迟次数、累计等待时间，以及各主机的配置和当前令牌数
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        stats['shared_enabled'] = self.shared
+        stats['hosts'] = {
+            host: {
+                'rate': bucket.rate,
+                'capacity': bucket.capacity,
+                'tokens': round(bucket.tokens, 2)
+            }
+            for host, bucket in self.buckets.items()
+        }
+        return stats
+
+
+# 默认速率限制
+DEFAULT_HOST_RATES = {
+    # OpenAlex: 每秒最多10次请求
+    'api.openalex.org': (10.0, 10.0),
+    # arXiv API: 每3秒最多1次请求，不允许突发
+    'export.arxiv.org': (1 / 3, 1.0),
+}
+
+# Semantic Scholar: 无API Key时每分钟100次，有API Key时每分钟5000次
+S2_HOST = 'api.semanticscholar.org'
+S2_RATE = (100 / 60, 2.0)
+S2_KEY_RATE = (5000 / 60, 10.0)
+
+# 导出单例
+_rate_limiter = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    获取速率限制器单例
+
+    环境变量:
+        RATE_LIMITS: 按主机覆盖的速率，如 "api.semanticscholar.org=100/60:2,export.arxiv.org=1/3"
+        RATE_LIMIT_SHARED: 是否使用MongoDB共享令牌桶（默认false）
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        host_rates = dict(DEFAULT_HOST_RATES)
+        host_rates[S2_HOST] = S2_KEY_RATE if os.getenv('S2_API_KEY') else S2_RATE
+        host_rates.update(_parse_host_rates(os.getenv('RATE_LIMITS', '')))
+        _rate_limiter = RateLimiter(
+            host_rates,
+            shared=os.getenv('RATE_LIMIT_SHARED', 'false').lower() == 'true'
+        )
+    return _rate_limiter
@@ -0,0 +1,278 @@
+"""
+论文搜索结果缓存
+对相同参数的外部搜索结果进行缓存，减少对arXiv/OpenAlex/Semantic Scholar的重复请求
+
+- 进程内LRU缓存（带TTL）
+- 可选的MongoDB共享缓存（search_cache集合，TTL索引自动过期），多进程/多实例共享
+- 命中/未命中计数
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from models.paper import json_default
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """线程安全的进程内LRU缓存，条目在TTL后过期"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        """
+        Args:
+            maxsize: 最大条目数
+            ttl: 条目存活时间（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期时返回None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存值，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """删除缓存值"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MongoCacheTier:
+    """基于MongoDB的共享缓存层（search_cache集合）"""
+
+    COLLECTION_NAME = 'search_cache'
+
+    def __init__(self, ttl: float = 600, collection=None):
+        """
+        Args:
+            ttl: 条目存活时间（秒）
+            collection: MongoDB集合（可选，默认延迟获取search_cache集合）
+        """
+        self.ttl = ttl
+        self._collection = collection
+
+    @property
+    def collection(self):
+        """获取缓存集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            collection = get_collection(self.COLLECTION_NAME)
+            # TTL索引：MongoDB会在expires_at时间点之后自动删除文档
+            collection.create_index('expires_at', expireAfterSeconds=0)
+            self._collection = collection
+        return self._collection
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值（TTL后台清理有延迟，因此这里再校验一次过期时间）"""
+        doc = self.collection.find_one({
+            '_id': key,
+            'expires_at': {'$gt': datetime.utcnow()}
+        })
+        if doc is None:
+            return None
+        return json.loads(doc['payload'])
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存值"""
+        now = datetime.utcnow()
+        self.collection.replace_one(
+            {'_id': key},
+            {
+                '_id': key,
+                # 以JSON字符串存储，避免论文字段中的特殊键名受BSON限制
+                'payload': json.dumps(value, ensure_ascii=False, default=json_default),
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=self.ttl)
+            },
+            upsert=True
+        )
+
+    def delete(self, key: str) -> None:
+        """删除缓存值"""
+        self.collection.delete_one({'_id': key})
+
+
+class SearchCache:
+    """两级搜索结果缓存：进程内LRU + 可选的MongoDB共享层"""
+
+    def __init__(self, memory: LRUCache, shared: Optional[MongoCacheTier] = None):
+        """
+        Args:
+            memory: 进程内缓存
+            shared: 共享缓存层（可选）
+        """
+        self.memory = memory
+        self.shared = shared
+        self._stats = {
+            'memory_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'shared_errors': 0
+        }
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """
+        根据规范化的查询参数生成缓存键
+
+        - 字符串去除首尾空白、合并连续空白并转为小写
+        - 值为None或空字符串的参数被忽略
+
+        Returns:
+            缓存键（sha256十六进制串）
+        """
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = ' '.join(value.split()).lower()
+            if value is None or value == '':
+                continue
+            normalized[name] = value
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存值：先查进程内缓存，再查共享缓存（命中后回填进程内缓存）
+
+        Returns:
+            缓存值的副本，未命中时返回None
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hits')
+            return copy.deepcopy(value)
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"读取共享搜索缓存失败: {e}")
+                value = None
+            if value is not None:
+                self._count('shared_hits')
+                self.memory.set(key, value)
+                return copy.deepcopy(value)
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """写入两级缓存"""
+        value = copy.deepcopy(value)
+        self.memory.set(key, value)
+        self._count('sets')
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"写入共享搜索缓存失败: {e}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """异步获取缓存值（共享缓存查询在线程池中执行，不阻塞事件循环）"""
+        if self.shared is None or self.memory.get(key) is not None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """异步写入缓存值"""
+        if self.shared is None:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        """清空进程内缓存（共享缓存依赖TTL过期）"""
+        self.memory.clear()
+
+    def stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中/未命中计数、命中率和当前条目数
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats['memory_hits'] + stats['shared_hits']
+        lookups = hits + stats['misses']
+        stats.update({
+            'hits': hits,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'memory_size': len(self.memory),
+            'memory_maxsize': self.memory.maxsize,
+            'ttl': self.memory.ttl,
+            'shared_enabled': self.shared is not None
+        })
+        return stats
+
+
+# 导出单例
+_search_cache = None
+
+
+def get_search_cache() -> SearchCache:
+    """
+    获取搜索缓存单例
+
+    环境变量:
+        SEARCH_CACHE_SIZE: 进程内缓存最大条目数（默认1024）
+        SEARCH_CACHE_TTL: 缓存存活时间，秒（默认600）
+        SEARCH_CACHE_SHARED: 是否启用MongoDB共享缓存（默认false）
+    """
+    global _search_cache
+    if _search_cache is None:
+        ttl = float(os.getenv('SEARCH_CACHE_TTL', '600'))
+        memory = LRUCache(
+            maxsize=int(os.getenv('SEARCH_CACHE_SIZE', '1024')),
+            ttl=ttl
+        )
+        shared = None
+        if os.getenv('SEARCH_CACHE_SHARED', 'false').lower() == 'true':
+            shared = MongoCacheTier(ttl=ttl)
+        _search_cache = SearchCache(memory, shared)
+    return _search_cache
@@ -7,7 +7,11 @@ API文档: https://api.semanticscholar.org/api-docs/
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime
-import re
+
+from models.paper import Paper, extract_year, strip_markup
+from services.http_transport import get_http_transport
+from services.projection import S2_FIELDS, project
+from services.single_flight import coalesce
 
 
 class SemanticScholarClient:
@@ -22,28 +26,36 @@ class SemanticScholarClient:
     # 有API Key：每分钟5000次请求
     API_KEY = None  # 可在环境变量中配置 S2_API_KEY
 
+    # 批量查询时每次请求的最大ID数（/paper/batch 最多支持500个）
+    BATCH_SIZE = 500
+
+    # 引用/参考文献接口每页最大条数
+    CITATION_PAGE_SIZE = 1000
+
+    # 引用/参考文献接口中相邻论文所在的键
+    CITATION_KEYS = {'citations': 'citingPaper', 'references': 'citedPaper'}
+
     def __init__(self, api_key: Optional[str] = None):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = get_http_transport()
+        self.headers = {
             'User-Agent': 'ScholarAI/1.0 (https://scholarai.example.com)'
-        })
+        }
 
         # 设置API Key（提高速率限制）
         self.api_key = api_key or self.API_KEY
         if self.api_key:
-            self.session.headers.update({
-                'x-api-key': self.api_key
-            })
+            self.headers['x-api-key'] = self.api_key
 
-    def _parse_paper(self, paper: Dict) -> Dict:
+    def _parse_paper(self, paper: Dict, profile: str = 'full') -> Paper:
         """
         解析Semantic Scholar论文数据
 
         Args:
             paper: Semantic Scholar返回的论文数据
+            profile: 字段视图（list/detail/full）
 
         Returns:
-            标准化的论文数据字典
+            标准化的论文记录
         """
         # 提取作者信息
         authors = []
@@ -59,9 +71,7 @@ class SemanticScholarClient:
         if 'year' in paper:
             published_year = paper['year']
         elif 'publicationDate' in paper:
-            date_match = re.search(r'(\d{4})', paper['publicationDate'])
-            if date_match:
-                published_year = int(date_match.group(1))
+            published_year = extract_year(paper['publicationDate'])
 
         # 提取发表时间
         published = None
@@ -86,38 +96,35 @@ class SemanticScholarClient:
             primary_category = paper['venue']
 
         # 提取摘要（移除HTML标签）
-        summary = paper.get('abstract', '')
-        if summary:
-            # 移除常见的JATS标签
-            summary = re.sub(r'<jats[^>]*>', '', summary)
-            summary = re.sub(r'</jats[^>]*>', '', summary)
-            summary = re.sub(r'<[^>]+>', '', summary)
-
-        return {
-            'paper_id': paper.get('paperId', ''),
-            'title': paper.get('title', ''),
-            'authors': authors,
-            'summary': summary,
-            'published': published,
-            'published_year': published_year,
-            'updated': updated,
-            'categories': [primary_category] if primary_category else [],
-            'primary_category': primary_category,
-            'pdf_url': pdf_url,
-            'arxiv_url': paper.get('url', ''),
-            'comment': '',
-            'journal_ref': paper.get('journal', {}).get('name') if paper.get('journal') else None,
+        summary = strip_markup(paper.get('abstract', ''))
+
+        parsed = Paper(
+            paper_id=paper.get('paperId', ''),
+            title=paper.get('title', ''),
+            authors=authors,
+            summary=summary,
+            published=published,
+            published_year=published_year,
+            updated=updated,
+            categories=[primary_category] if primary_category else [],
+            primary_category=primary_category,
+            pdf_url=pdf_url,
+            arxiv_url=paper.get('url', ''),
+            comment='',
+            journal_ref=paper.get('journal', {}).get('name') if paper.get('journal') else None,
             # Semantic Scholar特有字段
-            'citation_count': paper.get('citationCount', 0),
-            'influential_citation_count': paper.get('influentialCitationCount', 0),
-            'venue': paper.get('venue', ''),
-            'publication_types': paper.get('publicationTypes', []),
-            'publication_date': paper.get('publicationDate', ''),
-            'is_open_access': paper.get('isOpenAccess', False),
-            'external_ids': paper.get('externalIds', {}),
-            's2_fields_of_study': paper.get('s2FieldsOfStudy', []),
-        }
-
+            citation_count=paper.get('citationCount', 0),
+            influential_citation_count=paper.get('influentialCitationCount', 0),
+            venue=paper.get('venue', ''),
+            publication_types=paper.get('publicationTypes', []),
+            publication_date=paper.get('publicationDate', ''),
+            is_open_access=paper.get('isOpenAccess', False),
+            external_ids=paper.get('externalIds', {}),
+            s2_fields_of_study=paper.get('s2FieldsOfStudy', []),
+        )
+        return project(parsed, profile)
+
+    @coalesce
     async def search_papers(
         self,
         query: str,
@@ -129,7 +136,8 @@ class SemanticScholarClient:
         min_citation_count: Optional[int] = None,
         open_access_pdf: Optional[bool] = None,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        profile: str = 'full'
     ) -> Dict:
         """
         搜索Semantic Scholar论文
@@ -145,6 +153,7 @@ class SemanticScholarClient:
             open_access_pdf: 是否只返回有开放获取PDF的论文
             page: 页码（从1开始）
             page_size: 每页数量（最大100）
+            profile: 字段视图（list/detail/full），决定fields参数和返回的字段
 
         Returns:
             搜索结果字典
@@ -174,6 +183,8 @@ class SemanticScholarClient:
                 's2FieldsOfStudy'
             ])
         }
+        if profile in S2_FIELDS:
+            params['fields'] = ','.join(S2_FIELDS[profile])
 
         # 添加过滤条件
         if year_min or year_max:
@@ -204,8 +215,9 @@ class SemanticScholarClient:
 
         try:
             # 发送请求
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.GRAPH_API_BASE}/paper/search",
+                headers=self.headers,
                 params=params,
                 timeout=30
             )
@@ -214,7 +226,7 @@ class SemanticScholarClient:
             data = response.json()
 
             # 提取论文列表
-            papers = [self._parse_paper(paper) for paper in data.get('data', [])]
+            papers = [self._parse_paper(paper, profile) for paper in data.get('data', [])]
 
             # 提取总数
             total_results = data.get('total', 0)
@@ -244,12 +256,14 @@ class SemanticScholarClient:
                 'error': f'解析Semantic Scholar响应失败: {str(e)}'
             }
 
-    async def get_paper_details(self, paper_id: str) -> Dict:
+    @coalesce
+    async def get_paper_details(self, paper_id: str, profile: str = 'full') -> Dict:
         """
         获取论文详情
 
         Args:
             paper_id: Semantic Scholar论文ID
+            profile: 字段视图（list/detail/full），非full视图不请求引用和参考文献
 
         Returns:
             论文详情字典
@@ -280,10 +294,13 @@ class SemanticScholarClient:
                 'citations'
             ])
         }
+        if profile in S2_FIELDS:
+            params['fields'] = ','.join(S2_FIELDS[profile])
 
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.GRAPH_API_BASE}/paper/{paper_id}",
+                headers=self.headers,
                 params=params,
                 timeout=30
             )
@@ -293,7 +310,7 @@ class SemanticScholarClient:
 
             return {
                 'success': True,
-                'data': self._parse_paper(paper)
+                'data': self._parse_paper(paper, profile)
             }
 
         except requests.exceptions.RequestException as e:
@@ -307,6 +324,77 @@ class SemanticScholarClient:
                 'error': f'解析论文详情失败: {str(e)}'
             }
 
+    @coalesce
+    async def get_papers_batch(self, paper_ids: List[str]) -> Dict:
+        """
+        批量获取论文详情（使用 POST /paper/batch，每次请求最多 BATCH_SIZE 篇）
+
+        Args:
+            paper_ids: Semantic Scholar论文ID列表（也支持 ARXIV:xxx、DOI:xxx 形式）
+
+        Returns:
+            {
+                'success': True,
+                'data': {
+                    'papers': {论文ID: 论文数据},
+                    'errors': {论文ID: 错误信息}
+                }
+            }
+        """
+        papers = {}
+        errors = {}
+
+        fields = ','.join([
+            'paperId',
+            'externalIds',
+            'url',
+            'title',
+            'abstract',
+            'authors',
+            'venue',
+            'year',
+            'journal',
+            'citationCount',
+            'influentialCitationCount',
+            'isOpenAccess',
+            'openAccessPdf',
+            's2FieldsOfStudy',
+            'publicationTypes',
+            'publicationDate'
+        ])
+
+        for i in range(0, len(paper_ids), self.BATCH_SIZE):
+            chunk = paper_ids[i:i + self.BATCH_SIZE]
+
+            try:
+                response = await self.http.post(
+                    f"{self.GRAPH_API_BASE}/paper/batch",
+                    headers=self.headers,
+                    params={'fields': fields},
+                    json={'ids': chunk},
+                    timeout=30
+                )
+                response.raise_for_status()
+
+                # 返回列表与请求ID一一对应，未找到的论文为null
+                for pid, paper in zip(chunk, response.json()):
+                    if paper:
+                        papers[pid] = self._parse_paper(paper)
+                    else:
+                        errors[pid] = '论文未找到'
+
+            except Exception as e:
+                for pid in chunk:
+                    errors[pid] = f'获取论文详情失败: {str(e)}'
+
+        return {
+            'success': True,
+            'data': {
+                'papers': papers,
+                'errors': errors
+            }
+        }
+
     async def get_paper_pdf_url(self, paper_id: str) -> Dict:
         """
         获取论文PDF下载链接
@@ -348,8 +436,9 @@ class SemanticScholarClient:
             推荐论文列表
         """
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.RECOMMENDATIONS_API}/papers/{paper_id}/relatedpapers",
+                headers=self.headers,
                 params={'limit': limit},
                 timeout=30
             )
@@ -406,8 +495,9 @@ class SemanticScholarClient:
             引用论文列表
         """
         try:
-            response = self.session.get(
+            response = await self.http.get(
                 f"{self.GRAPH_API_BASE}/paper/{paper_id}/citations",
+                headers=self.headers,
                 params={'limit': limit, 'fields': 'paperId,title,authors,year,citationCount,abstract'},
                 timeout=30
             )
@@ -415,16 +505,17 @@ class SemanticScholarClient:
 
             data = response.json()
 
+            # 引用论文位于 citingPaper 中
             citations = [
                 {
-                    'paper_id': item.get('paperId', {}).get('paperId', ''),
-                    'title': item.get('paperId', {}).get('title', ''),
-                    'authors': [a.get('name', '') for a in item.get('paperId', {}).get('authors', [])],
-                    'year': item.get('paperId', {}).get('year'),
-                    'citation_count': item.get('paperId', {}).get('citationCount', 0),
-                    'abstract': item.get('paperId', {}).get('abstract', ''),
-                    'context': item.get('context', ''),  # 引用上下文（如果有）
-                    'intention': item.get('intention', ''),  # 引用意图（如果有）
+                    'paper_id': (item.get('citingPaper') or {}).get('paperId', ''),
+                    'title': (item.get('citingPaper') or {}).get('title', ''),
+                    'authors': [a.get('name', '') for a in (item.get('citingPaper') or {}).get('authors', [])],
+                    'year': (item.get('citingPaper') or {}).get('year'),
+                    'citation_count': (item.get('citingPaper') or {}).get('citationCount', 0),
+                    'abstract': (item.get('citingPaper') or {}).get('abstract', ''),
+                    'context': (item.get('contexts') or [''])[0],  # 引用上下文（如果有）
+                    'intention': (item.get('intents') or [''])[0],  # 引用意图（如果有）
                 }
                 for item in data.get('data', [])
             ]
@@ -448,6 +539,88 @@ class SemanticScholarClient:
                 'error': f'解析引用列表失败: {str(e)}'
             }
 
+    @coalesce
+    async def get_citation_page(
+        self,
+        paper_id: str,
+        direction: str = 'citations',
+        offset: int = 0,
+        limit: int = CITATION_PAGE_SIZE
+    ) -> Dict:
+        """
+        分页获取引用（citations）或参考文献（references）
+
+        Args:
+            paper_id: 论文ID（S2 ID，或 arXiv:/DOI: 等前缀ID）
+            direction: 'citations'（引用该论文的论文）或 'references'（该论文引用的论文）
+            offset: 起始位置
+            limit: 每页数量（最大1000）
+
+        Returns:
+            {
+                'success': True,
+                'data': {
+                    'papers': [{paper_id, title, year, citation_count, doi, arxiv_id, is_influential, intents}],
+                    'next': 下一页起始位置（没有更多时为None）
+                }
+            }
+        """
+        key = self.CITATION_KEYS.get(direction)
+        if key is None:
+            return {'success': False, 'error': f'无效的direction: {direction}'}
+
+        try:
+            response = await self.http.get(
+                f"{self.GRAPH_API_BASE}/paper/{paper_id}/{direction}",
+                headers=self.headers,
+                params={
+                    'offset': offset,
+                    'limit': min(limit, self.CITATION_PAGE_SIZE),
+                    'fields': 'paperId,title,year,citationCount,externalIds,isInfluential,intents'
+                },
+                timeout=30
+            )
+            response.raise_for_status()
+
+            data = response.json()
+
+            papers = []
+            for item in data.get('data') or []:
+                paper = item.get(key) or {}
+                # 未被S2收录的参考文献没有paperId
+                if not paper.get('paperId'):
+                    continue
+                external_ids = paper.get('externalIds') or {}
+                papers.append({
+                    'paper_id': paper['paperId'],
+                    'title': paper.get('title') or '',
+                    'year': paper.get('year'),
+                    'citation_count': paper.get('citationCount') or 0,
+                    'doi': external_ids.get('DOI'),
+                    'arxiv_id': external_ids.get('ArXiv'),
+                    'is_influential': bool(item.get('isInfluential')),
+                    'intents': item.get('intents') or []
+                })
+
+            return {
+                'success': True,
+                'data': {
+                    'papers': papers,
+                    'next': data.get('next')
+                }
+            }
+
+        except requests.exceptions.RequestException as e:
+            return {
+                'success': False,
+                'error': f'获取{direction}失败: {str(e)}'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'解析{direction}失败: {str(e)}'
+            }
+
 
 # 导出单例
 _semantic_scholar_client = None
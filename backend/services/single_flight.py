@@ -0,0 +1,129 @@
+"""
+上游请求合并（single-flight）
+同一时刻发出的相同请求只向上游发送一次，所有等待者共享同一个结果
+
+- 以请求参数生成的键识别相同请求，调用结束后立即移除（不是缓存）
+- 共享调用在独立任务中执行：某个等待者被取消不影响其他等待者，
+  所有等待者都取消后才取消上游调用
+- 有多个等待者时每个等待者都得到结果的深拷贝（包括第一个等待者），调用方可以安全地修改返回值
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次进行中的共享调用"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        # 是否有其他请求合并到此调用（调用结束后不再变化）
+        self.shared = False
+
+
+class SingleFlight:
+    """请求合并器"""
+
+    def __init__(self):
+        # (事件循环ID, 键) -> 进行中的调用；任务绑定事件循环，不同事件循环之间不共享
+        self._calls: Dict[tuple, _Call] = {}
+        self._stats = {'calls': 0, 'coalesced': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行调用，相同键的调用正在进行时等待其结果
+
+        Args:
+            key: 请求键
+            func: 无参数的协程函数（只在没有进行中的相同调用时执行）
+
+        Returns:
+            调用结果（异常同样传给所有等待者）
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        call = self._calls.get(call_key)
+        leader = call is None
+
+        if leader:
+            call = _Call(loop.create_task(func()))
+            self._calls[call_key] = call
+            call.task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+            self._count('calls')
+        else:
+            call.shared = True
+            self._count('coalesced')
+
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+            raise
+        # 等待者恢复执行的顺序不确定，共享的结果不交给任何等待者，避免修改被其他等待者看到
+        return copy.deepcopy(result) if call.shared else result
+
+    def in_flight(self) -> int:
+        """进行中的共享调用数"""
+        return len(self._calls)
+
+    def stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            上游调用数、被合并的请求数及合并率
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total = stats['calls'] + stats['coalesced']
+        stats['coalesce_rate'] = round(stats['coalesced'] / total, 4) if total else 0.0
+        stats['in_flight'] = self.in_flight()
+        return stats
+
+
+def make_key(*parts) -> str:
+    """将请求参数序列化为键（字典按键排序，无法序列化的值使用str）"""
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def coalesce(method):
+    """
+    装饰客户端的异步方法：同一客户端实例上参数相同的并发调用合并为一次
+
+    用法:
+        @coalesce
+        async def get_paper_details(self, paper_id): ...
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (method.__qualname__, id(self), make_key(args, kwargs))
+        return await get_single_flight().do(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+# 导出单例
+_single_flight = None
+
+
+def get_single_flight() -> SingleFlight:
+    """获取请求合并器单例"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
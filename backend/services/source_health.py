@@ -0,0 +1,278 @@
+"""
+数据源健康状态跟踪
+为每个上游数据源（arxiv/openalex/semantic_scholar）记录成功率和延迟的EWMA，
+并实现熔断器，用于跳过已知不可用的数据源、动态调整回退顺序
+
+熔断器状态:
+- closed: 正常放行
+- open: 连续失败达到阈值后熔断，冷却期内直接跳过该数据源
+- half_open: 冷却期结束后放行一个探测请求，成功则恢复，失败则重新熔断
+
+探测名额以令牌表示：allow() 放行探测请求时返回 ProbeToken，只有传回该令牌的
+record_success/record_failure/release 才会释放探测名额，其他请求的结果不会误释放
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProbeToken:
+    """半开状态下放行的探测请求的令牌（真值）"""
+
+    __slots__ = ('source',)
+
+    def __init__(self, source: str):
+        self.source = source
+
+
+class SourceHealth:
+    """单个数据源的健康状态（由 SourceHealthTracker 加锁访问）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.latency_ewma: Optional[float] = None
+        self.success_ewma = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe: Union[bool, ProbeToken, None] = None
+        self.last_error: Optional[str] = None
+
+    def to_dict(self, now: float, cooldown: float) -> Dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.opened_at + cooldown - now), 1)
+        return {
+            'state': self.state,
+            'latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            'success_rate': round(self.success_ewma, 3),
+            'successes': self.successes,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': retry_in,
+            'last_error': self.last_error
+        }
+
+
+class SourceHealthTracker:
+    """数据源健康跟踪器与熔断器（线程安全）"""
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        slow_latency: Optional[float] = None,
+        alpha: float = 0.2,
+        clock=time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: 连续失败多少次后熔断（默认 SOURCE_BREAKER_FAILURES 或 5）
+            cooldown: 熔断后多少秒放行探测请求（默认 SOURCE_BREAKER_COOLDOWN 或 30）
+            slow_latency: 延迟EWMA超过该值（秒）时视为降级（默认 SOURCE_SLOW_LATENCY 或 5）
+            alpha: EWMA平滑系数（越大越偏重最近的请求）
+            clock: 时钟函数（测试用）
+        """
+        self.failure_threshold = failure_threshold or int(os.getenv('SOURCE_BREAKER_FAILURES', '5'))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('SOURCE_BREAKER_COOLDOWN', '30'))
+        self.slow_latency = slow_latency or float(os.getenv('SOURCE_SLOW_LATENCY', '5'))
+        self.alpha = alpha
+        self.clock = clock
+        self._sources: Dict[str, SourceHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, source: str) -> SourceHealth:
+        """获取数据源状态（调用方持有锁）"""
+        health = self._sources.get(source)
+        if health is None:
+            health = self._sources[source] = SourceHealth(source)
+        return health
+
+    def _observe(self, health: SourceHealth, latency: Optional[float], success: bool) -> None:
+        if latency is not None:
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma += self.alpha * (latency - health.latency_ewma)
+        health.success_ewma += self.alpha * ((1.0 if success else 0.0) - health.success_ewma)
+
+    def allow(self, source: str) -> Union[bool, ProbeToken]:
+        """
+        判断是否可以向数据源发起请求
+
+        熔断冷却期结束后只放行一个探测请求，探测结果由 record_success/record_failure 记录
+
+        Args:
+            source: 数据源名称
+
+        Returns:
+            不放行时为False；正常放行时为True；放行探测请求时为 ProbeToken，
+            需作为 probe 参数传给 record_success/record_failure/release
+        """
+        with self._lock:
+            health = self._get(source)
+            if health.state == CLOSED:
+                return True
+            if health.state == OPEN:
+                if self.clock() - health.opened_at < self.cooldown:
+                    return False
+                health.state = HALF_OPEN
+                health.probe = None
+                logger.info(f"数据源 {source} 熔断冷却结束，放行探测请求")
+            if health.probe is not None:
+                return False
+            health.probe = ProbeToken(source)
+            return health.probe
+
+    @staticmethod
+    def _end_probe(health: SourceHealth, probe) -> None:
+        """只有持有探测令牌的请求结束时才释放探测名额（调用方持有锁）"""
+        if probe is not None and probe is health.probe:
+            health.probe = None
+
+    def is_open(self, source: str) -> bool:
+        """数据源是否处于熔断冷却期内（只读，不占用探测名额）"""
+        with self._lock:
+            health = self._sources.get(source)
+            return bool(
+                health and health.state == OPEN
+                and self.clock() - health.opened_at < self.cooldown
+            )
+
+    def record_success(self, source: str, latency: float, probe: Union[bool, ProbeToken, None] = None) -> None:
+        """
+        记录一次成功请求
+
+        Args:
+            source: 数据源名称
+            latency: 请求耗时（秒）
+            probe: allow() 的返回值（只有探测令牌会释放探测名额）
+        """
+        with self._lock:
+            health = self._get(source)
+            self._observe(health, latency, True)
+            health.successes += 1
+            health.consecutive_failures = 0
+            self._end_probe(health, probe)
+            if health.state != CLOSED:
+                logger.info(f"数据源 {source} 已恢复，关闭熔断")
+                health.state = CLOSED
+                health.opened_at = None
+
+    def record_failure(
+        self,
+        source: str,
+        latency: Optional[float] = None,
+        error: Optional[str] = None,
+        probe: Union[bool, ProbeToken, None] = None
+    ) -> None:
+        """
+        记录一次失败请求（异常、超时或返回失败）
+
+        冷却期已过但尚未经过 allow() 转为半开的熔断器（只用 is_open() 过滤的调用方）同样重新熔断
+
+        Args:
+            source: 数据源名称
+            latency: 请求耗时（秒），未知时为None
+            error: 错误信息
+            probe: allow() 的返回值（只有探测令牌会释放探测名额）
+        """
+        with self._lock:
+            health = self._get(source)
+            self._observe(health, latency, False)
+            health.failures += 1
+            health.consecutive_failures += 1
+            self._end_probe(health, probe)
+            health.last_error = error
+            now = self.clock()
+            if health.state == HALF_OPEN or (
+                health.state == CLOSED and health.consecutive_failures >= self.failure_threshold
+            ) or (
+                health.state == OPEN and now - health.opened_at >= self.cooldown
+            ):
+                logger.warning(f"数据源 {source} 连续失败 {health.consecutive_failures} 次，熔断 {self.cooldown}s")
+                health.state = OPEN
+                health.opened_at = now
+
+    def release(self, source: str, probe: Union[bool, ProbeToken, None] = None) -> None:
+        """
+        请求被取消、没有结果时释放探测名额
+
+        Args:
+            source: 数据源名称
+            probe: allow() 的返回值（只有探测令牌会释放探测名额）
+        """
+        with self._lock:
+            health = self._sources.get(source)
+            if health is not None:
+                self._end_probe(health, probe)
+
+    def _is_degraded(self, health: SourceHealth) -> bool:
+        return health.success_ewma < 0.5 or (
+            health.latency_ewma is not None and health.latency_ewma > self.slow_latency
+        )
+
+    def order(self, sources: List[str]) -> List[str]:
+        """
+        按健康状态调整数据源顺序
+
+        - 健康的数据源保持原有优先级，排在最前
+        - 降级（成功率低或延迟高）的数据源按预期耗时（延迟EWMA / 成功率）排序
+        - 处于熔断冷却期的数据源被移除
+
+        Args:
+            sources: 按优先级排序的数据源列表
+
+        Returns:
+            调整后的数据源列表
+        """
+        now = self.clock()
+        healthy, degraded = [], []
+        with self._lock:
+            for source in sources:
+                health = self._sources.get(source)
+                if health is None or health.state == CLOSED and not self._is_degraded(health):
+                    healthy.append(source)
+                elif health.state == OPEN and now - health.opened_at < self.cooldown:
+                    continue
+                else:
+                    cost = (health.latency_ewma or 0.0) / max(health.success_ewma, 0.05)
+                    degraded.append((health.state != CLOSED, cost, source))
+        return healthy + [source for _, _, source in sorted(degraded)]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        获取所有数据源的健康状态
+
+        Returns:
+            {数据源: {state, latency_ewma, success_rate, ...}}
+        """
+        now = self.clock()
+        with self._lock:
+            return {
+                name: health.to_dict(now, self.cooldown)
+                for name, health in sorted(self._sources.items())
+            }
+
+
+# 导出单例
+_source_health = None
+
+
+def get_source_health() -> SourceHealthTracker:
+    """获取数据源健康跟踪器单例"""
+    global _source_health
+    if _source_health is None:
+        _source_health = SourceHealthTracker()
+    return _source_health
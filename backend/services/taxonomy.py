@@ -0,0 +1,371 @@
+"""
+学科分类快照
+OpenAlex概念（concepts）、主题（topics）和arXiv分类的只读快照，
+供 /api/papers/fields 和分类名称查询使用，不再每个请求都访问OpenAlex
+
+- 启动时同步加载随代码发布的 data/taxonomy.json（arXiv分类和顶层概念）
+- 后台线程读取MongoDB taxonomy 集合中更新的快照，过期时从OpenAlex刷新并写回MongoDB
+- 快照不可变，刷新时整体替换；ID -> 名称索引为一个字典，列表响应按需序列化后缓存
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'taxonomy.json')
+
+# 列表类型 -> 响应中的键名
+KINDS = {'concepts': 'concepts', 'topics': 'topics', 'arxiv': 'categories'}
+
+OPENALEX_PREFIX = 'https://openalex.org/'
+
+
+class TaxonomySnapshot:
+    """不可变的分类快照"""
+
+    __slots__ = ('version', 'fetched_at', 'origin', 'concepts', 'topics', 'arxiv_categories',
+                 'totals', '_names', '_payloads', '_payload_lock')
+
+    def __init__(
+        self,
+        concepts: List[Dict],
+        topics: List[Dict],
+        arxiv_categories: List[Dict],
+        fetched_at: datetime,
+        origin: str,
+        version: Optional[str] = None,
+        totals: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            concepts: 概念列表（按论文数降序）
+            topics: 主题列表（按论文数降序）
+            arxiv_categories: arXiv分类列表 [{id, name}]
+            fetched_at: 数据获取时间
+            origin: 数据来源（bundled/store/openalex）
+            version: 版本号，默认按内容计算
+            totals: OpenAlex中的总数 {'concepts': ..., 'topics': ...}
+        """
+        self.concepts = tuple(concepts)
+        self.topics = tuple(topics)
+        self.arxiv_categories = tuple(arxiv_categories)
+        self.fetched_at = fetched_at
+        self.origin = origin
+        self.version = version or self.content_version(concepts, topics)
+        self.totals = {
+            'concepts': len(self.concepts),
+            'topics': len(self.topics),
+            'arxiv': len(self.arxiv_categories)
+        }
+        self.totals.update(totals or {})
+
+        names = {}
+        for items in (self.arxiv_categories, self.topics, self.concepts):
+            for item in items:
+                names[item['id']] = item['name']
+        self._names = names
+        self._payloads: Dict[Tuple[str, int], bytes] = {}
+        self._payload_lock = threading.Lock()
+
+    @staticmethod
+    def content_version(concepts: List[Dict], topics: List[Dict]) -> str:
+        """按概念和主题ID/名称计算版本号"""
+        digest = hashlib.sha1()
+        for item in list(concepts) + list(topics):
+            digest.update(f"{item['id']}\t{item['name']}\n".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def from_document(cls, doc: Dict, origin: str, arxiv_categories: Optional[List[Dict]] = None) -> 'TaxonomySnapshot':
+        """
+        从快照文档（bundled文件或MongoDB文档）创建
+
+        Args:
+            doc: {version, fetched_at, concepts, topics, arxiv_categories, concepts_total, topics_total}
+            origin: 数据来源
+            arxiv_categories: 文档中没有arXiv分类时使用的列表
+        """
+        fetched_at = doc.get('fetched_at')
+        if isinstance(fetched_at, str):
+            fetched_at = datetime.fromisoformat(fetched_at)
+        return cls(
+            concepts=doc.get('concepts') or [],
+            topics=doc.get('topics') or [],
+            arxiv_categories=doc.get('arxiv_categories') or arxiv_categories or [],
+            fetched_at=fetched_at or datetime.min,
+            origin=origin,
+            version=doc.get('version'),
+            totals={
+                key: doc[f'{key}_total']
+                for key in ('concepts', 'topics')
+                if doc.get(f'{key}_total')
+            }
+        )
+
+    def to_document(self) -> Dict:
+        """转换为MongoDB文档（不含arXiv分类，arXiv分类始终随代码发布）"""
+        return {
+            'version': self.version,
+            'fetched_at': self.fetched_at,
+            'concepts': list(self.concepts),
+            'topics': list(self.topics),
+            'concepts_total': self.totals['concepts'],
+            'topics_total': self.totals['topics']
+        }
+
+    def name(self, item_id: str) -> Optional[str]:
+        """
+        按ID查询名称
+
+        Args:
+            item_id: 概念ID（C41008148，可带 https://openalex.org/ 前缀）、主题ID（T10001）或arXiv分类（cs.AI）
+
+        Returns:
+            名称，未知ID返回None
+        """
+        name = self._names.get(item_id)
+        if name is None and item_id and item_id.startswith(OPENALEX_PREFIX):
+            name = self._names.get(item_id[len(OPENALEX_PREFIX):])
+        return name
+
+    def items(self, kind: str) -> Tuple[Dict, ...]:
+        """按类型获取列表（concepts/topics/arxiv）"""
+        if kind == 'concepts':
+            return self.concepts
+        if kind == 'topics':
+            return self.topics
+        if kind == 'arxiv':
+            return self.arxiv_categories
+        raise ValueError(f'无效的分类类型: {kind}')
+
+    def payload(self, kind: str, limit: int) -> bytes:
+        """
+        获取列表响应的JSON（按类型和数量缓存序列化结果）
+
+        Returns:
+            {'success': true, 'data': {<键名>: [...], 'total': ..., 'version': ..., 'fetched_at': ...}} 的UTF-8编码
+        """
+        key = (kind, limit)
+        body = self._payloads.get(key)
+        if body is None:
+            items = self.items(kind)
+            body = json.dumps({
+                'success': True,
+                'data': {
+                    KINDS[kind]: list(items[:limit]),
+                    'total': self.totals[kind],
+                    'version': self.version,
+                    'fetched_at': self.fetched_at.isoformat()
+                }
+            }, ensure_ascii=False).encode('utf-8')
+            with self._payload_lock:
+                self._payloads[key] = body
+        return body
+
+
+class Taxonomy:
+    """分类快照管理（当前快照整体替换，读取无需加锁）"""
+
+    COLLECTION_NAME = 'taxonomy'
+    DOCUMENT_ID = 'openalex'
+
+    # 快照刷新间隔，为0时不从OpenAlex刷新
+    REFRESH_INTERVAL = timedelta(hours=float(os.getenv('TAXONOMY_REFRESH_HOURS', '24')))
+
+    # 从OpenAlex获取的概念和主题数量
+    FETCH_LIMIT = 200
+
+    def __init__(self, client=None, collection=None, bundled_path: str = BUNDLED_PATH,
+                 refresh_interval: Optional[timedelta] = None):
+        """
+        Args:
+            client: OpenAlex客户端（默认延迟获取单例）
+            collection: taxonomy 集合（可选，默认延迟获取）
+            bundled_path: 随代码发布的快照文件
+            refresh_interval: 刷新间隔
+        """
+        self._client = client
+        self._collection = collection
+        self.bundled_path = bundled_path
+        self.refresh_interval = self.REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.snapshot = self._load_bundled()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from services.openalex_client import get_openalex_client
+            self._client = get_openalex_client()
+        return self._client
+
+    @property
+    def collection(self):
+        """获取快照集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            self._collection = get_collection(self.COLLECTION_NAME)
+        return self._collection
+
+    def _load_bundled(self) -> TaxonomySnapshot:
+        """加载随代码发布的快照（文件缺失时为空快照）"""
+        try:
+            with open(self.bundled_path, 'r', encoding='utf-8') as f:
+                doc = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"加载内置分类快照失败: {e}")
+            doc = {}
+        return TaxonomySnapshot.from_document(doc, origin='bundled')
+
+    def name(self, item_id: str) -> Optional[str]:
+        """按ID查询名称（见 TaxonomySnapshot.name）"""
+        return self.snapshot.name(item_id)
+
+    def is_stale(self) -> bool:
+        """当前快照是否需要刷新"""
+        if not self.refresh_interval:
+            return False
+        return datetime.utcnow() - self.snapshot.fetched_at > self.refresh_interval
+
+    def _install(self, snapshot: TaxonomySnapshot) -> bool:
+        """使用较新的快照替换当前快照"""
+        if snapshot.fetched_at <= self.snapshot.fetched_at or not snapshot.concepts:
+            return False
+        self.snapshot = snapshot
+        logger.info(f"分类快照已更新: {snapshot.origin} {snapshot.version}，"
+                    f"{len(snapshot.concepts)} 个概念，{len(snapshot.topics)} 个主题")
+        return True
+
+    def load_from_store(self) -> bool:
+        """
+        从MongoDB加载较新的快照
+
+        Returns:
+            是否替换了当前快照
+        """
+        doc = self.collection.find_one({'_id': self.DOCUMENT_ID})
+        if not doc:
+            return False
+        return self._install(TaxonomySnapshot.from_document(
+            doc, origin='store', arxiv_categories=list(self.snapshot.arxiv_categories)
+        ))
+
+    async def fetch(self) -> TaxonomySnapshot:
+        """
+        从OpenAlex获取新快照
+
+        Raises:
+            RuntimeError: 概念列表获取失败
+        """
+        concepts = await self.client.get_concepts(limit=self.FETCH_LIMIT)
+        if not concepts.get('success'):
+            raise RuntimeError(concepts.get('error', '获取概念列表失败'))
+        topics = await self.client.get_topics(limit=self.FETCH_LIMIT)
+        if not topics.get('success'):
+            # 主题获取失败时沿用当前快照中的主题
+            logger.warning(f"获取主题列表失败: {topics.get('error')}")
+            topics = {'data': {'topics': list(self.snapshot.topics), 'total': self.snapshot.totals['topics']}}
+
+        return TaxonomySnapshot(
+            concepts=concepts['data']['concepts'],
+            topics=topics['data']['topics'],
+            arxiv_categories=list(self.snapshot.arxiv_categories),
+            fetched_at=datetime.utcnow(),
+            origin='openalex',
+            totals={'concepts': concepts['data']['total'], 'topics': topics['data']['total']}
+        )
+
+    def refresh(self) -> bool:
+        """
+        刷新快照：MongoDB中有未过期的快照时直接使用，否则从OpenAlex获取并写回MongoDB
+
+        Returns:
+            是否替换了当前快照
+        """
+        from services.event_loop import run_async
+
+        with self._refresh_lock:
+            updated = False
+            try:
+                updated = self.load_from_store()
+            except Exception as e:
+                logger.warning(f"读取分类快照失败: {e}")
+            if not self.is_stale():
+                return updated
+
+            snapshot = run_async(self.fetch(), timeout=120)
+            updated = self._install(snapshot)
+            try:
+                self.collection.replace_one(
+                    {'_id': self.DOCUMENT_ID}, dict(snapshot.to_document(), _id=self.DOCUMENT_ID), upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"保存分类快照失败: {e}")
+            return updated
+
+    def start(self) -> None:
+        """启动后台刷新线程（启动时刷新一次，之后按 refresh_interval 定期刷新）"""
+        if not self.refresh_interval or (self._thread and self._thread.is_alive()):
+            return
+
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"刷新分类快照失败: {e}")
+                # 失败时较早重试
+                wait = self.refresh_interval if not self.is_stale() else min(self.refresh_interval, timedelta(minutes=10))
+                if self._stop.wait(wait.total_seconds()):
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='taxonomy-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台刷新线程"""
+        self._stop.set()
+
+
+# 导出单例
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> Taxonomy:
+    """获取分类快照单例（首次调用时加载内置快照）"""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = Taxonomy()
+        return _taxonomy
+
+
+def init_taxonomy(app=None) -> Taxonomy:
+    """
+    加载分类快照并启动后台刷新（在create_app中调用一次）
+
+    Args:
+        app: Flask应用实例（可选）
+
+    Returns:
+        Taxonomy实例
+    """
+    taxonomy = get_taxonomy()
+    taxonomy.start()
+    if app is not None:
+        app.extensions['taxonomy'] = taxonomy
+    return taxonomy
+
+
+def category_name(item_id: str) -> Optional[str]:
+    """按概念/主题ID或arXiv分类查询名称"""
+    return get_taxonomy().name(item_id)
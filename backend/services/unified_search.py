@@ -1,14 +1,26 @@
 """
 统一论文搜索服务
 实现arXiv优先，失败时自动回退到OpenAlex
+支持联邦模式：并发查询所有数据源，取最快结果或合并结果
 """
 
 import asyncio
 import logging
+import os
+import threading
+import time
 from typing import Dict, Optional, List
 from services.arxiv_client import get_arxiv_client
 from services.openalex_client import get_openalex_client
 from services.semantic_scholar_client import get_semantic_scholar_client
+from services.search_cache import get_search_cache
+from services.paper_store import get_paper_store
+from services.paper_merge import merge_papers
+from services.local_index import get_local_index
+from services.source_health import get_source_health
+from services.hedging import get_hedge_policy
+from services.projection import project_result
+from services.rate_limiter import WaitTracker, track_wait
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +31,43 @@ class UnifiedPaperSearch:
     # 数据源优先级
     SOURCES = ['arxiv', 'openalex', 'semantic_scholar']
 
+    # 搜索模式: 顺序回退 / 联邦竞速 / 联邦合并
+    SEARCH_MODES = ['fallback', 'race', 'merge']
+
+    # 联邦搜索时每个数据源的默认截止时间（秒）
+    SOURCE_DEADLINE = float(os.getenv('SEARCH_SOURCE_DEADLINE', '8'))
+
+    # 本地索引搜索模式: 优先本地 / 混合本地结果
+    LOCAL_MODES = ['first', 'blend']
+
+    # 默认本地索引搜索模式（为空时不使用本地索引）
+    LOCAL_MODE = os.getenv('LOCAL_SEARCH_MODE', '') or None
+
+    # 结果重排序方式: 按引用图分数（PageRank百分位）
+    RANK_MODES = ['citation']
+
+    # 默认重排序方式（为空时保持数据源返回的顺序）
+    RANK_MODE = os.getenv('SEARCH_RANK_MODE', '') or None
+
+    # 重排序时引用图分数的权重
+    RANK_WEIGHT = float(os.getenv('CITATION_RANK_WEIGHT', '0.3'))
+
+    # 获取论文详情时默认是否启用对冲请求
+    HEDGE_DETAILS = os.getenv('DETAIL_HEDGING', 'false').lower() == 'true'
+
     def __init__(self):
         self.arxiv_client = get_arxiv_client()
         self.openalex_client = get_openalex_client()
         self.semantic_scholar_client = get_semantic_scholar_client()
+        self.cache = get_search_cache()
+        self.paper_store = get_paper_store()
+        self.local_index = get_local_index()
+        self._local_index_lock = threading.Lock()
+        self.health = get_source_health()
+        self.hedge_policy = get_hedge_policy()
+        # 正在后台刷新的论文 {(source, paper_id)} 及对应任务
+        self._refreshing = set()
+        self._background_tasks = set()
 
     def _normalize_paper(self, paper: Dict, source: str) -> Dict:
         """
@@ -60,12 +105,20 @@ class UnifiedPaperSearch:
         venue: Optional[str] = None,
         page: int = 1,
         page_size: int = 10,
-        preferred_source: Optional[str] = None
+        preferred_source: Optional[str] = None,
+        mode: str = 'fallback',
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+        local: Optional[str] = None,
+        profile: str = 'full',
+        rank: Optional[str] = None
     ) -> Dict:
         """
         统一论文搜索接口
 
-        优先使用arXiv，如果失败则回退到OpenAlex
+        默认(fallback)优先使用arXiv，如果失败则依次回退到OpenAlex、Semantic Scholar；
+        race/merge 模式会同时查询所有数据源（联邦搜索）；
+        local 可让本地BM25索引优先作答或将本地结果混入上游结果
 
         Args:
             query: 搜索关键词
@@ -76,106 +129,249 @@ class UnifiedPaperSearch:
             page: 页码
             page_size: 每页数量
             preferred_source: 首选数据源 ('arxiv', 'openalex', 'semantic_scholar')
+            mode: 搜索模式
+                - 'fallback': 按优先级依次尝试（默认）
+                - 'race': 并发查询，返回第一个成功的结果
+                - 'merge': 并发查询，合并截止时间前返回的所有结果
+            deadline: 联邦搜索时每个数据源的截止时间（秒），默认 SOURCE_DEADLINE
+            use_cache: 是否读取缓存；为False时跳过缓存直接请求上游，并用新结果刷新缓存
+            local: 本地索引模式（默认 LOCAL_SEARCH_MODE）
+                - 'first': 本地索引能填满当前页时直接返回本地结果，否则请求上游
+                - 'blend': 请求上游，并将本地结果合并去重后返回
+                - None: 不使用本地索引
+            profile: 字段视图（list/detail/full），决定向上游请求和返回的字段
+            rank: 当前页结果的重排序方式（默认 SEARCH_RANK_MODE）
+                - 'citation': 按本地引用图的PageRank百分位与原排名加权重排序
+                - None: 保持原顺序
 
         Returns:
-            搜索结果字典
+            搜索结果字典（命中缓存时带有 "cached": true）
         """
-        # 确定数据源优先级
-        if preferred_source and preferred_source in self.SOURCES:
-            sources = [preferred_source] + [s for s in self.SOURCES if s != preferred_source]
-        else:
-            sources = self.SOURCES
+        local = local or self.LOCAL_MODE
+        rank = rank or self.RANK_MODE
+        local_result = None
+        if local in self.LOCAL_MODES:
+            local_result = await self._search_local(
+                query=query, field=field, year_min=year_min, year_max=year_max,
+                venue=venue, page=page, page_size=page_size
+            )
+            if local == 'first' and len(local_result['data']['papers']) >= page_size:
+                logger.info(f"本地索引命中: {query}")
+                return await self._rank(project_result(local_result, profile), rank)
+
+        result = await self._search_upstream(
+            query=query,
+            field=field,
+            year_min=year_min,
+            year_max=year_max,
+            venue=venue,
+            page=page,
+            page_size=page_size,
+            preferred_source=preferred_source,
+            mode=mode,
+            deadline=deadline,
+            use_cache=use_cache,
+            profile=profile
+        )
+
+        if local == 'blend' and self._has_papers(local_result):
+            if result.get('success'):
+                result = self._merge_results(
+                    [result, local_result], result['data'].get('source_errors', {}), page, page_size
+                )
+            else:
+                result = local_result
+
+        return await self._rank(project_result(result, profile), rank)
+
+    async def _rank(self, result: Dict, rank: Optional[str]) -> Dict:
+        """按引用图分数重排序当前页结果（不修改缓存中的结果）"""
+        if rank != 'citation' or not self._has_papers(result):
+            return result
+
+        def rerank():
+            from services.citation_rank import get_citation_ranker
+            return get_citation_ranker().rerank(result['data']['papers'], weight=self.RANK_WEIGHT)
+
+        try:
+            # 首次使用时需要从MongoDB加载引用图
+            papers = await asyncio.to_thread(rerank)
+        except Exception as e:
+            logger.warning(f"引用图重排序失败: {e}")
+            return result
+        result = dict(result)
+        result['data'] = dict(result['data'], papers=papers, ranked_by='citation')
+        return result
+
+    async def _search_upstream(
+        self,
+        query: str,
+        field: Optional[str],
+        year_min: Optional[int],
+        year_max: Optional[int],
+        venue: Optional[str],
+        page: int,
+        page_size: int,
+        preferred_source: Optional[str],
+        mode: str,
+        deadline: Optional[float],
+        use_cache: bool,
+        profile: str = 'full'
+    ) -> Dict:
+        """经过缓存的上游搜索，参数同 search_papers"""
+        cache_key = self.cache.make_key(
+            query=query,
+            field=field,
+            year_min=year_min,
+            year_max=year_max,
+            venue=venue,
+            page=page,
+            page_size=page_size,
+            source=preferred_source,
+            mode=mode,
+            profile=profile
+        )
+
+        if use_cache:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                logger.info(f"搜索缓存命中: {query}")
+                cached['cached'] = True
+                return cached
+
+        result = await self._search(
+            query=query,
+            field=field,
+            year_min=year_min,
+            year_max=year_max,
+            venue=venue,
+            page=page,
+            page_size=page_size,
+            preferred_source=preferred_source,
+            mode=mode,
+            deadline=deadline,
+            profile=profile
+        )
+
+        # 只缓存成功的结果，失败结果需要在下次请求时重试
+        if result.get('success'):
+            await self.cache.aset(cache_key, result)
+            # 裁剪过字段的论文只加入本地索引，不写入论文存储（避免详情查询读到不完整的数据）
+            self._schedule_index_papers(result['data']['papers'], store=profile == 'full')
+
+        return result
+
+    async def _search_local(self, query: str, field: Optional[str], **kwargs) -> Dict:
+        """
+        在本地BM25索引中搜索（首次使用时从论文存储构建索引）
+
+        Returns:
+            搜索结果字典，data.source 为 'local'
+        """
+        if not self.local_index.loaded:
+            await asyncio.to_thread(self._load_local_index)
+        data = await asyncio.to_thread(self.local_index.search, query, category=field, **kwargs)
+        return {'success': True, 'data': data}
+
+    def _load_local_index(self) -> None:
+        """从论文存储构建本地索引（只执行一次，存储不可用时以空索引继续）"""
+        with self._local_index_lock:
+            if self.local_index.loaded:
+                return
+            try:
+                self.local_index.load_from_store(self.paper_store)
+            except Exception as e:
+                logger.warning(f"从论文存储构建本地索引失败: {e}")
+                self.local_index.loaded = True
+
+    def _schedule_index_papers(self, papers: List[Dict], store: bool = True) -> None:
+        """在后台将搜索结果加入本地索引，并（store为True时）写入尚未存储的论文"""
+        items = [(paper, paper['source']) for paper in papers if paper.get('source') in self.SOURCES]
+        if not items:
+            return
+
+        async def index_papers():
+            await asyncio.to_thread(self.local_index.add_many, items)
+            if not store:
+                return
+            try:
+                await asyncio.to_thread(self.paper_store.insert_missing, items)
+            except Exception as e:
+                logger.warning(f"写入本地论文存储失败: {e}")
+
+        task = asyncio.ensure_future(index_papers())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _search(
+        self,
+        query: str,
+        field: Optional[str],
+        year_min: Optional[int],
+        year_max: Optional[int],
+        venue: Optional[str],
+        page: int,
+        page_size: int,
+        preferred_source: Optional[str],
+        mode: str,
+        deadline: Optional[float],
+        profile: str = 'full'
+    ) -> Dict:
+        """执行上游搜索（不经过缓存），参数同 search_papers"""
+        # 确定数据源优先级：按健康状态调整顺序并跳过已熔断的数据源，显式指定的首选数据源仍排在最前
+        sources = self.health.order(self.SOURCES)
+        if preferred_source in sources:
+            sources = [preferred_source] + [s for s in sources if s != preferred_source]
+
+        if not sources:
+            return {
+                'success': False,
+                'error': '所有数据源均已熔断，请稍后重试',
+                'tried_sources': [],
+                'source_health': self.health.snapshot()
+            }
 
         # 构建OpenAlex过滤条件
-        openalex_filters = {}
-        if year_min or year_max:
-            if year_min and year_max:
-                # OpenAlex publication_year filter format: publication_year:2020-2024 (hyphen-separated range)
-                openalex_filters['publication_year'] = f'{year_min},{year_max}'
-            elif year_min:
-                openalex_filters['publication_year'] = f'>{year_min}'
-            elif year_max:
-                openalex_filters['publication_year'] = f'<{year_max}'
+        openalex_filters = self._build_openalex_filters(year_min, year_max)
+
+        search_kwargs = dict(
+            query=query,
+            field=field,
+            year_min=year_min,
+            year_max=year_max,
+            venue=venue,
+            page=page,
+            page_size=page_size,
+            openalex_filters=openalex_filters,
+            profile=profile
+        )
+
+        if mode in ('race', 'merge'):
+            return await self._federated_search(
+                sources,
+                mode=mode,
+                deadline=deadline or self.SOURCE_DEADLINE,
+                **search_kwargs
+            )
 
         # 按优先级尝试数据源
         last_error = None
 
         for source in sources:
+            probe = self.health.allow(source)
+            if not probe:
+                logger.info(f"{source} 已熔断，跳过")
+                continue
             try:
                 logger.info(f"尝试使用 {source} 搜索: {query}")
 
-                if source == 'arxiv':
-                    result = await self.arxiv_client.search_papers(
-                        query=query,
-                        field=field,
-                        year_min=year_min,
-                        year_max=year_max,
-                        venue=venue,
-                        page=page,
-                        page_size=page_size
-                    )
-
-                    if result.get('success') and result.get('data', {}).get('papers'):
-                        logger.info(f"arXiv搜索成功，找到 {len(result['data']['papers'])} 篇论文")
-                        # 标准化并添加数据源标识
-                        result['data']['papers'] = [
-                            self._normalize_paper(p, 'arxiv')
-                            for p in result['data']['papers']
-                        ]
-                        result['data']['source'] = 'arxiv'
-                        return result
-                    else:
-                        last_error = result.get('error', 'arXiv搜索失败')
-                        logger.warning(f"arXiv搜索失败: {last_error}")
-
-                elif source == 'openalex':
-                    result = await self.openalex_client.search_papers(
-                        query=query,
-                        filter_fields=openalex_filters if openalex_filters else None,
-                        page=page,
-                        page_size=page_size,
-                        sort='cited_by_count:desc'  # 按引用数排序
-                    )
-
-                    if result.get('success') and result.get('data', {}).get('papers'):
-                        logger.info(f"OpenAlex搜索成功，找到 {len(result['data']['papers'])} 篇论文")
-                        # 标准化并添加数据源标识
-                        result['data']['papers'] = [
-                            self._normalize_paper(p, 'openalex')
-                            for p in result['data']['papers']
-                        ]
-                        result['data']['source'] = 'openalex'
-                        return result
-                    else:
-                        last_error = result.get('error', 'OpenAlex搜索失败')
-                        logger.warning(f"OpenAlex搜索失败: {last_error}")
-
-                elif source == 'semantic_scholar':
-                    # Semantic Scholar使用不同的参数名
-                    fields_of_study = [field] if field else None
-
-                    result = await self.semantic_scholar_client.search_papers(
-                        query=query,
-                        fields_of_study=fields_of_study,
-                        year_min=year_min,
-                        year_max=year_max,
-                        venue=venue,
-                        page=page,
-                        page_size=page_size
-                    )
-
-                    if result.get('success') and result.get('data', {}).get('papers'):
-                        logger.info(f"Semantic Scholar搜索成功，找到 {len(result['data']['papers'])} 篇论文")
-                        # 标准化并添加数据源标识
-                        result['data']['papers'] = [
-                            self._normalize_paper(p, 'semantic_scholar')
-                            for p in result['data']['papers']
-                        ]
-                        result['data']['source'] = 'semantic_scholar'
-                        return result
-                    else:
-                        last_error = result.get('error', 'Semantic Scholar搜索失败')
-                        logger.warning(f"Semantic Scholar搜索失败: {last_error}")
+                result = await self._search_source(source, probe=probe, **search_kwargs)
+                if self._has_papers(result):
+                    logger.info(f"{source} 搜索成功，找到 {len(result['data']['papers'])} 篇论文")
+                    return result
+                else:
+                    last_error = result.get('error', f'{source}搜索失败')
+                    logger.warning(f"{source} 搜索失败: {last_error}")
 
             except Exception as e:
                 last_error = str(e)
@@ -189,52 +385,406 @@ class UnifiedPaperSearch:
             'tried_sources': sources
         }
 
-    async def get_paper_details(self, paper_id: str, source: str = None) -> Dict:
+    def _build_openalex_filters(
+        self,
+        year_min: Optional[int],
+        year_max: Optional[int]
+    ) -> Dict:
+        """
+        构建OpenAlex年份过滤条件
+
+        Args:
+            year_min: 最小年份
+            year_max: 最大年份
+
+        Returns:
+            OpenAlex过滤条件字典
+        """
+        openalex_filters = {}
+        if year_min or year_max:
+            if year_min and year_max:
+                # OpenAlex publication_year filter format: publication_year:2020-2024 (hyphen-separated range)
+                openalex_filters['publication_year'] = f'{year_min},{year_max}'
+            elif year_min:
+                openalex_filters['publication_year'] = f'>{year_min}'
+            elif year_max:
+                openalex_filters['publication_year'] = f'<{year_max}'
+        return openalex_filters
+
+    @staticmethod
+    def _has_papers(result: Dict) -> bool:
+        """判断搜索结果是否成功且包含论文"""
+        return bool(result.get('success') and result.get('data', {}).get('papers'))
+
+    async def _search_source(self, source: str, probe=None, **search_kwargs) -> Dict:
+        """
+        在单个数据源上执行搜索，并将结果（成功/失败及耗时）记录到健康跟踪器
+
+        被取消的请求（联邦搜索中落败或超时）不计入，超时由调用方记录
+
+        Args:
+            source: 数据源名称
+            probe: health.allow() 的返回值（探测请求结束时释放探测名额）
+            **search_kwargs: 传给 _query_source 的搜索参数
+
+        Returns:
+            该数据源的搜索结果字典
+        """
+        start = time.monotonic()
+        with track_wait() as waited:
+            try:
+                result = await self._query_source(source, **search_kwargs)
+            except asyncio.CancelledError:
+                self.health.release(source, probe)
+                raise
+            except Exception as e:
+                self._record_failure(source, start, waited, str(e), probe)
+                raise
+
+        if result.get('success'):
+            self.health.record_success(source, self._latency(start, waited), probe)
+        else:
+            self._record_failure(source, start, waited, result.get('error'), probe)
+        return result
+
+    @staticmethod
+    def _latency(start: float, waited: WaitTracker) -> float:
+        """上游耗时（扣除本地速率限制的排队时间）"""
+        return max(0.0, time.monotonic() - start - waited.seconds)
+
+    def _record_failure(self, source: str, start: float, waited: WaitTracker, error: Optional[str], probe=None) -> None:
+        """记录失败请求；被本地速率限制拒绝的请求没有到达上游，不计入数据源健康"""
+        if waited.rejected:
+            self.health.release(source, probe)
+        else:
+            self.health.record_failure(source, self._latency(start, waited), error, probe)
+
+    async def _query_source(
+        self,
+        source: str,
+        query: str,
+        field: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        venue: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+        openalex_filters: Optional[Dict] = None,
+        profile: str = 'full'
+    ) -> Dict:
         """
-        获取论文详情（支持自动回退）
+        在单个数据源上执行搜索，并对结果做标准化
+
+        Args:
+            source: 数据源名称
+            其余参数同 search_papers
+
+        Returns:
+            该数据源的搜索结果字典
+        """
+        if source == 'arxiv':
+            result = await self.arxiv_client.search_papers(
+                query=query,
+                field=field,
+                year_min=year_min,
+                year_max=year_max,
+                venue=venue,
+                page=page,
+                page_size=page_size,
+                profile=profile
+            )
+        elif source == 'openalex':
+            result = await self.openalex_client.search_papers(
+                query=query,
+                filter_fields=openalex_filters if openalex_filters else None,
+                page=page,
+                page_size=page_size,
+                sort='cited_by_count:desc',  # 按引用数排序
+                profile=profile
+            )
+        elif source == 'semantic_scholar':
+            # Semantic Scholar使用不同的参数名
+            fields_of_study = [field] if field else None
+
+            result = await self.semantic_scholar_client.search_papers(
+                query=query,
+                fields_of_study=fields_of_study,
+                year_min=year_min,
+                year_max=year_max,
+                venue=venue,
+                page=page,
+                page_size=page_size,
+                profile=profile
+            )
+        else:
+            return {'success': False, 'error': f'未知数据源: {source}'}
+
+        if self._has_papers(result):
+            # 标准化并添加数据源标识
+            result['data']['papers'] = [
+                self._normalize_paper(p, source)
+                for p in result['data']['papers']
+            ]
+            result['data']['source'] = source
+        return result
+
+    async def _federated_search(
+        self,
+        sources: List[str],
+        mode: str,
+        deadline: float,
+        **search_kwargs
+    ) -> Dict:
+        """
+        并发查询所有数据源（联邦搜索）
+
+        - race: 返回第一个成功且有结果的数据源，并取消其余请求
+        - merge: 合并截止时间前返回的所有成功结果，超时的请求被取消
+
+        Args:
+            sources: 按优先级排序的数据源列表
+            mode: 'race' 或 'merge'
+            deadline: 每个数据源的截止时间（秒）
+            **search_kwargs: 传给 _search_source 的搜索参数
+
+        Returns:
+            搜索结果字典
+        """
+        async def run_source(source: str, probe) -> Dict:
+            return await asyncio.wait_for(
+                self._search_source(source, probe=probe, **search_kwargs),
+                timeout=deadline
+            )
+
+        probes = {s: self.health.allow(s) for s in sources}
+        tasks = {
+            asyncio.ensure_future(run_source(s, probe)): s
+            for s, probe in probes.items() if probe
+        }
+        if not tasks:
+            return {
+                'success': False,
+                'error': '所有数据源均已熔断，请稍后重试',
+                'tried_sources': []
+            }
+        results = {}
+        errors = {}
+
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    source = tasks[task]
+                    try:
+                        result = task.result()
+                    except asyncio.TimeoutError:
+                        errors[source] = f'超过截止时间 {deadline}s'
+                        self.health.record_failure(source, deadline, errors[source], probes[source])
+                        logger.warning(f"{source} 联邦搜索超时")
+                        continue
+                    except Exception as e:
+                        errors[source] = str(e)
+                        logger.error(f"{source} 联邦搜索异常: {e}")
+                        continue
+
+                    if self._has_papers(result):
+                        results[source] = result
+                    else:
+                        errors[source] = result.get('error', f'{source}搜索无结果')
+
+                if mode == 'race' and results:
+                    # 同一批完成的结果中按优先级选取
+                    winner = next(s for s in sources if s in results)
+                    logger.info(f"联邦搜索(race)由 {winner} 率先返回")
+                    return results[winner]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if not results:
+            return {
+                'success': False,
+                'error': f'所有数据源搜索失败: {errors}',
+                'tried_sources': sources
+            }
+
+        return self._merge_results(
+            [results[s] for s in sources if s in results],
+            errors=errors,
+            page=search_kwargs.get('page', 1),
+            page_size=search_kwargs.get('page_size', 10)
+        )
+
+    def _merge_results(
+        self,
+        results: List[Dict],
+        errors: Dict[str, str],
+        page: int,
+        page_size: int
+    ) -> Dict:
+        """
+        合并多个数据源的搜索结果（按数据源优先级轮流交错排列，并跨数据源去重）
+
+        Args:
+            results: 按优先级排序的成功结果列表
+            errors: 各失败数据源的错误信息
+            page: 页码
+            page_size: 每页数量
+
+        Returns:
+            合并后的搜索结果字典
+        """
+        paper_lists = [r['data']['papers'] for r in results]
+        candidates = []
+        for i in range(max(len(p) for p in paper_lists)):
+            for paper_list in paper_lists:
+                if i < len(paper_list):
+                    candidates.append(paper_list[i])
+
+        # 跨数据源去重：同一篇论文只保留一条合并记录
+        papers = merge_papers(candidates)
+
+        total = sum(r['data'].get('total', 0) for r in results)
+        total_pages = max(r['data'].get('total_pages', 0) for r in results)
+
+        return {
+            'success': True,
+            'data': {
+                'papers': papers,
+                'total': total,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': total_pages,
+                'source': 'federated',
+                'sources': [r['data']['source'] for r in results],
+                'source_errors': errors,
+                'duplicates_removed': len(candidates) - len(papers)
+            }
+        }
+
+    async def get_paper_details(
+        self,
+        paper_id: str,
+        source: str = None,
+        use_store: bool = True,
+        hedge: Optional[bool] = None
+    ) -> Dict:
+        """
+        获取论文详情（本地存储优先，支持自动回退）
+
+        先查询本地papers集合，命中则直接返回（数据过期时在后台刷新）；
+        未命中时从上游数据源获取，并写入本地存储
 
         Args:
             paper_id: 论文ID
             source: 数据源（如果为None则自动检测并回退）
+            use_store: 是否读取本地存储；为False时直接请求上游
+            hedge: 是否对冲请求前两个数据源（默认 DETAIL_HEDGING；指定source时不对冲）
+
+        Returns:
+            论文详情字典（来自本地存储时带有 "from_store": true）
+        """
+        if use_store:
+            stored = await self._load_from_store(paper_id, source)
+            if stored is not None:
+                return stored
+
+        if hedge is None:
+            hedge = self.HEDGE_DETAILS
+        result = await self._fetch_paper_details(paper_id, source, hedge=hedge)
+
+        if result.get('success'):
+            await self._save_to_store(result['data'], result['data']['source'])
+
+        return result
+
+    def _detail_sources(self, paper_id: str, source: Optional[str] = None) -> List[str]:
+        """
+        确定获取论文详情时的数据源回退顺序
+
+        Args:
+            paper_id: 论文ID
+            source: 指定的数据源（可选）
+
+        Returns:
+            数据源列表
+        """
+        if source:
+            return [source]
+        # OpenAlex ID格式
+        if 'W' in paper_id and len(paper_id) >= 10:
+            return ['openalex', 'semantic_scholar']
+        # Semantic Scholar ID格式
+        if paper_id.isdigit() or len(paper_id) == 27:
+            return ['semantic_scholar', 'openalex']
+        # arXiv ID格式 (YYMM.NNNNN) - 默认arXiv优先，但可以回退到OpenAlex
+        return ['arxiv', 'openalex']
+
+    async def _fetch_from_source(self, src: str, paper_id: str) -> Dict:
+        """
+        从单个数据源获取论文详情
+
+        Args:
+            src: 数据源名称
+            paper_id: 论文ID
 
         Returns:
             论文详情字典
         """
-        # 如果没有指定数据源，尝试自动检测并确定回退顺序
-        if not source:
-            # OpenAlex ID格式
-            if 'W' in paper_id and len(paper_id) >= 10:
-                sources = ['openalex', 'semantic_scholar']
-            # Semantic Scholar ID格式
-            elif paper_id.isdigit() or len(paper_id) == 27:
-                sources = ['semantic_scholar', 'openalex']
-            # arXiv ID格式 (YYMM.NNNNN) - 默认arXiv优先，但可以回退到OpenAlex
+        if src == 'arxiv':
+            result = await self.arxiv_client.get_paper_details(paper_id)
+        elif src == 'openalex':
+            # 如果是arXiv ID，使用专门的方法查找
+            if self._is_arxiv_id(paper_id):
+                result = await self.openalex_client.get_paper_by_arxiv_id(paper_id)
             else:
-                sources = ['arxiv', 'openalex']
+                result = await self.openalex_client.get_paper_details(paper_id)
+        elif src == 'semantic_scholar':
+            result = await self.semantic_scholar_client.get_paper_details(paper_id)
         else:
-            sources = [source]
+            return {'success': False, 'error': f'未知数据源: {src}'}
+
+        if result.get('success') and result.get('data'):
+            result['data']['source'] = src
+        return result
 
+    async def _fetch_paper_details(
+        self,
+        paper_id: str,
+        source: str = None,
+        sources: Optional[List[str]] = None,
+        hedge: bool = False
+    ) -> Dict:
+        """
+        从上游数据源获取论文详情（按回退顺序依次尝试，sources可覆盖默认顺序）
+
+        hedge为True时前两个数据源以对冲方式请求（见 _fetch_hedged），其余数据源依次回退
+        """
+        if sources is None:
+            sources = self._detail_sources(paper_id, source)
+        # 跳过熔断中的数据源（全部熔断时仍按原顺序尝试）
+        sources = [s for s in sources if not self.health.is_open(s)] or sources
         last_error = None
-        is_arxiv_id = self._is_arxiv_id(paper_id)
+
+        remaining = sources
+        if hedge and len(sources) > 1:
+            result = await self._fetch_hedged(paper_id, sources[0], sources[1])
+            if result.get('success') and result.get('data'):
+                return result
+            last_error = result.get('error', '未知错误')
+            remaining = sources[2:]
 
         # 尝试从各个数据源获取论文详情
-        for src in sources:
+        for src in remaining:
             try:
-                if src == 'arxiv':
-                    result = await self.arxiv_client.get_paper_details(paper_id)
-                elif src == 'openalex':
-                    # 如果是arXiv ID，使用专门的方法查找
-                    if is_arxiv_id:
-                        result = await self.openalex_client.get_paper_by_arxiv_id(paper_id)
-                    else:
-                        result = await self.openalex_client.get_paper_details(paper_id)
-                elif src == 'semantic_scholar':
-                    result = await self.semantic_scholar_client.get_paper_details(paper_id)
-                else:
-                    continue
+                result = await self._timed_fetch(src, paper_id)
 
                 if result.get('success') and result.get('data'):
-                    result['data']['source'] = src
                     logger.info(f"成功从 {src} 获取论文详情: {paper_id}")
                     return result
                 else:
@@ -252,6 +802,271 @@ class UnifiedPaperSearch:
             'tried_sources': sources
         }
 
+    @staticmethod
+    def _is_not_found(error: Optional[str]) -> bool:
+        """错误是否只是论文不存在（数据源正常响应，不计入失败）"""
+        return bool(error) and ('未找到' in error or '404' in error)
+
+    def _record_detail_outcome(
+        self,
+        src: str,
+        start: float,
+        waited: WaitTracker,
+        success: bool,
+        error: Optional[str] = None
+    ) -> None:
+        """将详情请求的结果记录到健康跟踪器（论文不存在视为数据源正常）"""
+        if success or self._is_not_found(error):
+            self.health.record_success(src, self._latency(start, waited))
+        else:
+            self._record_failure(src, start, waited, error)
+
+    async def _timed_fetch(self, src: str, paper_id: str) -> Dict:
+        """
+        从单个数据源获取论文详情，记录成功请求的延迟（用于计算对冲延迟），
+        并将结果记录到健康跟踪器（被取消的请求不计入）
+        """
+        start = time.monotonic()
+        with track_wait() as waited:
+            try:
+                result = await self._fetch_from_source(src, paper_id)
+            except asyncio.CancelledError:
+                self.health.release(src)
+                raise
+            except Exception as e:
+                self._record_failure(src, start, waited, str(e))
+                raise
+
+        success = bool(result.get('success') and result.get('data'))
+        if success:
+            self.hedge_policy.observe(src, self._latency(start, waited))
+        self._record_detail_outcome(src, start, waited, success, result.get('error'))
+        return result
+
+    async def _timed_batch(self, src: str, client, paper_ids: List[str]) -> Dict:
+        """向单个数据源发送批量详情请求，并将结果记录到健康跟踪器"""
+        start = time.monotonic()
+        with track_wait() as waited:
+            try:
+                response = await client.get_papers_batch(paper_ids)
+            except Exception as e:
+                self._record_failure(src, start, waited, str(e))
+                raise
+
+        # 所有ID都因请求错误（而不是论文不存在）失败时视为数据源失败
+        data = response.get('data') or {}
+        failures = [e for e in (data.get('errors') or {}).values() if not self._is_not_found(e)]
+        success = response.get('success', False) and not (failures and not data.get('papers'))
+        self._record_detail_outcome(src, start, waited, success, failures[0] if failures else response.get('error'))
+        return response
+
+    async def _fetch_hedged(self, paper_id: str, primary: str, secondary: str) -> Dict:
+        """
+        对冲获取论文详情
+
+        首选数据源在其p90延迟内没有返回且对冲预算允许时，向备选数据源发送备份请求，
+        先成功的结果胜出并取消另一个请求；首选数据源在对冲前就失败时直接回退到备选数据源
+
+        Args:
+            paper_id: 论文ID
+            primary: 首选数据源
+            secondary: 备选数据源
+
+        Returns:
+            论文详情字典（都失败时为最后一个失败结果）
+        """
+        policy = self.hedge_policy
+        policy.start_request()
+        tasks = {asyncio.ensure_future(self._timed_fetch(primary, paper_id)): primary}
+        result = {'success': False, 'error': '未知错误'}
+        # 备选数据源是否作为对冲请求发出（首选失败后的回退请求不计为对冲胜出）
+        hedged = False
+
+        try:
+            done, _ = await asyncio.wait(set(tasks), timeout=policy.delay(primary))
+            if not done and policy.try_hedge():
+                logger.info(f"{primary} 超过对冲延迟未返回，向 {secondary} 发送对冲请求: {paper_id}")
+                tasks[asyncio.ensure_future(self._timed_fetch(secondary, paper_id))] = secondary
+                hedged = True
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"从 {tasks[task]} 获取论文详情失败: {e}")
+                        result = {'success': False, 'error': str(e)}
+                        continue
+                    if result.get('success') and result.get('data'):
+                        logger.info(f"成功从 {tasks[task]} 获取论文详情: {paper_id}")
+                        if tasks[task] == secondary and hedged:
+                            policy.record_win()
+                        return result
+
+                if not pending and secondary not in tasks.values():
+                    task = asyncio.ensure_future(self._timed_fetch(secondary, paper_id))
+                    tasks[task] = secondary
+                    pending = {task}
+
+            return result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def get_papers_batch(self, paper_ids: List[str], use_store: bool = True) -> Dict:
+        """
+        批量获取论文详情
+
+        1. 一次查询本地存储
+        2. 未命中的ID按首选数据源分组，每个数据源一次批量请求（各数据源并发）
+        3. 批量请求失败的ID再逐个按回退顺序尝试其余数据源
+
+        Args:
+            paper_ids: 论文ID列表
+            use_store: 是否读取本地存储
+
+        Returns:
+            {
+                'success': True,
+                'data': {
+                    'papers': {论文ID: 论文数据}（按输入顺序）,
+                    'errors': {论文ID: 错误信息}
+                }
+            }
+        """
+        paper_ids = list(dict.fromkeys(paper_ids))
+        papers = {}
+        errors = {}
+
+        if use_store:
+            try:
+                docs = await asyncio.to_thread(self.paper_store.find_many, paper_ids)
+            except Exception as e:
+                logger.warning(f"读取本地论文存储失败: {e}")
+                docs = {}
+            for pid, doc in docs.items():
+                papers[pid] = doc['data']
+                if self.paper_store.is_stale(doc):
+                    self._schedule_refresh(doc['paper_id'], doc['source'])
+
+        # 按首选数据源分组
+        groups = {}
+        for pid in paper_ids:
+            if pid not in papers:
+                detail_sources = self._detail_sources(pid)
+                src = next((s for s in detail_sources if not self.health.is_open(s)), detail_sources[0])
+                groups.setdefault(src, []).append(pid)
+
+        clients = {
+            'arxiv': self.arxiv_client,
+            'openalex': self.openalex_client,
+            'semantic_scholar': self.semantic_scholar_client
+        }
+        responses = await asyncio.gather(
+            *[self._timed_batch(src, clients[src], ids) for src, ids in groups.items()],
+            return_exceptions=True
+        )
+
+        fetched = []
+        for (src, ids), response in zip(groups.items(), responses):
+            if isinstance(response, Exception):
+                for pid in ids:
+                    errors[pid] = str(response)
+                continue
+            for pid, paper in response['data']['papers'].items():
+                paper['source'] = src
+                papers[pid] = paper
+                fetched.append((paper, src))
+            errors.update(response['data']['errors'])
+
+        # 批量请求失败的ID，逐个尝试其余数据源
+        retry_ids = list(errors)
+        retries = await asyncio.gather(*[
+            self._fetch_paper_details(pid, sources=[
+                s for s in self._detail_sources(pid) if s not in groups or pid not in groups[s]
+            ])
+            for pid in retry_ids
+        ]) if retry_ids else []
+        for pid, result in zip(retry_ids, retries):
+            if result.get('success'):
+                papers[pid] = result['data']
+                fetched.append((result['data'], result['data']['source']))
+                del errors[pid]
+
+        if fetched:
+            await asyncio.to_thread(self.local_index.add_many, fetched)
+            try:
+                await asyncio.to_thread(self.paper_store.upsert_many, fetched)
+            except Exception as e:
+                logger.warning(f"写入本地论文存储失败: {e}")
+
+        return {
+            'success': True,
+            'data': {
+                'papers': {pid: papers[pid] for pid in paper_ids if pid in papers},
+                'errors': errors
+            }
+        }
+
+    async def _load_from_store(self, paper_id: str, source: Optional[str]) -> Optional[Dict]:
+        """
+        从本地存储读取论文详情，过期时安排后台刷新
+
+        Returns:
+            论文详情字典，未命中或存储不可用时返回None
+        """
+        try:
+            doc = await asyncio.to_thread(self.paper_store.find, paper_id, source)
+        except Exception as e:
+            logger.warning(f"读取本地论文存储失败: {e}")
+            return None
+
+        if doc is None:
+            return None
+
+        if self.paper_store.is_stale(doc):
+            self._schedule_refresh(doc['paper_id'], doc['source'])
+
+        logger.info(f"本地存储命中论文详情: {paper_id}")
+        return {
+            'success': True,
+            'data': doc['data'],
+            'from_store': True
+        }
+
+    async def _save_to_store(self, paper: Dict, source: str) -> None:
+        """将论文详情写入本地存储并更新本地索引（存储失败时只记录日志）"""
+        await asyncio.to_thread(self.local_index.add, paper, source)
+        try:
+            await asyncio.to_thread(self.paper_store.upsert, paper, source)
+        except Exception as e:
+            logger.warning(f"写入本地论文存储失败: {e}")
+
+    def _schedule_refresh(self, paper_id: str, source: str) -> None:
+        """在后台从上游刷新过期的论文数据（同一论文同时只刷新一次）"""
+        key = (source, paper_id)
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                result = await self._fetch_from_source(source, paper_id)
+                if result.get('success') and result.get('data'):
+                    await self._save_to_store(result['data'], source)
+            except Exception as e:
+                logger.warning(f"后台刷新论文 {paper_id} 失败: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.ensure_future(refresh())
+        # 持有任务引用，避免任务在完成前被垃圾回收
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     def _is_arxiv_id(self, paper_id: str) -> bool:
         """
         检测是否为arXiv ID格式
@@ -283,52 +1098,31 @@ class UnifiedPaperSearch:
         Returns:
             比较结果字典
         """
-        results = {}
-
-        # arXiv
-        try:
-            arxiv_result = await self.arxiv_client.search_papers(
-                query=query,
-                page=1,
-                page_size=limit
-            )
-            results['arxiv'] = {
-                'success': arxiv_result.get('success', False),
-                'total': arxiv_result.get('data', {}).get('total', 0),
-                'papers': arxiv_result.get('data', {}).get('papers', [])[:limit]
-            }
-        except Exception as e:
-            results['arxiv'] = {'success': False, 'error': str(e)}
+        clients = {
+            'arxiv': self.arxiv_client,
+            'openalex': self.openalex_client,
+            'semantic_scholar': self.semantic_scholar_client
+        }
 
-        # OpenAlex
-        try:
-            openalex_result = await self.openalex_client.search_papers(
-                query=query,
-                page=1,
-                page_size=limit
-            )
-            results['openalex'] = {
-                'success': openalex_result.get('success', False),
-                'total': openalex_result.get('data', {}).get('total', 0),
-                'papers': openalex_result.get('data', {}).get('papers', [])[:limit]
-            }
-        except Exception as e:
-            results['openalex'] = {'success': False, 'error': str(e)}
+        # 三个数据源并发查询，总耗时取决于最慢的数据源而不是耗时之和
+        responses = await asyncio.gather(
+            *[
+                client.search_papers(query=query, page=1, page_size=limit)
+                for client in clients.values()
+            ],
+            return_exceptions=True
+        )
 
-        # Semantic Scholar
-        try:
-            s2_result = await self.semantic_scholar_client.search_papers(
-                query=query,
-                page=1,
-                page_size=limit
-            )
-            results['semantic_scholar'] = {
-                'success': s2_result.get('success', False),
-                'total': s2_result.get('data', {}).get('total', 0),
-                'papers': s2_result.get('data', {}).get('papers', [])[:limit]
+        results = {}
+        for source, response in zip(clients, responses):
+            if isinstance(response, Exception):
+                results[source] = {'success': False, 'error': str(response)}
+                continue
+            results[source] = {
+                'success': response.get('success', False),
+                'total': response.get('data', {}).get('total', 0),
+                'papers': response.get('data', {}).get('papers', [])[:limit]
             }
-        except Exception as e:
-            results['semantic_scholar'] = {'success': False, 'error': str(e)}
 
         return {
             'success': True,
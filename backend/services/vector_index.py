@@ -0,0 +1,436 @@
+"""
+论文相似度向量索引
+基于已存储论文的标题和摘要构建 TF-IDF（+ SVD降维）向量，支持余弦相似度 top-k 检索
+
+- 纯CPU、本地计算，向量以 NumPy 矩阵存储
+- 语料较小时直接使用归一化的TF-IDF向量；较大时用截断SVD降维（LSA）
+- 论文数不超过 exact_threshold 时精确检索；超过时使用倒排聚类（IVF）近似检索：
+  球面k-means将向量划分到若干簇，查询时只扫描最近的 nprobe 个簇
+- 新论文可增量加入（按已有词表和SVD投影），累计新增较多时应重新构建
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import svds
+
+from models.paper import Paper
+from services.local_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def _paper_text(paper: Dict) -> str:
+    """用于向量化的文本（标题重复一次以提高权重）"""
+    title = paper.get('title') or ''
+    return f"{title} {title} {paper.get('summary') or ''}"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _tfidf(texts: List[str], vocabulary: Dict[str, int], idf: np.ndarray) -> csr_matrix:
+    """按给定词表计算行归一化的TF-IDF稀疏矩阵（次线性词频）"""
+    rows, cols, values = [], [], []
+    for row, text in enumerate(texts):
+        counts = Counter(t for t in tokenize(text) if t in vocabulary)
+        for term, count in counts.items():
+            col = vocabulary[term]
+            rows.append(row)
+            cols.append(col)
+            values.append((1.0 + math.log(count)) * idf[col])
+    matrix = csr_matrix(
+        (np.asarray(values, dtype=np.float32), (rows, cols)),
+        shape=(len(texts), len(vocabulary))
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return csr_matrix(matrix.multiply(1.0 / norms[:, None]))
+
+
+def _spherical_kmeans(vectors: np.ndarray, seed: int, iterations: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """球面k-means聚类，返回 (簇中心, 每行所属的簇)"""
+    n = len(vectors)
+    n_clusters = max(1, int(math.sqrt(n)))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(n, n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_clusters):
+            members = vectors[assignments == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize_rows(centroids)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class PaperVectorIndex:
+    """论文向量索引（线程安全）"""
+
+    def __init__(
+        self,
+        dim: int = 256,
+        exact_threshold: int = 20000,
+        nprobe: int = 8,
+        max_features: int = 50000,
+        seed: int = 0
+    ):
+        """
+        Args:
+            dim: SVD降维后的维度（语料不超过该规模时不降维）
+            exact_threshold: 精确检索的最大论文数，超过时使用IVF近似检索
+            nprobe: 近似检索时扫描的簇数
+            max_features: 词表最大词数（按文档频率保留）
+            seed: 随机种子（k-means初始化）
+        """
+        self.dim = dim
+        self.exact_threshold = exact_threshold
+        self.nprobe = nprobe
+        self.max_features = max_features
+        self.seed = seed
+        self._lock = threading.RLock()
+        # 构建期间增量加入的论文，替换索引后重新加入
+        self._building = 0
+        self._pending: List[Tuple[Dict, str]] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self.vocabulary: Dict[str, int] = {}
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.papers: List[Dict] = []
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+        self.built_size = 0
+        self.built_at = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.papers)
+
+    @property
+    def needs_rebuild(self) -> bool:
+        """增量加入的论文超过构建时规模的20%时建议重新构建"""
+        return len(self.papers) > max(self.built_size * 1.2, self.built_size + 50)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """将文本转换为归一化的稠密向量（调用方持有锁）"""
+        tfidf = _tfidf(texts, self.vocabulary, self.idf)
+        if self.components is not None:
+            dense = np.asarray(tfidf @ self.components, dtype=np.float32)
+        else:
+            dense = tfidf.toarray().astype(np.float32)
+        return _normalize_rows(dense)
+
+    def build(self, papers: Iterable[Tuple[Dict, str]]) -> int:
+        """
+        全量构建索引
+
+        词表、TF-IDF、SVD和聚类都在锁外计算，完成后在锁内整体替换，
+        构建期间旧索引继续提供检索
+
+        Args:
+            papers: [(论文数据, 数据源), ...]，没有标题和摘要的论文会被忽略
+
+        Returns:
+            索引的论文数
+        """
+        with self._lock:
+            self._building += 1
+        try:
+            return self._build(papers)
+        finally:
+            with self._lock:
+                self._building -= 1
+                if not self._building:
+                    self._pending = []
+
+    def _build(self, papers: Iterable[Tuple[Dict, str]]) -> int:
+        items = [(Paper.from_mapping(paper, source=source), _paper_text(paper)) for paper, source in papers]
+        items = [(paper, text) for paper, text in items if paper.get('paper_id') and text.strip()]
+
+        # 词表：按文档频率保留最常见的词，语料足够大时过滤只出现一次的词
+        document_frequency = Counter()
+        for _, text in items:
+            document_frequency.update(set(tokenize(text)))
+        min_df = 2 if len(items) >= 1000 else 1
+        terms = [t for t, df in document_frequency.most_common(self.max_features) if df >= min_df]
+
+        if not items or not terms:
+            with self._lock:
+                self._reset()
+                self.built_at = time.monotonic()
+                self.loaded = True
+            return 0
+
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        n = len(items)
+        idf = np.array(
+            [math.log((1 + n) / (1 + document_frequency[t])) + 1.0 for t in sorted(terms)],
+            dtype=np.float32
+        )
+        tfidf = _tfidf([text for _, text in items], vocabulary, idf)
+
+        # 语料规模超过目标维度时做截断SVD（LSA）
+        components = None
+        k = min(self.dim, min(tfidf.shape) - 1)
+        if n > self.dim and k >= 1:
+            _, _, vt = svds(tfidf.astype(np.float64), k=k, random_state=self.seed)
+            components = vt.T.astype(np.float32)
+            vectors = _normalize_rows(np.asarray(tfidf @ components, dtype=np.float32))
+        else:
+            vectors = _normalize_rows(tfidf.toarray().astype(np.float32))
+
+        centroids = assignments = None
+        if n > self.exact_threshold:
+            centroids, assignments = _spherical_kmeans(vectors, self.seed)
+
+        papers = [paper for paper, _ in items]
+        rows = {(p['source'], p['paper_id']): i for i, p in enumerate(papers)}
+
+        with self._lock:
+            self.vocabulary = vocabulary
+            self.idf = idf
+            self.components = components
+            self.vectors = vectors
+            self.papers = papers
+            self._rows = rows
+            self.centroids = centroids
+            self.assignments = assignments
+            self.built_size = n
+            self.built_at = time.monotonic()
+            self.loaded = True
+            pending, self._pending = self._pending, []
+            for paper, source in pending:
+                self.add(paper, source)
+
+        logger.info(f"论文向量索引构建完成，共 {n} 篇，维度 {vectors.shape[1]}")
+        return n
+
+    def add(self, paper: Dict, source: Optional[str] = None) -> None:
+        """
+        增量加入论文（使用现有词表和投影；已存在的论文会被更新）
+
+        Args:
+            paper: _parse_paper 的输出
+            source: 数据源名称（默认使用 paper['source']）
+        """
+        source = source or paper.get('source', '')
+        text = _paper_text(paper)
+        if not paper.get('paper_id') or not text.strip():
+            return
+
+        with self._lock:
+            if self._building:
+                self._pending.append((paper, source))
+            if not self.vocabulary:
+                return
+            vector = self._embed([text])
+            paper = Paper.from_mapping(paper, source=source)
+            key = (source, paper['paper_id'])
+            row = self._rows.get(key)
+            if row is not None:
+                self.vectors[row] = vector[0]
+                self.papers[row] = paper
+            else:
+                row = len(self.papers)
+                self.vectors = np.vstack([self.vectors, vector])
+                self.papers.append(paper)
+                self._rows[key] = row
+            if self.centroids is not None:
+                cluster = int(np.argmax(self.centroids @ vector[0]))
+                if row < len(self.assignments):
+                    self.assignments[row] = cluster
+                else:
+                    self.assignments = np.append(self.assignments, cluster)
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """近似检索时的候选行（精确检索时返回None）"""
+        if self.centroids is None or len(self.papers) <= self.exact_threshold:
+            return None
+        nprobe = min(self.nprobe, len(self.centroids))
+        clusters = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self.assignments, clusters))
+
+    def search_vector(self, query: np.ndarray, k: int = 10, exclude: Optional[set] = None) -> List[Tuple[Dict, float]]:
+        """
+        按向量检索最相似的论文
+
+        Args:
+            query: 归一化的查询向量
+            k: 返回数量
+            exclude: 需要排除的行号
+
+        Returns:
+            [(论文数据, 余弦相似度), ...]，按相似度降序
+        """
+        with self._lock:
+            if not self.papers:
+                return []
+            candidates = self._candidate_rows(query)
+            vectors = self.vectors if candidates is None else self.vectors[candidates]
+            scores = vectors @ query
+            rows = np.arange(len(scores)) if candidates is None else candidates
+
+            limit = min(len(scores), k + len(exclude or ()))
+            if limit == 0:
+                return []
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top], kind='stable')]
+
+            results = []
+            for i in top:
+                row = int(rows[i])
+                if exclude and row in exclude:
+                    continue
+                if scores[i] <= 0:
+                    break
+                results.append((self.papers[row], float(scores[i])))
+                if len(results) == k:
+                    break
+            return results
+
+    def similar(self, paper: Dict, k: int = 5) -> List[Tuple[Dict, float]]:
+        """
+        查找与给定论文相似的论文（论文本身及其跨数据源重复记录不在结果中）
+
+        Args:
+            paper: 论文数据（已在索引中时直接使用其向量，否则按文本计算）
+            k: 返回数量
+
+        Returns:
+            [(论文数据, 余弦相似度), ...]
+        """
+        with self._lock:
+            if not self.papers:
+                return []
+            row = self._rows.get((paper.get('source', ''), paper.get('paper_id')))
+            if row is not None:
+                query = self.vectors[row]
+            else:
+                query = self._embed([_paper_text(paper)])[0]
+                if not query.any():
+                    return []
+            exclude = {row} if row is not None else set()
+            # 多取一些以便过滤同一论文的其他来源记录
+            results = self.search_vector(query, k=k + 3, exclude=exclude)
+
+        title = (paper.get('title') or '').strip().lower()
+        return [
+            (candidate, score) for candidate, score in results
+            if candidate.get('paper_id') != paper.get('paper_id')
+            and (candidate.get('title') or '').strip().lower() != title
+        ][:k]
+
+    def load_from_store(self, store, batch_size: int = 1000) -> int:
+        """
+        从论文存储全量构建索引
+
+        Args:
+            store: PaperStore实例
+            batch_size: 每批读取的文档数
+
+        Returns:
+            索引的论文数
+        """
+        return self.build(
+            (doc['data'], doc['source']) for doc in store.iter_documents(batch_size=batch_size)
+        )
+
+    def stats(self) -> Dict:
+        """
+        获取索引统计信息
+
+        Returns:
+            论文数、维度、是否近似检索等
+        """
+        with self._lock:
+            return {
+                'papers': len(self.papers),
+                'dimensions': int(self.vectors.shape[1]) if len(self.papers) else 0,
+                'vocabulary': len(self.vocabulary),
+                'svd': self.components is not None,
+                'approximate': self.centroids is not None and len(self.papers) > self.exact_threshold,
+                'clusters': 0 if self.centroids is None else len(self.centroids),
+                'needs_rebuild': self.needs_rebuild,
+                'loaded': self.loaded
+            }
+
+
+# 导出单例
+_vector_index = None
+_vector_index_lock = threading.Lock()
+_rebuilding = threading.Event()
+
+# 索引最长使用时间（秒），超过后在后台重新构建
+VECTOR_INDEX_MAX_AGE = float(os.getenv('VECTOR_INDEX_MAX_AGE', '3600'))
+
+
+def _load(index: PaperVectorIndex, store) -> None:
+    if store is None:
+        from services.paper_store import get_paper_store
+        store = get_paper_store()
+    try:
+        index.load_from_store(store)
+    except Exception as e:
+        logger.warning(f"从论文存储构建向量索引失败: {e}")
+        index.built_at = time.monotonic()
+        index.loaded = True
+
+
+def schedule_rebuild(store=None) -> bool:
+    """
+    在后台线程重新构建向量索引（构建期间继续使用旧索引）
+
+    Returns:
+        是否启动了新的构建（已有构建进行中时返回False）
+    """
+    if _rebuilding.is_set():
+        return False
+    _rebuilding.set()
+    index = get_vector_index(store)
+
+    def rebuild():
+        try:
+            _load(index, store)
+        finally:
+            _rebuilding.clear()
+
+    threading.Thread(target=rebuild, name='vector-index-rebuild', daemon=True).start()
+    return True
+
+
+def get_vector_index(store=None) -> PaperVectorIndex:
+    """
+    获取论文向量索引单例
+
+    首次调用时从论文存储同步构建（存储不可用时为空索引）；
+    之后索引过期（VECTOR_INDEX_MAX_AGE）或增量新增过多时在后台重新构建
+
+    Args:
+        store: PaperStore实例（默认使用全局论文存储）
+    """
+    global _vector_index
+    with _vector_index_lock:
+        if _vector_index is None:
+            _vector_index = PaperVectorIndex()
+        if not _vector_index.loaded:
+            _load(_vector_index, store)
+            return _vector_index
+
+    index = _vector_index
+    if index.needs_rebuild or time.monotonic() - index.built_at > VECTOR_INDEX_MAX_AGE:
+        schedule_rebuild(store)
+    return index
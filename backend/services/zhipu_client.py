@@ -6,19 +6,206 @@
 
 import os
 import json
+import asyncio
+import hashlib
+import random
+import threading
 import requests
-from typing import Dict, List, Optional, Any, Generator
-from datetime import datetime
+from typing import Dict, List, Optional, Any, AsyncGenerator, Generator
+from datetime import datetime, timedelta
 import logging
-import time
+
+from services.event_loop import run_async
+from services.http_transport import AsyncHTTPTransport, get_http_transport, parse_retry_after
+from services.single_flight import get_single_flight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class ZhipuClient:
-    """智谱AI客户端"""
+class LLMResponseCache:
+    """
+    LLM补全结果缓存（按内容寻址）
+
+    缓存键为模型、消息和采样参数的哈希，结果存储在MongoDB的llm_cache集合中，
+    通过TTL索引自动过期。流式与非流式调用共享同一缓存条目。
+    """
+
+    COLLECTION_NAME = 'llm_cache'
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_temperature: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        collection=None
+    ):
+        """
+        Args:
+            ttl: 条目存活时间（秒，默认 LLM_CACHE_TTL）
+            max_temperature: 可缓存的最高温度（默认 LLM_CACHE_MAX_TEMPERATURE），
+                            温度更高的调用视为非确定性，不读写缓存
+            enabled: 是否启用（默认 LLM_CACHE_ENABLED）
+            collection: MongoDB集合（可选，默认延迟获取llm_cache集合）
+        """
+        self.ttl = ttl if ttl is not None else float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+        self.max_temperature = max_temperature if max_temperature is not None else \
+            float(os.getenv('LLM_CACHE_MAX_TEMPERATURE', '0.2'))
+        self.enabled = enabled if enabled is not None else \
+            os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+        self._collection = collection
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'bypassed': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def collection(self):
+        """获取缓存集合（延迟初始化）"""
+        if self._collection is None:
+            from config.database import get_collection
+            collection = get_collection(self.COLLECTION_NAME)
+            # TTL索引：MongoDB会在expires_at时间点之后自动删除文档
+            collection.create_index('expires_at', expireAfterSeconds=0)
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], **params) -> str:
+        """
+        根据模型、消息和采样参数生成缓存键
+
+        Returns:
+            缓存键（sha256十六进制串）
+        """
+        params = {name: value for name, value in params.items() if value is not None}
+        raw = json.dumps(
+            {'model': model, 'messages': messages, 'params': params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def should_cache(self, temperature: float, cache: Optional[bool] = None) -> bool:
+        """
+        判断本次调用是否使用缓存
+
+        Args:
+            temperature: 采样温度
+            cache: 调用方显式指定（False为退出缓存，True为强制使用）
+
+        Returns:
+            是否读写缓存
+        """
+        if not self.enabled or cache is False:
+            use_cache = False
+        elif cache is True:
+            use_cache = True
+        else:
+            use_cache = temperature <= self.max_temperature
+        if not use_cache:
+            self._count('bypassed')
+        return use_cache
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        获取缓存条目
+
+        Returns:
+            {'content': 文本, 'data': 完整响应（仅非流式写入时存在）}，未命中返回None
+        """
+        try:
+            doc = self.collection.find_one({
+                '_id': key,
+                'expires_at': {'$gt': datetime.utcnow()}
+            })
+        except Exception as e:
+            self._count('errors')
+            logger.warning(f"读取LLM缓存失败: {e}")
+            doc = None
+
+        if doc is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return {'content': doc.get('content', ''), 'data': doc.get('data')}
+
+    def set(self, key: str, content: str, data: Optional[Dict] = None, model: Optional[str] = None) -> None:
+        """
+        写入缓存条目
+
+        Args:
+            key: 缓存键
+            content: 补全文本
+            data: 完整的API响应（可选）
+            model: 模型名称（便于排查）
+        """
+        now = datetime.utcnow()
+        doc = {
+            '_id': key,
+            'model': model,
+            'content': content,
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=self.ttl)
+        }
+        if data is not None:
+            doc['data'] = data
+        try:
+            self.collection.replace_one({'_id': key}, doc, upsert=True)
+            self._count('sets')
+        except Exception as e:
+            self._count('errors')
+            logger.warning(f"写入LLM缓存失败: {e}")
+
+    def stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中/未命中/跳过计数和命中率
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+            'enabled': self.enabled,
+            'ttl': self.ttl,
+            'max_temperature': self.max_temperature
+        })
+        return stats
+
+
+# 导出单例
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """
+    获取LLM补全缓存单例
+
+    环境变量:
+        LLM_CACHE_ENABLED: 是否启用（默认true）
+        LLM_CACHE_TTL: 缓存存活时间，秒（默认7天）
+        LLM_CACHE_MAX_TEMPERATURE: 可缓存的最高温度（默认0.2，低于对话和摘要的默认温度0.7）
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache()
+    return _llm_cache
+
+
+class AsyncZhipuClient:
+    """
+    智谱AI异步客户端
+
+    - 请求通过共享的HTTP连接池（AsyncHTTPTransport）发送，不阻塞事件循环
+    - 重试退避使用 asyncio.sleep，遵循 Retry-After 响应头并加入随机抖动
+    - 任务被取消时立即停止（包括退避等待期间）
+    """
 
     # API端点配置
     API_BASE_URL = "https://open.bigmodel.cn/api/paas/v4"
@@ -32,13 +219,32 @@ class ZhipuClient:
         "glm-4-air"
     ]
 
-    def __init__(self, api_key: Optional[str] = None):
+    # 缓存回放流式响应时每个片段的字符数
+    REPLAY_CHUNK_SIZE = 20
+
+    # 需要重试的HTTP状态码（限流和服务端暂时性错误）
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        transport: Optional[AsyncHTTPTransport] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0
+    ):
         """
-        初始化智谱AI客户端
+        初始化智谱AI异步客户端
 
         Args:
             api_key: 智谱AI API密钥 (格式: id.secret)
                     如果不提供，将从环境变量ZHIPU_API_KEY读取
+            cache: 补全结果缓存（可选，默认使用全局LLM缓存）
+            transport: HTTP传输层（可选，默认使用共享连接池）
+            max_retries: 最大尝试次数
+            retry_delay: 首次重试的基础延迟（秒），之后指数增长
+            max_retry_delay: 单次退避的最大延迟（秒）
         """
         self.api_key = api_key or os.getenv("ZHIPU_API_KEY")
         if not self.api_key:
@@ -48,29 +254,18 @@ class ZhipuClient:
         if "." not in self.api_key:
             raise ValueError("智谱AI API密钥格式错误，应为 'id.secret' 格式")
 
-        # 初始化session
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
-        })
-
-        logger.info("智谱AI客户端初始化成功")
-
-    def _parse_api_key(self) -> tuple[str, str]:
-        """
-        解析API密钥，提取ID和Secret
-
-        Returns:
-            (api_id, api_secret)
-        """
-        parts = self.api_key.split(".")
-        if len(parts) != 2:
-            raise ValueError("API密钥格式错误")
-
-        return parts[0], parts[1]
-
-    def _handle_response(self, response: requests.Response) -> Dict:
+        }
+        self.http = transport or get_http_transport()
+        self.cache = cache or get_llm_cache()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+    @staticmethod
+    def _handle_response(response: requests.Response) -> Dict:
         """
         处理API响应
 
@@ -130,43 +325,106 @@ class ZhipuClient:
                 "error": f"处理响应失败: {str(e)}"
             }
 
-    def _retry_request(
+    def _backoff_delay(self, attempt: int, retry_delay: float, response=None) -> float:
+        """
+        计算第 attempt 次失败后的等待时间
+
+        优先使用响应中的 Retry-After；否则为指数退避加随机抖动
+        （在 [delay/2, delay] 内均匀分布，避免大量请求同时重试）
+
+        Args:
+            attempt: 已失败的次数（从0开始）
+            retry_delay: 基础延迟（秒）
+            response: 失败的HTTP响应（可选）
+
+        Returns:
+            等待秒数
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_delay)
+        delay = min(retry_delay * (2 ** attempt), self.max_retry_delay)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _send(
         self,
-        func,
-        max_retries: int = 3,
-        retry_delay: float = 1.0
-    ) -> Dict:
+        method: str,
+        url: str,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        **kwargs
+    ) -> requests.Response:
         """
-        重试请求逻辑
+        发送请求，网络错误和可重试状态码按退避策略重试
 
         Args:
-            func: 请求函数
-            max_retries: 最大重试次数
-            retry_delay: 重试延迟（秒）
+            method: HTTP方法
+            url: 请求URL
+            max_retries: 最大尝试次数（默认使用客户端配置）
+            retry_delay: 基础退避延迟（默认使用客户端配置）
+            **kwargs: 透传给 requests 的参数
 
         Returns:
-            响应数据字典
+            最后一次的HTTP响应
+
+        Raises:
+            Exception: 所有尝试均发生网络错误时抛出最后一个异常
+            asyncio.CancelledError: 任务被取消
         """
-        last_error = None
+        max_retries = max_retries or self.max_retries
+        retry_delay = retry_delay if retry_delay is not None else self.retry_delay
+        headers = {**self.headers, **kwargs.pop("headers", {})}
 
         for attempt in range(max_retries):
+            response = None
             try:
-                return func()
+                response = await self.http.request(method, url, headers=headers, **kwargs)
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    return response
+                error = f"HTTP {response.status_code}"
             except Exception as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    logger.warning(f"请求失败，{retry_delay}秒后重试 ({attempt + 1}/{max_retries}): {str(e)}")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # 指数退避
-                else:
-                    logger.error(f"请求失败，已达最大重试次数: {str(e)}")
+                error = str(e)
+                if attempt == max_retries - 1:
+                    logger.error(f"请求失败，已达最大重试次数: {error}")
+                    raise
+
+            if attempt == max_retries - 1:
+                logger.error(f"请求失败，已达最大重试次数: {error}")
+                return response
+
+            delay = self._backoff_delay(attempt, retry_delay, response)
+            logger.warning(f"请求失败，{delay:.1f}秒后重试 ({attempt + 1}/{max_retries}): {error}")
+            if response is not None:
+                response.close()
+            await asyncio.sleep(delay)
+
+    async def _request(self, method: str, url: str, **kwargs) -> Dict:
+        """
+        发送请求并处理响应
 
-        return {
-            "success": False,
-            "error": f"请求失败: {str(last_error)}"
-        }
+        Returns:
+            响应数据字典
+        """
+        try:
+            response = await self._send(method, url, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"请求失败: {str(e)}"
+            }
+        return self._handle_response(response)
 
-    def chat_completion(
+    def _cache_key(self, model, messages, temperature, top_p, max_tokens, custom_variables) -> str:
+        return self.cache.make_key(
+            model, messages,
+            temperature=temperature, top_p=top_p,
+            max_tokens=max_tokens, custom_variables=custom_variables
+        )
+
+    async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         model: str = "glm-4-flash",
@@ -174,7 +432,8 @@ class ZhipuClient:
         temperature: float = 0.7,
         top_p: float = 0.9,
         max_tokens: Optional[int] = None,
-        custom_variables: Optional[Dict] = None
+        custom_variables: Optional[Dict] = None,
+        cache: Optional[bool] = None
     ) -> Dict:
         """
         调用智谱AI聊天补全API
@@ -187,47 +446,83 @@ class ZhipuClient:
             top_p: top_p参数 (0-1)
             max_tokens: 最大生成token数
             custom_variables: 自定义变量 (用于Agent API)
+            cache: 是否使用补全缓存（默认按温度阈值决定，False为退出缓存）
 
         Returns:
-            响应数据字典
+            响应数据字典（命中缓存时包含 "cached": True）
         """
-        def make_request():
-            # 构建请求体
-            payload = {
-                "model": model,
-                "messages": messages,
-                "stream": stream,
-                "temperature": temperature,
-                "top_p": top_p
-            }
-
-            if max_tokens:
-                payload["max_tokens"] = max_tokens
-
-            if custom_variables:
-                payload["custom_variables"] = custom_variables
+        use_cache = not stream and self.cache.should_cache(temperature, cache)
+        if use_cache:
+            key = self._cache_key(model, messages, temperature, top_p, max_tokens, custom_variables)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info(f"LLM缓存命中，模型: {model}")
+                return {
+                    "success": True,
+                    "data": cached['data'] or self._completion_from_content(model, cached['content']),
+                    "cached": True
+                }
 
-            logger.info(f"发送聊天请求，模型: {model}")
+        # 构建请求体
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "temperature": temperature,
+            "top_p": top_p
+        }
 
-            response = self.session.post(
-                self.CHAT_ENDPOINT,
-                json=payload,
-                timeout=60
-            )
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
 
-            return self._handle_response(response)
+        if custom_variables:
+            payload["custom_variables"] = custom_variables
 
-        return self._retry_request(make_request)
+        async def request() -> Dict:
+            logger.info(f"发送聊天请求，模型: {model}")
+            result = await self._request("POST", self.CHAT_ENDPOINT, json=payload, timeout=60)
+
+            if use_cache and result.get("success"):
+                try:
+                    content = result["data"]["choices"][0]["message"]["content"]
+                except (KeyError, IndexError, TypeError):
+                    content = None
+                if content:
+                    await asyncio.to_thread(self.cache.set, key, content, result["data"], model)
+            return result
+
+        # 相同的并发请求（同一API密钥）只发送一次；显式退出缓存或流式请求时不合并
+        if stream or cache is False:
+            return await request()
+        flight_key = (
+            "chat_completion",
+            hashlib.sha256(self.api_key.encode("utf-8")).hexdigest(),
+            self._cache_key(model, messages, temperature, top_p, max_tokens, custom_variables)
+        )
+        return await get_single_flight().do(flight_key, request)
+
+    @staticmethod
+    def _completion_from_content(model: str, content: str) -> Dict:
+        """由缓存的文本构造与API一致的非流式响应结构"""
+        return {
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }]
+        }
 
-    def chat_completion_stream(
+    async def chat_completion_stream(
         self,
         messages: List[Dict[str, str]],
         model: str = "glm-4-flash",
         temperature: float = 0.7,
         top_p: float = 0.9,
         max_tokens: Optional[int] = None,
-        custom_variables: Optional[Dict] = None
-    ) -> Generator[str, None, None]:
+        custom_variables: Optional[Dict] = None,
+        cache: Optional[bool] = None
+    ) -> AsyncGenerator[str, None]:
         """
         流式聊天补全
 
@@ -238,10 +533,25 @@ class ZhipuClient:
             top_p: top_p参数
             max_tokens: 最大生成token数
             custom_variables: 自定义变量
+            cache: 是否使用补全缓存（默认按温度阈值决定，False为退出缓存）
 
         Yields:
-            str: 每次生成的文本片段
+            str: 每次生成的文本片段（命中缓存时按片段回放缓存内容）
         """
+        use_cache = self.cache.should_cache(temperature, cache)
+        if use_cache:
+            key = self._cache_key(model, messages, temperature, top_p, max_tokens, custom_variables)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info(f"LLM缓存命中（流式回放），模型: {model}")
+                content = cached['content']
+                for start in range(0, len(content), self.REPLAY_CHUNK_SIZE):
+                    yield content[start:start + self.REPLAY_CHUNK_SIZE]
+                return
+
+        chunks = []
+        completed = False
+
         # 构建请求体
         payload = {
             "model": model,
@@ -257,10 +567,12 @@ class ZhipuClient:
         if custom_variables:
             payload["custom_variables"] = custom_variables
 
+        response = None
         try:
             logger.info(f"发送流式聊天请求，模型: {model}")
 
-            response = self.session.post(
+            response = await self._send(
+                "POST",
                 self.CHAT_ENDPOINT,
                 json=payload,
                 stream=True,
@@ -269,35 +581,195 @@ class ZhipuClient:
 
             response.raise_for_status()
 
-            # 处理流式响应
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
+            # 处理流式响应（逐行读取在传输层的流读取线程池中进行）
+            async for line in self.http.iter_lines(response):
+                if not line:
+                    continue
+                line = line.decode('utf-8')
+
+                # SSE格式: data: {...}
+                if not line.startswith('data: '):
+                    continue
+                data_str = line[6:]  # 移除 "data: " 前缀
+
+                # 检查结束标记
+                if data_str.strip() == '[DONE]':
+                    completed = True
+                    break
+
+                try:
+                    data = json.loads(data_str)
+                except json.JSONDecodeError:
+                    continue
+
+                # 提取内容
+                if "choices" in data and len(data["choices"]) > 0:
+                    delta = data["choices"][0].get("delta", {})
+                    content = delta.get("content", "")
+                    if content:
+                        chunks.append(content)
+                        yield content
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"流式请求失败: {e}")
+            yield f"错误: {str(e)}"
+            return
+        finally:
+            if response is not None:
+                response.close()
 
-                    # SSE格式: data: {...}
-                    if line.startswith('data: '):
-                        data_str = line[6:]  # 移除 "data: " 前缀
+        # 只缓存完整结束（收到[DONE]）的流
+        if use_cache and completed and chunks:
+            await asyncio.to_thread(self.cache.set, key, ''.join(chunks), None, model)
 
-                        # 检查结束标记
-                        if data_str.strip() == '[DONE]':
-                            break
+    async def test_connection(self) -> Dict:
+        """
+        测试API连接
 
-                        try:
-                            data = json.loads(data_str)
+        Returns:
+            测试结果字典
+        """
+        try:
+            # 发送简单的测试请求
+            messages = [{"role": "user", "content": "Hi"}]
 
-                            # 提取内容
-                            if "choices" in data and len(data["choices"]) > 0:
-                                delta = data["choices"][0].get("delta", {})
-                                content = delta.get("content", "")
-                                if content:
-                                    yield content
+            result = await self.chat_completion(
+                messages=messages,
+                max_tokens=10,
+                cache=False
+            )
 
-                        except json.JSONDecodeError:
-                            continue
+            if result.get("success"):
+                return {
+                    "success": True,
+                    "message": "智谱AI API连接成功",
+                    "model": result["data"].get("model", "unknown")
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": result.get("error", "连接失败")
+                }
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"流式请求失败: {e}")
-            yield f"错误: {str(e)}"
+            return {
+                "success": False,
+                "message": f"连接测试失败: {str(e)}"
+            }
+
+
+class ZhipuClient:
+    """智谱AI客户端（同步接口，基于 AsyncZhipuClient 在应用事件循环中执行）"""
+
+    # API端点配置
+    API_BASE_URL = AsyncZhipuClient.API_BASE_URL
+    CHAT_ENDPOINT = AsyncZhipuClient.CHAT_ENDPOINT
+    AGENT_ENDPOINT = AsyncZhipuClient.AGENT_ENDPOINT
+
+    # 可用的免费模型
+    FREE_MODELS = AsyncZhipuClient.FREE_MODELS
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        transport: Optional[AsyncHTTPTransport] = None
+    ):
+        """
+        初始化智谱AI客户端
+
+        Args:
+            api_key: 智谱AI API密钥 (格式: id.secret)
+                    如果不提供，将从环境变量ZHIPU_API_KEY读取
+            cache: 补全结果缓存（可选，默认使用全局LLM缓存）
+            transport: HTTP传输层（可选，默认使用共享连接池）
+        """
+        self.async_client = AsyncZhipuClient(api_key=api_key, cache=cache, transport=transport)
+        self.api_key = self.async_client.api_key
+        self.cache = self.async_client.cache
+
+        logger.info("智谱AI客户端初始化成功")
+
+    def _parse_api_key(self) -> tuple[str, str]:
+        """
+        解析API密钥，提取ID和Secret
+
+        Returns:
+            (api_id, api_secret)
+        """
+        parts = self.api_key.split(".")
+        if len(parts) != 2:
+            raise ValueError("API密钥格式错误")
+
+        return parts[0], parts[1]
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "glm-4-flash",
+        stream: bool = False,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        custom_variables: Optional[Dict] = None,
+        cache: Optional[bool] = None
+    ) -> Dict:
+        """
+        调用智谱AI聊天补全API（参数同 AsyncZhipuClient.chat_completion）
+
+        Returns:
+            响应数据字典（命中缓存时包含 "cached": True）
+        """
+        return run_async(self.async_client.chat_completion(
+            messages=messages,
+            model=model,
+            stream=stream,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            custom_variables=custom_variables,
+            cache=cache
+        ))
+
+    def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "glm-4-flash",
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        custom_variables: Optional[Dict] = None,
+        cache: Optional[bool] = None
+    ) -> Generator[str, None, None]:
+        """
+        流式聊天补全（参数同 AsyncZhipuClient.chat_completion_stream）
+
+        Yields:
+            str: 每次生成的文本片段
+        """
+        stream = self.async_client.chat_completion_stream(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            custom_variables=custom_variables,
+            cache=cache
+        )
+        try:
+            while True:
+                try:
+                    chunk = run_async(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            # 提前结束迭代（如客户端断开）时关闭上游连接
+            run_async(stream.aclose())
 
     async def upload_document(
         self,
@@ -320,40 +792,45 @@ class ZhipuClient:
         Returns:
             上传结果字典
         """
-        def make_request():
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"文件不存在: {file_path}")
-
-            # 准备文件
-            files = {
-                'file': (os.path.basename(file_path), open(file_path, 'rb'))
+        # 检查文件是否存在
+        if not os.path.exists(file_path):
+            return {
+                "success": False,
+                "error": f"请求失败: 文件不存在: {file_path}"
             }
 
-            data = {
-                'knowledge_id': knowledge_id,
-                'knowledge_type': knowledge_type,
-                'parse_image': str(parse_image).lower()
-            }
+        # 读取文件内容（重试时可重复发送）
+        def read_file():
+            with open(file_path, 'rb') as f:
+                return f.read()
 
-            if custom_separator:
-                data['custom_separator'] = custom_separator
+        content = await asyncio.to_thread(read_file)
 
-            logger.info(f"上传文档到知识库: {knowledge_id}")
+        data = {
+            'knowledge_id': knowledge_id,
+            'knowledge_type': knowledge_type,
+            'parse_image': str(parse_image).lower()
+        }
 
-            # 注意: 知识库API的端点可能不同，这里使用通用端点
-            url = f"{self.API_BASE_URL}/knowledge/document"
+        if custom_separator:
+            data['custom_separator'] = custom_separator
 
-            response = self.session.post(
-                url,
-                files=files,
-                data=data,
-                timeout=300  # 5分钟超时（上传大文件）
-            )
+        logger.info(f"上传文档到知识库: {knowledge_id}")
 
-            return self._handle_response(response)
+        # 注意: 知识库API的端点可能不同，这里使用通用端点
+        url = f"{self.API_BASE_URL}/knowledge/document"
 
-        return self._retry_request(make_request, max_retries=2, retry_delay=2.0)
+        # multipart请求由requests自行设置Content-Type
+        return await self.async_client._request(
+            "POST",
+            url,
+            files={'file': (os.path.basename(file_path), content)},
+            data=data,
+            headers={"Content-Type": None},
+            timeout=300,  # 5分钟超时（上传大文件）
+            max_retries=2,
+            retry_delay=2.0
+        )
 
     async def upload_url_document(
         self,
@@ -374,26 +851,24 @@ class ZhipuClient:
         Returns:
             上传结果字典
         """
-        def make_request():
-            payload = {
-                'knowledge_id': knowledge_id,
-                'url': url,
-                'knowledge_type': knowledge_type,
-                'parse_image': parse_image
-            }
-
-            logger.info(f"通过URL上传文档到知识库: {knowledge_id}")
-
-            api_url = f"{self.API_BASE_URL}/knowledge/url-document"
-            response = self.session.post(
-                api_url,
-                json=payload,
-                timeout=60
-            )
+        payload = {
+            'knowledge_id': knowledge_id,
+            'url': url,
+            'knowledge_type': knowledge_type,
+            'parse_image': parse_image
+        }
 
-            return self._handle_response(response)
+        logger.info(f"通过URL上传文档到知识库: {knowledge_id}")
 
-        return self._retry_request(make_request, max_retries=2, retry_delay=2.0)
+        api_url = f"{self.API_BASE_URL}/knowledge/url-document"
+        return await self.async_client._request(
+            "POST",
+            api_url,
+            json=payload,
+            timeout=60,
+            max_retries=2,
+            retry_delay=2.0
+        )
 
     async def create_knowledge(
         self,
@@ -412,27 +887,18 @@ class ZhipuClient:
         Returns:
             创建结果字典
         """
-        def make_request():
-            payload = {
-                'name': name,
-                'permission': permission
-            }
-
-            if description:
-                payload['description'] = description
-
-            logger.info(f"创建知识库: {name}")
+        payload = {
+            'name': name,
+            'permission': permission
+        }
 
-            api_url = f"{self.API_BASE_URL}/knowledge"
-            response = self.session.post(
-                api_url,
-                json=payload,
-                timeout=30
-            )
+        if description:
+            payload['description'] = description
 
-            return self._handle_response(response)
+        logger.info(f"创建知识库: {name}")
 
-        return self._retry_request(make_request)
+        api_url = f"{self.API_BASE_URL}/knowledge"
+        return await self.async_client._request("POST", api_url, json=payload, timeout=30)
 
     async def get_conversation_history(
         self,
@@ -453,24 +919,15 @@ class ZhipuClient:
         Returns:
             对话历史字典
         """
-        def make_request():
-            params = {
-                'page': page,
-                'page_size': page_size
-            }
-
-            logger.info(f"获取对话历史: {conversation_id}")
-
-            api_url = f"{self.AGENT_ENDPOINT}/{agent_id}/conversations/{conversation_id}/messages"
-            response = self.session.get(
-                api_url,
-                params=params,
-                timeout=30
-            )
+        params = {
+            'page': page,
+            'page_size': page_size
+        }
 
-            return self._handle_response(response)
+        logger.info(f"获取对话历史: {conversation_id}")
 
-        return self._retry_request(make_request)
+        api_url = f"{self.AGENT_ENDPOINT}/{agent_id}/conversations/{conversation_id}/messages"
+        return await self.async_client._request("GET", api_url, params=params, timeout=30)
 
     async def create_agent(
         self,
@@ -491,27 +948,18 @@ class ZhipuClient:
         Returns:
             Agent创建结果
         """
-        def make_request():
-            payload = {
-                'name': name,
-                'prompt': prompt,
-                'model': model
-            }
-
-            if tools:
-                payload['tools'] = tools
-
-            logger.info(f"创建Agent: {name}")
+        payload = {
+            'name': name,
+            'prompt': prompt,
+            'model': model
+        }
 
-            response = self.session.post(
-                self.AGENT_ENDPOINT,
-                json=payload,
-                timeout=30
-            )
+        if tools:
+            payload['tools'] = tools
 
-            return self._handle_response(response)
+        logger.info(f"创建Agent: {name}")
 
-        return self._retry_request(make_request)
+        return await self.async_client._request("POST", self.AGENT_ENDPOINT, json=payload, timeout=30)
 
     async def test_connection(self) -> Dict:
         """
@@ -520,32 +968,7 @@ class ZhipuClient:
         Returns:
             测试结果字典
         """
-        try:
-            # 发送简单的测试请求
-            messages = [{"role": "user", "content": "Hi"}]
-
-            result = await self.chat_completion(
-                messages=messages,
-                max_tokens=10
-            )
-
-            if result.get("success"):
-                return {
-                    "success": True,
-                    "message": "智谱AI API连接成功",
-                    "model": result["data"].get("model", "unknown")
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": result.get("error", "连接失败")
-                }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"连接测试失败: {str(e)}"
-            }
+        return await self.async_client.test_connection()
 
     def is_free_model(self, model: str) -> bool:
         """
@@ -0,0 +1,120 @@
+"""
+ScholarAI - arXiv Atom Parser Tests
+
+Tests for the streaming arXiv Atom parser against the feedparser-based path.
+"""
+
+import asyncio
+import io
+import os
+from unittest.mock import MagicMock, patch
+
+import feedparser
+import pytest
+
+from services.arxiv_atom import iter_entries, parse_feed
+from services.arxiv_client import ArxivClient
+from services.arxiv_reader import ArxivReader
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'arxiv_feed.xml')
+
+# feedparser exposes arxiv:comment / arxiv:journal_ref as arxiv_comment / arxiv_journal_ref,
+# so the feedparser path always returned empty values for them
+FIXED_FIELDS = ('comment', 'journal_ref')
+
+
+@pytest.fixture
+def feed_bytes():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+
+class StaticTransport:
+    """Async transport stand-in returning a fixed body."""
+
+    def __init__(self, content):
+        self.content = content
+
+    async def get(self, url, **kwargs):
+        return MagicMock(status_code=200, content=self.content)
+
+
+@pytest.mark.unit
+class TestAtomParser:
+    """Test parity with feedparser and the arXiv-specific fields."""
+
+    def test_matches_feedparser_output(self, feed_bytes):
+        client = ArxivClient()
+        expected = [client._parse_paper(e) for e in feedparser.parse(feed_bytes).entries]
+
+        papers, total = parse_feed(feed_bytes)
+
+        assert total == 48213
+        assert len(papers) == len(expected) == 4
+        for paper, reference in zip(papers, expected):
+            assert set(paper) == set(reference)
+            for key in reference:
+                if key not in FIXED_FIELDS:
+                    assert paper[key] == reference[key], key
+
+    def test_reads_arxiv_extension_fields(self, feed_bytes):
+        papers, _ = parse_feed(feed_bytes)
+
+        assert papers[0]['comment'] == '15 pages, 5 figures'
+        assert papers[0]['journal_ref'] is None
+        assert papers[1]['journal_ref'] == 'Proc. ICML 40 (2023) 1-12'
+        assert papers[1]['comment'].endswith('?a=1&b=2')
+
+    def test_entities_and_unicode(self, feed_bytes):
+        papers, _ = parse_feed(feed_bytes)
+
+        assert papers[1]['title'].startswith('Scaling Laws & Sparse Mixtures')
+        assert papers[1]['authors'] == ['Zoë Müller', '李雷']
+        assert '<b>variants</b>' in papers[1]['summary']
+
+    def test_entry_fields(self, feed_bytes):
+        entry = next(iter_entries(io.BytesIO(feed_bytes)))
+
+        assert entry['primary_category'] == 'cs.CL'
+        assert entry['links'][1]['type'] == 'application/pdf'
+
+    def test_total_results_from_stream(self, feed_bytes):
+        info = {}
+        ids = [e['id'] for e in iter_entries(io.BytesIO(feed_bytes), info)]
+
+        assert info['total_results'] == 48213
+        assert ids[2] == 'http://arxiv.org/abs/hep-th/9711200v3'
+
+    def test_empty_feed(self):
+        assert parse_feed(b'<feed xmlns="http://www.w3.org/2005/Atom"></feed>') == ([], 0)
+
+
+@pytest.mark.unit
+class TestParserIntegration:
+    """Test the clients that use the streaming parser."""
+
+    def test_search_papers(self, feed_bytes):
+        client = ArxivClient()
+        client.http = StaticTransport(feed_bytes)
+
+        result = asyncio.run(client.search_papers('transformer', page_size=4))
+
+        assert result['data']['total'] == 48213
+        assert result['data']['papers'][0]['paper_id'] == '1706.03762'
+
+    def test_malformed_response_is_an_error(self):
+        client = ArxivClient()
+        client.http = StaticTransport(b'<html>Service Unavailable')
+
+        result = asyncio.run(client.get_paper_details('2301.00009'))
+
+        assert result['success'] is False
+
+    def test_reader_metadata(self, feed_bytes):
+        response = MagicMock(content=feed_bytes)
+        with patch('services.arxiv_reader.requests.get', return_value=response):
+            metadata = ArxivReader().fetch_paper_metadata('1706.03762')
+
+        assert metadata['primary_category'] == 'cs.CL'
+        assert metadata['pdf_url'] == 'https://arxiv.org/pdf/1706.03762v7'
+        assert metadata['comment'] == '15 pages, 5 figures'
@@ -0,0 +1,254 @@
+"""
+ScholarAI - arXiv Harvest Tests
+
+Tests for the incremental, watermark-based arXiv harvest against a local stand-in for the arXiv API.
+"""
+
+import asyncio
+import re
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services.arxiv_client import ArxivClient
+from services.arxiv_harvest import ArxivHarvester, LeaseLost
+from services.local_index import LocalPaperIndex
+from services.paper_store import PaperStore
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+WINDOW_PATTERN = re.compile(r'cat:(\S+) AND lastUpdatedDate:\[(\d{12}) TO (\d{12})\]')
+
+ENTRY = """<entry>
+  <id>http://arxiv.org/abs/{id}v1</id>
+  <updated>{updated}</updated>
+  <published>{updated}</published>
+  <title>Paper {id}</title>
+  <summary>Abstract of {id}</summary>
+  <author><name>Ada Lovelace</name></author>
+  <link href="http://arxiv.org/pdf/{id}v1" rel="related" type="application/pdf"/>
+  <arxiv:primary_category term="{category}"/>
+  <category term="{category}"/>
+</entry>"""
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+  {entries}
+</feed>"""
+
+
+class FakeArxivAPI:
+    """Local stand-in for export.arxiv.org/api/query: filters entries by category and update window."""
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda e: e['updated'])
+        self.queries = []
+        self.fail_after = None
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                api.queries.append(params)
+                if api.fail_after is not None and len(api.queries) > api.fail_after:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = api.respond(params).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/atom+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/api/query'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, params):
+        category, since, until = WINDOW_PATTERN.match(params['search_query']).groups()
+        since = datetime.strptime(since, '%Y%m%d%H%M')
+        until = datetime.strptime(until, '%Y%m%d%H%M')
+        matches = [e for e in self.entries if e['category'] == category and since <= e['updated'] <= until]
+        start, size = int(params['start']), int(params['max_results'])
+        entries = '\n'.join(
+            ENTRY.format(id=e['id'], category=e['category'], updated=e['updated'].strftime('%Y-%m-%dT%H:%M:%SZ'))
+            for e in matches[start:start + size]
+        )
+        return FEED.format(total=len(matches), entries=entries)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def entry(n, hours_ago, category='cs.AI'):
+    return {'id': f'2603.{n:05d}', 'updated': NOW - timedelta(hours=hours_ago), 'category': category}
+
+
+class WatermarkCollection:
+    """Minimal in-memory stand-in for the harvest_watermarks collection."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        return self.docs.get(query['_id'])
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query['_id'], {'_id': query['_id'], 'harvested': 0})
+        doc.update(update['$set'])
+        doc['harvested'] += update['$inc']['harvested']
+
+    def find_one_and_update(self, query, update, upsert=False):
+        doc = self.docs.get(query['_id'])
+        if doc is not None:
+            owner, expiry = query['$or']
+            if doc['owner'] != owner['owner'] and doc['expires_at'] > expiry['expires_at']['$lte']:
+                raise DuplicateKeyError('E11000 duplicate key error')
+        self.docs[query['_id']] = dict(update['$set'], _id=query['_id'])
+
+
+@pytest.fixture
+def api():
+    api = FakeArxivAPI(
+        [entry(n, hours_ago=2 + n * 12) for n in range(10)] + [entry(99, hours_ago=5, category='cs.CL')]
+    )
+    yield api
+    api.close()
+
+
+def make_harvester(api, watermarks=None, **kwargs):
+    client = ArxivClient()
+    client.BASE_URL = api.url
+    papers = MagicMock()
+    options = dict(lookback=timedelta(days=7), overlap=timedelta(hours=72), page_size=3)
+    options.update(kwargs)
+    harvester = ArxivHarvester(
+        client=client, store=PaperStore(collection=papers), index=LocalPaperIndex(),
+        collection=watermarks or WatermarkCollection(), **options
+    )
+    return harvester, papers
+
+
+def stored_ids(papers):
+    return [op._filter['paper_id'] for call in papers.bulk_write.call_args_list for op in call[0][0]]
+
+
+@pytest.mark.unit
+class TestArxivHarvest:
+    """Test windowed paging, watermarks and resuming."""
+
+    def test_first_harvest_uses_lookback(self, api):
+        harvester, papers = make_harvester(api)
+
+        result = asyncio.run(harvester.harvest('cs.AI', now=NOW))
+
+        assert result['harvested'] == 10
+        assert result['windows'] == 7
+        assert sorted(stored_ids(papers)) == [f'2603.{n:05d}' for n in range(10)]
+        assert harvester.watermark('cs.AI') == NOW
+        assert harvester.index.search('paper')['total'] == 10
+        params = api.queries[0]
+        assert params['sortBy'] == 'lastUpdatedDate' and params['sortOrder'] == 'ascending'
+
+    def test_papers_are_normalized(self, api):
+        harvester, papers = make_harvester(api)
+
+        asyncio.run(harvester.harvest('cs.CL', now=NOW))
+
+        document = papers.bulk_write.call_args[0][0][0]._doc
+        assert document['source'] == 'arxiv'
+        assert document['ids']['arxiv'] == '2603.00099'
+        assert document['data']['pdf_url'] == 'http://arxiv.org/pdf/2603.00099v1'
+        assert document['data']['primary_category'] == 'cs.CL'
+
+    def test_windows_are_paged(self, api):
+        api.entries += [entry(200 + n, hours_ago=1) for n in range(7)]
+        harvester, papers = make_harvester(api, lookback=timedelta(hours=3))
+
+        result = asyncio.run(harvester.harvest('cs.AI', now=NOW))
+
+        assert result['harvested'] == 8
+        assert [q['start'] for q in api.queries] == ['0', '3', '6']
+
+    def test_next_run_resumes_from_watermark(self, api):
+        watermarks = WatermarkCollection()
+        harvester, _ = make_harvester(api, watermarks=watermarks)
+        asyncio.run(harvester.harvest('cs.AI', now=NOW))
+        api.queries.clear()
+        api.entries.append(entry(300, hours_ago=-1))
+
+        harvester, papers = make_harvester(api, watermarks=watermarks)
+        result = asyncio.run(harvester.harvest('cs.AI', now=NOW + timedelta(hours=2)))
+
+        # only the overlap is re-read: 6 entries from the last 72 hours plus the new one
+        assert sorted(stored_ids(papers)) == [f'2603.{n:05d}' for n in (0, 1, 2, 3, 4, 5, 300)]
+        assert result['windows'] == 4
+        assert watermarks.docs['arxiv:cs.AI']['watermark'] == NOW + timedelta(hours=2)
+
+    def test_failure_keeps_last_complete_window(self, api):
+        harvester, _ = make_harvester(api)
+        api.fail_after = 3
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(harvester.harvest('cs.AI', now=NOW))
+
+        assert harvester.watermark('cs.AI') == NOW - timedelta(days=4)
+
+    def test_run_reports_errors_per_category(self, api, monkeypatch):
+        harvester, _ = make_harvester(api)
+        api.fail_after = 0
+        monkeypatch.setattr('services.event_loop.run_async', lambda coro, timeout=None: asyncio.run(coro))
+
+        results = harvester.run(['cs.AI'])
+
+        assert 'error' in results['cs.AI']
+
+    def test_lease_allows_one_harvester(self):
+        watermarks = WatermarkCollection()
+        first = ArxivHarvester(collection=watermarks, interval=timedelta(hours=6), owner='worker-1')
+        second = ArxivHarvester(collection=watermarks, interval=timedelta(hours=6), owner='worker-2')
+
+        assert first.acquire_lease(now=NOW) is True
+        assert second.acquire_lease(now=NOW) is False
+        assert first.acquire_lease(now=NOW + timedelta(hours=6)) is True
+        assert second.acquire_lease(now=NOW + timedelta(hours=10)) is False
+        # the holder stopped renewing: the lease expires after interval + grace
+        assert second.acquire_lease(now=NOW + timedelta(hours=13, minutes=1)) is True
+        assert watermarks.docs['lease:arxiv']['owner'] == 'worker-2'
+
+    def test_harvest_stops_when_lease_is_lost(self, api):
+        watermarks = WatermarkCollection()
+        harvester, _ = make_harvester(api, watermarks=watermarks, owner='worker-1')
+        assert harvester.acquire_lease()
+        harvest_window = harvester.harvest_window
+
+        async def window_then_takeover(*args):
+            written = await harvest_window(*args)
+            watermarks.docs['lease:arxiv'] = {'_id': 'lease:arxiv', 'owner': 'worker-2', 'expires_at': datetime.max}
+            return written
+
+        harvester.harvest_window = window_then_takeover
+
+        with pytest.raises(LeaseLost):
+            asyncio.run(harvester.harvest('cs.AI', now=NOW, lease=True))
+
+        assert harvester.watermark('cs.AI') == NOW - timedelta(days=6)
+
+    def test_disabled_without_categories(self):
+        harvester = ArxivHarvester(categories=[], collection=WatermarkCollection())
+
+        harvester.start()
+
+        assert harvester._thread is None
@@ -0,0 +1,204 @@
+"""
+ScholarAI - Bulk Ingestion Tests
+
+Tests for parsing OpenAlex/arXiv dumps and resumable bulk writes into the paper store.
+"""
+
+import functools
+import gzip
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from services.bulk_ingest import BulkIngester, Checkpoint, ingest_lines, parse_arxiv_record
+from services.paper_store import PaperStore
+
+ARXIV_RECORD = {
+    'id': '2301.00001',
+    'submitter': 'Ada Lovelace',
+    'authors': 'Ada Lovelace and Alan Turing',
+    'title': 'Attention\n  Is All You Need',
+    'comments': '15 pages',
+    'journal-ref': 'NeurIPS 2017',
+    'doi': '10.1/attention',
+    'categories': 'cs.CL cs.LG',
+    'abstract': '  We propose the Transformer.\n',
+    'versions': [
+        {'version': 'v1', 'created': 'Mon, 2 Jan 2023 10:00:00 GMT'},
+        {'version': 'v2', 'created': 'Tue, 3 Jan 2023 12:30:00 GMT'}
+    ],
+    'update_date': '2023-01-03',
+    'authors_parsed': [['Lovelace', 'Ada', ''], ['Turing', 'Alan', 'Jr']]
+}
+
+OPENALEX_WORK = {
+    'id': 'https://openalex.org/W42',
+    'doi': 'https://doi.org/10.1/w42',
+    'title': 'Graph Networks',
+    'publication_year': 2020,
+    'publication_date': '2020-05-01',
+    'authorships': [{'author': {'display_name': 'Grace Hopper'}}],
+    'abstract_inverted_index': {'Graphs': [0], 'are': [1], 'everywhere': [2, 4], 'and': [3]},
+    'cited_by_count': 3
+}
+
+
+def arxiv_line(n):
+    record = dict(ARXIV_RECORD, id=f'2301.{n:05d}')
+    return json.dumps(record) + '\n'
+
+
+def write_dump(path, lines, compress=True):
+    opener = gzip.open if compress else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.writelines(lines)
+    return str(path)
+
+
+def stored_ids(collection):
+    ids = []
+    for call in collection.bulk_write.call_args_list:
+        ids.extend(op._filter['paper_id'] for op in call[0][0])
+    return ids
+
+
+class FileStore:
+    """Picklable store for worker processes: records paper ids in a file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def upsert_many(self, items):
+        items = list(items)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(f"{paper['paper_id']}\n" for paper, _ in items)
+        return len(items)
+
+    insert_missing = upsert_many
+
+
+@pytest.mark.unit
+class TestParsing:
+    """Test normalization of dump records."""
+
+    def test_arxiv_record(self):
+        paper = parse_arxiv_record(ARXIV_RECORD)
+
+        assert paper['paper_id'] == '2301.00001'
+        assert paper['title'] == 'Attention Is All You Need'
+        assert paper['summary'] == 'We propose the Transformer.'
+        assert paper['authors'] == ['Ada Lovelace', 'Alan Turing Jr']
+        assert paper['categories'] == ['cs.CL', 'cs.LG']
+        assert paper['published'].startswith('2023-01-02')
+        assert paper['pdf_url'].endswith('2301.00001v2')
+        assert paper['doi'] == '10.1/attention'
+
+    def test_old_style_arxiv_id(self):
+        paper = parse_arxiv_record(dict(ARXIV_RECORD, id='hep-th/9901001'))
+
+        assert paper['paper_id'] == 'hep-th/9901001'
+
+    def test_openalex_abstract_is_rebuilt(self):
+        collection = MagicMock()
+
+        counts = ingest_lines([json.dumps(OPENALEX_WORK).encode()], 'openalex', PaperStore(collection=collection))
+
+        assert counts['written'] == 1
+        document = collection.bulk_write.call_args[0][0][0]._doc
+        assert document['source'] == 'openalex'
+        assert document['data']['summary'] == 'Graphs are everywhere and everywhere'
+
+    def test_invalid_lines_are_counted(self):
+        collection = MagicMock()
+        lines = [b'{not json', b'\n', json.dumps({'title': 'no id'}).encode(), arxiv_line(1).encode()]
+
+        counts = ingest_lines(lines, 'arxiv', PaperStore(collection=collection))
+
+        assert counts == {'records': 3, 'written': 1, 'skipped': 1, 'invalid': 1, 'errors': 0}
+
+    def test_bulk_write_errors_are_counted(self):
+        collection = MagicMock()
+        collection.bulk_write.side_effect = BulkWriteError({'writeErrors': [{'index': 0}]})
+        lines = [arxiv_line(n).encode() for n in range(3)]
+
+        counts = ingest_lines(lines, 'arxiv', PaperStore(collection=collection))
+
+        assert counts['written'] == 2
+        assert counts['errors'] == 1
+
+
+@pytest.mark.unit
+class TestBulkIngester:
+    """Test batching, checkpoints and resuming."""
+
+    @pytest.mark.parametrize('compress', [True, False])
+    def test_ingest_in_batches(self, tmp_path, compress):
+        path = write_dump(tmp_path / ('dump.json.gz' if compress else 'dump.json'), [arxiv_line(n) for n in range(25)], compress)
+        collection = MagicMock()
+        ingester = BulkIngester('arxiv', store=PaperStore(collection=collection), workers=0, batch_size=10,
+                                checkpoint=str(tmp_path / 'ckpt.json'))
+
+        stats = ingester.ingest([path])
+
+        assert stats['written'] == 25
+        assert collection.bulk_write.call_count == 3
+        assert all(call[1]['ordered'] is False for call in collection.bulk_write.call_args_list)
+        progress = Checkpoint(str(tmp_path / 'ckpt.json')).get(path)
+        assert progress['lines'] == 25 and progress['done'] is True
+
+    @pytest.mark.parametrize('compress', [True, False])
+    def test_resume_from_checkpoint(self, tmp_path, compress):
+        lines = [arxiv_line(n) for n in range(25)]
+        path = write_dump(tmp_path / ('dump.json.gz' if compress else 'dump.json'), lines, compress)
+        checkpoint = Checkpoint(str(tmp_path / 'ckpt.json'))
+        checkpoint.update(path, 20, len(''.join(lines[:20]).encode()))
+        checkpoint.save()
+        collection = MagicMock()
+        ingester = BulkIngester('arxiv', store=PaperStore(collection=collection), workers=0, batch_size=10,
+                                checkpoint=str(tmp_path / 'ckpt.json'))
+
+        ingester.ingest([path])
+
+        assert stored_ids(collection) == [f'2301.{n:05d}' for n in range(20, 25)]
+
+    def test_finished_files_are_skipped(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.json.gz', [arxiv_line(1)])
+        collection = MagicMock()
+        kwargs = dict(store=PaperStore(collection=collection), workers=0, checkpoint=str(tmp_path / 'ckpt.json'))
+
+        BulkIngester('arxiv', **kwargs).ingest([path])
+        stats = BulkIngester('arxiv', **kwargs).ingest([path])
+
+        assert collection.bulk_write.call_count == 1
+        assert stats['files'] == 0
+
+    def test_directory_input(self, tmp_path):
+        write_dump(tmp_path / 'part_001.gz', [arxiv_line(1)])
+        write_dump(tmp_path / 'part_000.gz', [arxiv_line(0)])
+        (tmp_path / 'manifest').write_text('{}')
+        collection = MagicMock()
+
+        stats = BulkIngester('arxiv', store=PaperStore(collection=collection), workers=0).ingest([str(tmp_path)])
+
+        assert stats['files'] == 2
+        assert stored_ids(collection) == ['2301.00000', '2301.00001']
+
+    def test_worker_processes(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.json.gz', [arxiv_line(n) for n in range(40)])
+        output = tmp_path / 'written.txt'
+        ingester = BulkIngester('arxiv', workers=2, batch_size=7, checkpoint=str(tmp_path / 'ckpt.json'),
+                                store_factory=functools.partial(FileStore, str(output)))
+
+        stats = ingester.ingest([path])
+
+        assert stats['written'] == 40
+        assert sorted(output.read_text().split()) == [f'2301.{n:05d}' for n in range(40)]
+        assert Checkpoint(str(tmp_path / 'ckpt.json')).get(path)['lines'] == 40
+
+    def test_invalid_options(self):
+        with pytest.raises(ValueError):
+            BulkIngester('pubmed')
+        with pytest.raises(ValueError):
+            BulkIngester('arxiv', mode='merge')
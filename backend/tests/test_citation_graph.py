@@ -0,0 +1,283 @@
+"""
+ScholarAI - Citation Graph Tests
+
+Tests for the local citation graph: paginated fill, caching, persistence and traversal queries.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.citation_graph import CitationGraph
+
+
+def pid(name):
+    """40-hex S2 style id for a short test name."""
+    return name.encode().hex().ljust(40, '0')[:40]
+
+
+# citing -> [cited]
+REFERENCES = {
+    'a': ['c', 'd'],
+    'b': ['c', 'd', 'e'],
+    'c': ['f'],
+    'd': ['f'],
+    'e': [],
+    'f': ['g'],
+    'g': []
+}
+NAMES = {pid(name): name for name in REFERENCES}
+
+
+class FakeS2Client:
+    """Serves REFERENCES through the paginated citation endpoint."""
+
+    CITATION_PAGE_SIZE = 2
+
+    def __init__(self):
+        self.pages = []
+        self.fail = set()
+
+    def _neighbors(self, name, direction):
+        if direction == 'references':
+            return REFERENCES[name]
+        return sorted(citing for citing, cited in REFERENCES.items() if name in cited)
+
+    async def get_citation_page(self, paper_id, direction='citations', offset=0, limit=2):
+        self.pages.append((NAMES[paper_id], direction, offset))
+        if paper_id in self.fail:
+            return {'success': False, 'error': 'boom'}
+        names = self._neighbors(NAMES[paper_id], direction)
+        page = names[offset:offset + limit]
+        following = offset + limit if offset + limit < len(names) else None
+        return {
+            'success': True,
+            'data': {
+                'papers': [
+                    {'paper_id': pid(n), 'title': n.upper(), 'year': 2020, 'citation_count': ord(n)}
+                    for n in page
+                ],
+                'next': following
+            }
+        }
+
+    async def get_paper_details(self, paper_id, profile='full'):
+        if paper_id == 'arXiv:1':
+            return {'success': True, 'data': {'paper_id': pid('a'), 'title': 'A'}}
+        return {'success': False, 'error': 'not found'}
+
+
+class WideS2Client:
+    """Gives every paper `width` distinct citing papers."""
+
+    CITATION_PAGE_SIZE = 1000
+
+    def __init__(self, width):
+        self.width = width
+
+    async def get_citation_page(self, paper_id, direction='citations', offset=0, limit=1000):
+        papers = [{'paper_id': f'{paper_id}:{i}'} for i in range(offset, min(offset + limit, self.width))]
+        following = offset + limit if offset + limit < self.width else None
+        return {'success': True, 'data': {'papers': papers, 'next': following}}
+
+
+def make_graph(**kwargs):
+    client = FakeS2Client()
+    kwargs.setdefault('persist', False)
+    return CitationGraph(client=client, **kwargs), client
+
+
+@pytest.mark.unit
+class TestFill:
+    """Test loading adjacency lists."""
+
+    def test_paginates_and_caches(self):
+        graph, client = make_graph()
+
+        first = asyncio.run(graph.neighbors(pid('b'), 'references'))
+        second = asyncio.run(graph.neighbors(pid('b'), 'references', offset=1, limit=1))
+
+        assert first['total'] == 3
+        # sorted by citation_count desc
+        assert [p['title'] for p in first['papers']] == ['E', 'D', 'C']
+        assert [p['title'] for p in second['papers']] == ['D']
+        assert client.pages == [('b', 'references', 0), ('b', 'references', 2)]
+        assert graph.stats()['memory_hits'] == 1
+
+    def test_fill_records_reverse_edges(self):
+        graph, _ = make_graph()
+
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+
+        assert graph.adjacent(pid('c'), 'citations') == {pid('a')}
+
+    def test_max_edges_truncates(self):
+        graph, _ = make_graph(max_edges=2)
+
+        result = asyncio.run(graph.neighbors(pid('b'), 'references'))
+
+        assert result['total'] == 2
+        assert result['truncated'] is True
+
+    def test_concurrent_ensure_loads_once(self):
+        graph, client = make_graph()
+
+        async def run():
+            await asyncio.gather(*[graph.ensure(pid('a'), 'references') for _ in range(5)])
+
+        asyncio.run(run())
+
+        assert client.pages == [('a', 'references', 0)]
+
+    def test_stale_entries_are_refetched(self):
+        graph, client = make_graph(max_age=timedelta(seconds=60))
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+        graph._complete[(pid('a'), 'references')]['fetched_at'] -= timedelta(minutes=5)
+
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+
+        assert len(client.pages) == 2
+
+    def test_lru_eviction_drops_adjacency(self):
+        graph, _ = make_graph(cache_size=1)
+
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+        asyncio.run(graph.ensure(pid('b'), 'references'))
+
+        assert graph.adjacent(pid('a'), 'references') == set()
+        assert len(graph.adjacent(pid('b'), 'references')) == 3
+
+    def test_eviction_releases_reverse_edges(self):
+        graph, _ = make_graph(cache_size=1)
+
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+        asyncio.run(graph.ensure(pid('e'), 'references'))
+
+        assert graph.adjacent(pid('c'), 'citations') == set()
+        assert graph._adjacency['citations'] == {}
+
+    def test_memory_stays_bounded(self):
+        graph = CitationGraph(client=WideS2Client(width=1000), persist=False, cache_size=2, max_edges=1000)
+
+        for n in range(50):
+            asyncio.run(graph.ensure(f'{n:040x}', 'citations'))
+
+        assert graph.stats()['cached_adjacency'] == 2
+        assert len(graph._adjacency['citations']) == 2
+        assert len(graph._adjacency['references']) == 2000
+
+    def test_upstream_failure_raises(self):
+        graph, client = make_graph()
+        client.fail.add(pid('a'))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(graph.ensure(pid('a'), 'references'))
+
+    def test_invalid_direction(self):
+        graph, _ = make_graph()
+
+        with pytest.raises(ValueError):
+            asyncio.run(graph.ensure(pid('a'), 'sideways'))
+
+    def test_resolve(self):
+        graph, _ = make_graph()
+
+        assert asyncio.run(graph.resolve(pid('a'))) == pid('a')
+        assert asyncio.run(graph.resolve('arXiv:1')) == pid('a')
+        assert asyncio.run(graph.resolve('missing')) is None
+
+
+@pytest.mark.unit
+class TestPersistence:
+    """Test the MongoDB tier."""
+
+    def test_fetched_lists_are_written(self):
+        edges, nodes = MagicMock(), MagicMock()
+        nodes.find_one.return_value = None
+        graph, _ = make_graph(edges=edges, nodes=nodes, persist=True)
+
+        asyncio.run(graph.ensure(pid('a'), 'references'))
+
+        edge_ops = edges.bulk_write.call_args[0][0]
+        assert len(edge_ops) == 2
+        node_ops = nodes.bulk_write.call_args[0][0]
+        assert node_ops[-1]._filter == {'_id': pid('a')}
+
+    def test_fresh_store_entry_skips_upstream(self):
+        edges, nodes = MagicMock(), MagicMock()
+        nodes.find_one.return_value = {
+            '_id': pid('a'),
+            'references_fetched_at': datetime.utcnow(),
+            'references_truncated': False
+        }
+        edges.find.return_value = [{'cited': pid('c')}, {'cited': pid('d')}]
+        nodes.find.return_value = [{'_id': pid('c'), 'title': 'C', 'year': 2020, 'citation_count': 5}]
+        graph, client = make_graph(edges=edges, nodes=nodes, persist=True)
+
+        result = asyncio.run(graph.neighbors(pid('a'), 'references'))
+
+        assert client.pages == []
+        assert result['total'] == 2
+        assert result['papers'][0]['title'] == 'C'
+        assert graph.stats()['store_hits'] == 1
+
+    def test_store_errors_fall_back_to_upstream(self):
+        edges, nodes = MagicMock(), MagicMock()
+        nodes.find_one.side_effect = Exception('mongo down')
+        edges.bulk_write.side_effect = Exception('mongo down')
+        graph, client = make_graph(edges=edges, nodes=nodes, persist=True)
+
+        result = asyncio.run(graph.neighbors(pid('a'), 'references'))
+
+        assert result['total'] == 2
+        assert client.pages == [('a', 'references', 0)]
+
+
+@pytest.mark.unit
+class TestQueries:
+    """Test traversal queries."""
+
+    def test_neighborhood_two_hops(self):
+        graph, _ = make_graph()
+
+        result = asyncio.run(graph.neighborhood(pid('a'), hops=2, direction='references'))
+
+        hops = {NAMES[n['paper_id']]: n['hop'] for n in result['nodes']}
+        assert hops == {'a': 0, 'c': 1, 'd': 1, 'f': 2}
+        assert {'citing': pid('c'), 'cited': pid('f')} in result['edges']
+        assert result['errors'] == {}
+
+    def test_neighborhood_respects_max_nodes(self):
+        graph, _ = make_graph()
+
+        result = asyncio.run(graph.neighborhood(pid('f'), hops=3, max_nodes=3))
+
+        assert len(result['nodes']) == 3
+
+    def test_common_citations_and_references(self):
+        graph, _ = make_graph()
+
+        cocited = asyncio.run(graph.common([pid('c'), pid('d')], 'citations'))
+        shared_refs = asyncio.run(graph.common([pid('a'), pid('b')], 'references'))
+
+        assert {NAMES[p['paper_id']] for p in cocited['papers']} == {'a', 'b'}
+        assert {NAMES[p['paper_id']] for p in shared_refs['papers']} == {'c', 'd'}
+
+    def test_shortest_path_ignores_direction(self):
+        graph, _ = make_graph()
+
+        result = asyncio.run(graph.shortest_path(pid('a'), pid('e')))
+
+        names = [NAMES[p['paper_id']] for p in result['path']]
+        assert names[0] == 'a' and names[-1] == 'e'
+        assert len(names) == 4  # a -> c|d <- b -> e
+        assert {'citing': pid('b'), 'cited': pid('e')} in result['edges']
+
+    def test_shortest_path_not_found_within_depth(self):
+        graph, _ = make_graph()
+
+        result = asyncio.run(graph.shortest_path(pid('e'), pid('g'), max_depth=1))
+
+        assert result['path'] is None
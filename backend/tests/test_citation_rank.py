@@ -0,0 +1,228 @@
+"""
+ScholarAI - Citation Ranking Tests
+
+Tests for PageRank / co-citation / coupling scores over the local citation graph.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from services.citation_rank import (
+    CitationRanker, cocitation_strength, coupling_strength, pagerank
+)
+from services.unified_search import UnifiedPaperSearch
+
+# citing -> cited
+EDGES = [
+    ('a', 'c'), ('a', 'd'),
+    ('b', 'c'), ('b', 'd'), ('b', 'e'),
+    ('c', 'f'), ('d', 'f'),
+    ('f', 'g'),
+    ('a', 'c')  # duplicate
+]
+
+
+def dense_adjacency(edges):
+    ids = sorted({n for edge in edges for n in edge})
+    index = {pid: i for i, pid in enumerate(ids)}
+    matrix = np.zeros((len(ids), len(ids)))
+    for citing, cited in edges:
+        matrix[index[citing], index[cited]] = 1.0
+    return ids, matrix
+
+
+def reference_pagerank(matrix, damping=0.85, iterations=200):
+    """Dense power iteration used as the reference implementation."""
+    n = len(matrix)
+    out_degree = matrix.sum(axis=1)
+    transition = np.where(out_degree[:, None] > 0, matrix / np.maximum(out_degree, 1)[:, None], 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        scores = (1 - damping) / n + damping * transition.T @ scores
+    return scores
+
+
+def built_ranker(**kwargs):
+    ranker = CitationRanker(**kwargs)
+    ranker.build(EDGES, aliases=[('e', {'arxiv': '2301.00001', 'doi': '10.1/e'})])
+    return ranker
+
+
+@pytest.mark.unit
+class TestScores:
+    """Test the vectorized score functions."""
+
+    def test_pagerank_matches_dense_reference(self):
+        ids, matrix = dense_adjacency(EDGES)
+
+        scores, iterations = pagerank(csr_matrix(matrix), tol=1e-12, max_iter=500)
+
+        np.testing.assert_allclose(scores, reference_pagerank(matrix), atol=1e-9)
+        assert scores.sum() == pytest.approx(1.0)
+        assert 1 < iterations < 500
+
+    def test_warm_start_converges_faster(self):
+        _, matrix = dense_adjacency(EDGES)
+        adjacency = csr_matrix(matrix)
+
+        scores, cold = pagerank(adjacency)
+        _, warm = pagerank(adjacency, start=scores)
+
+        assert warm < cold
+
+    def test_strengths_match_pairwise_counts(self):
+        _, matrix = dense_adjacency(EDGES)
+        adjacency = csr_matrix(matrix)
+        cocitation = matrix.T @ matrix
+        coupling = matrix @ matrix.T
+        np.fill_diagonal(cocitation, 0)
+        np.fill_diagonal(coupling, 0)
+
+        np.testing.assert_array_equal(cocitation_strength(adjacency), cocitation.sum(axis=1))
+        np.testing.assert_array_equal(coupling_strength(adjacency), coupling.sum(axis=1))
+
+    def test_empty_graph(self):
+        ranker = CitationRanker()
+
+        assert ranker.build([]) == 0
+        assert ranker.scores('a') is None
+        assert ranker.related('a') == []
+
+
+@pytest.mark.unit
+class TestCitationRanker:
+    """Test building, lookups and re-ranking."""
+
+    def test_build_scores(self):
+        ranker = built_ranker()
+
+        assert ranker.edges == 8
+        assert ranker.scores('g')['percentile'] == 1.0
+        assert ranker.scores('c')['cocitation'] == 3  # with d twice, with e once
+        assert ranker.scores('a')['coupling'] == 2
+        assert ranker.scores('x') is None
+
+    def test_related_by_cocitation_and_coupling(self):
+        ranker = built_ranker()
+
+        related = dict(ranker.related('c'))
+
+        assert related['d']['cocitation'] == 2
+        assert related['d']['coupling'] == 1
+        assert related['e']['cocitation'] == 1
+        assert 'c' not in related
+        assert list(dict(ranker.related('c', k=1))) == ['d']
+
+    def test_lookup_by_external_ids(self):
+        ranker = built_ranker()
+
+        arxiv = ranker.lookup({'paper_id': '2301.00001v2'}, 'arxiv')
+        openalex = ranker.lookup({'paper_id': 'W1', 'doi': 'https://doi.org/10.1/E'}, 'openalex')
+
+        assert arxiv == openalex == ranker.scores('e')
+        assert ranker.lookup({'paper_id': 'W2'}, 'openalex') is None
+
+    def test_rerank_promotes_central_papers(self):
+        ranker = built_ranker()
+        papers = [
+            {'paper_id': 'a', 'source': 'semantic_scholar'},
+            {'paper_id': 'W9', 'source': 'openalex'},
+            {'paper_id': 'g', 'source': 'semantic_scholar'}
+        ]
+
+        ranked = ranker.rerank(papers, weight=0.9)
+
+        assert [p['paper_id'] for p in ranked] == ['g', 'W9', 'a']
+        assert ranked[0]['citation_rank'] == 1.0
+        assert ranked[1]['citation_rank'] is None
+        assert 'citation_rank' not in papers[0]
+
+    def test_rerank_without_weight_keeps_order(self):
+        ranker = built_ranker()
+        papers = [{'paper_id': pid, 'source': 'semantic_scholar'} for pid in 'gab']
+
+        assert [p['paper_id'] for p in ranker.rerank(papers, weight=0.0)] == ['g', 'a', 'b']
+
+    def test_rebuild_uses_previous_scores(self):
+        ranker = built_ranker()
+        cold_iterations = ranker.iterations
+
+        ranker.build(EDGES + [('e', 'g')])
+
+        assert ranker.iterations < cold_iterations
+
+    def test_save_scores_skips_unchanged(self):
+        ranker = built_ranker()
+        collection = MagicMock()
+        previous = {pid: ranker.scores(pid) for pid in 'abcdefg'}
+        previous['g']['pagerank'] *= 2
+        previous['c']['cocitation'] -= 1
+
+        written = ranker.save_scores(collection, previous=previous)
+
+        assert written == 2
+        assert [op._filter for op in collection.bulk_write.call_args[0][0]] == [{'_id': 'c'}, {'_id': 'g'}]
+
+    def test_stored_scores_are_used_without_iterating(self):
+        stored = {pid: built_ranker().scores(pid) for pid in 'abcdefg'}
+        stored['a']['percentile'] = 0.99
+        ranker = CitationRanker()
+
+        ranker.build(EDGES, stored=stored)
+
+        assert ranker.iterations == 0
+        assert ranker.scores('a')['percentile'] == 0.99
+        assert ranker.scores('c')['cocitation'] == 3
+
+    def test_partial_stored_scores_warm_start(self):
+        stored = {pid: built_ranker().scores(pid) for pid in 'abcdefg'}
+        ranker = CitationRanker()
+
+        ranker.build(EDGES + [('h', 'g')], stored=stored)
+
+        assert 0 < ranker.iterations < built_ranker().iterations
+        assert ranker.scores('h') is not None
+
+    def test_load_scores(self):
+        collection = MagicMock()
+        collection.find.return_value = [
+            {'_id': 'a', 'pagerank': 0.1, 'percentile': 0.5, 'cocitation': 1, 'coupling': 2},
+            {'_id': 'b', 'pagerank': 0.2}
+        ]
+
+        assert CitationRanker().load_scores(collection) == {
+            'a': {'pagerank': 0.1, 'percentile': 0.5, 'cocitation': 1, 'coupling': 2}
+        }
+
+    def test_save_scores_in_batches(self):
+        ranker = built_ranker()
+        collection = MagicMock()
+
+        assert ranker.save_scores(collection, batch_size=3) == 7
+        assert collection.bulk_write.call_count == 3
+
+
+@pytest.mark.unit
+class TestSearchRanking:
+    """Test re-ranking in the unified search."""
+
+    def test_citation_rank_reorders_page(self, monkeypatch):
+        ranker = built_ranker()
+        monkeypatch.setattr('services.citation_rank.get_citation_ranker', lambda graph=None: ranker)
+        search = UnifiedPaperSearch.__new__(UnifiedPaperSearch)
+        search.RANK_WEIGHT = 0.9
+        result = {'success': True, 'data': {'papers': [
+            {'paper_id': 'a', 'source': 'semantic_scholar'},
+            {'paper_id': 'g', 'source': 'semantic_scholar'}
+        ]}}
+
+        ranked = asyncio.run(search._rank(result, 'citation'))
+
+        assert [p['paper_id'] for p in ranked['data']['papers']] == ['g', 'a']
+        assert ranked['data']['ranked_by'] == 'citation'
+        assert result['data']['papers'][0]['paper_id'] == 'a'
+        assert asyncio.run(search._rank(result, None)) is result
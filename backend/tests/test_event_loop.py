@@ -0,0 +1,80 @@
+"""
+ScholarAI - Event Loop Runner Tests
+
+Tests for the persistent app-level event loop used by sync routes.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from services.event_loop import EventLoopRunner
+
+
+@pytest.fixture
+def runner():
+    runner = EventLoopRunner(name='test-event-loop').start()
+    yield runner
+    runner.stop()
+
+
+@pytest.mark.unit
+class TestEventLoopRunner:
+    """Test submitting coroutines from sync code."""
+
+    def test_run_returns_result(self, runner):
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        assert runner.run(add(1, 2)) == 3
+
+    def test_loop_is_reused_across_calls(self, runner):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert runner.run(current_loop()) is runner.run(current_loop())
+
+    def test_exceptions_propagate(self, runner):
+        async def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            runner.run(fail())
+
+    def test_timeout_cancels_coroutine(self, runner):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            runner.run(slow(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_concurrent_callers_share_loop(self, runner):
+        async def slow_value(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda v: runner.run(slow_value(v)), range(5)))
+
+        assert results == list(range(5))
+
+    def test_run_inside_loop_thread_is_rejected(self, runner):
+        async def nested():
+            coro = asyncio.sleep(0)
+            try:
+                runner.run(coro)
+            finally:
+                coro.close()
+
+        with pytest.raises(RuntimeError):
+            runner.run(nested())
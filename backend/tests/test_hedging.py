@@ -0,0 +1,150 @@
+"""
+ScholarAI - Hedged Request Tests
+
+Tests for the hedge policy and hedged paper detail lookups.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.hedging import HedgePolicy
+from tests.test_unified_search import FakeClient, make_search
+
+
+class DetailClient:
+    """Async stand-in for a client's detail lookups."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def get_paper_details(self, paper_id):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            return {'success': False, 'error': self.error}
+        return {'success': True, 'data': {'paper_id': paper_id, 'title': 'T'}}
+
+    get_paper_by_arxiv_id = get_paper_details
+
+
+def make_hedged_search(arxiv, openalex, **policy_kwargs):
+    search = make_search(arxiv, openalex, FakeClient())
+    policy_kwargs.setdefault('default_delay', 0.05)
+    search.hedge_policy = HedgePolicy(**policy_kwargs)
+    return search
+
+
+@pytest.mark.unit
+class TestHedgePolicy:
+    """Test delay quantiles and the hedge budget."""
+
+    def test_delay_uses_quantile_after_enough_samples(self):
+        policy = HedgePolicy(default_delay=2.0, min_samples=10)
+        for i in range(5):
+            policy.observe('arxiv', 0.1)
+        assert policy.delay('arxiv') == 2.0
+
+        for i in range(95):
+            policy.observe('arxiv', 0.1 if i < 85 else 3.0)
+        assert policy.delay('arxiv') == 3.0
+
+    def test_delay_has_floor(self):
+        policy = HedgePolicy(min_samples=1, min_delay=0.05)
+        policy.observe('arxiv', 0.001)
+
+        assert policy.delay('arxiv') == 0.05
+
+    def test_budget_caps_hedge_rate(self):
+        policy = HedgePolicy(budget=0.25, max_burst=1)
+        policy._tokens = 0
+
+        allowed = 0
+        for _ in range(100):
+            policy.start_request()
+            allowed += policy.try_hedge()
+
+        assert allowed == 25
+        assert policy.stats()['budget_exhausted'] == 75
+
+
+@pytest.mark.unit
+class TestHedgedDetails:
+    """Test hedged lookups in UnifiedPaperSearch."""
+
+    def test_slow_primary_is_hedged(self):
+        arxiv = DetailClient(delay=1.0)
+        openalex = DetailClient(delay=0.01)
+        search = make_hedged_search(arxiv, openalex)
+
+        start = time.monotonic()
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert time.monotonic() - start < 0.5
+        assert result['data']['source'] == 'openalex'
+        assert arxiv.cancelled is True
+        assert search.hedge_policy.stats()['hedge_wins'] == 1
+
+    def test_fast_primary_is_not_hedged(self):
+        arxiv = DetailClient(delay=0.0)
+        openalex = DetailClient()
+        search = make_hedged_search(arxiv, openalex)
+
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert result['data']['source'] == 'arxiv'
+        assert openalex.calls == 0
+
+    def test_primary_failure_falls_back_without_hedge(self):
+        arxiv = DetailClient(error='not found')
+        openalex = DetailClient()
+        search = make_hedged_search(arxiv, openalex)
+
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert result['data']['source'] == 'openalex'
+        assert search.hedge_policy.stats()['hedged'] == 0
+        assert search.hedge_policy.stats()['hedge_wins'] == 0
+
+    def test_primary_wins_if_hedge_fails(self):
+        arxiv = DetailClient(delay=0.15)
+        openalex = DetailClient(error='not found')
+        search = make_hedged_search(arxiv, openalex)
+
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert result['data']['source'] == 'arxiv'
+        assert search.hedge_policy.stats()['hedge_wins'] == 0
+
+    def test_exhausted_budget_waits_for_primary(self):
+        arxiv = DetailClient(delay=0.15)
+        openalex = DetailClient()
+        search = make_hedged_search(arxiv, openalex, budget=0, max_burst=0)
+
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert result['data']['source'] == 'arxiv'
+        assert openalex.calls == 0
+
+    def test_both_fail(self):
+        search = make_hedged_search(DetailClient(error='a'), DetailClient(error='b'))
+
+        result = asyncio.run(search._fetch_paper_details('2301.00001', hedge=True))
+
+        assert result['success'] is False
+        assert result['tried_sources'] == ['arxiv', 'openalex']
+
+    def test_latency_samples_recorded(self):
+        search = make_hedged_search(DetailClient(), DetailClient())
+
+        asyncio.run(search._fetch_paper_details('2301.00001'))
+
+        assert 'arxiv' in search.hedge_policy.stats()['delays']
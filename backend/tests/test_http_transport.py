@@ -0,0 +1,99 @@
+"""
+ScholarAI - HTTP Transport Tests
+
+Tests for the shared async HTTP transport against a local stand-in server.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.http_transport import AsyncHTTPTransport, _parse_host_limits
+
+RESPONSE_DELAY = 0.3
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Responds after a fixed delay to make overlap measurable."""
+
+    def do_GET(self):
+        time.sleep(RESPONSE_DELAY)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+async def fetch_many(transport, url, count):
+    responses = await asyncio.gather(*[transport.get(url, timeout=5) for _ in range(count)])
+    return [r.json() for r in responses]
+
+
+@pytest.mark.unit
+class TestAsyncHTTPTransport:
+    """Test concurrency and per-host limits."""
+
+    def test_concurrent_requests_overlap(self, server):
+        transport = AsyncHTTPTransport(pool_maxsize=10, max_workers=10)
+
+        start = time.monotonic()
+        results = asyncio.run(fetch_many(transport, f'{server}/x', 5))
+        elapsed = time.monotonic() - start
+        transport.close()
+
+        assert results == [{'ok': True}] * 5
+        # Sequential execution would take 5 * RESPONSE_DELAY
+        assert elapsed < RESPONSE_DELAY * 3
+
+    def test_host_limit_serializes_requests(self, server):
+        transport = AsyncHTTPTransport(pool_maxsize=10, max_workers=10)
+        transport.set_host_limit('127.0.0.1', 1)
+
+        start = time.monotonic()
+        asyncio.run(fetch_many(transport, f'{server}/x', 3))
+        elapsed = time.monotonic() - start
+        transport.close()
+
+        assert elapsed >= RESPONSE_DELAY * 3 * 0.9
+
+    def test_stream_lines_use_dedicated_threads(self):
+        transport = AsyncHTTPTransport(max_workers=2)
+        threads = []
+
+        class StreamResponse:
+            def iter_lines(self):
+                for line in (b'data: a', b'', b'data: b'):
+                    threads.append(threading.current_thread().name)
+                    yield line
+
+        async def read():
+            return [line async for line in transport.iter_lines(StreamResponse())]
+
+        lines = asyncio.run(read())
+        transport.close()
+
+        assert lines == [b'data: a', b'', b'data: b']
+        assert all(name.startswith('scholarai-stream') for name in threads)
+
+    def test_parse_host_limits(self):
+        limits = _parse_host_limits('export.arxiv.org=2, api.semanticscholar.org=4,bad,x=y')
+
+        assert limits == {'export.arxiv.org': 2, 'api.semanticscholar.org': 4}
@@ -0,0 +1,270 @@
+"""
+ScholarAI - LLM Batch Executor Tests
+
+Tests for bounded-concurrency LLM calls and the /api/papers-ai/summarize
+branches that use them.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from routes.papers_ai import papers_ai_bp
+from services.llm_batch import BoundedLLMExecutor
+
+
+class ConcurrencyProbe:
+    """Sync callable that records peak concurrency."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay * item.get('delay', 1))
+            if item.get('raise'):
+                raise RuntimeError(item['raise'])
+            return {'success': True, 'data': item['id']}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.mark.unit
+class TestBoundedLLMExecutor:
+    """Test ordering, limits, timeouts and per-item failures."""
+
+    def test_results_in_input_order(self):
+        probe = ConcurrencyProbe()
+        items = [{'id': i, 'delay': 3 - i} for i in range(3)]
+
+        results = asyncio.run(BoundedLLMExecutor(limit=3).map(probe, items))
+
+        assert [r['data'] for r in results] == [0, 1, 2]
+
+    def test_respects_concurrency_limit(self):
+        probe = ConcurrencyProbe()
+
+        asyncio.run(BoundedLLMExecutor(limit=2).map(probe, [{'id': i} for i in range(6)]))
+
+        assert probe.peak == 2
+
+    def test_coroutine_calls_are_cancelled_on_timeout(self):
+        cancelled = []
+
+        async def call(item):
+            try:
+                await asyncio.sleep(item)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+            return {'success': True, 'data': item}
+
+        results = asyncio.run(BoundedLLMExecutor(limit=2, timeout=0.1).map(call, [0, 5]))
+
+        assert results[0] == {'success': True, 'data': 0}
+        assert results[1]['success'] is False
+        assert cancelled == [5]
+
+    def test_partial_failures_reported_per_item(self):
+        probe = ConcurrencyProbe(delay=0.01)
+        items = [{'id': 0}, {'id': 1, 'raise': 'quota exceeded'}, {'id': 2, 'delay': 50}]
+
+        results = asyncio.run(BoundedLLMExecutor(limit=3, timeout=0.1).map(probe, items))
+
+        assert results[0] == {'success': True, 'data': 0}
+        assert results[1] == {'success': False, 'error': 'quota exceeded'}
+        assert results[2]['success'] is False
+        assert '超时' in results[2]['error']
+
+
+def slow_stream(item):
+    """Yields item['chunks'] with a delay before each chunk."""
+    for chunk in item['chunks']:
+        time.sleep(item.get('delay', 0.01))
+        if chunk == 'boom':
+            raise RuntimeError('stream broke')
+        yield chunk
+
+
+@pytest.mark.unit
+class TestBoundedLLMExecutorStream:
+    """Test multiplexed streaming."""
+
+    def test_streams_interleave_and_finish_independently(self):
+        items = [
+            {'chunks': ['a1', 'a2'], 'delay': 0.2},
+            {'chunks': ['b1', 'b2'], 'delay': 0.01}
+        ]
+
+        events = list(BoundedLLMExecutor(limit=2).stream(slow_stream, items))
+
+        # The fast stream completes before the slow one emits its first chunk
+        assert events[:3] == [(1, 'chunk', 'b1'), (1, 'chunk', 'b2'), (1, 'done', None)]
+        assert events[3:] == [(0, 'chunk', 'a1'), (0, 'chunk', 'a2'), (0, 'done', None)]
+
+    def test_stream_errors_are_per_item(self):
+        items = [{'chunks': ['x', 'boom']}, {'chunks': ['y']}]
+
+        events = list(BoundedLLMExecutor(limit=2).stream(slow_stream, items))
+        terminal = {index: (kind, payload) for index, kind, payload in events if kind != 'chunk'}
+
+        assert terminal == {0: ('error', 'stream broke'), 1: ('done', None)}
+
+    def test_stalled_streams_time_out(self):
+        items = [{'chunks': ['late'], 'delay': 1}]
+
+        events = list(BoundedLLMExecutor(limit=1, timeout=0.1).stream(slow_stream, items))
+
+        assert events[0][:2] == (0, 'error')
+
+    def test_stalled_stream_times_out_while_others_produce(self):
+        items = [
+            {'chunks': ['late'], 'delay': 1},
+            {'chunks': [f'c{i}' for i in range(20)], 'delay': 0.03}
+        ]
+
+        events = list(BoundedLLMExecutor(limit=2, timeout=0.2).stream(slow_stream, items))
+        terminal = [(index, kind) for index, kind, _ in events if kind != 'chunk']
+
+        # The stalled stream is reported on its own deadline, not when the busy stream falls silent
+        assert terminal == [(0, 'error'), (1, 'error')]
+        assert events.index((0, 'error', 'LLM调用超时（0.2秒）')) < 10
+
+
+class FakeAsyncZhipuClient:
+    """Stand-in for AsyncZhipuClient returning canned completions."""
+
+    async def chat_completion(self, messages, **kwargs):
+        if 'Broken' in messages[0]['content']:
+            return {'success': False, 'error': 'upstream error'}
+        content = '{"summary": "short", "key_points": ["a"]}'
+        return {'success': True, 'data': {'choices': [{'message': {'content': content}}]}}
+
+
+class FakeZhipuClient:
+    """Stand-in for ZhipuClient."""
+
+    def __init__(self, api_key=None):
+        self.async_client = FakeAsyncZhipuClient()
+
+    def chat_completion_stream(self, messages, **kwargs):
+        title = messages[0]['content'].split('Title: ')[1].split('\n')[0]
+        if title == 'Slow':
+            time.sleep(0.3)
+        yield f'{title} summary'
+
+
+def by_id(papers):
+    return {paper['paper_id']: paper for paper in papers}
+
+
+@pytest.mark.unit
+class TestSummarizeRoute:
+    """Test the summarize endpoint (batch and streaming)."""
+
+    def make_app(self):
+        app = Flask(__name__)
+        app.register_blueprint(papers_ai_bp)
+        return app
+
+    def test_summaries_keep_order_and_report_failures(self):
+        app = self.make_app()
+        papers = [
+            {'paper_id': 'P1', 'title': 'Good'},
+            {'paper_id': 'P2', 'title': 'Broken'},
+            {'paper_id': 'P3', 'title': 'Also good'}
+        ]
+
+        with patch('routes.papers_ai.fetch_papers_with_errors', return_value=(by_id(papers), {})), \
+                patch('routes.papers_ai.ZhipuClient', FakeZhipuClient):
+            response = app.test_client().post(
+                '/api/papers-ai/summarize', json={'paper_ids': ['P1', 'P2', 'P3']}
+            )
+
+        data = response.get_json()['data']
+        assert [s['paper_id'] for s in data['summaries']] == ['P1', 'P2', 'P3']
+        assert data['summaries'][0]['key_points'] == ['a']
+        assert data['summaries'][1]['error'] == 'upstream error'
+        assert data['failed'] == 1
+
+    def test_stream_multiplexes_papers(self):
+        app = self.make_app()
+        papers = [{'paper_id': 'P1', 'title': 'Slow'}, {'paper_id': 'P2', 'title': 'Fast'}]
+
+        with patch('routes.papers_ai.fetch_papers_with_errors', return_value=(by_id(papers), {})), \
+                patch('routes.papers_ai.ZhipuClient', FakeZhipuClient):
+            response = app.test_client().post(
+                '/api/papers-ai/summarize', json={'paper_ids': ['P1', 'P2'], 'stream': True}
+            )
+            lines = [l[6:] for l in response.get_data(as_text=True).split('\n\n') if l]
+
+        assert lines[-1] == '[DONE]'
+        events = [json.loads(l) for l in lines[:-1]]
+        assert events == [
+            {'paper_id': 'P2', 'content': 'Fast summary'},
+            {'paper_id': 'P2', 'done': True},
+            {'paper_id': 'P1', 'content': 'Slow summary'},
+            {'paper_id': 'P1', 'done': True}
+        ]
+
+    def test_unfetched_papers_are_reported(self):
+        app = self.make_app()
+        papers = [{'paper_id': 'P1', 'title': 'Good'}, {'paper_id': 'P3', 'title': 'Also good'}]
+
+        with patch('routes.papers_ai.fetch_papers_with_errors', return_value=(by_id(papers), {'P2': 'timeout'})), \
+                patch('routes.papers_ai.ZhipuClient', FakeZhipuClient):
+            response = app.test_client().post(
+                '/api/papers-ai/summarize', json={'paper_ids': ['P1', 'P2', 'P3']}
+            )
+            stream = app.test_client().post(
+                '/api/papers-ai/summarize', json={'paper_ids': ['P1', 'P2', 'P3'], 'stream': True}
+            ).get_data(as_text=True)
+
+        data = response.get_json()['data']
+        assert [s['paper_id'] for s in data['summaries']] == ['P1', 'P2', 'P3']
+        assert data['summaries'][1] == {'paper_id': 'P2', 'error': 'timeout'}
+        assert data['failed'] == 1
+        assert 'data: {"paper_id": "P2", "error": "timeout"}' in stream
+
+    @pytest.mark.parametrize('value', ['4', 0, True, 2.5])
+    def test_invalid_max_concurrency(self, value):
+        response = self.make_app().test_client().post(
+            '/api/papers-ai/summarize', json={'paper_ids': ['P1'], 'max_concurrency': value}
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('stream', [False, True])
+    def test_max_concurrency_is_capped(self, stream):
+        app = self.make_app()
+        papers = [{'paper_id': f'P{n}', 'title': 'Good'} for n in range(10)]
+        limits = []
+
+        class RecordingExecutor(BoundedLLMExecutor):
+            def __init__(self, limit=None, timeout=None):
+                limits.append(limit)
+                super().__init__(limit, timeout)
+
+        with patch('routes.papers_ai.fetch_papers_with_errors', return_value=(by_id(papers), {})), \
+                patch('routes.papers_ai.ZhipuClient', FakeZhipuClient), \
+                patch('routes.papers_ai.LLM_MAX_CONCURRENCY', 3), \
+                patch('routes.papers_ai.BoundedLLMExecutor', RecordingExecutor):
+            for value in (None, 2, 50):
+                body = {'paper_ids': list(by_id(papers)), 'stream': stream}
+                if value is not None:
+                    body['max_concurrency'] = value
+                app.test_client().post('/api/papers-ai/summarize', json=body).get_data()
+
+        assert limits == [3, 2, 3]
@@ -0,0 +1,153 @@
+"""
+ScholarAI - LLM Response Cache Tests
+
+Tests for the content-addressed completion cache in ZhipuClient.
+"""
+
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.zhipu_client import LLMResponseCache, ZhipuClient
+
+
+class DictCollection:
+    """Minimal in-memory stand-in for the llm_cache collection."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        doc = self.docs.get(query['_id'])
+        if doc and doc['expires_at'] > query['expires_at']['$gt']:
+            return doc
+        return None
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query['_id']] = doc
+
+
+class FakeTransport:
+    """Async transport stand-in returning a fixed response."""
+
+    def __init__(self):
+        self.response = None
+        self.calls = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.response
+
+    async def iter_lines(self, response):
+        for line in response.iter_lines():
+            yield line
+
+
+def completion_response(content):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {'model': 'glm-4-flash', 'choices': [{'message': {'content': content}}]}
+    return response
+
+
+def stream_response(chunks, finished=True):
+    lines = [
+        f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}".encode('utf-8')
+        for c in chunks
+    ]
+    if finished:
+        lines.append(b'data: [DONE]')
+    response = MagicMock(status_code=200)
+    response.iter_lines.side_effect = lambda: iter(lines)
+    return response
+
+
+def make_client(**cache_kwargs):
+    cache = LLMResponseCache(ttl=60, collection=DictCollection(), **cache_kwargs)
+    return ZhipuClient(api_key='id.secret', cache=cache, transport=FakeTransport())
+
+
+MESSAGES = [{'role': 'user', 'content': 'Summarize 2301.00001'}]
+
+
+@pytest.mark.unit
+class TestLLMResponseCache:
+    """Test cache keys, hits and opt-outs."""
+
+    def test_key_depends_on_sampling_params(self):
+        key = LLMResponseCache.make_key('glm-4-flash', MESSAGES, temperature=0.2)
+
+        assert key == LLMResponseCache.make_key('glm-4-flash', MESSAGES, temperature=0.2, max_tokens=None)
+        assert key != LLMResponseCache.make_key('glm-4-flash', MESSAGES, temperature=0.3)
+        assert key != LLMResponseCache.make_key('glm-4-air', MESSAGES, temperature=0.2)
+
+    def test_repeat_completion_served_from_cache(self):
+        client = make_client()
+        client.async_client.http.response = completion_response('cached text')
+
+        first = client.chat_completion(MESSAGES, temperature=0.2)
+        second = client.chat_completion(MESSAGES, temperature=0.2)
+
+        assert client.async_client.http.calls == 1
+        assert 'cached' not in first
+        assert second['cached'] is True
+        assert second['data']['choices'][0]['message']['content'] == 'cached text'
+        assert client.cache.stats()['hit_rate'] == 0.5
+
+    def test_high_temperature_and_opt_out_bypass_cache(self):
+        client = make_client(max_temperature=0.5)
+        client.async_client.http.response = completion_response('x')
+
+        client.chat_completion(MESSAGES, temperature=0.9)
+        client.chat_completion(MESSAGES, temperature=0.9)
+        client.chat_completion(MESSAGES, temperature=0.2, cache=False)
+
+        assert client.async_client.http.calls == 3
+        assert client.cache.stats()['bypassed'] == 3
+
+    def test_default_temperature_is_not_cached(self, monkeypatch):
+        monkeypatch.delenv('LLM_CACHE_MAX_TEMPERATURE', raising=False)
+        client = make_client()
+        client.async_client.http.response = completion_response('x')
+
+        client.chat_completion(MESSAGES)
+        client.chat_completion(MESSAGES)
+
+        assert client.async_client.http.calls == 2
+        assert client.cache.stats()['bypassed'] == 2
+
+    def test_stream_is_replayed_from_cache(self):
+        client = make_client()
+        client.async_client.http.response = stream_response(['Hello ', 'world'])
+
+        first = ''.join(client.chat_completion_stream(MESSAGES, temperature=0.2))
+        second = ''.join(client.chat_completion_stream(MESSAGES, temperature=0.2))
+        completion = client.chat_completion(MESSAGES, temperature=0.2)
+
+        assert first == second == 'Hello world'
+        assert client.async_client.http.calls == 1
+        assert completion['data']['choices'][0]['message']['content'] == 'Hello world'
+
+    def test_incomplete_stream_not_cached(self):
+        client = make_client()
+        client.async_client.http.response = stream_response(['partial'], finished=False)
+
+        ''.join(client.chat_completion_stream(MESSAGES, temperature=0.2))
+
+        assert client.cache.collection.docs == {}
+
+    def test_expired_entry_is_a_miss(self):
+        cache = LLMResponseCache(ttl=60, collection=DictCollection())
+        cache.set('k', 'text')
+        cache.collection.docs['k']['expires_at'] = datetime(2000, 1, 1)
+
+        assert cache.get('k') is None
+
+    def test_storage_errors_degrade_to_miss(self):
+        collection = MagicMock()
+        collection.find_one.side_effect = RuntimeError('Database not initialized')
+        cache = LLMResponseCache(collection=collection)
+
+        assert cache.get('k') is None
+        assert cache.stats()['errors'] == 1
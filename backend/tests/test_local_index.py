@@ -0,0 +1,164 @@
+"""
+ScholarAI - Local Index Tests
+
+Tests for the BM25 index over stored papers and its use in UnifiedPaperSearch.
+"""
+
+import asyncio
+import heapq
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.local_index import LocalPaperIndex, tokenize
+from tests.test_unified_search import FakeClient, make_search
+
+
+PAPERS = [
+    {'paper_id': '1706.03762', 'title': 'Attention Is All You Need', 'authors': ['Ashish Vaswani'],
+     'summary': 'The Transformer, based solely on attention mechanisms.',
+     'categories': ['cs.CL', 'cs.LG'], 'published_year': 2017},
+    {'paper_id': '1810.04805', 'title': 'BERT: Pre-training of Deep Bidirectional Transformers',
+     'authors': ['Jacob Devlin'], 'summary': 'Language representation model.',
+     'categories': ['cs.CL'], 'published_year': 2018},
+    {'paper_id': '1512.03385', 'title': 'Deep Residual Learning for Image Recognition',
+     'authors': ['Kaiming He'], 'summary': 'Residual networks ease training of deep networks.',
+     'categories': ['cs.CV'], 'published_year': 2015},
+]
+
+
+def build_index():
+    index = LocalPaperIndex()
+    index.add_many((paper, 'arxiv') for paper in PAPERS)
+    return index
+
+
+@pytest.mark.unit
+class TestLocalPaperIndex:
+    """Test BM25 ranking, filters and incremental updates."""
+
+    def test_tokenize(self):
+        assert tokenize('The Transformer: 注意力') == ['transformer', '注', '意', '力']
+
+    def test_title_match_ranks_first(self):
+        data = build_index().search('attention transformer')
+
+        assert [p['paper_id'] for p in data['papers']][:2] == ['1706.03762', '1810.04805']
+        assert data['papers'][0]['local_score'] > data['papers'][1]['local_score']
+        assert data['source'] == 'local'
+
+    def test_year_and_category_filters(self):
+        index = build_index()
+
+        assert [p['paper_id'] for p in index.search('deep', year_min=2016)['papers']] == ['1810.04805']
+        assert [p['paper_id'] for p in index.search('deep', category='cs.CV')['papers']] == ['1512.03385']
+        assert index.search('deep', year_max=2014)['total'] == 0
+
+    def test_update_replaces_previous_version(self):
+        index = build_index()
+
+        index.add(dict(PAPERS[2], title='Residual Nets', summary='', categories=['cs.AI']), 'arxiv')
+
+        assert len(index) == 3
+        assert index.search('image recognition')['total'] == 0
+        assert index.search('deep', category='cs.CV')['total'] == 0
+        assert index.search('residual', category='cs.ai')['total'] == 1
+
+    def test_updates_reuse_document_slots(self):
+        index = build_index()
+
+        for year in range(2000, 2050):
+            index.add(dict(PAPERS[2], published_year=year, categories=[f'cs.X{year % 3}']), 'arxiv')
+
+        assert len(index._papers) == 3
+        assert index.stats()['years'] == 3
+        assert index.stats()['categories'] == 3  # cs.CL, cs.LG and the latest cs.X*
+        assert [p['paper_id'] for p in index.search('deep', year_min=2049)['papers']] == ['1512.03385']
+
+    def test_pagination(self):
+        data = build_index().search('deep', page=2, page_size=1)
+
+        assert data['total'] == 2
+        assert data['total_pages'] == 2
+        assert len(data['papers']) == 1
+
+    def test_load_from_store(self):
+        store = MagicMock()
+        store.iter_documents.return_value = [{'source': 'arxiv', 'data': p} for p in PAPERS]
+        index = LocalPaperIndex()
+
+        assert index.load_from_store(store) == 3
+        assert index.loaded
+
+    def test_load_from_store_is_capped(self):
+        store = MagicMock()
+        store.iter_documents.return_value = [{'source': 'arxiv', 'data': p} for p in PAPERS[:2]]
+
+        assert LocalPaperIndex().load_from_store(store, max_docs=2) == 2
+        store.iter_documents.assert_called_once_with(batch_size=1000, limit=2)
+
+    def test_ranking_happens_outside_the_lock(self, monkeypatch):
+        index = build_index()
+        nlargest = heapq.nlargest
+
+        def checked(*args, **kwargs):
+            assert not index._lock._is_owned()
+            return nlargest(*args, **kwargs)
+
+        monkeypatch.setattr('services.local_index.heapq.nlargest', checked)
+
+        pages = [index.search('deep', page=page, page_size=1)['papers'] for page in (1, 2)]
+        full = index.search('deep', page_size=10)['papers']
+
+        assert [p[0]['paper_id'] for p in pages] == [p['paper_id'] for p in full]
+
+
+@pytest.mark.unit
+class TestLocalSearchModes:
+    """Test UnifiedPaperSearch local=first / blend."""
+
+    def make_search(self, upstream_papers):
+        search = make_search(FakeClient(upstream_papers), FakeClient(), FakeClient())
+        search.local_index = build_index()
+        search.local_index.loaded = True
+        return search
+
+    def test_first_answers_locally_when_page_is_full(self):
+        search = self.make_search([{'paper_id': '2401.00001', 'title': 'Upstream'}])
+
+        result = asyncio.run(search.search_papers(query='deep', page_size=2, local='first'))
+
+        assert result['data']['source'] == 'local'
+        assert search.arxiv_client.calls == 0
+
+    def test_first_falls_through_when_local_is_thin(self):
+        search = self.make_search([{'paper_id': '2401.00001', 'title': 'Upstream'}])
+
+        result = asyncio.run(search.search_papers(query='attention', page_size=5, local='first'))
+
+        assert result['data']['source'] == 'arxiv'
+        assert search.arxiv_client.calls == 1
+
+    def test_blend_merges_and_dedups(self):
+        upstream = [dict(PAPERS[0], source='arxiv'), {'paper_id': '2401.00001', 'title': 'New'}]
+        search = self.make_search(upstream)
+
+        result = asyncio.run(search.search_papers(query='attention', local='blend'))
+        ids = [p['paper_id'] for p in result['data']['papers']]
+
+        assert ids.count('1706.03762') == 1
+        assert '2401.00001' in ids
+
+    def test_upstream_results_are_indexed(self):
+        search = make_search(FakeClient([{'paper_id': '2401.00001', 'title': 'Quantum kittens'}]),
+                             FakeClient(), FakeClient())
+        search.paper_store = MagicMock()
+
+        async def run():
+            await search.search_papers(query='kittens')
+            await asyncio.gather(*search._background_tasks)
+
+        asyncio.run(run())
+
+        assert search.local_index.search('kittens')['total'] == 1
+        assert search.paper_store.insert_missing.called
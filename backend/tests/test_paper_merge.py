@@ -0,0 +1,86 @@
+"""
+ScholarAI - Paper Merge Tests
+
+Tests for cross-source clustering and record merging.
+"""
+
+import asyncio
+
+import pytest
+
+from services.paper_merge import merge_papers, title_fingerprint
+from tests.test_unified_search import FakeClient, make_search
+
+
+ARXIV = {
+    'source': 'arxiv', 'paper_id': '1706.03762v5', 'title': 'Attention Is All You Need',
+    'authors': ['Ashish Vaswani'], 'categories': ['cs.CL'], 'summary': 'We propose...'
+}
+OPENALEX = {
+    'source': 'openalex', 'paper_id': 'W2963403868', 'title': 'Attention is all you need.',
+    'authors': ['Ashish Vaswani'], 'categories': ['Computer science'],
+    'doi': 'https://doi.org/10.48550/arxiv.1706.03762', 'citation_count': 90000, 'summary': ''
+}
+S2 = {
+    'source': 'semantic_scholar', 'paper_id': '204e3073870fae3d05bcbc2f6a8e263d9b72e776',
+    'title': 'Attention is All you Need', 'authors': ['A. Vaswani'],
+    'external_ids': {'ArXiv': '1706.03762', 'DOI': '10.48550/arXiv.1706.03762'},
+    'citation_count': 95000, 'venue': 'NeurIPS'
+}
+
+
+@pytest.mark.unit
+class TestMergePapers:
+    """Test clustering by DOI, arXiv ID and title fingerprint."""
+
+    def test_fingerprint_ignores_case_punctuation_and_accents(self):
+        a = {'title': 'Déjà Vu: A Study', 'authors': ['José Núñez']}
+        b = {'title': 'deja vu - a study', 'authors': ['Jose Nunez']}
+
+        assert title_fingerprint(a) == title_fingerprint(b)
+
+    def test_clusters_across_all_three_sources(self):
+        merged = merge_papers([ARXIV, OPENALEX, S2])
+
+        assert len(merged) == 1
+        paper = merged[0]
+        assert paper['source'] == 'arxiv'
+        assert paper['sources'] == ['arxiv', 'openalex', 'semantic_scholar']
+        assert paper['source_ids']['openalex'] == 'W2963403868'
+        assert paper['summary'] == 'We propose...'
+        assert paper['venue'] == 'NeurIPS'
+        assert paper['citation_count'] == 95000
+        assert paper['categories'] == ['cs.CL', 'Computer science']
+
+    def test_transitive_links_join_clusters(self):
+        # S2 links to arXiv by arXiv ID and to OpenAlex by DOI; OpenAlex's title
+        # differs so it only joins through S2.
+        openalex = dict(OPENALEX, title='Attention is all you need (extended)')
+
+        assert len(merge_papers([ARXIV, openalex, S2])) == 1
+
+    def test_distinct_papers_keep_rank_order(self):
+        other = {'source': 'openalex', 'paper_id': 'W1', 'title': 'BERT', 'authors': ['Jacob Devlin']}
+
+        merged = merge_papers([other, ARXIV, S2])
+
+        assert [p['paper_id'] for p in merged] == ['W1', '1706.03762v5']
+
+    def test_same_title_different_first_author_not_merged(self):
+        a = {'source': 'arxiv', 'paper_id': '2301.00001', 'title': 'Survey', 'authors': ['Ann Lee']}
+        b = {'source': 'openalex', 'paper_id': 'W2', 'title': 'Survey', 'authors': ['Bo Chen']}
+
+        assert len(merge_papers([a, b])) == 2
+
+
+@pytest.mark.unit
+class TestFederatedDedup:
+    """Test that merge mode returns no duplicates."""
+
+    def test_merge_mode_dedups(self):
+        search = make_search(FakeClient([ARXIV]), FakeClient([OPENALEX]), FakeClient([S2]))
+
+        result = asyncio.run(search.search_papers(query='attention', mode='merge', deadline=1))
+
+        assert len(result['data']['papers']) == 1
+        assert result['data']['duplicates_removed'] == 2
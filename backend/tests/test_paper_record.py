@@ -0,0 +1,166 @@
+"""
+ScholarAI - Paper Record Tests
+
+Tests for the slotted Paper record shared by all paper clients.
+"""
+
+import copy
+import json
+import pickle
+import tracemalloc
+
+import pytest
+from flask import Flask, jsonify
+
+from app.json_provider import ScholarJSONProvider
+from models.paper import Paper, extract_year, strip_markup
+from services.openalex_client import OpenAlexClient
+from services.projection import project
+from services.semantic_scholar_client import SemanticScholarClient
+
+FIELDS = {
+    'paper_id': 'W1',
+    'title': 'Attention',
+    'authors': ['A', 'B'],
+    'summary': 'S',
+    'published_year': 2017,
+    'categories': ['cs.CL'],
+    'concepts': [{'display_name': 'CS'}],
+    'citation_count': 10,
+    'source': 'openalex'
+}
+
+
+@pytest.mark.unit
+class TestPaperMapping:
+    """Test that Paper behaves like the dicts it replaces."""
+
+    def test_mapping_access(self):
+        paper = Paper(FIELDS)
+
+        assert paper['title'] == 'Attention'
+        assert paper.get('doi') is None
+        assert paper.get('doi', '') == ''
+        assert 'concepts' in paper and 'doi' not in paper
+        assert dict(paper) == FIELDS
+        assert paper == FIELDS
+        with pytest.raises(KeyError):
+            paper['doi']
+
+    def test_unknown_fields_are_kept(self):
+        paper = Paper(FIELDS, rank=3)
+        paper['custom'] = {'a': 1}
+        del paper['rank']
+
+        assert paper['custom'] == {'a': 1}
+        assert 'rank' not in paper
+        assert len(paper) == len(FIELDS) + 1
+
+    def test_delete_and_update(self):
+        paper = Paper(FIELDS)
+        del paper['concepts']
+        paper.update(doi='10.1/x')
+
+        assert 'concepts' not in paper
+        assert list(paper).count('doi') == 1
+        with pytest.raises(KeyError):
+            del paper['concepts']
+
+    def test_no_instance_dict(self):
+        assert not hasattr(Paper(FIELDS), '__dict__')
+
+    def test_from_mapping_overrides(self):
+        paper = Paper.from_mapping(FIELDS, source='arxiv', local_score=1.5)
+
+        assert paper['source'] == 'arxiv'
+        assert paper['local_score'] == 1.5
+        assert FIELDS['source'] == 'openalex'
+
+
+@pytest.mark.unit
+class TestPaperCopyAndSerialization:
+    """Test copies, pickling and JSON output."""
+
+    def test_deepcopy_is_independent(self):
+        paper = Paper(FIELDS, extra=[1])
+        clone = copy.deepcopy(paper)
+        clone['authors'].append('C')
+        clone['extra'].append(2)
+
+        assert paper['authors'] == ['A', 'B']
+        assert paper['extra'] == [1]
+        assert isinstance(clone, Paper)
+
+    def test_shallow_copy(self):
+        paper = Paper(FIELDS)
+        clone = paper.copy()
+        clone['title'] = 'Other'
+
+        assert paper['title'] == 'Attention'
+        assert clone['authors'] is paper['authors']
+
+    def test_pickle_round_trip(self):
+        paper = Paper(FIELDS, rank=1)
+
+        assert pickle.loads(pickle.dumps(paper)) == paper
+
+    def test_to_json(self):
+        assert json.loads(Paper(FIELDS).to_json()) == FIELDS
+
+    def test_flask_jsonify(self):
+        app = Flask(__name__)
+        app.json = ScholarJSONProvider(app)
+
+        with app.app_context():
+            response = jsonify({'data': {'papers': [Paper(FIELDS)]}})
+
+        assert response.get_json()['data']['papers'][0] == FIELDS
+
+    def test_uses_less_memory_than_dict(self):
+        # a full OpenAlex record has ~25 keys
+        record = OpenAlexClient()._parse_paper({'id': 'https://openalex.org/W1'}).to_dict()
+
+        def measure(factory):
+            tracemalloc.start()
+            records = [factory() for _ in range(2000)]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert len(records) == 2000
+            return size
+
+        assert measure(lambda: Paper(record)) < measure(lambda: dict(record)) * 0.6
+
+
+@pytest.mark.unit
+class TestClientsProducePaper:
+    """Test that the parsers produce Paper records."""
+
+    def test_openalex_parse(self):
+        paper = OpenAlexClient()._parse_paper({
+            'id': 'https://openalex.org/W1',
+            'title': 'T',
+            'publication_date': '2021-05-01',
+            'abstract': '<jats:p>Hello &amp; bye</jats:p>'
+        })
+
+        assert isinstance(paper, Paper)
+        assert paper['published_year'] == 2021
+        assert paper['summary'] == 'Hello & bye'
+
+    def test_semantic_scholar_parse(self):
+        paper = SemanticScholarClient()._parse_paper({
+            'paperId': 'S1', 'publicationDate': '2019-02-03', 'abstract': 'A <i>b</i>'
+        })
+
+        assert isinstance(paper, Paper)
+        assert paper['published_year'] == 2019
+        assert paper['summary'] == 'A b'
+
+    def test_projection_keeps_record_type(self):
+        assert isinstance(project(Paper(FIELDS), 'list'), Paper)
+
+    def test_helpers(self):
+        assert extract_year('published 1999-01-01') == 1999
+        assert extract_year(None) is None
+        assert strip_markup('plain') == 'plain'
+        assert strip_markup('') == ''
@@ -0,0 +1,273 @@
+"""
+ScholarAI - Paper Store Tests
+
+Tests for identifier extraction and the read-through paper details path.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.paper_store import (
+    PaperStore, extract_identifiers, normalize_arxiv_id, normalize_doi
+)
+from services.local_index import LocalPaperIndex
+from services.source_health import SourceHealthTracker
+from services.unified_search import UnifiedPaperSearch
+
+
+@pytest.mark.unit
+class TestIdentifiers:
+    """Test identifier normalization."""
+
+    def test_normalize_doi(self):
+        assert normalize_doi('https://doi.org/10.1000/ABC') == '10.1000/abc'
+        assert normalize_doi('doi:10.1000/x') == '10.1000/x'
+        assert normalize_doi('not-a-doi') is None
+        assert normalize_doi(None) is None
+
+    def test_normalize_arxiv_id(self):
+        assert normalize_arxiv_id('2301.00001v3') == '2301.00001'
+        assert normalize_arxiv_id('hep-th/9901001v1') == 'hep-th/9901001'
+        assert normalize_arxiv_id('W123456789') is None
+
+    def test_semantic_scholar_external_ids(self):
+        paper = {
+            'paper_id': 'abc123',
+            'external_ids': {'DOI': '10.1/XY', 'ArXiv': '2301.00001'}
+        }
+
+        assert extract_identifiers(paper, 'semantic_scholar') == {
+            's2': 'abc123', 'doi': '10.1/xy', 'arxiv': '2301.00001'
+        }
+
+    def test_openalex_identifiers(self):
+        paper = {'paper_id': 'W1', 'doi': 'https://doi.org/10.1/z'}
+
+        assert extract_identifiers(paper, 'openalex') == {'openalex': 'W1', 'doi': '10.1/z'}
+
+
+@pytest.mark.unit
+class TestPaperStore:
+    """Test collection access."""
+
+    def test_upsert_replaces_by_source_and_id(self):
+        collection = MagicMock()
+        store = PaperStore(collection=collection)
+
+        store.upsert({'paper_id': '2301.00001', 'title': 'T'}, 'arxiv')
+
+        query, doc = collection.replace_one.call_args[0]
+        assert query == {'source': 'arxiv', 'paper_id': '2301.00001'}
+        assert doc['ids'] == {'arxiv': '2301.00001'}
+        assert doc['data']['source'] == 'arxiv'
+
+    def test_find_prefers_exact_id_match(self):
+        collection = MagicMock()
+        collection.find.return_value = [
+            {'source': 'semantic_scholar', 'paper_id': 'abc', 'ids': {'arxiv': '2301.00001'}},
+            {'source': 'arxiv', 'paper_id': '2301.00001', 'ids': {'arxiv': '2301.00001'}}
+        ]
+        store = PaperStore(collection=collection)
+
+        assert store.find('2301.00001')['source'] == 'arxiv'
+
+    def test_find_many_maps_docs_to_requested_ids(self):
+        collection = MagicMock()
+        collection.find.return_value = [
+            {'source': 'semantic_scholar', 'paper_id': 'abc', 'ids': {'doi': '10.1/x'}},
+            {'source': 'openalex', 'paper_id': 'W1', 'ids': {'openalex': 'W1'}}
+        ]
+        store = PaperStore(collection=collection)
+
+        found = store.find_many(['https://doi.org/10.1/X', 'W1', 'W2'])
+
+        assert found['https://doi.org/10.1/X']['paper_id'] == 'abc'
+        assert found['W1']['paper_id'] == 'W1'
+        assert 'W2' not in found
+        assert collection.find.call_count == 1
+
+    def test_lookup_only_uses_indexed_fields(self):
+        collection = MagicMock()
+        collection.find.return_value = []
+        store = PaperStore(collection=collection)
+
+        store.find_many(['2301.00001', '10.1/x', 'W1'])
+
+        query = collection.find.call_args[0][0]
+        assert {field for clause in query['$or'] for field in clause} <= {
+            'ids.arxiv', 'ids.doi', 'ids.openalex', 'ids.s2'
+        }
+
+    def test_upsert_many_uses_unordered_bulk_write(self):
+        collection = MagicMock()
+        store = PaperStore(collection=collection)
+
+        count = store.upsert_many([({'paper_id': 'W1'}, 'openalex'), ({'title': 'no id'}, 'arxiv')])
+
+        assert count == 1
+        assert collection.bulk_write.call_args[1] == {'ordered': False}
+
+    def test_is_stale(self):
+        store = PaperStore(collection=MagicMock(), max_age=timedelta(hours=1))
+
+        assert not store.is_stale({'fetched_at': datetime.utcnow()})
+        assert store.is_stale({'fetched_at': datetime.utcnow() - timedelta(hours=2)})
+
+
+class MemoryStore(PaperStore):
+    """PaperStore backed by a dict instead of MongoDB."""
+
+    def __init__(self, max_age=timedelta(hours=1)):
+        super().__init__(collection=MagicMock(), max_age=max_age)
+        self.docs = {}
+
+    def upsert(self, paper, source):
+        self.docs[paper['paper_id']] = self.build_document(paper, source)
+
+    def find(self, paper_id, source=None):
+        return self.docs.get(paper_id)
+
+    def find_many(self, paper_ids, source=None):
+        return {pid: self.docs[pid] for pid in paper_ids if pid in self.docs}
+
+    def upsert_many(self, items):
+        for paper, source in items:
+            self.upsert(paper, source)
+        return len(items)
+
+
+class DetailsClient:
+    """Async client stub counting detail fetches."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_paper_details(self, paper_id):
+        self.calls += 1
+        return {'success': True, 'data': {'paper_id': paper_id, 'title': f'v{self.calls}'}}
+
+    get_paper_by_arxiv_id = get_paper_details
+
+
+class BatchClient(DetailsClient):
+    """Async client stub recording batch requests; IDs in `missing` are not found."""
+
+    def __init__(self, missing=()):
+        super().__init__()
+        self.missing = set(missing)
+        self.batches = []
+
+    async def get_papers_batch(self, paper_ids):
+        self.batches.append(list(paper_ids))
+        return {
+            'success': True,
+            'data': {
+                'papers': {pid: {'paper_id': pid} for pid in paper_ids if pid not in self.missing},
+                'errors': {pid: 'Paper not found' for pid in paper_ids if pid in self.missing}
+            }
+        }
+
+
+@pytest.mark.unit
+class TestReadThroughDetails:
+    """Test UnifiedPaperSearch.get_paper_details against the store."""
+
+    def make_search(self, store):
+        search = UnifiedPaperSearch()
+        search.arxiv_client = DetailsClient()
+        search.paper_store = store
+        search.local_index = LocalPaperIndex()
+        search.health = SourceHealthTracker()
+        return search
+
+    def test_second_lookup_served_locally(self):
+        search = self.make_search(MemoryStore())
+
+        first = asyncio.run(search.get_paper_details('2301.00001'))
+        second = asyncio.run(search.get_paper_details('2301.00001'))
+
+        assert search.arxiv_client.calls == 1
+        assert 'from_store' not in first
+        assert second['from_store'] is True
+        assert second['data']['source'] == 'arxiv'
+
+    def test_stale_paper_refreshed_in_background(self):
+        store = MemoryStore()
+        search = self.make_search(store)
+        store.upsert({'paper_id': '2301.00001', 'title': 'old'}, 'arxiv')
+        store.docs['2301.00001']['fetched_at'] = datetime.utcnow() - timedelta(days=30)
+
+        async def lookup_and_wait():
+            result = await search.get_paper_details('2301.00001')
+            await asyncio.gather(*search._background_tasks)
+            return result
+
+        result = asyncio.run(lookup_and_wait())
+
+        assert result['data']['title'] == 'old'
+        assert store.docs['2301.00001']['data']['title'] == 'v1'
+
+    def test_store_errors_fall_back_to_upstream(self):
+        store = MagicMock()
+        store.find.side_effect = RuntimeError('Database not initialized')
+        store.upsert.side_effect = RuntimeError('Database not initialized')
+        search = self.make_search(store)
+
+        result = asyncio.run(search.get_paper_details('2301.00001'))
+
+        assert result['success'] is True
+        assert search.arxiv_client.calls == 1
+
+
+@pytest.mark.unit
+class TestBatchDetails:
+    """Test UnifiedPaperSearch.get_papers_batch."""
+
+    def make_search(self, store, arxiv=None, openalex=None, s2=None):
+        search = UnifiedPaperSearch()
+        search.arxiv_client = arxiv or BatchClient()
+        search.openalex_client = openalex or BatchClient()
+        search.semantic_scholar_client = s2 or BatchClient()
+        search.paper_store = store
+        search.local_index = LocalPaperIndex()
+        search.health = SourceHealthTracker()
+        return search
+
+    def test_one_request_per_source(self):
+        store = MemoryStore()
+        search = self.make_search(store)
+        ids = ['2301.00001', 'W1000000001', '2301.00002', 'W1000000002', 'a' * 27]
+
+        result = asyncio.run(search.get_papers_batch(ids + ['W1000000001']))
+
+        assert list(result['data']['papers']) == ids
+        assert search.arxiv_client.batches == [['2301.00001', '2301.00002']]
+        assert search.openalex_client.batches == [['W1000000001', 'W1000000002']]
+        assert search.semantic_scholar_client.batches == [['a' * 27]]
+        assert result['data']['papers']['W1000000001']['source'] == 'openalex'
+        assert set(store.docs) == set(ids)
+
+    def test_store_hits_skip_upstream(self):
+        store = MemoryStore()
+        store.upsert({'paper_id': 'W1000000001', 'title': 'stored'}, 'openalex')
+        search = self.make_search(store)
+
+        result = asyncio.run(search.get_papers_batch(['W1000000001', 'W1000000002']))
+
+        assert result['data']['papers']['W1000000001']['title'] == 'stored'
+        assert search.openalex_client.batches == [['W1000000002']]
+
+    def test_missing_ids_fall_back_to_other_sources(self):
+        search = self.make_search(
+            MemoryStore(),
+            arxiv=BatchClient(missing={'2301.00009'})
+        )
+
+        result = asyncio.run(search.get_papers_batch(['2301.00001', '2301.00009']))
+
+        assert result['data']['errors'] == {}
+        assert result['data']['papers']['2301.00009']['source'] == 'openalex'
+        assert search.openalex_client.calls == 1
@@ -0,0 +1,164 @@
+"""
+ScholarAI - Field Projection Tests
+
+Tests for list/detail/full field profiles on upstream requests and responses.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.openalex_client import OpenAlexClient
+from services.projection import LIST_FIELDS, project, project_result, resolve_fields
+from services.semantic_scholar_client import SemanticScholarClient
+from tests.test_unified_search import FakeClient, make_search
+
+PAPER = {
+    'paper_id': 'W1',
+    'title': 'Attention',
+    'authors': ['A'],
+    'summary': 'S',
+    'published_year': 2017,
+    'updated': '2020-01-01',
+    'concepts': [{'display_name': 'CS', 'score': 0.9}],
+    'topics': [{'display_name': 'NLP'}],
+    'influential_citation_count': 3,
+    'source': 'openalex'
+}
+
+
+class RecordingTransport:
+    """Async transport stand-in that records request params."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        response = MagicMock(status_code=200)
+        response.json.return_value = self.payload
+        return response
+
+
+class RecordingClient(FakeClient):
+    """FakeClient that records the search kwargs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.kwargs = []
+
+    async def search_papers(self, **kwargs):
+        self.kwargs.append(kwargs)
+        return await super().search_papers(**kwargs)
+
+
+@pytest.mark.unit
+class TestProjection:
+    """Test profile resolution and field trimming."""
+
+    def test_resolve_profiles(self):
+        assert resolve_fields(None) == ('full', None)
+        assert resolve_fields('list') == ('list', None)
+        assert resolve_fields('detail') == ('detail', None)
+
+    def test_resolve_custom_fields(self):
+        assert resolve_fields('title, authors') == ('list', ('title', 'authors'))
+        assert resolve_fields('title,concepts') == ('full', ('title', 'concepts'))
+
+    def test_resolve_rejects_empty_list(self):
+        with pytest.raises(ValueError):
+            resolve_fields(' , ')
+
+    def test_list_profile_keeps_list_and_meta_fields(self):
+        paper = project(PAPER, 'list')
+
+        assert set(paper) <= set(LIST_FIELDS) | {'source'}
+        assert paper['source'] == 'openalex'
+        assert 'concepts' not in paper and 'updated' not in paper
+
+    def test_detail_profile_drops_raw_nested_objects(self):
+        paper = project(PAPER, 'detail')
+
+        assert 'concepts' not in paper and 'topics' not in paper
+        assert paper['updated'] == '2020-01-01'
+
+    def test_full_profile_is_unchanged(self):
+        assert project(PAPER, 'full') is PAPER
+
+    def test_project_result_handles_search_and_detail(self):
+        search = project_result({'success': True, 'data': {'papers': [dict(PAPER)]}}, fields=('title',))
+        detail = project_result({'success': True, 'data': dict(PAPER)}, 'detail')
+
+        assert search['data']['papers'] == [{'title': 'Attention', 'source': 'openalex'}]
+        assert 'concepts' not in detail['data']
+
+
+@pytest.mark.unit
+class TestUpstreamSelection:
+    """Test that clients only request the fields of the profile."""
+
+    def test_openalex_search_sends_select(self):
+        client = OpenAlexClient()
+        client.http = RecordingTransport({'results': [{'id': 'https://openalex.org/W1', 'title': 'T'}], 'meta': {}})
+
+        result = asyncio.run(client.search_papers('transformers', profile='list'))
+
+        url = client.http.calls[0][0]
+        assert 'select=id,doi,title' in url
+        assert set(result['data']['papers'][0]) <= set(LIST_FIELDS)
+
+    def test_openalex_full_profile_sends_no_select(self):
+        client = OpenAlexClient()
+        client.http = RecordingTransport({'id': 'https://openalex.org/W1', 'title': 'T'})
+
+        result = asyncio.run(client.get_paper_details('W1'))
+
+        assert client.http.calls[0][1]['params'] is None
+        assert 'concepts' in result['data']
+
+    def test_semantic_scholar_detail_skips_citations(self):
+        client = SemanticScholarClient()
+        client.http = RecordingTransport({'paperId': 'S1', 'title': 'T'})
+
+        asyncio.run(client.get_paper_details('S1', profile='detail'))
+        asyncio.run(client.get_paper_details('S2'))
+
+        trimmed = client.http.calls[0][1]['params']['fields'].split(',')
+        full = client.http.calls[1][1]['params']['fields'].split(',')
+        assert 'citations' not in trimmed and 'references' not in trimmed
+        assert 'citations' in full
+
+
+@pytest.mark.unit
+class TestUnifiedSearchProfiles:
+    """Test profile threading through UnifiedPaperSearch."""
+
+    def test_list_profile_is_passed_upstream_and_not_stored(self):
+        arxiv = RecordingClient(papers=[dict(PAPER, paper_id='2301.00001')])
+        search = make_search(arxiv, FakeClient(), FakeClient())
+        search.paper_store = MagicMock()
+
+        async def main():
+            result = await search.search_papers(query='test', profile='list')
+            await asyncio.gather(*search._background_tasks)
+            return result
+
+        result = asyncio.run(main())
+
+        assert arxiv.kwargs[0]['profile'] == 'list'
+        assert 'concepts' not in result['data']['papers'][0]
+        search.paper_store.insert_missing.assert_not_called()
+        assert search.local_index.stats()['papers'] == 1
+
+    def test_profiles_are_cached_separately(self):
+        arxiv = RecordingClient(papers=[dict(PAPER, paper_id='2301.00001')])
+        search = make_search(arxiv, FakeClient(), FakeClient())
+        search.paper_store = MagicMock()
+
+        asyncio.run(search.search_papers(query='test', profile='list'))
+        full = asyncio.run(search.search_papers(query='test'))
+
+        assert arxiv.calls == 2
+        assert 'concepts' in full['data']['papers'][0]
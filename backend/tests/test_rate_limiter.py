@@ -0,0 +1,327 @@
+"""
+ScholarAI - Rate Limiter Tests
+
+Tests for per-host token buckets, async waiter queueing, the shared
+Mongo-backed bucket and 429 handling in the HTTP transport.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.http_transport import AsyncHTTPTransport
+from services.rate_limiter import (
+    MongoTokenBucket, RateLimitExceeded, RateLimiter, TokenBucket, _parse_host_rates, parse_rate, track_wait
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def evaluate(expr, doc):
+    """Evaluate the small subset of aggregation expressions MongoTokenBucket uses."""
+    if isinstance(expr, str) and expr.startswith('$'):
+        return doc.get(expr[1:])
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    values = [evaluate(arg, doc) for arg in args]
+    if op == '$ifNull':
+        return values[0] if values[0] is not None else values[1]
+    if op == '$min':
+        return min(values)
+    if op == '$add':
+        return sum(values)
+    if op == '$subtract':
+        return values[0] - values[1]
+    if op == '$multiply':
+        return values[0] * values[1]
+    raise NotImplementedError(op)
+
+
+class PipelineCollection:
+    """In-memory stand-in for the rate_limits collection."""
+
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def find_one_and_update(self, query, pipeline, upsert=False, return_document=None):
+        with self.lock:
+            doc = self.docs.get(query['_id'], {'_id': query['_id']})
+            updates = {name: evaluate(expr, doc) for name, expr in pipeline[0]['$set'].items()}
+            doc = dict(doc, **updates)
+            self.docs[query['_id']] = doc
+            return doc
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Test refill, reservations and pauses."""
+
+    def test_burst_then_paced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+        waits = [bucket.reserve() for _ in range(4)]
+
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+    def test_refills_over_time_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock)
+        for _ in range(3):
+            bucket.reserve()
+
+        clock.now = 100
+        assert bucket.tokens == 3
+
+    def test_refund_returns_reservation(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        bucket.refund()
+
+        assert bucket.reserve() == 1.0
+
+    def test_pause_delays_next_reservation(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=10, clock=clock)
+
+        bucket.pause(2)
+
+        assert bucket.reserve() == pytest.approx(2.1)
+
+    def test_thread_safe_reservations(self):
+        bucket = TokenBucket(rate=1, capacity=1000, clock=FakeClock())
+
+        threads = [threading.Thread(target=lambda: [bucket.reserve() for _ in range(100)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert bucket.tokens == 200
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test async acquisition through the limiter."""
+
+    def test_waiters_are_spaced_without_blocking_loop(self):
+        limiter = RateLimiter({'api.example.org': (20, 1)})
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            acquired = []
+
+            async def acquire(i):
+                await limiter.acquire('api.example.org')
+                acquired.append(time.monotonic())
+
+            await asyncio.gather(ticker(), *[acquire(i) for i in range(4)])
+            return acquired
+
+        acquired = asyncio.run(main())
+
+        assert acquired[-1] - acquired[0] >= 0.14
+        assert ticks[-1] - ticks[0] < 0.1
+        assert limiter.stats()['delayed'] == 3
+
+    def test_unlisted_hosts_are_not_limited(self):
+        limiter = RateLimiter({'api.example.org': (1, 1)})
+
+        async def main():
+            return await asyncio.gather(*[limiter.acquire('other.org') for _ in range(5)])
+
+        waits = asyncio.run(main())
+
+        assert waits == [0.0] * 5
+
+    def test_cancelled_waiter_refunds_token(self):
+        limiter = RateLimiter({'h': (1, 1)})
+
+        async def main():
+            await limiter.acquire('h')
+            waiter = asyncio.ensure_future(limiter.acquire('h'))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(main())
+
+        assert limiter.buckets['h'].tokens > -0.5
+
+    def test_shared_refund_runs_off_the_loop(self):
+        threads = []
+        collection = PipelineCollection()
+        update = collection.find_one_and_update
+
+        def find_one_and_update(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return update(*args, **kwargs)
+
+        collection.find_one_and_update = find_one_and_update
+        limiter = RateLimiter({'h': (1, 1)}, shared=True, collection=collection)
+
+        async def main():
+            await limiter.acquire('h')
+            waiter = asyncio.ensure_future(limiter.acquire('h'))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.sleep(0.05)
+
+        asyncio.run(main())
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        assert limiter.shared_buckets['h'].reserve() < 1.5
+
+    def test_max_wait_fails_fast_and_refunds(self):
+        limiter = RateLimiter({'h': (1, 1)})
+
+        async def main():
+            await limiter.acquire('h')
+            with pytest.raises(RateLimitExceeded):
+                await limiter.acquire('h', max_wait=0.5)
+
+        asyncio.run(main())
+
+        assert limiter.stats()['rejected'] == 1
+        assert limiter.buckets['h'].tokens > -0.5
+
+    def test_wait_is_tracked_across_tasks(self):
+        limiter = RateLimiter({'h': (10, 1)})
+
+        async def main():
+            with track_wait() as waited:
+                await asyncio.gather(*[limiter.acquire('h') for _ in range(3)])
+                with pytest.raises(RateLimitExceeded):
+                    await limiter.acquire('h', max_wait=0)
+            return waited
+
+        waited = asyncio.run(main())
+
+        assert waited.seconds == pytest.approx(0.3, abs=0.01)
+        assert waited.rejected == 1
+
+    def test_shared_bucket_is_shared_between_limiters(self):
+        collection = PipelineCollection()
+        first = RateLimiter({'h': (1, 2)}, shared=True, collection=collection)
+        second = RateLimiter({'h': (1, 2)}, shared=True, collection=collection)
+
+        waits = [
+            first.shared_buckets['h'].reserve(),
+            second.shared_buckets['h'].reserve(),
+            first.shared_buckets['h'].reserve()
+        ]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(1.0, abs=0.05)
+
+    def test_shared_bucket_errors_fall_back_to_local(self):
+        collection = MagicMock()
+        collection.find_one_and_update.side_effect = RuntimeError('Database not initialized')
+        limiter = RateLimiter({'h': (100, 5)}, shared=True, collection=collection)
+
+        assert asyncio.run(limiter.acquire('h')) == 0.0
+        assert limiter.stats()['shared_errors'] == 1
+        assert limiter.buckets['h'].tokens < 5
+
+    def test_mongo_bucket_pause(self):
+        clock = FakeClock()
+        bucket = MongoTokenBucket('h', rate=1, capacity=5, collection=PipelineCollection(), clock=clock)
+
+        bucket.pause(3)
+
+        assert bucket.reserve() == 4.0
+
+    def test_parse_rates(self):
+        assert parse_rate('100/60') == (100 / 60, 2.0)
+        assert parse_rate('10/1:5') == (10.0, 5.0)
+        assert _parse_host_rates('a.org=100/60, b.org=1/3:1,bad,c.org=x') == {
+            'a.org': (100 / 60, 2.0),
+            'b.org': (1 / 3, 1.0)
+        }
+
+
+class TooManyRequestsHandler(BaseHTTPRequestHandler):
+    """Always answers 429 with a short Retry-After."""
+
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header('Retry-After', '0.2')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), TooManyRequestsHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.unit
+class TestTransportRateLimiting:
+    """Test that the transport acquires tokens and backs off on 429."""
+
+    def test_429_pauses_host(self, server):
+        limiter = RateLimiter({'127.0.0.1': (100, 10)})
+        transport = AsyncHTTPTransport(max_workers=2, rate_limiter=limiter)
+
+        async def main():
+            await transport.get(f'{server}/x', timeout=5)
+            start = time.monotonic()
+            await transport.get(f'{server}/x', timeout=5)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(main())
+        transport.close()
+
+        assert elapsed >= 0.18
+        assert limiter.stats()['paused'] == 2
+
+    def test_shared_pause_runs_off_the_loop(self, server):
+        threads = []
+        collection = MagicMock()
+
+        def find_one_and_update(*args, **kwargs):
+            threads.append(threading.get_ident())
+            raise RuntimeError('Database not initialized')
+
+        collection.find_one_and_update.side_effect = find_one_and_update
+        limiter = RateLimiter({'127.0.0.1': (100, 10)}, shared=True, collection=collection)
+        transport = AsyncHTTPTransport(max_workers=2, rate_limiter=limiter)
+
+        asyncio.run(transport.get(f'{server}/x', timeout=5))
+        transport.close()
+
+        assert limiter.stats()['paused'] == 1
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
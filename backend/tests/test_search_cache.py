@@ -0,0 +1,131 @@
+"""
+ScholarAI - Search Cache Tests
+
+Tests for the two-tier search result cache and its use in UnifiedPaperSearch.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.search_cache import LRUCache, MongoCacheTier, SearchCache
+from services.source_health import SourceHealthTracker
+from services.unified_search import UnifiedPaperSearch
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """Test the in-process tier."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_entries_expire(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+
+@pytest.mark.unit
+class TestSearchCache:
+    """Test key normalization, tiers and counters."""
+
+    def test_key_normalization(self):
+        key = SearchCache.make_key(query='  Deep   Learning ', page=1, field=None)
+
+        assert key == SearchCache.make_key(query='deep learning', page=1)
+        assert key != SearchCache.make_key(query='deep learning', page=2)
+
+    def test_hit_miss_counters(self):
+        cache = SearchCache(LRUCache())
+        assert cache.get('k') is None
+        cache.set('k', {'papers': [1]})
+        assert cache.get('k') == {'papers': [1]}
+
+        stats = cache.stats()
+        assert stats['memory_hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_returned_values_are_copies(self):
+        cache = SearchCache(LRUCache())
+        cache.set('k', {'papers': []})
+        cache.get('k')['papers'].append('mutated')
+
+        assert cache.get('k') == {'papers': []}
+
+    def test_shared_tier_hit_promotes_to_memory(self):
+        collection = MagicMock()
+        collection.find_one.return_value = {'payload': json.dumps({'v': 1})}
+        cache = SearchCache(LRUCache(), MongoCacheTier(collection=collection))
+
+        assert cache.get('k') == {'v': 1}
+        assert cache.get('k') == {'v': 1}
+        assert collection.find_one.call_count == 1
+        assert cache.stats()['shared_hits'] == 1
+
+    def test_shared_tier_errors_are_not_fatal(self):
+        collection = MagicMock()
+        collection.find_one.side_effect = RuntimeError('Database not initialized')
+        collection.replace_one.side_effect = RuntimeError('Database not initialized')
+        cache = SearchCache(LRUCache(), MongoCacheTier(collection=collection))
+
+        cache.set('k', {'v': 1})
+        assert cache.get('other') is None
+        assert cache.stats()['shared_errors'] == 2
+
+
+class CountingClient:
+    """Async client stub counting upstream searches."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def search_papers(self, **kwargs):
+        self.calls += 1
+        return {'success': True, 'data': {'papers': [{'paper_id': 'W1'}], 'total': 1}}
+
+
+@pytest.mark.unit
+class TestUnifiedSearchCaching:
+    """Test cache integration in UnifiedPaperSearch."""
+
+    def make_search(self):
+        search = UnifiedPaperSearch()
+        search.arxiv_client = CountingClient()
+        search.cache = SearchCache(LRUCache())
+        search.health = SourceHealthTracker()
+        return search
+
+    def test_repeat_search_hits_cache(self):
+        search = self.make_search()
+
+        first = asyncio.run(search.search_papers(query='Graph Networks'))
+        second = asyncio.run(search.search_papers(query='graph networks '))
+
+        assert search.arxiv_client.calls == 1
+        assert 'cached' not in first
+        assert second['cached'] is True
+
+    def test_bypass_refreshes_cache(self):
+        search = self.make_search()
+
+        asyncio.run(search.search_papers(query='q'))
+        asyncio.run(search.search_papers(query='q', use_cache=False))
+
+        assert search.arxiv_client.calls == 2
+        assert search.cache.stats()['sets'] == 2
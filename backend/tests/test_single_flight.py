@@ -0,0 +1,236 @@
+"""
+ScholarAI - Single-Flight Tests
+
+Tests for coalescing identical in-flight upstream calls.
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.arxiv_client import ArxivClient
+from services.single_flight import SingleFlight, coalesce
+from services.zhipu_client import AsyncZhipuClient, LLMResponseCache
+
+
+class SlowUpstream:
+    """Counts calls and returns a fresh mutable result after a delay."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def fetch(self, value):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {'success': True, 'data': {'value': value}}
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test sharing, isolation and cancellation."""
+
+    def test_concurrent_identical_calls_share_one_request(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream()
+
+        async def main():
+            return await asyncio.gather(*[
+                flight.do('k', lambda: upstream.fetch(1)) for _ in range(10)
+            ])
+
+        results = asyncio.run(main())
+
+        assert upstream.calls == 1
+        assert all(r == {'success': True, 'data': {'value': 1}} for r in results)
+        assert flight.stats()['coalesced'] == 9
+        assert flight.in_flight() == 0
+
+    def test_results_are_independent_copies(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream()
+
+        async def main():
+            return await asyncio.gather(*[flight.do('k', lambda: upstream.fetch(1)) for _ in range(2)])
+
+        first, second = asyncio.run(main())
+        first['data']['value'] = 'mutated'
+
+        assert second['data']['value'] == 1
+
+    def test_leader_mutation_is_not_seen_by_followers(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream()
+
+        async def leader():
+            result = await flight.do('k', lambda: upstream.fetch(1))
+            result['data']['value'] = 'mutated'
+            return result
+
+        async def follower():
+            await asyncio.sleep(0)
+            return await flight.do('k', lambda: upstream.fetch(1))
+
+        async def main():
+            return await asyncio.gather(leader(), follower())
+
+        _, result = asyncio.run(main())
+
+        assert upstream.calls == 1
+        assert result['data']['value'] == 1
+
+    def test_different_keys_are_not_coalesced(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream()
+
+        async def main():
+            return await asyncio.gather(*[
+                flight.do(i, lambda i=i: upstream.fetch(i)) for i in range(3)
+            ])
+
+        results = asyncio.run(main())
+
+        assert upstream.calls == 3
+        assert [r['data']['value'] for r in results] == [0, 1, 2]
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream(delay=0)
+
+        asyncio.run(flight.do('k', lambda: upstream.fetch(1)))
+        asyncio.run(flight.do('k', lambda: upstream.fetch(1)))
+
+        assert upstream.calls == 2
+
+    def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream(error=ConnectionError('reset'))
+
+        async def main():
+            return await asyncio.gather(
+                *[flight.do('k', lambda: upstream.fetch(1)) for _ in range(3)],
+                return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+
+        assert upstream.calls == 1
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+        upstream = SlowUpstream(delay=0.1)
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do('k', lambda: upstream.fetch(1)))
+            follower = asyncio.ensure_future(flight.do('k', lambda: upstream.fetch(1)))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        result = asyncio.run(main())
+
+        assert result['data']['value'] == 1
+        assert upstream.calls == 1
+
+    def test_call_cancelled_when_all_waiters_cancel(self):
+        flight = SingleFlight()
+        cancelled = []
+
+        async def upstream():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def main():
+            waiter = asyncio.ensure_future(flight.do('k', upstream))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+
+        assert cancelled == [True]
+
+
+class CountingTransport:
+    """Async transport stand-in that records requests."""
+
+    def __init__(self, response, delay=0.05):
+        self.response = response
+        self.delay = delay
+        self.calls = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+
+@pytest.mark.unit
+class TestClientCoalescing:
+    """Test coalescing on the paper clients and the Zhipu client."""
+
+    def test_decorated_method_coalesces_per_instance(self):
+        class Client:
+            def __init__(self):
+                self.upstream = SlowUpstream()
+
+            @coalesce
+            async def get_paper_details(self, paper_id):
+                return await self.upstream.fetch(paper_id)
+
+        first, second = Client(), Client()
+
+        async def main():
+            return await asyncio.gather(
+                *[first.get_paper_details('2301.00001') for _ in range(5)],
+                first.get_paper_details('2301.00002'),
+                second.get_paper_details('2301.00001')
+            )
+
+        asyncio.run(main())
+
+        assert first.upstream.calls == 2
+        assert second.upstream.calls == 1
+
+    def test_arxiv_details_burst_sends_one_request(self):
+        feed = MagicMock(status_code=200, content=b'<feed></feed>')
+        client = ArxivClient()
+        client.http = CountingTransport(feed)
+
+        async def main():
+            return await asyncio.gather(*[client.get_paper_details('2301.00001') for _ in range(20)])
+
+        asyncio.run(main())
+
+        assert client.http.calls == 1
+
+    def test_identical_chat_completions_coalesced(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'choices': [{'message': {'content': 'hi'}}]}
+        transport = CountingTransport(response)
+        client = AsyncZhipuClient(
+            api_key='id.secret', cache=LLMResponseCache(enabled=False), transport=transport
+        )
+        messages = [{'role': 'user', 'content': 'Summarize'}]
+
+        async def main():
+            same = [client.chat_completion(messages, temperature=0.2) for _ in range(5)]
+            opted_out = [client.chat_completion(messages, temperature=0.2, cache=False) for _ in range(2)]
+            return await asyncio.gather(*same, *opted_out)
+
+        results = asyncio.run(main())
+
+        assert transport.calls == 3
+        assert all(json.dumps(r['data']) == json.dumps(results[0]['data']) for r in results)
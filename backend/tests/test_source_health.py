@@ -0,0 +1,296 @@
+"""
+ScholarAI - Source Health Tests
+
+Tests for per-source circuit breakers and latency-aware source ordering.
+"""
+
+import asyncio
+
+import pytest
+
+from services.rate_limiter import RateLimitExceeded, RateLimiter
+from services.source_health import CLOSED, HALF_OPEN, OPEN, SourceHealthTracker
+from tests.test_hedging import DetailClient
+from tests.test_unified_search import FakeClient, make_search
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_tracker(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault('failure_threshold', 3)
+    kwargs.setdefault('cooldown', 30)
+    kwargs.setdefault('slow_latency', 5)
+    return SourceHealthTracker(clock=clock, **kwargs), clock
+
+
+@pytest.mark.unit
+class TestSourceHealthTracker:
+    """Test breaker transitions and ordering."""
+
+    def test_trips_after_consecutive_failures(self):
+        tracker, _ = make_tracker()
+
+        for _ in range(2):
+            tracker.record_failure('arxiv', 1.0, 'down')
+        assert tracker.allow('arxiv') is True
+
+        tracker.record_failure('arxiv', 1.0, 'down')
+        assert tracker.allow('arxiv') is False
+        assert tracker.snapshot()['arxiv']['state'] == OPEN
+
+    def test_success_resets_failure_streak(self):
+        tracker, _ = make_tracker()
+
+        for _ in range(2):
+            tracker.record_failure('arxiv', 1.0)
+        tracker.record_success('arxiv', 1.0)
+        tracker.record_failure('arxiv', 1.0)
+
+        assert tracker.allow('arxiv') is True
+
+    def test_half_open_allows_single_probe(self):
+        tracker, clock = make_tracker()
+        for _ in range(3):
+            tracker.record_failure('arxiv', 1.0)
+
+        clock.now = 31
+        probe = tracker.allow('arxiv')
+        assert probe
+        assert tracker.allow('arxiv') is False
+        assert tracker.snapshot()['arxiv']['state'] == HALF_OPEN
+
+        tracker.record_success('arxiv', 0.5, probe)
+        assert tracker.snapshot()['arxiv']['state'] == CLOSED
+        assert tracker.allow('arxiv') is True
+
+    def test_failed_probe_reopens(self):
+        tracker, clock = make_tracker()
+        for _ in range(3):
+            tracker.record_failure('arxiv', 1.0)
+
+        clock.now = 31
+        tracker.allow('arxiv')
+        tracker.record_failure('arxiv', 1.0)
+
+        assert tracker.snapshot()['arxiv']['state'] == OPEN
+        assert tracker.snapshot()['arxiv']['retry_in'] == 30
+        assert tracker.allow('arxiv') is False
+
+    def test_released_probe_can_be_retried(self):
+        tracker, clock = make_tracker()
+        for _ in range(3):
+            tracker.record_failure('arxiv', 1.0)
+        clock.now = 31
+
+        probe = tracker.allow('arxiv')
+        tracker.release('arxiv', probe)
+
+        assert tracker.allow('arxiv')
+
+    def test_only_the_probe_releases_its_slot(self):
+        tracker, clock = make_tracker()
+        for _ in range(3):
+            tracker.record_failure('arxiv', 1.0)
+        clock.now = 31
+
+        probe = tracker.allow('arxiv')
+        tracker.release('arxiv')
+        tracker.release('arxiv', True)
+
+        assert tracker.allow('arxiv') is False
+        tracker.release('arxiv', probe)
+        assert tracker.allow('arxiv')
+
+    def test_failure_after_cooldown_reopens(self):
+        tracker, clock = make_tracker()
+        for _ in range(3):
+            tracker.record_failure('arxiv', 1.0)
+        clock.now = 31
+
+        # callers that only check is_open() never move the breaker to half-open
+        assert tracker.is_open('arxiv') is False
+        tracker.record_failure('arxiv', 1.0)
+
+        assert tracker.is_open('arxiv') is True
+        assert tracker.snapshot()['arxiv']['retry_in'] == 30
+
+    def test_order_keeps_priority_for_healthy_sources(self):
+        tracker, _ = make_tracker()
+        tracker.record_success('arxiv', 2.0)
+        tracker.record_success('openalex', 0.1)
+
+        assert tracker.order(['arxiv', 'openalex', 'semantic_scholar']) == [
+            'arxiv', 'openalex', 'semantic_scholar'
+        ]
+
+    def test_order_demotes_slow_and_drops_open_sources(self):
+        tracker, _ = make_tracker()
+        tracker.record_success('arxiv', 12.0)
+        for _ in range(3):
+            tracker.record_failure('openalex', 1.0)
+
+        assert tracker.order(['arxiv', 'openalex', 'semantic_scholar']) == ['semantic_scholar', 'arxiv']
+
+    def test_latency_ewma(self):
+        tracker, _ = make_tracker(alpha=0.5)
+        tracker.record_success('arxiv', 1.0)
+        tracker.record_success('arxiv', 3.0)
+
+        assert tracker.snapshot()['arxiv']['latency_ewma'] == 2.0
+
+
+class ThrottledClient(FakeClient):
+    """Takes a token from a local rate limiter before answering."""
+
+    def __init__(self, limiter, max_wait=None, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.max_wait = max_wait
+
+    async def search_papers(self, **kwargs):
+        await self.limiter.acquire('h', max_wait=self.max_wait)
+        return await super().search_papers(**kwargs)
+
+
+@pytest.mark.unit
+class TestSearchWithBreakers:
+    """Test UnifiedPaperSearch skipping sources with open breakers."""
+
+    def make_search(self, arxiv):
+        openalex = FakeClient(papers=[{'paper_id': 'W1', 'title': 'A'}])
+        search = make_search(arxiv, openalex, FakeClient())
+        search.health, _ = make_tracker()
+        return search
+
+    def test_dead_source_skipped_after_trip(self):
+        arxiv = FakeClient(error='arXiv down')
+        search = self.make_search(arxiv)
+
+        for i in range(5):
+            result = asyncio.run(search.search_papers(query=f'q{i}', use_cache=False))
+            assert result['data']['source'] == 'openalex'
+
+        assert arxiv.calls == 3
+        assert search.health.snapshot()['arxiv']['state'] == OPEN
+
+    def test_federated_timeouts_count_as_failures(self):
+        arxiv = FakeClient(papers=[{'paper_id': 'A1', 'title': 'Slow'}], delay=1.0)
+        search = self.make_search(arxiv)
+
+        for i in range(4):
+            asyncio.run(search.search_papers(query=f'q{i}', mode='merge', deadline=0.05))
+
+        assert arxiv.calls == 3
+        assert search.health.snapshot()['arxiv']['failures'] == 3
+
+    def test_race_losers_not_counted_as_failures(self):
+        arxiv = FakeClient(papers=[{'paper_id': 'A1', 'title': 'Slow'}], delay=0.3)
+        search = self.make_search(arxiv)
+
+        asyncio.run(search.search_papers(query='q', mode='race'))
+
+        assert arxiv.cancelled is True
+        assert 'arxiv' not in search.health.snapshot() or search.health.snapshot()['arxiv']['failures'] == 0
+
+    def test_local_throttling_is_not_upstream_latency(self):
+        limiter = RateLimiter({'h': (5, 1)})
+        arxiv = ThrottledClient(limiter, papers=[{'paper_id': 'A1', 'title': 'A'}])
+        search = self.make_search(arxiv)
+
+        for i in range(3):
+            asyncio.run(search.search_papers(query=f'q{i}', use_cache=False))
+
+        assert limiter.stats()['wait_seconds'] > 0.3
+        assert search.health.snapshot()['arxiv']['latency_ewma'] < 0.05
+
+    def test_rate_limit_rejections_are_not_failures(self):
+        limiter = RateLimiter({'h': (0.1, 1)})
+        arxiv = ThrottledClient(limiter, max_wait=1, papers=[{'paper_id': 'A1', 'title': 'A'}])
+        search = self.make_search(arxiv)
+
+        asyncio.run(search._search_source('arxiv', query='q0'))
+        for i in range(1, 5):
+            with pytest.raises(RateLimitExceeded):
+                asyncio.run(search._search_source('arxiv', query=f'q{i}'))
+
+        assert limiter.stats()['rejected'] == 4
+        assert search.health.snapshot()['arxiv']['failures'] == 0
+
+    def test_all_sources_open(self):
+        search = make_search(FakeClient(error='x'), FakeClient(error='y'), FakeClient(error='z'))
+        search.health, _ = make_tracker(failure_threshold=1)
+
+        asyncio.run(search.search_papers(query='q1', use_cache=False))
+        result = asyncio.run(search.search_papers(query='q2', use_cache=False))
+
+        assert result['success'] is False
+        assert result['tried_sources'] == []
+
+
+class BatchClient(DetailClient):
+    """Detail client whose batch lookups raise."""
+
+    async def get_papers_batch(self, paper_ids):
+        self.calls += 1
+        raise ConnectionError('batch down')
+
+
+@pytest.mark.unit
+class TestLookupsWithBreakers:
+    """Test detail and batch lookups recording source health."""
+
+    def make_search(self, arxiv, openalex):
+        search = make_search(arxiv, openalex, FakeClient())
+        search.health, _ = make_tracker()
+        return search
+
+    def test_failed_detail_lookups_trip_breaker(self):
+        arxiv = DetailClient(error='获取论文详情失败: 503')
+        search = self.make_search(arxiv, DetailClient())
+
+        for _ in range(5):
+            result = asyncio.run(search._fetch_paper_details('2301.00001'))
+            assert result['data']['source'] == 'openalex'
+
+        assert arxiv.calls == 3
+        assert search.health.snapshot()['arxiv']['state'] == OPEN
+        assert search.health.snapshot()['openalex']['failures'] == 0
+
+    def test_breaker_reopens_after_cooldown(self):
+        arxiv = DetailClient(error='获取论文详情失败: 503')
+        search = self.make_search(arxiv, DetailClient())
+        search.health, clock = make_tracker()
+
+        for _ in range(3):
+            asyncio.run(search._fetch_paper_details('2301.00001'))
+        clock.now = 31
+        for _ in range(3):
+            asyncio.run(search._fetch_paper_details('2301.00001'))
+
+        assert arxiv.calls == 4
+        assert search.health.is_open('arxiv') is True
+
+    def test_not_found_is_not_a_failure(self):
+        search = self.make_search(DetailClient(error='论文未找到'), DetailClient())
+
+        for _ in range(5):
+            asyncio.run(search._fetch_paper_details('2301.00001'))
+
+        assert search.health.snapshot()['arxiv']['state'] == CLOSED
+        assert search.health.snapshot()['arxiv']['failures'] == 0
+
+    def test_failed_batch_is_recorded(self):
+        arxiv = BatchClient()
+        search = self.make_search(arxiv, DetailClient())
+
+        result = asyncio.run(search.get_papers_batch(['2301.00001'], use_store=False))
+
+        assert result['data']['papers']['2301.00001']['source'] == 'openalex'
+        assert search.health.snapshot()['arxiv']['failures'] == 1
@@ -0,0 +1,197 @@
+"""
+ScholarAI - Taxonomy Snapshot Tests
+
+Tests for the bundled/stored/refreshed concept snapshot behind /api/papers/fields.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from services.taxonomy import Taxonomy, TaxonomySnapshot
+
+CONCEPTS = [
+    {'id': 'C1', 'name': 'Computer science', 'level': 0, 'works_count': 100, 'description': ''},
+    {'id': 'C2', 'name': 'Biology', 'level': 0, 'works_count': 50, 'description': ''}
+]
+TOPICS = [{'id': 'T1', 'name': 'Deep Learning', 'subfield': 'AI', 'field': 'CS', 'domain': 'Physical', 'works_count': 9}]
+
+
+class FakeOpenAlexClient:
+    def __init__(self, topics_ok=True):
+        self.calls = 0
+        self.topics_ok = topics_ok
+
+    async def get_concepts(self, limit=100):
+        self.calls += 1
+        return {'success': True, 'data': {'concepts': CONCEPTS, 'total': 65000}}
+
+    async def get_topics(self, limit=100):
+        if not self.topics_ok:
+            return {'success': False, 'error': 'boom'}
+        return {'success': True, 'data': {'topics': TOPICS, 'total': 4500}}
+
+
+def make_taxonomy(collection=None, client=None, **kwargs):
+    if collection is None:
+        collection = MagicMock()
+        collection.find_one.return_value = None
+    return Taxonomy(client=client or FakeOpenAlexClient(), collection=collection, **kwargs)
+
+
+@pytest.mark.unit
+class TestSnapshot:
+    """Test the immutable snapshot."""
+
+    def test_bundled_snapshot(self):
+        snapshot = make_taxonomy().snapshot
+
+        assert snapshot.origin == 'bundled'
+        assert snapshot.name('C41008148') == 'Computer science'
+        assert snapshot.name('https://openalex.org/C41008148') == 'Computer science'
+        assert snapshot.name('cs.CL') == 'Computation and Language'
+        assert snapshot.name('cs.XX') is None
+        assert snapshot.name('') is None
+
+    def test_missing_bundle_gives_empty_snapshot(self, tmp_path):
+        snapshot = make_taxonomy(bundled_path=str(tmp_path / 'missing.json')).snapshot
+
+        assert snapshot.concepts == ()
+        assert snapshot.name('cs.AI') is None
+
+    def test_version_follows_content(self):
+        now = datetime.utcnow()
+        a = TaxonomySnapshot(CONCEPTS, TOPICS, [], now, 'openalex')
+        b = TaxonomySnapshot(CONCEPTS, TOPICS, [], now + timedelta(days=1), 'openalex')
+        c = TaxonomySnapshot(CONCEPTS[:1], TOPICS, [], now, 'openalex')
+
+        assert a.version == b.version != c.version
+
+    def test_payload_is_cached(self):
+        snapshot = TaxonomySnapshot(CONCEPTS, TOPICS, [], datetime(2026, 1, 1), 'openalex', totals={'concepts': 65000})
+
+        body = snapshot.payload('concepts', 1)
+        data = json.loads(body)['data']
+
+        assert data['concepts'] == CONCEPTS[:1]
+        assert data['total'] == 65000
+        assert data['version'] == snapshot.version
+        assert snapshot.payload('concepts', 1) is body
+        assert json.loads(snapshot.payload('topics', 10))['data']['topics'] == TOPICS
+
+    def test_document_round_trip(self):
+        snapshot = TaxonomySnapshot(CONCEPTS, TOPICS, [], datetime(2026, 1, 1), 'openalex', totals={'topics': 4500})
+
+        restored = TaxonomySnapshot.from_document(snapshot.to_document(), origin='store')
+
+        assert restored.version == snapshot.version
+        assert restored.concepts == snapshot.concepts
+        assert restored.totals['topics'] == 4500
+
+
+@pytest.mark.unit
+class TestRefresh:
+    """Test loading newer snapshots."""
+
+    def test_stale_snapshot_is_fetched_and_stored(self):
+        client = FakeOpenAlexClient()
+        collection = MagicMock()
+        collection.find_one.return_value = None
+        taxonomy = make_taxonomy(collection=collection, client=client, refresh_interval=timedelta(hours=1))
+
+        assert taxonomy.refresh() is True
+
+        assert taxonomy.snapshot.origin == 'openalex'
+        assert taxonomy.name('T1') == 'Deep Learning'
+        # arXiv categories come from the bundle
+        assert taxonomy.name('cs.AI') == 'Artificial Intelligence'
+        stored = collection.replace_one.call_args[0][1]
+        assert stored['_id'] == 'openalex'
+        assert 'arxiv_categories' not in stored
+
+    def test_fresh_store_snapshot_skips_upstream(self):
+        client = FakeOpenAlexClient()
+        collection = MagicMock()
+        collection.find_one.return_value = {
+            '_id': 'openalex', 'version': 'v1', 'fetched_at': datetime.utcnow(),
+            'concepts': CONCEPTS, 'topics': TOPICS
+        }
+        taxonomy = make_taxonomy(collection=collection, client=client, refresh_interval=timedelta(hours=1))
+
+        assert taxonomy.refresh() is True
+
+        assert client.calls == 0
+        assert taxonomy.snapshot.origin == 'store'
+        assert taxonomy.snapshot.version == 'v1'
+        assert taxonomy.name('cs.AI') == 'Artificial Intelligence'
+
+    def test_store_errors_fall_back_to_upstream(self):
+        collection = MagicMock()
+        collection.find_one.side_effect = Exception('mongo down')
+        collection.replace_one.side_effect = Exception('mongo down')
+        taxonomy = make_taxonomy(collection=collection, refresh_interval=timedelta(hours=1))
+
+        assert taxonomy.refresh() is True
+        assert taxonomy.snapshot.origin == 'openalex'
+
+    def test_topics_failure_keeps_concepts(self):
+        taxonomy = make_taxonomy(client=FakeOpenAlexClient(topics_ok=False), refresh_interval=timedelta(hours=1))
+
+        taxonomy.refresh()
+
+        assert taxonomy.name('C2') == 'Biology'
+        assert taxonomy.snapshot.topics == ()
+
+    def test_older_snapshot_is_ignored(self):
+        collection = MagicMock()
+        collection.find_one.return_value = {'fetched_at': datetime(2000, 1, 1), 'concepts': CONCEPTS}
+        taxonomy = make_taxonomy(collection=collection)
+
+        assert taxonomy.load_from_store() is False
+        assert taxonomy.snapshot.origin == 'bundled'
+
+    def test_disabled_refresh(self):
+        taxonomy = make_taxonomy(refresh_interval=timedelta(0))
+
+        assert taxonomy.is_stale() is False
+        taxonomy.start()
+        assert taxonomy._thread is None
+
+
+@pytest.mark.unit
+class TestFieldsRoute:
+    """Test /api/papers/fields served from the snapshot."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from routes.papers import papers_bp
+
+        taxonomy = make_taxonomy(refresh_interval=timedelta(0))
+        monkeypatch.setattr('routes.papers.get_taxonomy', lambda: taxonomy)
+        app = Flask(__name__)
+        app.register_blueprint(papers_bp)
+        return app.test_client()
+
+    def test_fields(self, client):
+        response = client.get('/api/papers/fields?limit=3')
+        data = response.get_json()['data']
+
+        assert response.status_code == 200
+        assert [c['name'] for c in data['concepts']] == ['Computer science', 'Medicine', 'Biology']
+        assert response.headers['ETag'] == f'"{data["version"]}"'
+
+    def test_arxiv_categories(self, client):
+        data = client.get('/api/papers/fields?type=arxiv&limit=1000').get_json()['data']
+
+        assert {'id': 'cs.LG', 'name': 'Machine Learning'} in data['categories']
+
+    def test_not_modified(self, client):
+        etag = client.get('/api/papers/fields').headers['ETag']
+
+        assert client.get('/api/papers/fields', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_invalid_type(self, client):
+        assert client.get('/api/papers/fields?type=bogus').status_code == 400
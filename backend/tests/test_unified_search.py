@@ -0,0 +1,137 @@
+"""
+ScholarAI - Unified Search Tests
+
+Tests for UnifiedPaperSearch source selection:
+- Sequential fallback
+- Federated race / merge modes with per-source deadlines
+"""
+
+import asyncio
+
+import pytest
+
+from services.local_index import LocalPaperIndex
+from services.search_cache import LRUCache, SearchCache
+from services.source_health import SourceHealthTracker
+from services.unified_search import UnifiedPaperSearch
+
+
+class FakeClient:
+    """Async stand-in for an upstream paper client."""
+
+    def __init__(self, papers=None, delay=0.0, error=None):
+        self.papers = papers or []
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def search_papers(self, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            return {'success': False, 'error': self.error}
+        return {
+            'success': True,
+            'data': {
+                'papers': [dict(p) for p in self.papers],
+                'total': len(self.papers),
+                'page': 1,
+                'page_size': 10,
+                'total_pages': 1
+            }
+        }
+
+
+def make_search(arxiv, openalex, semantic_scholar):
+    search = UnifiedPaperSearch()
+    search.arxiv_client = arxiv
+    search.openalex_client = openalex
+    search.semantic_scholar_client = semantic_scholar
+    search.cache = SearchCache(LRUCache())
+    search.local_index = LocalPaperIndex()
+    search.health = SourceHealthTracker()
+    return search
+
+
+@pytest.mark.unit
+class TestFallbackMode:
+    """Test the default sequential fallback."""
+
+    def test_falls_back_to_next_source(self):
+        arxiv = FakeClient(error='arXiv down')
+        openalex = FakeClient(papers=[{'paper_id': 'W1', 'title': 'A'}])
+        s2 = FakeClient(papers=[{'paper_id': 'S1', 'title': 'B'}])
+        search = make_search(arxiv, openalex, s2)
+
+        result = asyncio.run(search.search_papers(query='test'))
+
+        assert result['success'] is True
+        assert result['data']['source'] == 'openalex'
+        assert result['data']['papers'][0]['source'] == 'openalex'
+        assert s2.calls == 0
+
+    def test_all_sources_fail(self):
+        search = make_search(
+            FakeClient(error='a'), FakeClient(error='b'), FakeClient(error='c')
+        )
+
+        result = asyncio.run(search.search_papers(query='test'))
+
+        assert result['success'] is False
+        assert result['tried_sources'] == UnifiedPaperSearch.SOURCES
+
+
+@pytest.mark.unit
+class TestFederatedModes:
+    """Test concurrent race / merge modes."""
+
+    def test_race_returns_fastest_and_cancels_rest(self):
+        arxiv = FakeClient(papers=[{'paper_id': '2301.00001'}], delay=5)
+        openalex = FakeClient(papers=[{'paper_id': 'W1'}], delay=0.01)
+        s2 = FakeClient(papers=[{'paper_id': 'S1'}], delay=5)
+        search = make_search(arxiv, openalex, s2)
+
+        result = asyncio.run(search.search_papers(query='test', mode='race', deadline=10))
+
+        assert result['data']['source'] == 'openalex'
+        assert arxiv.cancelled and s2.cancelled
+
+    def test_race_skips_failed_source(self):
+        arxiv = FakeClient(error='boom')
+        openalex = FakeClient(papers=[{'paper_id': 'W1'}], delay=0.05)
+        s2 = FakeClient(error='boom')
+        search = make_search(arxiv, openalex, s2)
+
+        result = asyncio.run(search.search_papers(query='test', mode='race', deadline=1))
+
+        assert result['success'] is True
+        assert result['data']['source'] == 'openalex'
+
+    def test_merge_respects_deadline(self):
+        arxiv = FakeClient(papers=[{'paper_id': '2301.00001'}], delay=5)
+        openalex = FakeClient(papers=[{'paper_id': 'W1'}, {'paper_id': 'W2'}])
+        s2 = FakeClient(papers=[{'paper_id': 'S1'}])
+        search = make_search(arxiv, openalex, s2)
+
+        result = asyncio.run(search.search_papers(query='test', mode='merge', deadline=0.1))
+        data = result['data']
+
+        assert data['source'] == 'federated'
+        assert data['sources'] == ['openalex', 'semantic_scholar']
+        assert [p['paper_id'] for p in data['papers']] == ['W1', 'S1', 'W2']
+        assert 'arxiv' in data['source_errors']
+        assert arxiv.cancelled
+
+    def test_federated_all_fail(self):
+        search = make_search(
+            FakeClient(error='a'), FakeClient(error='b'), FakeClient(delay=5)
+        )
+
+        result = asyncio.run(search.search_papers(query='test', mode='merge', deadline=0.05))
+
+        assert result['success'] is False
@@ -0,0 +1,221 @@
+"""
+ScholarAI - Paper Vector Index Tests
+
+Tests for the TF-IDF/SVD similarity index and the /api/papers-ai/recommend
+endpoint that answers from it.
+"""
+
+import random
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+from scipy.sparse.linalg import svds
+
+from routes.papers_ai import papers_ai_bp
+from services.vector_index import PaperVectorIndex
+
+TOPICS = {
+    'vision': 'image convolutional segmentation pixel detection camera object',
+    'language': 'language translation token transformer text parsing grammar',
+    'graphs': 'graph node edge message passing molecule network community',
+    'robots': 'robot control manipulation reinforcement policy locomotion arm'
+}
+
+
+def make_corpus(per_topic=10, seed=1):
+    rng = random.Random(seed)
+    papers = []
+    for topic, words in TOPICS.items():
+        vocabulary = words.split()
+        for i in range(per_topic):
+            text = ' '.join(rng.choice(vocabulary) for _ in range(30))
+            papers.append(({
+                'paper_id': f'{topic}-{i}',
+                'title': f'{topic} study {i}',
+                'summary': text
+            }, 'arxiv'))
+    return papers
+
+
+def topic_of(paper):
+    return paper['paper_id'].split('-')[0]
+
+
+@pytest.mark.unit
+class TestPaperVectorIndex:
+    """Test building, exact/approximate search and incremental adds."""
+
+    def test_similar_papers_share_topic(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus())
+
+        results = index.similar({'paper_id': 'graphs-0', 'source': 'arxiv'}, k=5)
+
+        assert len(results) == 5
+        assert all(topic_of(paper) == 'graphs' for paper, _ in results)
+        assert 'graphs-0' not in [paper['paper_id'] for paper, _ in results]
+        assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+    def test_svd_used_for_larger_corpora(self):
+        index = PaperVectorIndex(dim=8)
+        index.build(make_corpus())
+
+        stats = index.stats()
+        results = index.similar({'paper_id': 'robots-3', 'source': 'arxiv'}, k=3)
+
+        assert stats['svd'] is True and stats['dimensions'] == 8
+        assert all(topic_of(paper) == 'robots' for paper, _ in results)
+
+    def test_approximate_search_above_threshold(self):
+        index = PaperVectorIndex(dim=8, exact_threshold=10, nprobe=2)
+        index.build(make_corpus(per_topic=25))
+
+        results = index.similar({'paper_id': 'vision-1', 'source': 'arxiv'}, k=5)
+
+        assert index.stats()['approximate'] is True
+        assert all(topic_of(paper) == 'vision' for paper, _ in results)
+
+    def test_unindexed_paper_is_embedded_from_text(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus())
+
+        results = index.similar({
+            'paper_id': 'new',
+            'title': 'Transformer translation',
+            'summary': 'language token grammar parsing'
+        }, k=3)
+
+        assert all(topic_of(paper) == 'language' for paper, _ in results)
+
+    def test_cross_source_duplicates_are_excluded(self):
+        corpus = make_corpus()
+        duplicate = dict(corpus[0][0], paper_id='W123')
+        index = PaperVectorIndex()
+        index.build(corpus + [(duplicate, 'openalex')])
+
+        results = index.similar(dict(corpus[0][0], source='arxiv'), k=5)
+
+        assert 'W123' not in [paper['paper_id'] for paper, _ in results]
+
+    def test_add_folds_in_new_papers(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus())
+
+        index.add({'paper_id': 'robots-new', 'title': 'robot arm', 'summary': 'robot arm control policy'}, 'arxiv')
+        results = index.similar({'paper_id': 'robots-0', 'source': 'arxiv'}, k=20)
+
+        assert 'robots-new' in [paper['paper_id'] for paper, _ in results]
+        assert len(index) == 41
+
+    def test_rebuild_flagged_after_many_adds(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus(per_topic=1))
+
+        for i in range(60):
+            index.add({'paper_id': f'x{i}', 'title': 'graph node'}, 'arxiv')
+
+        assert index.needs_rebuild is True
+
+    def test_old_index_serves_during_rebuild(self):
+        index = PaperVectorIndex(dim=8)
+        index.build(make_corpus())
+        started, release = threading.Event(), threading.Event()
+
+        def slow_svds(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return svds(*args, **kwargs)
+
+        with patch('services.vector_index.svds', slow_svds):
+            rebuild = threading.Thread(target=index.build, args=(make_corpus(per_topic=12),))
+            rebuild.start()
+            assert started.wait(5)
+
+            # the lock is free while the SVD runs: queries and adds go to the old index
+            results = index.similar({'paper_id': 'graphs-0', 'source': 'arxiv'}, k=3)
+            index.add({'paper_id': 'late-0', 'title': 'robot arm', 'summary': 'robot control policy'}, 'arxiv')
+            release.set()
+            rebuild.join(5)
+
+        assert len(results) == 3
+        assert len(index) == 49
+        assert ('arxiv', 'late-0') in index._rows
+
+    def test_load_from_store(self):
+        store = MagicMock()
+        store.iter_documents.return_value = [
+            {'data': paper, 'source': source} for paper, source in make_corpus()
+        ]
+        index = PaperVectorIndex()
+
+        assert index.load_from_store(store) == 40
+        assert index.loaded is True
+
+    def test_empty_index_returns_nothing(self):
+        index = PaperVectorIndex()
+        index.build([])
+
+        assert index.similar({'paper_id': 'x', 'title': 'anything'}) == []
+
+
+@pytest.mark.unit
+class TestRecommendRoute:
+    """Test the recommend endpoint."""
+
+    def make_app(self):
+        app = Flask(__name__)
+        app.register_blueprint(papers_ai_bp)
+        return app
+
+    def test_recommends_from_index_without_llm(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus())
+        source = dict(make_corpus()[0][0], source='arxiv')
+
+        with patch('routes.papers_ai.fetch_papers', return_value=[source]), \
+                patch('routes.papers_ai.get_vector_index', return_value=index), \
+                patch('routes.papers_ai.ZhipuClient') as client:
+            response = self.make_app().test_client().post(
+                '/api/papers-ai/recommend', json={'paper_id': 'vision-0', 'count': 3}
+            )
+
+        data = response.get_json()['data']
+        assert response.status_code == 200
+        assert len(data['recommendations']) == 3
+        assert all(rec['paper_id'].startswith('vision') for rec in data['recommendations'])
+        assert data['recommendations'][0]['score'] > 0
+        client.assert_not_called()
+
+    def test_explain_uses_llm_reasons(self):
+        index = PaperVectorIndex()
+        index.build(make_corpus())
+        source = dict(make_corpus()[0][0], source='arxiv')
+        client = MagicMock()
+
+        def reasons(messages, **kwargs):
+            ids = [line[2:].split(':')[0] for line in messages[0]['content'].split('\n') if line.startswith('- ')]
+            content = '{' + ', '.join(f'"{pid}": "because {pid}"' for pid in ids) + '}'
+            return {'success': True, 'data': {'choices': [{'message': {'content': content}}]}}
+
+        client.return_value.chat_completion.side_effect = reasons
+
+        with patch('routes.papers_ai.fetch_papers', return_value=[source]), \
+                patch('routes.papers_ai.get_vector_index', return_value=index), \
+                patch('routes.papers_ai.ZhipuClient', client):
+            response = self.make_app().test_client().post(
+                '/api/papers-ai/recommend', json={'paper_id': 'vision-0', 'count': 2, 'explain': True}
+            )
+
+        recommendations = response.get_json()['data']['recommendations']
+        assert client.return_value.chat_completion.call_count == 1
+        assert all(rec['reason'] == f"because {rec['paper_id']}" for rec in recommendations)
+
+    def test_unknown_paper_is_404(self):
+        with patch('routes.papers_ai.fetch_papers', return_value=[]):
+            response = self.make_app().test_client().post(
+                '/api/papers-ai/recommend', json={'paper_id': 'missing'}
+            )
+
+        assert response.status_code == 404
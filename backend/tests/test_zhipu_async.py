@@ -0,0 +1,133 @@
+"""
+ScholarAI - Async Zhipu Client Tests
+
+Tests for non-blocking retries, Retry-After handling and cancellation.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from services.http_transport import parse_retry_after
+from services.zhipu_client import AsyncZhipuClient, LLMResponseCache
+
+
+def make_response(status_code, headers=None, content='ok'):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = {'choices': [{'message': {'content': content}}]}
+    return response
+
+
+class ScriptedTransport:
+    """Returns (or raises) scripted outcomes in order."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(outcomes, **kwargs):
+    return AsyncZhipuClient(
+        api_key='id.secret',
+        cache=LLMResponseCache(enabled=False),
+        transport=ScriptedTransport(outcomes),
+        **kwargs
+    )
+
+
+MESSAGES = [{'role': 'user', 'content': 'Hi'}]
+
+
+@pytest.mark.unit
+class TestAsyncZhipuClient:
+    """Test retry and backoff behaviour."""
+
+    def test_retries_transient_status_then_succeeds(self):
+        client = make_client([make_response(503), make_response(200)], retry_delay=0.01)
+
+        result = asyncio.run(client.chat_completion(MESSAGES))
+
+        assert result['success'] is True
+        assert client.http.calls == 2
+
+    def test_network_errors_exhaust_retries(self):
+        client = make_client([ConnectionError('reset')] * 3, retry_delay=0.01)
+
+        result = asyncio.run(client.chat_completion(MESSAGES))
+
+        assert result['success'] is False
+        assert 'reset' in result['error']
+        assert client.http.calls == 3
+
+    def test_client_errors_are_not_retried(self):
+        response = make_response(400)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        client = make_client([response], retry_delay=0.01)
+
+        result = asyncio.run(client.chat_completion(MESSAGES))
+
+        assert result['success'] is False
+        assert result['status_code'] == 400
+        assert client.http.calls == 1
+
+    def test_retry_after_overrides_backoff(self):
+        client = make_client([], retry_delay=10)
+
+        delay = client._backoff_delay(0, 10, make_response(429, {'Retry-After': '0.5'}))
+
+        assert delay == 0.5
+
+    def test_backoff_has_jitter_and_cap(self):
+        client = make_client([], max_retry_delay=4)
+
+        delays = {client._backoff_delay(5, 1.0) for _ in range(20)}
+
+        assert all(2 <= d <= 4 for d in delays)
+        assert len(delays) > 1
+
+    def test_backoff_does_not_block_event_loop(self):
+        client = make_client([make_response(429, {'Retry-After': '0.3'}), make_response(200)])
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            return await asyncio.gather(client.chat_completion(MESSAGES), ticker())
+
+        result, _ = asyncio.run(main())
+
+        assert result['success'] is True
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.25
+
+    def test_cancellation_during_backoff(self):
+        client = make_client([make_response(429, {'Retry-After': '10'}), make_response(200)])
+
+        async def main():
+            task = asyncio.ensure_future(client.chat_completion(MESSAGES))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+
+        assert client.http.calls == 1
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None